@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class ConsultationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api.consultation"
+
+    def ready(self):
+        from . import signals
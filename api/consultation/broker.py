@@ -0,0 +1,81 @@
+"""In-process publish/subscribe for consultation events.
+
+A local stand-in for a shared broker (Redis pub/sub, Postgres LISTEN/NOTIFY).
+Subscribers are asyncio queues owned by the event streams running in this
+ASGI process; ``publish`` can be called from any thread, including the
+worker threads Django runs sync views in.
+
+Events carry no payload the stream relies on: a subscriber treats each one as
+"look for new rows". An event published in another process never arrives
+here, and a full queue drops it, so streams also re-read the database on a
+timer and a lost wake-up only delays a message.
+"""
+import asyncio
+import threading
+from typing import Any, Dict, Set
+
+DEFAULT_QUEUE_SIZE = 100
+
+
+class Subscription:
+    def __init__(self, broker: "Broker", channel: str, maxsize: int):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def _offer(self, event: Any) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for an event; drains the backlog."""
+        try:
+            await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        return True
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel: str) -> Subscription:
+        """Subscribe the running event loop to ``channel``."""
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel: str, event: Any = None) -> int:
+        """Wake every subscriber of ``channel``; returns how many there were."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # The subscriber's loop already closed; it unsubscribes itself.
+                pass
+        return len(subscribers)
+
+
+broker = Broker()
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:34
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def backfill_last_message(apps, schema_editor):
+    Consultation = apps.get_model('consultation', 'Consultation')
+    ConsultationMessage = apps.get_model('consultation', 'ConsultationMessage')
+    last = ConsultationMessage.objects.filter(consultation=OuterRef('pk')).order_by('-id')
+    Consultation.objects.update(
+        last_message_id=Subquery(last.values('id')[:1]),
+        last_message_at=Subquery(last.values('created_at')[:1]),
+    )
+    # Existing history counts as read; badges start with the next message.
+    Consultation.objects.filter(last_message_id__isnull=False).update(
+        farmer_read_id=F('last_message_id'), consultant_read_id=F('last_message_id')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultation',
+            name='consultant_read_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='consultant_unread',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='farmer_read_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='farmer_unread',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='last_message_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_last_message, migrations.RunPython.noop),
+    ]
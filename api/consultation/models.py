@@ -37,6 +37,15 @@ class Consultation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
+    # Maintained by api.consultation.services when a message is created or
+    # read, so lists can show unread badges without counting messages.
+    last_message_id = models.BigIntegerField(null=True, blank=True)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    farmer_read_id = models.BigIntegerField(default=0)
+    consultant_read_id = models.BigIntegerField(default=0)
+    farmer_unread = models.PositiveIntegerField(default=0)
+    consultant_unread = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return f"Konsultasi {self.id}"
 
@@ -1,13 +1,25 @@
 from rest_framework import serializers
 from apps.core.models import Consultant
 from .models import Consultation, ConsultationMessage
+from api.listing import SparseFieldsMixin
 from api.user_flutter.models import FlutterUser
+from apps.core.services.media_pipeline import rendition_url
 
 
-class ConsultantSerializer(serializers.ModelSerializer):
+class ConsultantSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    profile_picture = serializers.SerializerMethodField()
+
     class Meta:
         model = Consultant
         fields = ['id', 'name', 'profile_picture', 'institution_name', 'bio']
+        sparse_sources = {'profile_picture': ['profile_picture']}
+
+    def get_profile_picture(self, obj):
+        url = rendition_url(obj, 'profile_picture', 'full', 'jpeg')
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
 
 
 class ConsultationMessageSerializer(serializers.ModelSerializer):
@@ -68,17 +80,25 @@ class ConsultationSerializer(serializers.ModelSerializer):
     consultant_id = serializers.PrimaryKeyRelatedField(
         queryset=Consultant.objects.all(), source='consultant', write_only=True
     )
+    unread_count = serializers.IntegerField(source='farmer_unread', read_only=True)
 
     class Meta:
         model = Consultation
         fields = [
             'id', 'farmer_id', 'consultant_id', 'topic', 'status', 
-            'created_at', 'updated_at', 'messages'
+            'created_at', 'updated_at', 'last_message_id', 'last_message_at',
+            'unread_count', 'messages'
+        ]
+        read_only_fields = [
+            'created_at', 'updated_at', 'messages', 'status', 'last_message_id', 'last_message_at'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'messages', 'status']
 
 
 class ConsultationListSerializer(serializers.ModelSerializer):
+    # Clients compare last_message_id with their cache and fetch only
+    # /messages/?after_id=<cached id> when it moved.
+    unread_count = serializers.IntegerField(source='farmer_unread', read_only=True)
+
     class Meta:
         model = Consultation
-        fields = ['id', 'topic', 'status', 'created_at']
\ No newline at end of file
+        fields = ['id', 'topic', 'status', 'created_at', 'last_message_id', 'last_message_at', 'unread_count']
\ No newline at end of file
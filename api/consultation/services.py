@@ -0,0 +1,126 @@
+"""Consultation messages: unread counters, incremental reads and event streams.
+
+Creating a message (``message_created``, from the post_save signal) moves the
+consultation's ``last_message_*`` fields and bumps the unread counter of the
+side that did not send it in one UPDATE, then wakes the event streams of that
+consultation after commit. ``mark_read`` moves a reader's marker and recounts
+what is left, so the counters never need a COUNT when listing.
+
+``message_events`` is the body of the SSE responses: it sends the messages
+after the client's last id, then waits for a broker wake-up and re-reads the
+database at least every ``CONSULTATION_STREAM_INTERVAL`` seconds. Under ASGI
+each open stream keeps the database connection of its request for as long
+as the client stays connected, so size the database's connection limit for
+the number of open app screens and dashboard tabs.
+"""
+import json
+from functools import partial
+from typing import AsyncIterator, Callable, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q
+
+from .broker import broker
+from .models import Consultation, ConsultationMessage
+
+FARMER = "farmer"
+CONSULTANT = "consultant"
+READERS = {
+    FARMER: ("farmer_read_id", "farmer_unread"),
+    CONSULTANT: ("consultant_read_id", "consultant_unread"),
+}
+
+DEFAULT_STREAM_INTERVAL = 10
+STREAM_BATCH = 200
+RETRY_MS = 3000
+
+
+def channel(consultation_id: int) -> str:
+    return f"consultation:{consultation_id}"
+
+
+def _sent_by(reader: str) -> Q:
+    # Same precedence as ConsultationMessageSerializer.get_sender_type.
+    if reader == FARMER:
+        return Q(sender_consultant__isnull=True, sender_farmer__isnull=False)
+    return Q(sender_consultant__isnull=False)
+
+
+def message_created(message: ConsultationMessage) -> None:
+    if not message.consultation_id:
+        return
+    values = {"last_message_id": message.pk, "last_message_at": message.created_at}
+    if message.sender_consultant_id:
+        values["farmer_unread"] = F("farmer_unread") + 1
+    elif message.sender_farmer_id:
+        values["consultant_unread"] = F("consultant_unread") + 1
+    else:
+        values["farmer_unread"] = F("farmer_unread") + 1
+        values["consultant_unread"] = F("consultant_unread") + 1
+    Consultation.objects.filter(pk=message.consultation_id).update(**values)
+    transaction.on_commit(partial(broker.publish, channel(message.consultation_id), message.pk))
+
+
+def mark_read(consultation_id: int, reader: str, up_to_id: Optional[int] = None) -> Consultation:
+    """Mark messages up to ``up_to_id`` (default: all) read for ``reader``."""
+    read_field, unread_field = READERS[reader]
+    with transaction.atomic():
+        consultation = Consultation.objects.select_for_update().get(pk=consultation_id)
+        last_id = consultation.last_message_id or 0
+        target = last_id if up_to_id is None else min(up_to_id, last_id)
+        read_id = max(getattr(consultation, read_field), target)
+        unread = consultation.messages.filter(id__gt=read_id).exclude(_sent_by(reader)).count()
+        Consultation.objects.filter(pk=consultation.pk).update(**{read_field: read_id, unread_field: unread})
+    setattr(consultation, read_field, read_id)
+    setattr(consultation, unread_field, unread)
+    return consultation
+
+
+def messages_after(consultation_id: int, after_id: int = 0):
+    return (
+        ConsultationMessage.objects.filter(consultation_id=consultation_id, id__gt=after_id)
+        .select_related("sender_farmer", "sender_consultant__user")
+        .order_by("id")
+    )
+
+
+def _serialized_after(consultation_id: int, after_id: int, serialize: Callable) -> List[dict]:
+    return [serialize(message) for message in messages_after(consultation_id, after_id)[:STREAM_BATCH]]
+
+
+def _event(data: dict) -> str:
+    return f"id: {data['id']}\nevent: message\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def message_events(consultation_id: int, after_id: int, serialize: Callable,
+                         follow: bool = True) -> AsyncIterator[str]:
+    """Server-sent events for the messages of a consultation after ``after_id``.
+
+    Without ``follow`` only the backlog is sent and the client's EventSource
+    reconnects with Last-Event-ID. That is plain polling where the server
+    cannot hold connections open (WSGI), so ``retry`` is stretched to the
+    stream interval instead of the short reconnect delay of a dropped stream.
+    """
+    interval = getattr(settings, "CONSULTATION_STREAM_INTERVAL", DEFAULT_STREAM_INTERVAL)
+    retry_ms = RETRY_MS if follow else max(RETRY_MS, interval * 1000)
+    # Subscribe before the first read so nothing committed in between is missed.
+    subscription = broker.subscribe(channel(consultation_id)) if follow else None
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        while True:
+            rows = await sync_to_async(_serialized_after)(consultation_id, after_id, serialize)
+            for row in rows:
+                after_id = row["id"]
+                yield _event(row)
+            if len(rows) == STREAM_BATCH:
+                continue
+            if subscription is None:
+                return
+            if not await subscription.wait(interval):
+                yield ": keep-alive\n\n"
+    finally:
+        if subscription is not None:
+            subscription.close()
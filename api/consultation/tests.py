@@ -0,0 +1,70 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.user_flutter import identity
+from apps.core.models import Consultant
+
+from .broker import broker
+from .models import Consultation, ConsultationMessage
+from .services import channel
+
+
+@override_settings(APP_SECRET_KEY='test-key', CONSULTATION_STREAM_INTERVAL=5)
+class ConsultationMessagesTest(TestCase):
+    headers = {'HTTP_X_APP_KEY': 'test-key', 'HTTP_X_EMAIL': 'petani@example.com'}
+
+    def setUp(self):
+        cache.clear()
+        identity.clear_local()
+        self.consultant = Consultant.objects.create(name='Dr. Sawit')
+        response = self.client.post(
+            '/api/consultation/consultations/', {'consultant_id': self.consultant.pk, 'topic': 'Hama'}, **self.headers
+        )
+        self.consultation = Consultation.objects.get(pk=response.json()['id'])
+        self.url = f'/api/consultation/consultations/{self.consultation.pk}/'
+
+    def reply(self, content):
+        return ConsultationMessage.objects.create(
+            consultation=self.consultation, sender_consultant=self.consultant, content=content
+        )
+
+    def test_unread_counters_and_incremental_fetch(self):
+        self.client.post(f'{self.url}messages/', {'content': 'Daun menguning'}, **self.headers)
+        first, second = self.reply('Cek pupuk'), self.reply('Kirim foto')
+        self.consultation.refresh_from_db()
+        self.assertEqual((self.consultation.consultant_unread, self.consultation.farmer_unread), (1, 2))
+
+        listed = self.client.get('/api/consultation/consultations/', **self.headers).json()[0]
+        self.assertEqual((listed['unread_count'], listed['last_message_id']), (2, second.pk))
+        newer = self.client.get(f'{self.url}messages/', {'after_id': first.pk}, **self.headers).json()
+        self.assertEqual([message['id'] for message in newer], [second.pk])
+
+        read = self.client.post(f'{self.url}read/', {'last_id': first.pk}, **self.headers).json()
+        self.assertEqual((read['read_id'], read['unread_count']), (first.pk, 1))
+        self.assertEqual(self.client.post(f'{self.url}read/', **self.headers).json()['unread_count'], 0)
+
+    def test_event_stream_backlog_without_asgi(self):
+        first = self.reply('Cek pupuk')
+        # WSGI: only the backlog, EventSource reconnects with Last-Event-ID.
+        backlog = self.client.get(f'{self.url}events/', HTTP_LAST_EVENT_ID='0', **self.headers)
+        self.assertEqual(backlog['Content-Type'], 'text/event-stream')
+        self.assertIn(f'id: {first.pk}\nevent: message', backlog.content.decode())
+        self.assertTrue(backlog.content.decode().startswith('retry: 5000\n'))
+
+    async def test_event_stream_wakes_on_publish(self):
+        first = await sync_to_async(self.reply)('Cek pupuk')
+        response = await self.async_client.get(
+            f'{self.url}events/', {'after_id': first.pk},
+            headers={'X-App-Key': 'test-key', 'X-Email': 'petani@example.com'},
+        )
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        second = await sync_to_async(self.reply)('Kirim foto')
+        # on_commit never fires inside TestCase; publish as the signal would.
+        self.assertEqual(broker.publish(channel(self.consultation.pk), second.pk), 1)
+        event = await asyncio.wait_for(anext(stream), 2)
+        await stream.aclose()
+        self.assertTrue(event.decode().startswith(f'id: {second.pk}\n'))
@@ -1,6 +1,13 @@
 from django.urls import path, include
 from rest_framework_nested import routers
-from .views import ConsultantViewSet, ConsultationViewSet, ConsultationMessageViewSet, ConsultantDashboardView
+from .views import (
+    ConsultantViewSet,
+    ConsultationViewSet,
+    ConsultationMessageViewSet,
+    ConsultantDashboardView,
+    consultant_dashboard_events,
+    consultation_events,
+)
 
 app_name = 'consultation'
 
@@ -14,9 +21,15 @@ consultations_router = routers.NestedDefaultRouter(router, r'consultations', loo
 consultations_router.register(r'messages', ConsultationMessageViewSet, basename='consultation-messages')
 
 urlpatterns = [
+    path('consultations/<int:pk>/events/', consultation_events, name='consultation_events'),
     path('', include(router.urls)),
     path('', include(consultations_router.urls)),
     path('consultant-dashboard/', ConsultantDashboardView.as_view(), name='consultant_dashboard'),
+    path(
+        'consultant-dashboard/<int:pk>/events/',
+        consultant_dashboard_events,
+        name='consultant_dashboard_events',
+    ),
 ]
 # untuk cek
 # http://127.0.0.1:8000/api/consultation/consultant-dashboard/
\ No newline at end of file
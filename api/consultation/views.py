@@ -1,13 +1,23 @@
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django.views.generic import TemplateView
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
 
+from . import services
 from .models import Consultant, Consultation, ConsultationMessage
+from api.listing import CachedListMixin, KeysetListMixin
 from api.permission import HasValidAppKey
-from api.user_flutter.models import FlutterUser
 from .serializers import (
     ConsultantSerializer,
     ConsultationSerializer,
@@ -15,13 +25,16 @@ from .serializers import (
     ConsultationListSerializer
 )
 
-class ConsultantViewSet(viewsets.ReadOnlyModelViewSet):
+class ConsultantViewSet(CachedListMixin, KeysetListMixin, viewsets.ReadOnlyModelViewSet):
     """
     A simple ViewSet for viewing consultants.
     """
-    queryset = Consultant.objects.all()
+    queryset = Consultant.objects.prefetch_related('media_assets')
     serializer_class = ConsultantSerializer
     permission_classes = [HasValidAppKey]
+    cache_namespace = "consultant"
+    # created_at is nullable on Consultant, so page by id.
+    cursor_ordering = ("-id",)
 
 
 class ConsultationViewSet(viewsets.ModelViewSet):
@@ -35,14 +48,34 @@ class ConsultationViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """
         Filter konsultasi berdasarkan pengguna (petani) yang diidentifikasi
-        melalui header X-EMAIL.
+        melalui header X-EMAIL / X-PHONE (sudah di-resolve oleh HasValidAppKey).
         """
-        email = self.request.headers.get('X-EMAIL')
-        if email:
-            farmer = FlutterUser.objects.filter(email=email).first()
-            if farmer:
-                return Consultation.objects.filter(farmer=farmer)
-        return Consultation.objects.none()
+        farmer = getattr(self.request, 'flutter_user', None)
+        if not farmer:
+            return Consultation.objects.none()
+        queryset = Consultation.objects.filter(farmer=farmer)
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(Prefetch(
+                'messages',
+                queryset=ConsultationMessage.objects.select_related('sender_farmer', 'sender_consultant__user'),
+            ))
+        return queryset
+
+    @action(detail=True, methods=['post'])
+    def read(self, request, pk=None):
+        """Tandai pesan terbaca sampai ``last_id`` (default: semua)."""
+        consultation = self.get_object()
+        last_id = request.data.get('last_id')
+        try:
+            last_id = int(last_id) if last_id not in (None, '') else None
+        except (TypeError, ValueError):
+            raise ValidationError({'last_id': 'Harus berupa angka.'})
+        consultation = services.mark_read(consultation.pk, services.FARMER, last_id)
+        return Response({
+            'id': consultation.pk,
+            'read_id': consultation.farmer_read_id,
+            'unread_count': consultation.farmer_unread,
+        })
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -50,18 +83,9 @@ class ConsultationViewSet(viewsets.ModelViewSet):
         return ConsultationSerializer
 
     def perform_create(self, serializer):
-        email = self.request.headers.get('X-EMAIL')
-        phone = self.request.headers.get('X-PHONE')
-
-        # Dapatkan pengguna Flutter pertama yang cocok dengan email, atau buat yang baru jika tidak ada.
-        # Ini mencegah error 'MultipleObjectsReturned'.
-        farmer = FlutterUser.objects.filter(email=email).first()
+        farmer = getattr(self.request, 'flutter_user', None)
         if not farmer:
-            farmer = FlutterUser.objects.create(
-                email=email,
-                defaults={'phone': phone, 'identifier': email}
-            )
-
+            raise ValidationError({'detail': 'Header X-EMAIL atau X-PHONE wajib diisi.'})
         serializer.save(farmer=farmer)
 
 
@@ -78,15 +102,19 @@ class ConsultationMessageViewSet(viewsets.ModelViewSet):
         Filter messages to only those belonging to the specified consultation,
         and ensure the requestor owns the consultation.
         """
-        email = self.request.headers.get('X-EMAIL')
         consultation_pk = self.kwargs.get('consultation_pk')
-
-        if email:
-            farmer = FlutterUser.objects.filter(email=email).first()
-            if farmer:
-                # Filter pesan yang konsultasinya dimiliki oleh farmer yang melakukan request
-                return self.queryset.filter(consultation_id=consultation_pk, consultation__farmer=farmer)
-        return self.queryset.none()
+        farmer = getattr(self.request, 'flutter_user', None)
+        if not farmer:
+            return self.queryset.none()
+        # Filter pesan yang konsultasinya dimiliki oleh farmer yang melakukan request
+        queryset = self.queryset.filter(
+            consultation_id=consultation_pk, consultation__farmer=farmer
+        ).select_related('sender_farmer', 'sender_consultant__user')
+        if self.action == 'list':
+            # ?after_id=<id terakhir di klien> hanya mengirim pesan baru.
+            after_id = _after_id(self.request.query_params.get('after_id'))
+            queryset = queryset.filter(id__gt=after_id).order_by('id')
+        return queryset
 
     def perform_create(self, serializer):
         """
@@ -94,8 +122,7 @@ class ConsultationMessageViewSet(viewsets.ModelViewSet):
         and the sender from the request headers.
         """
         consultation = Consultation.objects.get(pk=self.kwargs['consultation_pk'])
-        email = self.request.headers.get('X-EMAIL')
-        farmer = FlutterUser.objects.filter(email=email).first()
+        farmer = getattr(self.request, 'flutter_user', None)
 
         # Set sender based on who is making the request
         serializer.save(consultation=consultation, sender_farmer=farmer)
@@ -128,14 +155,12 @@ class ConsultantDashboardView(LoginRequiredMixin, TemplateView):
             context['messages'] = ConsultationMessage.objects.none()
             return context
 
-        consultations = (
-            consultant.consultations.select_related('farmer')
-            .prefetch_related('messages')
-            .order_by('-created_at')
-        )
+        consultations = consultant.consultations.select_related('farmer').order_by('-created_at')
         active_consultation = self.get_selected_consultation(consultant, consultations)
 
         if active_consultation:
+            if active_consultation.consultant_unread:
+                services.mark_read(active_consultation.pk, services.CONSULTANT)
             messages_qs = (
                 ConsultationMessage.objects.filter(consultation=active_consultation)
                 .select_related('sender_farmer', 'sender_consultant')
@@ -181,4 +206,67 @@ class ConsultantDashboardView(LoginRequiredMixin, TemplateView):
             image=image,
         )
         messages.success(request, 'Pesan berhasil dikirim.')
-        return redirect(f"{reverse('consultation:consultant_dashboard')}?consultation={consultation.id}")
\ No newline at end of file
+        return redirect(f"{reverse('consultation:consultant_dashboard')}?consultation={consultation.id}")
+
+
+# --- Server-sent events ------------------------------------------------------
+
+def _after_id(value) -> int:
+    try:
+        return max(int(value or 0), 0)
+    except (TypeError, ValueError):
+        raise ValidationError({'after_id': 'Harus berupa angka.'})
+
+
+def _farmer_consultation(request, pk):
+    api_request = Request(request)
+    if not HasValidAppKey().has_permission(api_request, None):
+        raise PermissionDenied
+    farmer = getattr(api_request, 'flutter_user', None)
+    if not farmer:
+        raise Http404
+    return get_object_or_404(Consultation, pk=pk, farmer=farmer)
+
+
+def _consultant_consultation(user, pk):
+    consultant = getattr(user, 'consultant_profile', None)
+    if consultant is None:
+        raise PermissionDenied
+    return get_object_or_404(Consultation, pk=pk, consultant=consultant)
+
+
+async def _event_response(request, consultation):
+    try:
+        after_id = _after_id(request.headers.get('Last-Event-ID') or request.GET.get('after_id'))
+    except ValidationError:
+        return JsonResponse({'after_id': 'Harus berupa angka.'}, status=400)
+
+    def serialize(message):
+        return ConsultationMessageSerializer(message, context={'request': request}).data
+
+    # Only an ASGI server can hold the connection open; under WSGI the
+    # backlog is sent and EventSource polls again after the stream interval.
+    follow = isinstance(request, ASGIRequest)
+    events = services.message_events(consultation.pk, after_id, serialize, follow=follow)
+    if follow:
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+    else:
+        response = HttpResponse(''.join([event async for event in events]), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def consultation_events(request, pk):
+    """SSE pesan baru sebuah konsultasi untuk aplikasi petani (header X-APP-KEY/X-EMAIL/X-PHONE)."""
+    consultation = await sync_to_async(_farmer_consultation)(request, pk)
+    return await _event_response(request, consultation)
+
+
+async def consultant_dashboard_events(request, pk):
+    """SSE pesan baru untuk dashboard konsultan (login sesi)."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        raise PermissionDenied
+    consultation = await sync_to_async(_consultant_consultation)(user, pk)
+    return await _event_response(request, consultation)
@@ -0,0 +1,193 @@
+"""Shared list behaviour for the Flutter APIs.
+
+- ``KeysetPagination``: cursor (keyset) pagination, opt-in. A list is only
+  paged when the client sends ``cursor`` or ``page_size``; without them the
+  old bare-array response is kept so released app versions keep working.
+- ``SparseFieldsMixin``: ``?fields=a,b`` trims the serializer output of a
+  GET; ``sparse_queryset`` trims the SQL column list to match with
+  ``only()``.
+- ``KeysetListMixin`` / ``list_response``: wire both into generic views and
+  function views, with ETag / If-None-Match handled by ``conditional_page``.
+- ``CachedListMixin``: serve the list of a master-data view from
+  ``apps.core.services.master_cache``, keyed by the parameters it honours.
+"""
+from typing import Iterable, Optional, Sequence, Set
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import conditional_page
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from apps.core.services import master_cache
+
+DEFAULT_ORDERING = ("-created_at", "-id")
+
+
+class KeysetPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = DEFAULT_ORDERING
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(getattr(view, "cursor_ordering", None) or self.ordering)
+        if ordering == DEFAULT_ORDERING:
+            try:
+                queryset.model._meta.get_field("created_at")
+            except FieldDoesNotExist:
+                return ("-id",)
+        return ordering
+
+
+def requested_fields(request) -> Optional[Set[str]]:
+    """Field names from ``?fields=`` on a GET, or None for all fields."""
+    if request is None or request.method != "GET":
+        return None
+    raw = request.query_params.get("fields")
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+
+class SparseFieldsMixin:
+    """Drop serializer fields not listed in ``?fields=`` (GET only).
+
+    ``Meta.sparse_sources`` maps computed fields to the model columns (or
+    prefetched relations) they read, so ``sparse_queryset`` can still narrow
+    the SELECT and skip prefetches nobody reads.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(self.context.get("request"))
+        if wanted:
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+def _select_related_paths(tree, prefix=""):
+    for name, subtree in tree.items():
+        if subtree:
+            yield from _select_related_paths(subtree, f"{prefix}{name}__")
+        else:
+            yield f"{prefix}{name}"
+
+
+def sparse_queryset(queryset, serializer, ordering: Iterable[str] = ()):
+    """``queryset.only()`` the columns ``serializer``'s remaining fields read.
+
+    Returns ``queryset`` unchanged when a field's columns cannot be derived
+    (a property or an unmapped computed field).
+    """
+    if requested_fields(serializer.context.get("request")) is None:
+        return queryset
+
+    model = queryset.model
+    sources = getattr(getattr(serializer, "Meta", None), "sparse_sources", {})
+    columns = {model._meta.pk.name} | {name.lstrip("-") for name in ordering}
+    for name, field in serializer.fields.items():
+        if name in sources:
+            columns.update(sources[name])
+            continue
+        if field.source == "*":
+            return queryset
+        root = field.source.split(".")[0]
+        try:
+            model_field = model._meta.get_field(root)
+        except FieldDoesNotExist:
+            return queryset
+        if not model_field.concrete or model_field.many_to_many:
+            return queryset
+        columns.add(root)
+
+    related = queryset.query.select_related
+    if related is True:
+        return queryset
+    prefetches = queryset._prefetch_related_lookups
+    prefetched = {lookup.split("__")[0] for lookup in prefetches if isinstance(lookup, str)}
+    queryset = queryset.only(*(columns - prefetched))
+    if prefetched:
+        kept = [
+            lookup for lookup in prefetches
+            if not isinstance(lookup, str) or lookup.split("__")[0] in columns
+        ]
+        queryset = queryset.prefetch_related(None).prefetch_related(*kept)
+    if related:
+        kept = [path for path in _select_related_paths(related) if path.split("__")[0] in columns]
+        queryset = queryset.select_related(None).select_related(*kept)
+    return queryset
+
+
+class KeysetListMixin:
+    """List with opt-in keyset pagination, ``?fields=`` and ETag support."""
+    pagination_class = KeysetPagination
+    cursor_ordering: Sequence[str] = DEFAULT_ORDERING
+
+    @method_decorator(conditional_page)
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = self.paginator.get_ordering(request, queryset, self)
+        queryset = sparse_queryset(queryset, self.get_serializer(), ordering)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+
+def list_response(request, queryset, serializer_class, ordering: Sequence[str] = DEFAULT_ORDERING, context=None):
+    """Function-view counterpart of ``KeysetListMixin.list``.
+
+    Wrap the view in ``conditional_page`` for ETag support.
+    """
+    context = {"request": request, **(context or {})}
+    paginator = KeysetPagination()
+    paginator.ordering = tuple(ordering)
+    queryset = sparse_queryset(
+        queryset, serializer_class(context=context), paginator.get_ordering(request, queryset, None)
+    )
+    page = paginator.paginate_queryset(queryset, request)
+    if page is not None:
+        return paginator.get_paginated_response(serializer_class(page, many=True, context=context).data)
+    return Response(serializer_class(queryset, many=True, context=context).data)
+
+
+class CachedListMixin:
+    """Serve ``list`` from the master-data cache namespace ``cache_namespace``.
+
+    The key is built only from what changes the response: the scheme, host
+    and path (pagination links are absolute), the filters named in
+    ``cache_query_params``, the effective ``fields`` and the cursor and page
+    size. Unknown query parameters do not create new entries.
+    """
+    cache_namespace: str = ""
+    cache_query_params: Sequence[str] = ()
+
+    def list_cache_key(self, request):
+        params = request.query_params
+        filters = tuple((name, params.get(name, "").strip()) for name in self.cache_query_params)
+        fields = ",".join(sorted(self.get_serializer().fields)) if requested_fields(request) else ""
+        paginator = self.paginator
+        page = ""
+        if paginator is not None and (
+            paginator.cursor_query_param in params or paginator.page_size_query_param in params
+        ):
+            page = (params.get(paginator.cursor_query_param, ""), paginator.get_page_size(request))
+        return ("list", type(self).__name__, request.build_absolute_uri(request.path), filters, fields, page)
+
+    def list(self, request, *args, **kwargs):
+        data = master_cache.get_or_set(
+            self.cache_namespace,
+            self.list_cache_key(request),
+            lambda: super(CachedListMixin, self).list(request, *args, **kwargs).data,
+        )
+        return Response(data)
@@ -0,0 +1,43 @@
+import codecs
+import csv
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def _decoded_lines(stream, parser_context):
+    encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+    return codecs.getreader(encoding)(stream)
+
+
+class CSVParser(BaseParser):
+    """CSV with a header row; empty cells are dropped so optional fields default."""
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            reader = csv.DictReader(_decoded_lines(stream, parser_context))
+            return [
+                {key.strip(): value for key, value in row.items() if key and value not in ("", None)}
+                for row in reader
+            ]
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise ParseError(f"CSV tidak valid: {exc}")
+
+
+class NDJSONParser(BaseParser):
+    """One JSON object per line."""
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        records = []
+        number = 0
+        try:
+            for number, line in enumerate(_decoded_lines(stream, parser_context), start=1):
+                if line.strip():
+                    records.append(json.loads(line))
+        except ValueError as exc:
+            raise ParseError(f"NDJSON tidak valid pada baris {number}: {exc}")
+        return records
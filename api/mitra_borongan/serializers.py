@@ -1,47 +1,40 @@
-from urllib.parse import urljoin
-
-from django.conf import settings
 from rest_framework import serializers
 
 from apps.core.models import Employee
 from apps.core.models.employee import Borongan
-from apps.modules.compensation6.models import WorkRequest
+from apps.core.services import media_pipeline
+from apps.modules.compensation6.models import Attendance, WorkRequest
 from apps.modules.area.models import Desa
+from apps.modules.area.services import area_index
 
 
 class BoronganSerializer(serializers.ModelSerializer):
     employee_photo = serializers.SerializerMethodField()
-    
+    employee_photo_thumb = serializers.SerializerMethodField()
+
     class Meta:
         model = Borongan
-        fields = ["id", "pekerjaan", "satuan", "harga_borongan", "employee_photo"]
-    
-    def get_employee_photo(self, obj):
-        photo_field = getattr(obj.employee, "photo", None)
-        if not photo_field:
-            return None
-
-        photo_name = getattr(photo_field, "name", "")
-        if not photo_name:
-            return None
-
-        storage = getattr(photo_field, "storage", None)
-        if storage and not storage.exists(photo_name):
-            return None
+        fields = ["id", "pekerjaan", "satuan", "harga_borongan", "employee_photo", "employee_photo_thumb"]
+
+    def _photo_urls(self, obj):
+        # Every borongan of an employee shares the photo; resolve it once.
+        # URLs come from the employee's prefetched MediaAsset, not from storage.
+        cache = self.context.setdefault("_employee_photo_urls", {})
+        if obj.employee_id not in cache:
+            urls = media_pipeline.media_urls(obj.employee, "photo", ("thumb", "full"))
+            request = self.context.get("request")
+            if urls and request:
+                urls = {name: request.build_absolute_uri(url) for name, url in urls.items()}
+            cache[obj.employee_id] = urls
+        return cache[obj.employee_id]
 
-        try:
-            url = photo_field.url
-        except ValueError:
-            return None
-
-        request = self.context.get("request")
-        if request:
-            return request.build_absolute_uri(url)
-
-        if url.startswith("http"):
-            return url
+    def get_employee_photo(self, obj):
+        urls = self._photo_urls(obj)
+        return urls["full"] if urls else None
 
-        return urljoin(settings.MEDIA_URL, url.lstrip("/"))
+    def get_employee_photo_thumb(self, obj):
+        urls = self._photo_urls(obj)
+        return urls["thumb"] if urls else None
 
 
 class WorkRequestSummarySerializer(serializers.ModelSerializer):
@@ -62,11 +55,20 @@ class WorkRequestSummarySerializer(serializers.ModelSerializer):
 
 
 class AreaSerializer(serializers.ModelSerializer):
+    alamat_lengkap = serializers.SerializerMethodField()
+
     class Meta:
         model = Desa
         fields = ["id", "nama", "jenis", "kode_pos", "alamat_lengkap"]
         depth = 2
 
+    def get_alamat_lengkap(self, obj):
+        # Read from the area index instead of walking kecamatan -> provinsi per row.
+        # Resolve the index once per response: get_index() reads the cache version.
+        if "_area_index" not in self.context:
+            self.context["_area_index"] = area_index.get_index()
+        return self.context["_area_index"].desa_address(obj.id) or obj.alamat_lengkap
+
 
 class EmployeeAvailabilitySerializer(serializers.ModelSerializer):
     borongan = BoronganSerializer(many=True, read_only=True)
@@ -85,21 +87,58 @@ class EmployeeAvailabilitySerializer(serializers.ModelSerializer):
 class EmployeeWorkCalendarSerializer(serializers.ModelSerializer):
     borongan = BoronganSerializer(many=True, read_only=True)
     calendar = serializers.SerializerMethodField()
+    busy_spans = serializers.SerializerMethodField()
 
     class Meta:
         model = Employee
-        fields = ["id", "name", "borongan", "calendar"]
+        fields = ["id", "name", "borongan", "calendar", "busy_spans"]
+
+    def _work_request_data(self, work_request):
+        # Serialize each request once even though it covers many days.
+        cache = self.context.setdefault("_work_request_data", {})
+        if work_request.pk not in cache:
+            cache[work_request.pk] = WorkRequestSummarySerializer(work_request).data
+        return cache[work_request.pk]
 
     def get_calendar(self, obj):
-        calendar_map = self.context.get("calendar_map", {})
-        day_entries = calendar_map.get(obj.id, [])
+        work_calendar = self.context.get("work_calendar")
+        if work_calendar is None:
+            return []
+        entries = []
+        for span in work_calendar.spans(obj.id):
+            work_request = self._work_request_data(span.work_request) if span.is_busy else None
+            entries.extend(
+                {
+                    "date": day.isoformat(),
+                    "is_working": span.is_busy,
+                    "work_request": work_request,
+                }
+                for day in span.dates
+            )
+        return entries
+
+    def get_busy_spans(self, obj):
+        work_calendar = self.context.get("work_calendar")
+        if work_calendar is None:
+            return []
         return [
             {
-                "date": entry["date"].isoformat(),
-                "is_working": entry["is_working"],
-                "work_request": WorkRequestSummarySerializer(entry["work_request"]).data
-                if entry["work_request"]
-                else None,
+                "start_date": span.start_date.isoformat(),
+                "end_date": span.end_date.isoformat(),
+                "days": span.length,
+                "work_request_id": span.work_request.id,
             }
-            for entry in day_entries
-        ]
\ No newline at end of file
+            for span in work_calendar.busy_spans(obj.id)
+        ]
+
+
+class AttendanceRecordSerializer(serializers.Serializer):
+    """One row of a batch attendance upload; references are checked in the service."""
+    employee = serializers.IntegerField(min_value=1)
+    date = serializers.DateField()
+    clock_in = serializers.TimeField(required=False, allow_null=True)
+    clock_out = serializers.TimeField(required=False, allow_null=True)
+    status = serializers.ChoiceField(choices=Attendance.Status.choices, default=Attendance.Status.PRESENT)
+    borongan = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    realisasi = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, default=0)
+    notes = serializers.CharField(required=False, allow_blank=True, default="")
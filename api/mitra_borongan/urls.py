@@ -1,8 +1,10 @@
 from django.urls import path
 
 from .views import (
+    AttendanceBulkUpsertView,
     EmployeeAvailabilityView,
     EmployeeWorkCalendarView,
+    FreeWorkerSearchView,
     WorkRequestCreateView,
 )
 
@@ -11,5 +13,7 @@ app_name = "mitra"
 urlpatterns = [
     path("", EmployeeAvailabilityView.as_view(), name="employee_availability"),
     path("calendar/", EmployeeWorkCalendarView.as_view(), name="employee_work_calendar"),
+    path("available-workers/", FreeWorkerSearchView.as_view(), name="free_worker_search"),
     path("work-request/", WorkRequestCreateView.as_view(), name="work_request_create"),
+    path("attendance/bulk/", AttendanceBulkUpsertView.as_view(), name="attendance_bulk_upsert"),
 ]
\ No newline at end of file
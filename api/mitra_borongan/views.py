@@ -1,7 +1,6 @@
-from datetime import timedelta
-
 from django.utils import timezone
 from django.utils.dateparse import parse_date
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
@@ -9,49 +8,143 @@ from rest_framework import status
 from api.permission import HasValidAppKey
 from apps.core.models import Employee
 from apps.modules.compensation6.models import PayrollPeriod, WorkRequest
+from apps.modules.compensation6.services.attendance_import import upsert_attendance
+from apps.modules.compensation6.services.availability import (
+    busy_employee_ids,
+    first_free_workers,
+    work_request_ids_between,
+)
+from apps.modules.compensation6.services.work_calendar import WorkCalendar
 
+from .parsers import CSVParser, NDJSONParser
 from .serializers import (
+    AttendanceRecordSerializer,
     EmployeeAvailabilitySerializer,
     EmployeeWorkCalendarSerializer,
     WorkRequestSummarySerializer,
 )
 
 
+def _parse_date_range(request):
+    """``(start, end, error_response)`` from the ``date``/``end_date`` params."""
+    query_date = request.query_params.get("date")
+    end_param = request.query_params.get("end_date")
+
+    target_date = parse_date(query_date) if query_date else timezone.localdate()
+    if not target_date:
+        return None, None, Response(
+            {"detail": "Parameter date harus dalam format YYYY-MM-DD."},
+            status=400,
+        )
+
+    end_date = parse_date(end_param) if end_param else target_date
+    if not end_date:
+        return None, None, Response(
+            {"detail": "Parameter end_date harus dalam format YYYY-MM-DD."},
+            status=400,
+        )
+    if target_date > end_date:
+        return None, None, Response(
+            {"detail": "date tidak boleh setelah end_date."},
+            status=400,
+        )
+    if (end_date - target_date).days > 90:
+        return None, None, Response(
+            {"detail": "Rentang tanggal maksimum 90 hari."},
+            status=400,
+        )
+    return target_date, end_date, None
+
+
+def _checker_employee_ids(request):
+    """Active employees the calling field checker may record attendance for.
+
+    The checker is the active Employee whose email matches the FlutterUser of
+    the request; only employees of the checker's company are allowed. Returns
+    ``None`` when the caller cannot be resolved to such an employee.
+    """
+    flutter_user = getattr(request, "flutter_user", None)
+    if flutter_user is None or not flutter_user.email:
+        return None
+    checker = (
+        Employee.objects.filter(email__iexact=flutter_user.email, is_active=True, company__isnull=False)
+        .only("company_id")
+        .first()
+    )
+    if checker is None:
+        return None
+    return set(
+        Employee.objects.filter(company_id=checker.company_id, is_active=True).values_list("id", flat=True)
+    )
+
+
 class EmployeeAvailabilityView(APIView):
     permission_classes = [HasValidAppKey]
 
     def get(self, request):
-        query_date = request.query_params.get("date")
-        if query_date:
-            target_date = parse_date(query_date)
-            if not target_date:
-                return Response(
-                    {"detail": "Parameter date harus dalam format YYYY-MM-DD."},
-                    status=400,
-                )
-        else:
-            target_date = timezone.localdate()
+        target_date, end_date, error = _parse_date_range(request)
+        if error:
+            return error
 
         employees = (
             Employee.objects.filter(is_active=True)
-            .prefetch_related("borongan")
-            .select_related("desa__kecamatan__kabupaten_kota__provinsi")
+            .prefetch_related("borongan", "media_assets")
+            .select_related("desa")
             .order_by("name")
         )
 
-        busy_employee_ids = set(
-            WorkRequest.objects.filter(
-                start_date__lte=target_date,
-                end_date__gte=target_date,
-            ).values_list("employee_id", flat=True)
-        )
-
         serializer = EmployeeAvailabilitySerializer(
             employees,
             many=True,
-            context={"busy_employee_ids": busy_employee_ids},
+            context={"busy_employee_ids": busy_employee_ids(target_date, end_date), "request": request},
+        )
+        data = {"date": target_date, "employees": serializer.data}
+        if end_date != target_date:
+            data["end_date"] = end_date
+        return Response(data)
+
+
+class FreeWorkerSearchView(APIView):
+    """First N free workers with a borongan skill, optionally in one desa."""
+    permission_classes = [HasValidAppKey]
+    max_limit = 100
+
+    def get(self, request):
+        target_date, end_date, error = _parse_date_range(request)
+        if error:
+            return error
+
+        desa_param = request.query_params.get("desa")
+        limit_param = request.query_params.get("limit", "10")
+        try:
+            desa_id = int(desa_param) if desa_param else None
+            limit = int(limit_param)
+        except ValueError:
+            return Response(
+                {"detail": "Parameter desa dan limit harus berupa angka."},
+                status=400,
+            )
+        limit = max(1, min(limit, self.max_limit))
+
+        workers = (
+            first_free_workers(
+                target_date,
+                end_date,
+                skill=request.query_params.get("skill"),
+                desa_id=desa_id,
+                limit=limit,
+            )
+            .prefetch_related("borongan", "media_assets")
+            .select_related("desa")
+        )
+        serializer = EmployeeAvailabilitySerializer(workers, many=True, context={"request": request})
+        return Response(
+            {
+                "date": target_date,
+                "end_date": end_date,
+                "employees": serializer.data,
+            }
         )
-        return Response({"date": target_date, "employees": serializer.data})
 
 
 class EmployeeWorkCalendarView(APIView):
@@ -116,7 +209,7 @@ class EmployeeWorkCalendarView(APIView):
 
         employees_qs = (
             Employee.objects.filter(is_active=True)
-            .prefetch_related("borongan")
+            .prefetch_related("borongan", "media_assets")
             .order_by("name")
         )
         if employee_param:
@@ -124,53 +217,29 @@ class EmployeeWorkCalendarView(APIView):
 
         employees = list(employees_qs)
 
-        date_range = [
-            start_date + timedelta(days=offset) for offset in range(date_span + 1)
-        ]
-
         work_requests = (
             WorkRequest.objects.filter(
-                employee__in=employees,
-                start_date__lte=end_date,
-                end_date__gte=start_date,
+                id__in=work_request_ids_between(
+                    start_date, end_date, [employee.id for employee in employees]
+                ),
             )
-            .select_related("employee")
-            .order_by("employee__name", "start_date")
+            .select_related("employee", "flutter_user")
+        )
+        work_calendar = WorkCalendar(
+            start_date, end_date, [employee.id for employee in employees], work_requests
         )
-
-        request_lookup = {}
-        for wr in work_requests:
-            wr_start = max(wr.start_date, start_date)
-            wr_end = min(wr.end_date, end_date)
-            current = wr_start
-            while current <= wr_end:
-                request_lookup[(wr.employee_id, current)] = wr
-                current += timedelta(days=1)
-
-        calendar_map = {employee.id: [] for employee in employees}
-        for employee in employees:
-            entries = calendar_map[employee.id]
-            for current_date in date_range:
-                wr = request_lookup.get((employee.id, current_date))
-                entries.append(
-                    {
-                        "date": current_date,
-                        "is_working": wr is not None,
-                        "work_request": wr,
-                    }
-                )
 
         serializer = EmployeeWorkCalendarSerializer(
             employees,
             many=True,
-            context={"calendar_map": calendar_map},
+            context={"work_calendar": work_calendar, "request": request},
         )
 
         return Response(
             {
                 "start_date": start_date.isoformat(),
                 "end_date": end_date.isoformat(),
-                "date_range": [current.isoformat() for current in date_range],
+                "date_range": [current.isoformat() for current in work_calendar.dates],
                 "employees": serializer.data,
             }
         )
@@ -255,4 +324,65 @@ class WorkRequestCreateView(APIView):
                 "flutter_user_identifier": identifier,
             },
             status=status.HTTP_201_CREATED,
-        )
\ No newline at end of file
+        )
+
+
+class AttendanceBulkUpsertView(APIView):
+    """Create or update many Attendance rows in one request.
+
+    Accepts a JSON array (or ``{"records": [...]}``), CSV with a header row, or
+    NDJSON. Each row is answered individually in ``results``. Only employees
+    of the calling checker's company can be written.
+    """
+    permission_classes = [HasValidAppKey]
+    parser_classes = [JSONParser, CSVParser, NDJSONParser]
+    max_records = 2000
+
+    def post(self, request):
+        allowed_employee_ids = _checker_employee_ids(request)
+        if allowed_employee_ids is None:
+            return Response(
+                {"detail": "Pengguna tidak terdaftar sebagai karyawan aktif perusahaan."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        records = request.data
+        if isinstance(records, dict):
+            records = records.get("records")
+        if not isinstance(records, list) or not records:
+            return Response(
+                {"detail": "Kirim daftar absensi sebagai array atau field records."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(records) > self.max_records:
+            return Response(
+                {"detail": f"Maksimum {self.max_records} baris absensi per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [None] * len(records)
+        cleaned, positions = [], []
+        for index, record in enumerate(records):
+            serializer = AttendanceRecordSerializer(data=record)
+            if serializer.is_valid():
+                cleaned.append(serializer.validated_data)
+                positions.append(index)
+            else:
+                results[index] = {"row": index, "result": "error", "errors": serializer.errors}
+
+        if cleaned:
+            for position, result in zip(positions, upsert_attendance(cleaned, employee_ids=allowed_employee_ids)):
+                result["row"] = position
+                results[position] = result
+
+        counts = {"created": 0, "updated": 0, "error": 0}
+        for result in results:
+            counts[result["result"]] += 1
+        return Response(
+            {
+                "created": counts["created"],
+                "updated": counts["updated"],
+                "errors": counts["error"],
+                "results": results,
+            }
+        )
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import MarketplaceComment, MarketplaceItem
+from .models import MarketplaceComment, MarketplaceItem, MarketplaceUpload
 
 
 @admin.register(MarketplaceItem)
@@ -23,3 +23,11 @@ class MarketplaceCommentAdmin(admin.ModelAdmin):
     list_filter = ("is_purchase_intent", "created_at")
     search_fields = ("message", "buyer_identifier")
     readonly_fields = ("created_at",)
+
+
+@admin.register(MarketplaceUpload)
+class MarketplaceUploadAdmin(admin.ModelAdmin):
+    list_display = ("filename", "uploader_identifier", "offset", "size", "status", "updated_at")
+    list_filter = ("status",)
+    search_fields = ("filename", "uploader_identifier")
+    readonly_fields = ("created_at", "updated_at")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PasarConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api.pasar'
+
+    def ready(self):
+        from . import signals
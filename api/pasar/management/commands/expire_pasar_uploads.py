@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from api.pasar.uploads import expire_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked marketplace uploads that were abandoned or never attached to an item"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="Discard uploads untouched for this many hours (default: 24)",
+        )
+
+    def handle(self, *args, **options):
+        count = expire_uploads(timedelta(hours=options["hours"]))
+        self.stdout.write(self.style.SUCCESS(f"{count} unggahan kedaluwarsa dihapus"))
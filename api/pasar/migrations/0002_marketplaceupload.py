@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:30
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pasar', '0001_initial'),
+        ('user_flutter', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketplaceUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('uploader_identifier', models.CharField(blank=True, max_length=255)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveIntegerField()),
+                ('offset', models.PositiveIntegerField(default=0)),
+                ('data', models.FileField(blank=True, upload_to='pasar/uploads/')),
+                ('status', models.CharField(choices=[('uploading', 'Mengunggah'), ('complete', 'Selesai')], default='uploading', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('uploader', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='marketplace_uploads', to='user_flutter.flutteruser')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
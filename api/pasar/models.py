@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import uuid
 from decimal import Decimal
 
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericRelation
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
@@ -10,14 +13,25 @@ from django.utils import timezone
 from api.user_flutter.models import FlutterUser
 
 
+DEFAULT_MAX_PHOTO_SIZE = 10 * 1024 * 1024
+
+
+def max_photo_size() -> int:
+    return getattr(settings, "PASAR_MAX_PHOTO_SIZE", DEFAULT_MAX_PHOTO_SIZE)
+
+
 def validate_image_size(image_field) -> None:
-    """Ensure image file size does not exceed 150KB."""
+    """Ensure the original photo does not exceed ``PASAR_MAX_PHOTO_SIZE``.
+
+    Phones upload the original; list thumbnails and the detail image are
+    rendered in the background by ``apps.core.services.media_pipeline``.
+    """
     if not image_field:
         return
 
-    max_size_kb = 150
-    if image_field.size > max_size_kb * 1024:
-        raise ValidationError(f"Ukuran file gambar tidak boleh melebihi {max_size_kb} KB.")
+    max_size_mb = max_photo_size() // (1024 * 1024)
+    if image_field.size > max_photo_size():
+        raise ValidationError(f"Ukuran file gambar tidak boleh melebihi {max_size_mb} MB.")
 
 
 class MarketplaceItem(models.Model):
@@ -87,6 +101,9 @@ class MarketplaceItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Renditions of photo_1/photo_2, see apps.core.services.media_pipeline.
+    media_assets = GenericRelation("core.MediaAsset")
+
     class Meta:
         ordering = ["-created_at"]
 
@@ -133,3 +150,44 @@ class MarketplaceComment(models.Model):
     def __str__(self) -> str:  # pragma: no cover - representasional
         identifier = self.buyer_identifier or "anonim"
         return f"Komentar {identifier}"
+
+
+class MarketplaceUpload(models.Model):
+    """Unggahan foto bertahap yang dapat dilanjutkan setelah koneksi putus.
+
+    Klien membuat sesi dengan nama file dan ukuran total, lalu mengirim
+    potongan berurutan mulai dari ``offset``. Setelah lengkap, id sesi
+    dipakai sebagai ``photo_1_upload``/``photo_2_upload`` saat membuat barang.
+    """
+
+    class Status(models.TextChoices):
+        UPLOADING = "uploading", "Mengunggah"
+        COMPLETE = "complete", "Selesai"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    uploader = models.ForeignKey(
+        FlutterUser,
+        on_delete=models.CASCADE,
+        related_name="marketplace_uploads",
+        null=True,
+        blank=True,
+    )
+    uploader_identifier = models.CharField(max_length=255, blank=True)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveIntegerField()
+    offset = models.PositiveIntegerField(default=0)
+    data = models.FileField(upload_to="pasar/uploads/", blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.UPLOADING)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:  # pragma: no cover - representasional
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def is_complete(self) -> bool:
+        return self.status == self.Status.COMPLETE
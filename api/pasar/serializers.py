@@ -1,5 +1,9 @@
+from functools import partial
+
 from rest_framework import serializers
 
+from api.listing import SparseFieldsMixin
+from apps.core.services import media_pipeline
 from apps.modules.area.models import Provinsi, KabupatenKota, Kecamatan, Desa
 from apps.modules.area.serializers import (
     ProvinsiSerializer,
@@ -8,12 +12,27 @@ from apps.modules.area.serializers import (
     DesaSerializer,
 )
 
-from .models import MarketplaceComment, MarketplaceItem
+from . import uploads
+from .models import MarketplaceComment, MarketplaceItem, MarketplaceUpload
+
+PHOTO_FIELDS = ("photo_1", "photo_2")
 
 
-class MarketplaceItemSerializer(serializers.ModelSerializer):
+class MarketplaceItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     photo_1_url = serializers.SerializerMethodField()
     photo_2_url = serializers.SerializerMethodField()
+    photo_1_thumb_url = serializers.SerializerMethodField()
+    photo_2_thumb_url = serializers.SerializerMethodField()
+    photo_1_upload = serializers.PrimaryKeyRelatedField(
+        queryset=MarketplaceUpload.objects.filter(status=MarketplaceUpload.Status.COMPLETE),
+        required=False,
+        write_only=True,
+    )
+    photo_2_upload = serializers.PrimaryKeyRelatedField(
+        queryset=MarketplaceUpload.objects.filter(status=MarketplaceUpload.Status.COMPLETE),
+        required=False,
+        write_only=True,
+    )
     provinsi = serializers.PrimaryKeyRelatedField(
         queryset=Provinsi.objects.all(), required=False, allow_null=True
     )
@@ -44,6 +63,10 @@ class MarketplaceItemSerializer(serializers.ModelSerializer):
             "photo_2",
             "photo_1_url",
             "photo_2_url",
+            "photo_1_thumb_url",
+            "photo_2_thumb_url",
+            "photo_1_upload",
+            "photo_2_upload",
             "is_sold",
             "sold_at",
             "seller_identifier",
@@ -66,27 +89,76 @@ class MarketplaceItemSerializer(serializers.ModelSerializer):
             "updated_at",
             "photo_1_url",
             "photo_2_url",
+            "photo_1_thumb_url",
+            "photo_2_thumb_url",
             "provinsi_detail",
             "kabupaten_kota_detail",
             "kecamatan_detail",
             "desa_detail",
         ]
-
-    def _build_photo_url(self, obj, attr: str) -> str | None:
-        photo = getattr(obj, attr)
-        if not photo:
+        sparse_sources = {
+            "photo_1_url": ["photo_1", "media_assets"],
+            "photo_2_url": ["photo_2", "media_assets"],
+            "photo_1_thumb_url": ["photo_1", "media_assets"],
+            "photo_2_thumb_url": ["photo_2", "media_assets"],
+        }
+
+    def _build_photo_url(self, obj, attr: str, rendition: str) -> str | None:
+        # Detail ("full") and feed ("thumb") renditions; the original until they are ready.
+        url = media_pipeline.rendition_url(obj, attr, rendition)
+        if not url:
             return None
         request = self.context.get("request")
-        url = photo.url
         if request:
             return request.build_absolute_uri(url)
         return url
 
     def get_photo_1_url(self, obj):
-        return self._build_photo_url(obj, "photo_1")
+        return self._build_photo_url(obj, "photo_1", "full")
 
     def get_photo_2_url(self, obj):
-        return self._build_photo_url(obj, "photo_2")
+        return self._build_photo_url(obj, "photo_2", "full")
+
+    def get_photo_1_thumb_url(self, obj):
+        return self._build_photo_url(obj, "photo_1", "thumb")
+
+    def get_photo_2_thumb_url(self, obj):
+        return self._build_photo_url(obj, "photo_2", "thumb")
+
+    def _validate_upload(self, upload):
+        request = self.context.get("request")
+        identifier = getattr(request, "flutter_user_identifier", "") if request else ""
+        if upload is not None and upload.uploader_identifier != (identifier or ""):
+            raise serializers.ValidationError("Unggahan tidak ditemukan.")
+        return upload
+
+    def validate_photo_1_upload(self, upload):
+        return self._validate_upload(upload)
+
+    def validate_photo_2_upload(self, upload):
+        return self._validate_upload(upload)
+
+    def _use_uploads(self, validated_data):
+        """Put completed chunked uploads in place of the photo files."""
+        used = []
+        for field in PHOTO_FIELDS:
+            upload = validated_data.pop(f"{field}_upload", None)
+            if upload is not None:
+                validated_data[field] = uploads.as_file(upload)
+                used.append((upload, validated_data[field]))
+        return used
+
+    def _save_with_uploads(self, save, validated_data):
+        used = self._use_uploads(validated_data)
+        try:
+            item = save(validated_data)
+        finally:
+            for _, file in used:
+                file.close()
+        # The item holds its own copy now.
+        for upload, _ in used:
+            uploads.discard(upload)
+        return item
 
     def create(self, validated_data):
         request = self.context.get("request")
@@ -95,12 +167,15 @@ class MarketplaceItemSerializer(serializers.ModelSerializer):
 
         validated_data.setdefault("seller", seller)
         validated_data.setdefault("seller_identifier", identifier or "")
-        return super().create(validated_data)
+        return self._save_with_uploads(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self._save_with_uploads(partial(super().update, instance), validated_data)
 
     def validate(self, attrs):
         attrs = super().validate(attrs)
-        photo_1 = attrs.get("photo_1")
-        photo_2 = attrs.get("photo_2")
+        photo_1 = attrs.get("photo_1") or attrs.get("photo_1_upload")
+        photo_2 = attrs.get("photo_2") or attrs.get("photo_2_upload")
 
         if self.instance:
             photo_1 = photo_1 or getattr(self.instance, "photo_1")
@@ -147,3 +222,16 @@ class MarketplaceItemDetailSerializer(MarketplaceItemSerializer):
 
     class Meta(MarketplaceItemSerializer.Meta):
         fields = MarketplaceItemSerializer.Meta.fields + ["comments"]
+
+
+class MarketplaceUploadSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = MarketplaceUpload
+        fields = ["id", "filename", "size", "offset", "status", "chunk_size", "created_at"]
+        read_only_fields = ["id", "offset", "status", "created_at"]
+        extra_kwargs = {"size": {"min_value": 1}}
+
+    def get_chunk_size(self, obj):
+        return uploads.max_chunk_size()
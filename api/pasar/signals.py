@@ -0,0 +1,6 @@
+from apps.core.services import media_pipeline
+
+from .models import MarketplaceItem
+
+media_pipeline.register(MarketplaceItem, "photo_1", "product")
+media_pipeline.register(MarketplaceItem, "photo_2", "product")
@@ -1,3 +1,98 @@
-from django.test import TestCase
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.user_flutter import identity
+from apps.core.models import MediaAsset
+from apps.core.services import media_pipeline
+from apps.core.tests import noisy_png
+
+from .models import MarketplaceItem, MarketplaceUpload
+
+
+@override_settings(APP_SECRET_KEY='test-key')
+class MarketplaceItemListTest(TestCase):
+    def setUp(self):
+        for number in range(3):
+            MarketplaceItem.objects.create(title=f'Bibit {number}', seller_identifier='petani@example.com')
+
+    def get(self, params=None, **headers):
+        return self.client.get('/api/pasar/', params or {}, HTTP_X_APP_KEY='test-key', **headers)
+
+    def test_unpaginated_by_default(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['title'] for item in response.json()], ['Bibit 2', 'Bibit 1', 'Bibit 0'])
+
+    def test_cursor_pages_and_sparse_fields(self):
+        with self.assertNumQueries(1):
+            first = self.get({'page_size': 2, 'fields': 'id,title'}).json()
+        self.assertEqual(first['results'], [
+            {'id': item.id, 'title': item.title}
+            for item in MarketplaceItem.objects.order_by('-created_at', '-id')[:2]
+        ])
+        second = self.client.get(first['next'], HTTP_X_APP_KEY='test-key').json()
+        self.assertEqual([item['title'] for item in second['results']], ['Bibit 0'])
+        self.assertIsNone(second['next'])
+
+    def test_etag(self):
+        response = self.get({'fields': 'id'})
+        etag = response['ETag']
+        self.assertEqual(self.get({'fields': 'id'}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        MarketplaceItem.objects.create(title='Pupuk', seller_identifier='petani@example.com')
+        self.assertEqual(self.get({'fields': 'id'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(APP_SECRET_KEY='test-key', PASAR_UPLOAD_MAX_CHUNK=4096)
+class MarketplaceUploadTest(TestCase):
+    headers = {'HTTP_X_APP_KEY': 'test-key', 'HTTP_X_EMAIL': 'petani@example.com'}
+
+    def setUp(self):
+        # The uploader's FlutterUser id is cached across test databases.
+        cache.clear()
+        identity.clear_local()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.photo = noisy_png(900, 600)
+
+    def send(self, url, offset, chunk):
+        return self.client.patch(
+            url, chunk, content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset), **self.headers
+        )
+
+    def test_resumable_upload_becomes_item_with_thumbnails(self):
+        self.assertGreater(len(self.photo), 150 * 1024)
+        session = self.client.post(
+            '/api/pasar/uploads/', {'filename': 'sawit.png', 'size': len(self.photo)}, **self.headers
+        ).json()
+        url = f"/api/pasar/uploads/{session['id']}/"
+        step = session['chunk_size']
+        self.assertEqual(self.send(url, 0, self.photo[:step]).json()['offset'], step)
+
+        # A resent chunk is refused with the offset to resume from.
+        retry = self.send(url, 0, self.photo[:step])
+        self.assertEqual((retry.status_code, retry.json()['offset']), (409, step))
+        offset = self.client.get(url, **self.headers).json()['offset']
+        while offset < len(self.photo):
+            offset = self.send(url, offset, self.photo[offset:offset + step]).json()['offset']
+        self.assertEqual(MarketplaceUpload.objects.get().status, MarketplaceUpload.Status.COMPLETE)
+
+        response = self.client.post(
+            '/api/pasar/', {'title': 'Sawit', 'price': '1000', 'photo_1_upload': session['id']}, **self.headers
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertFalse(MarketplaceUpload.objects.exists())
+        item = MarketplaceItem.objects.get()
+        self.assertEqual(item.photo_1.read(), self.photo)
+
+        media_pipeline.process_pending()
+        listed = self.client.get('/api/pasar/', {'fields': 'id,photo_1_thumb_url'}, **self.headers).json()
+        self.assertTrue(listed[0]['photo_1_thumb_url'].endswith('/thumb.jpg'))
+        thumb = MediaAsset.objects.get(field='photo_1').renditions['thumb']
+        self.assertEqual((thumb['width'], thumb['height']), (400, 400))
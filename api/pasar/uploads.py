@@ -0,0 +1,124 @@
+"""Resumable chunked photo uploads for the marketplace.
+
+A session (``MarketplaceUpload``) is opened with the file name and total
+size, then the client sends chunks together with the byte offset each one
+starts at. A chunk at the wrong offset is refused with the stored offset, so
+after a dropped connection the client reads the session and continues from
+there; resending an already stored chunk is harmless because the partial file
+is truncated to the stored offset before each write.
+
+Once the last byte arrives the file must open as an image and the session
+becomes COMPLETE. Creating an item with ``photo_1_upload``/``photo_2_upload``
+copies the file onto the item, where ``apps.core.services.media_pipeline``
+renders the list thumbnail and detail image in the background.
+"""
+import os
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from .models import MarketplaceUpload, max_photo_size
+
+DEFAULT_MAX_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """A refused upload request.
+
+    ``status`` is the HTTP status to answer with; ``offset`` is set when the
+    client should resume from the stored offset.
+    """
+
+    def __init__(self, message: str, status: int = 400, offset: int = None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def max_chunk_size() -> int:
+    return getattr(settings, "PASAR_UPLOAD_MAX_CHUNK", DEFAULT_MAX_CHUNK_SIZE)
+
+
+def start_upload(filename: str, size: int, uploader=None, identifier: str = "") -> MarketplaceUpload:
+    if size > max_photo_size():
+        raise UploadError(f"Ukuran file gambar tidak boleh melebihi {max_photo_size() // (1024 * 1024)} MB.")
+    upload = MarketplaceUpload(
+        uploader=uploader,
+        uploader_identifier=identifier,
+        filename=os.path.basename(filename)[:255] or "foto.jpg",
+        size=size,
+    )
+    upload.data.save(f"{upload.id}.part", ContentFile(b""), save=False)
+    upload.save()
+    return upload
+
+
+def _is_image(upload: MarketplaceUpload) -> bool:
+    from PIL import Image
+
+    try:
+        with upload.data.storage.open(upload.data.name, "rb") as handle:
+            Image.open(handle).verify()
+    except Exception:
+        return False
+    return True
+
+
+def append_chunk(upload: MarketplaceUpload, offset: int, chunk: bytes) -> MarketplaceUpload:
+    """Store ``chunk`` at ``offset``; returns the session with its new offset."""
+    with transaction.atomic():
+        upload = MarketplaceUpload.objects.select_for_update().get(pk=upload.pk)
+        if upload.is_complete:
+            raise UploadError("Unggahan sudah selesai.", status=409, offset=upload.offset)
+        if offset != upload.offset:
+            raise UploadError(
+                f"Offset tidak sesuai, lanjutkan dari byte {upload.offset}.", status=409, offset=upload.offset
+            )
+        if not chunk:
+            raise UploadError("Potongan file kosong.")
+        if offset + len(chunk) > upload.size:
+            raise UploadError("Potongan melebihi ukuran file yang didaftarkan.")
+
+        with upload.data.storage.open(upload.data.name, "r+b") as handle:
+            handle.seek(offset)
+            handle.write(chunk)
+            handle.truncate()
+        upload.offset = offset + len(chunk)
+        valid = upload.offset < upload.size or _is_image(upload)
+        if upload.offset == upload.size and valid:
+            upload.status = MarketplaceUpload.Status.COMPLETE
+        upload.save(update_fields=["offset", "status", "updated_at"])
+
+    if not valid:
+        discard(upload)
+        raise UploadError("File bukan gambar yang valid.")
+    return upload
+
+
+def discard(upload: MarketplaceUpload) -> None:
+    """Delete the session; its partial file goes after commit."""
+    name, storage = upload.data.name, upload.data.storage
+    upload.delete()
+    if name:
+        transaction.on_commit(partial(storage.delete, name))
+
+
+def as_file(upload: MarketplaceUpload) -> File:
+    """The complete upload as an uncommitted file to assign to an ImageField."""
+    return File(upload.data.storage.open(upload.data.name, "rb"), name=upload.filename)
+
+
+def expire_uploads(older_than: timedelta) -> int:
+    """Discard sessions untouched for ``older_than``; returns how many."""
+    stale = MarketplaceUpload.objects.filter(updated_at__lt=timezone.now() - older_than)
+    count = 0
+    for upload in stale.iterator():
+        with transaction.atomic():
+            discard(upload)
+        count += 1
+    return count
@@ -5,6 +5,8 @@ from .views import (
     MarketplaceItemDetailView,
     MarketplaceItemListCreateView,
     MarketplaceItemMarkSoldView,
+    MarketplaceUploadCreateView,
+    MarketplaceUploadDetailView,
     marketplace_item_deep_link,
 )
 
@@ -19,5 +21,7 @@ urlpatterns = [
         MarketplaceItemCommentListCreateView.as_view(),
         name="item_comments",
     ),
+    path("uploads/", MarketplaceUploadCreateView.as_view(), name="upload_create"),
+    path("uploads/<uuid:pk>/", MarketplaceUploadDetailView.as_view(), name="upload_detail"),
     path("item/<int:pk>/", marketplace_item_deep_link, name="item_deep_link"),
 ]
@@ -5,21 +5,31 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.listing import KeysetListMixin
 from api.permission import HasValidAppKey
+from apps.core.services import media_pipeline
 
-from .models import MarketplaceComment, MarketplaceItem
+from . import uploads
+from .models import MarketplaceComment, MarketplaceItem, MarketplaceUpload
+from .parsers import ChunkParser
 from .serializers import (
     MarketplaceCommentSerializer,
     MarketplaceItemDetailSerializer,
     MarketplaceItemSerializer,
+    MarketplaceUploadSerializer,
 )
 
 
 logger = logging.getLogger(__name__)
 
 
-class MarketplaceItemListCreateView(generics.ListCreateAPIView):
-    queryset = MarketplaceItem.objects.all().order_by("-created_at")
+class MarketplaceItemListCreateView(KeysetListMixin, generics.ListCreateAPIView):
+    queryset = MarketplaceItem.objects.select_related(
+        "provinsi",
+        "kabupaten_kota__provinsi",
+        "kecamatan__kabupaten_kota__provinsi",
+        "desa__kecamatan__kabupaten_kota__provinsi",
+    ).prefetch_related("media_assets").order_by("-created_at")
     serializer_class = MarketplaceItemSerializer
     permission_classes = [HasValidAppKey]
 
@@ -37,7 +47,7 @@ class MarketplaceItemListCreateView(generics.ListCreateAPIView):
 
 
 class MarketplaceItemDetailView(generics.RetrieveAPIView):
-    queryset = MarketplaceItem.objects.all()
+    queryset = MarketplaceItem.objects.prefetch_related("media_assets")
     serializer_class = MarketplaceItemDetailSerializer
     permission_classes = [HasValidAppKey]
 
@@ -99,6 +109,68 @@ class MarketplaceItemCommentListCreateView(APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class MarketplaceUploadCreateView(APIView):
+    """Open a resumable chunked photo upload."""
+    permission_classes = [HasValidAppKey]
+
+    def post(self, request):
+        serializer = MarketplaceUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = uploads.start_upload(
+                serializer.validated_data["filename"],
+                serializer.validated_data["size"],
+                uploader=getattr(request, "flutter_user", None),
+                identifier=getattr(request, "flutter_user_identifier", "") or "",
+            )
+        except uploads.UploadError as exc:
+            return Response({"detail": str(exc)}, status=exc.status)
+        return Response(MarketplaceUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+
+class MarketplaceUploadDetailView(APIView):
+    """Read (to resume), append a chunk to, or cancel an upload.
+
+    PATCH sends the raw chunk as ``application/octet-stream`` with the byte
+    offset it starts at in the ``Upload-Offset`` header.
+    """
+    permission_classes = [HasValidAppKey]
+    parser_classes = [ChunkParser]
+
+    def _get_upload(self, request, pk):
+        identifier = getattr(request, "flutter_user_identifier", "") or ""
+        return get_object_or_404(MarketplaceUpload, pk=pk, uploader_identifier=identifier)
+
+    def get(self, request, pk):
+        return Response(MarketplaceUploadSerializer(self._get_upload(request, pk)).data)
+
+    def patch(self, request, pk):
+        upload = self._get_upload(request, pk)
+        try:
+            offset = int(request.headers.get("Upload-Offset", ""))
+        except ValueError:
+            return Response({"detail": "Header Upload-Offset wajib berupa angka."}, status=400)
+        if int(request.META.get("CONTENT_LENGTH") or 0) > uploads.max_chunk_size():
+            return Response(
+                {"detail": f"Potongan maksimal {uploads.max_chunk_size()} byte."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        try:
+            upload = uploads.append_chunk(upload, offset, request.data)
+        except MarketplaceUpload.DoesNotExist:
+            return Response({"detail": "Unggahan tidak ditemukan."}, status=status.HTTP_404_NOT_FOUND)
+        except uploads.UploadError as exc:
+            data = {"detail": str(exc)}
+            if exc.offset is not None:
+                data["offset"] = exc.offset
+            return Response(data, status=exc.status)
+        return Response(MarketplaceUploadSerializer(upload).data)
+
+    def delete(self, request, pk):
+        uploads.discard(self._get_upload(request, pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 def marketplace_item_deep_link(request, pk):
     """
     Handle deep link from WhatsApp sharing.
@@ -109,8 +181,9 @@ def marketplace_item_deep_link(request, pk):
     item = MarketplaceItem.objects.filter(pk=pk).select_related("seller").first()
 
     image_url = ""
-    if item and item.photo_1:
-        image_url = request.build_absolute_uri(item.photo_1.url)
+    photo_url = media_pipeline.rendition_url(item, "photo_1", "list") if item else None
+    if photo_url:
+        image_url = request.build_absolute_uri(photo_url)
 
     app_scheme = "nusasawit"
     deep_link_url = f"{app_scheme}://pasar/item/{pk}"
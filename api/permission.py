@@ -1,6 +1,6 @@
 from django.conf import settings
 from rest_framework.permissions import BasePermission
-from .user_flutter.models import FlutterUser
+from .user_flutter.identity import resolve_request_user
 
 
 class HasValidAppKey(BasePermission):
@@ -13,6 +13,13 @@ class HasValidAppKey(BasePermission):
         if not expected_key:
             return False
 
+        # Reject before touching the database.
+        provided_key = request.headers.get("X-APP-KEY")
+        if provided_key is None:
+            provided_key = request.query_params.get("app_key")
+        if provided_key != expected_key:
+            return False
+
         # Store user identifier from headers if available
         email = request.headers.get("X-EMAIL")
         phone = request.headers.get("X-PHONE")
@@ -27,11 +34,6 @@ class HasValidAppKey(BasePermission):
         else:
             request.user_identifier = "unknown"
 
-        # Resolve and save FlutterUser from headers
-        FlutterUser.resolve_from_request(request)
-
-        provided_key = request.headers.get("X-APP-KEY")
-        if provided_key is None:
-            provided_key = request.query_params.get("app_key")
-
-        return provided_key == expected_key
+        # Resolve FlutterUser from headers (cached, see user_flutter.identity)
+        resolve_request_user(request)
+        return True
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PetunjukConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api.petunjuk'
+
+    def ready(self):
+        from apps.core.services import master_cache
+        from .models import PetunjukKategori
+
+        master_cache.invalidate_on_change('petunjuk_kategori', PetunjukKategori)
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from api.listing import SparseFieldsMixin
 from .models import Petunjuk, PetunjukKategori, PetunjukBaca
 
 
@@ -9,7 +11,7 @@ class PetunjukKategoriSerializer(serializers.ModelSerializer):
         fields = ['id', 'nama', 'deskripsi', 'urutan', 'aktif']
 
 
-class PetunjukSerializer(serializers.ModelSerializer):
+class PetunjukSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer untuk petunjuk yang akan digunakan Flutter frontend"""
     kategori_nama = serializers.CharField(source='kategori.nama', read_only=True)
     sudah_dibaca = serializers.SerializerMethodField()
@@ -21,6 +23,7 @@ class PetunjukSerializer(serializers.ModelSerializer):
             'langkah_langkah', 'gambar', 'urutan', 'aktif', 
             'created_at', 'updated_at', 'sudah_dibaca'
         ]
+        sparse_sources = {'sudah_dibaca': []}
     
     def get_sudah_dibaca(self, obj):
         """Check if current user has read this petunjuk"""
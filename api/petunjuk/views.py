@@ -1,3 +1,4 @@
+from django.views.decorators.http import conditional_page
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import status
@@ -5,9 +6,12 @@ from .models import Petunjuk, PetunjukKategori, PetunjukBaca
 from .serializers import (
     PetunjukSerializer, PetunjukKategoriSerializer, PetunjukBacaSerializer
 )
+from api.listing import list_response
 from api.permission import HasValidAppKey
+from apps.core.services import master_cache
 
 
+@conditional_page
 @api_view(['GET', 'POST'])
 @permission_classes([HasValidAppKey])
 def petunjuk_list(request):
@@ -23,13 +27,7 @@ def petunjuk_list(request):
         petunjuk_queryset = petunjuk_queryset.select_related('kategori').order_by(
             'kategori__urutan', 'kategori__nama', 'urutan', 'judul'
         )
-        
-        serializer = PetunjukSerializer(
-            petunjuk_queryset, 
-            many=True, 
-            context={'request': request}
-        )
-        return Response(serializer.data)
+        return list_response(request, petunjuk_queryset, PetunjukSerializer)
         
     elif request.method == 'POST':
         serializer = PetunjukSerializer(data=request.data)
@@ -69,9 +67,11 @@ def petunjuk_detail(request, pk):
 def kategori_list(request):
     """List all kategori or create new kategori"""
     if request.method == 'GET':
-        kategori = PetunjukKategori.objects.filter(aktif=True).order_by('urutan', 'nama')
-        serializer = PetunjukKategoriSerializer(kategori, many=True)
-        return Response(serializer.data)
+        def load():
+            kategori = PetunjukKategori.objects.filter(aktif=True).order_by('urutan', 'nama')
+            return PetunjukKategoriSerializer(kategori, many=True).data
+
+        return Response(master_cache.get_or_set('petunjuk_kategori', 'aktif', load))
         
     elif request.method == 'POST':
         serializer = PetunjukKategoriSerializer(data=request.data)
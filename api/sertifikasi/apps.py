@@ -3,3 +3,9 @@ from django.apps import AppConfig
 class ConsultationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api.sertifikasi"
+
+    def ready(self):
+        from apps.core.services import master_cache
+        from .models import CertificationScheme, CertificationSchemeDetail
+
+        master_cache.invalidate_on_change("sertifikasi", CertificationScheme, CertificationSchemeDetail)
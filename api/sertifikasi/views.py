@@ -3,9 +3,44 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from api.permission import HasValidAppKey
+from apps.core.services import master_cache
 from .models import CertificationScheme
 
 
+def _scheme_list():
+    return [
+        {
+            'id': scheme.id,
+            'name': scheme.name,
+            'description': scheme.description,
+            'user_status': 'not_started',  # Default status since we don't have progress tracking
+            'has_progress': False,
+        }
+        for scheme in CertificationScheme.objects.order_by('id')
+    ]
+
+
+def _scheme_detail(pk):
+    scheme = CertificationScheme.objects.prefetch_related('details').filter(id=pk).first()
+    if scheme is None:
+        return None
+    return {
+        'id': scheme.id,
+        'name': scheme.name,
+        'description': scheme.description,
+        'user_status': 'not_started',
+        'has_progress': False,
+        'details': [
+            {
+                'id': detail.id,
+                'title': detail.title,
+                'description': detail.description,
+            }
+            for detail in scheme.details.all()
+        ]
+    }
+
+
 class FlutterCertificationListView(APIView):
     permission_classes = [HasValidAppKey]
     
@@ -14,21 +49,8 @@ class FlutterCertificationListView(APIView):
         if not flutter_user:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        # Get all certification schemes
-        schemes = CertificationScheme.objects.all()
-        
-        # Create simple response
-        result = []
-        for scheme in schemes:
-            scheme_data = {
-                'id': scheme.id,
-                'name': scheme.name,
-                'description': scheme.description,
-                'user_status': 'not_started',  # Default status since we don't have progress tracking
-                'has_progress': False,
-            }
-            result.append(scheme_data)
-        
+        result = master_cache.get_or_set('sertifikasi', 'list', _scheme_list)
+
         return Response({
             'user_identifier': flutter_user.identifier,
             'certifications': result
@@ -43,30 +65,10 @@ class FlutterCertificationDetailView(APIView):
         if not flutter_user:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        try:
-            scheme = CertificationScheme.objects.get(id=pk)
-        except CertificationScheme.DoesNotExist:
+        scheme_data = master_cache.get_or_set('sertifikasi', ('detail', pk), lambda: _scheme_detail(pk))
+        if scheme_data is None:
             return Response({"error": "Certification not found"}, status=status.HTTP_404_NOT_FOUND)
-        
-        # Get scheme details
-        details = scheme.details.all() if hasattr(scheme, 'details') else []
-        
-        scheme_data = {
-            'id': scheme.id,
-            'name': scheme.name,
-            'description': scheme.description,
-            'user_status': 'not_started',
-            'has_progress': False,
-            'details': [
-                {
-                    'id': detail.id,
-                    'title': detail.title,
-                    'description': detail.description,
-                }
-                for detail in details
-            ]
-        }
-        
+
         return Response({
             'user_identifier': flutter_user.identifier,
             'certification': scheme_data
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'api.sync'
+
+    def ready(self):
+        from .resources import connect_tombstone_signals
+
+        connect_tombstone_signals()
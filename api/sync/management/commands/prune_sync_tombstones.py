@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.sync.resources import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than SYNC_TOMBSTONE_DAYS"
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} tombstone sinkronisasi dihapus"))
@@ -0,0 +1,19 @@
+from django.db import models
+from django.utils import timezone
+
+
+class SyncTombstone(models.Model):
+    """Jejak penghapusan baris yang disinkronkan ke aplikasi Flutter.
+
+    Klien yang menyimpan salinan lokal membaca tombstone setelah ``since``
+    untuk ikut menghapus baris tersebut.
+    """
+    resource = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["resource", "deleted_at", "id"])]
+
+    def __str__(self):
+        return f"{self.resource}#{self.object_id} ({self.deleted_at:%Y-%m-%d %H:%M})"
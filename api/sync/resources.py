@@ -0,0 +1,222 @@
+"""Resources mirrored by the Flutter app through ``/api/sync/``.
+
+Every resource is read with ``values_list`` over a fixed column list and
+paged by keyset on ``(updated_at, id)``. Deletions are recorded as
+``SyncTombstone`` rows by a post_delete signal and paged the same way on
+``(deleted_at, id)``. The client keeps one opaque cursor holding both
+positions for every resource.
+
+Only changes older than ``SYNC_HORIZON_SECONDS`` are handed out, so a
+transaction that commits a slightly older ``updated_at`` after a client has
+synced is still picked up on the next call. Tombstones older than
+``SYNC_TOMBSTONE_DAYS`` are pruned; a cursor behind that window is reset to
+a full download of the resource.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from api.pasar.models import MarketplaceItem
+from api.petunjuk.models import Petunjuk, PetunjukKategori
+from api.tips.models import Tip
+from apps.core.models import Borongan, Employee
+from apps.modules.area.models import Desa, KabupatenKota, Kecamatan, Provinsi
+from apps.modules.compensation6.models import WorkRequest
+
+from .models import SyncTombstone
+
+# (row updated_at µs, row id, tombstone deleted_at µs, tombstone id)
+Position = Tuple[int, int, int, int]
+START: Position = (0, 0, 0, 0)
+
+DEFAULT_HORIZON_SECONDS = 2
+DEFAULT_TOMBSTONE_DAYS = 90
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def to_micros(moment: datetime) -> int:
+    return (moment - _EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+@dataclass(frozen=True)
+class SyncResource:
+    name: str
+    model: Type[models.Model]
+    fields: Tuple[str, ...]
+    timestamp_field: str = "updated_at"
+
+    def _file_columns(self) -> List[int]:
+        return [
+            index for index, name in enumerate(self.fields)
+            if isinstance(self.model._meta.get_field(name), models.FileField)
+        ]
+
+    def changed_rows(self, after: Tuple[int, int], horizon: datetime, limit: int):
+        """Up to ``limit + 1`` rows changed after ``after``, as ``(ts, id, values)``."""
+        ts_field = self.timestamp_field
+        moment = from_micros(after[0])
+        queryset = (
+            self.model._default_manager
+            .filter(Q(**{f"{ts_field}__gt": moment}) | Q(**{ts_field: moment, "id__gt": after[1]}))
+            .filter(**{f"{ts_field}__lte": horizon})
+            .order_by(ts_field, "id")
+            .values_list(ts_field, *self.fields)[:limit + 1]
+        )
+        file_columns = self._file_columns()
+        rows = []
+        for changed_at, *values in queryset:
+            for index in file_columns:
+                field = self.model._meta.get_field(self.fields[index])
+                values[index] = field.storage.url(values[index]) if values[index] else None
+            rows.append((to_micros(changed_at), values[self.fields.index("id")], values))
+        return rows
+
+    def deleted_ids(self, after: Tuple[int, int], horizon: datetime, limit: int):
+        """Up to ``limit + 1`` tombstones after ``after``, as ``(ts, tombstone id, object id)``."""
+        moment = from_micros(after[0])
+        queryset = (
+            SyncTombstone.objects.filter(resource=self.name, deleted_at__lte=horizon)
+            .filter(Q(deleted_at__gt=moment) | Q(deleted_at=moment, id__gt=after[1]))
+            .order_by("deleted_at", "id")
+            .values_list("deleted_at", "id", "object_id")[:limit + 1]
+        )
+        return [(to_micros(deleted_at), pk, object_id) for deleted_at, pk, object_id in queryset]
+
+
+RESOURCES: Dict[str, SyncResource] = {
+    resource.name: resource
+    for resource in [
+        SyncResource("area.provinsi", Provinsi, ("id", "kode", "nama")),
+        SyncResource("area.kabupaten_kota", KabupatenKota, ("id", "provinsi_id", "kode", "nama", "jenis")),
+        SyncResource("area.kecamatan", Kecamatan, ("id", "kabupaten_kota_id", "kode", "nama")),
+        SyncResource("area.desa", Desa, ("id", "kecamatan_id", "kode", "nama", "jenis", "kode_pos")),
+        SyncResource("mitra.employee", Employee, ("id", "name", "desa_id", "is_active", "photo")),
+        SyncResource(
+            "mitra.borongan", Borongan, ("id", "employee_id", "pekerjaan", "satuan", "harga_borongan")
+        ),
+        SyncResource(
+            "mitra.work_request",
+            WorkRequest,
+            ("id", "employee_id", "title", "description", "start_date", "end_date", "due_date"),
+        ),
+        SyncResource(
+            "pasar.item",
+            MarketplaceItem,
+            (
+                "id", "seller_identifier", "title", "description", "price", "photo_1", "photo_2",
+                "provinsi_id", "kabupaten_kota_id", "kecamatan_id", "desa_id", "is_sold", "sold_at",
+                "created_at",
+            ),
+        ),
+        SyncResource(
+            "tips.tip", Tip, ("id", "title", "content", "category", "image_url", "contributor_id", "created_at")
+        ),
+        SyncResource("petunjuk.kategori", PetunjukKategori, ("id", "nama", "deskripsi", "urutan", "aktif")),
+        SyncResource(
+            "petunjuk.petunjuk",
+            Petunjuk,
+            ("id", "kategori_id", "judul", "konten", "langkah_langkah", "gambar", "urutan", "aktif"),
+        ),
+    ]
+}
+
+_MODEL_RESOURCES = {resource.model: name for name, resource in RESOURCES.items()}
+
+
+def encode_cursor(positions: Dict[str, Position], issued_at: datetime) -> str:
+    raw = json.dumps({"at": to_micros(issued_at), "p": positions}, separators=(",", ":"), sort_keys=True)
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Tuple[Dict[str, Position], Optional[datetime]]:
+    """``(positions, issued_at)`` stored in ``token``; ValueError when malformed."""
+    if not token:
+        return {}, None
+    try:
+        raw = json.loads(urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        positions = {
+            name: tuple(int(part) for part in value)
+            for name, value in raw["p"].items() if name in RESOURCES
+        }
+        issued_at = from_micros(int(raw["at"]))
+    except (TypeError, KeyError, ValueError, AttributeError, UnicodeDecodeError) as exc:
+        raise ValueError("invalid sync cursor") from exc
+    if any(len(position) != 4 for position in positions.values()):
+        raise ValueError("invalid sync cursor")
+    return positions, issued_at
+
+
+def tombstone_cutoff(now: datetime) -> datetime:
+    return now - timedelta(days=getattr(settings, "SYNC_TOMBSTONE_DAYS", DEFAULT_TOMBSTONE_DAYS))
+
+
+def collect_changes(token: Optional[str], names: List[str], limit: int, now: Optional[datetime] = None):
+    """Changes of ``names`` since the cursor ``token``.
+
+    Returns ``(payload, cursor, has_more, reset)`` where ``payload`` maps
+    each changed resource to ``{"fields", "rows", "deleted"}`` and ``reset``
+    lists resources whose cursor is older than the tombstone window (the
+    client must drop its copy; the rows are sent from scratch). Raises
+    ValueError for a malformed ``token``.
+    """
+    positions, issued_at = decode_cursor(token)
+    now = now or timezone.now()
+    horizon = now - timedelta(seconds=getattr(settings, "SYNC_HORIZON_SECONDS", DEFAULT_HORIZON_SECONDS))
+    expired = issued_at is not None and issued_at < tombstone_cutoff(now)
+
+    payload: Dict[str, dict] = {}
+    new_positions = dict(positions)
+    has_more = False
+    reset: List[str] = []
+    for name in names:
+        resource = RESOURCES[name]
+        position = positions.get(name, START)
+        if expired and position != START:
+            reset.append(name)
+            position = START
+
+        rows = resource.changed_rows(position[:2], horizon, limit)
+        deleted = resource.deleted_ids(position[2:], horizon, limit)
+        if len(rows) > limit or len(deleted) > limit:
+            has_more = True
+        rows, deleted = rows[:limit], deleted[:limit]
+
+        row_position = rows[-1][:2] if rows else position[:2]
+        tomb_position = deleted[-1][:2] if deleted else position[2:]
+        new_positions[name] = (*row_position, *tomb_position)
+        if rows or deleted:
+            payload[name] = {
+                "fields": list(resource.fields),
+                "rows": [values for _, _, values in rows],
+                "deleted": [object_id for _, _, object_id in deleted],
+            }
+    return payload, encode_cursor(new_positions, horizon), has_more, reset
+
+
+def _record_tombstone(sender, instance, **kwargs):
+    name = _MODEL_RESOURCES.get(sender)
+    if name and instance.pk is not None:
+        SyncTombstone.objects.create(resource=name, object_id=instance.pk)
+
+
+def connect_tombstone_signals() -> None:
+    for model in _MODEL_RESOURCES:
+        post_delete.connect(_record_tombstone, sender=model, dispatch_uid=f"sync_tombstone_{model._meta.label}")
+
+
+def prune_tombstones(now: Optional[datetime] = None) -> int:
+    deleted, _ = SyncTombstone.objects.filter(deleted_at__lt=tombstone_cutoff(now or timezone.now())).delete()
+    return deleted
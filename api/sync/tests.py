@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.petunjuk.models import Petunjuk, PetunjukKategori
+from apps.modules.area.models import Provinsi
+
+from .models import SyncTombstone
+from .resources import collect_changes, decode_cursor, encode_cursor, prune_tombstones
+
+
+@override_settings(APP_SECRET_KEY='test-key', SYNC_HORIZON_SECONDS=0)
+class SyncViewTest(TestCase):
+    def setUp(self):
+        self.kategori = PetunjukKategori.objects.create(nama='Registrasi')
+        self.petunjuk = Petunjuk.objects.create(judul='Daftar', kategori=self.kategori, konten='...')
+        Provinsi.objects.create(kode='14', nama='Riau')
+
+    def sync(self, **params):
+        response = self.client.get('/api/sync/', params, HTTP_X_APP_KEY='test-key')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_full_then_delta_with_tombstones(self):
+        first = self.sync(resources='petunjuk.kategori,petunjuk.petunjuk')
+        petunjuk = first['resources']['petunjuk.petunjuk']
+        self.assertEqual(petunjuk['fields'][:3], ['id', 'kategori_id', 'judul'])
+        self.assertEqual(petunjuk['rows'][0][:3], [self.petunjuk.id, self.kategori.id, 'Daftar'])
+        self.assertFalse(first['has_more'])
+
+        unchanged = self.sync(since=first['cursor'], resources='petunjuk.kategori,petunjuk.petunjuk')
+        self.assertEqual(unchanged['resources'], {})
+
+        self.petunjuk.judul = 'Daftar Akun'
+        self.petunjuk.save()
+        other = Petunjuk.objects.create(judul='Login', kategori=self.kategori, konten='...')
+        other_id = other.id
+        other.delete()
+        delta = self.sync(since=first['cursor'], resources='petunjuk.kategori,petunjuk.petunjuk')
+        self.assertEqual(list(delta['resources']), ['petunjuk.petunjuk'])
+        self.assertEqual([row[2] for row in delta['resources']['petunjuk.petunjuk']['rows']], ['Daftar Akun'])
+        self.assertEqual(delta['resources']['petunjuk.petunjuk']['deleted'], [other_id])
+
+    def test_paging_and_bad_cursor(self):
+        Provinsi.objects.create(kode='15', nama='Jambi')
+        page = self.sync(resources='area.provinsi', limit=1)
+        self.assertTrue(page['has_more'])
+        page = self.sync(resources='area.provinsi', limit=1, since=page['cursor'])
+        self.assertEqual(len(page['resources']['area.provinsi']['rows']), 1)
+
+        response = self.client.get('/api/sync/', {'since': 'xyz'}, HTTP_X_APP_KEY='test-key')
+        self.assertEqual(response.status_code, 400)
+
+    def test_expired_cursor_resets_resource(self):
+        old = timezone.now() - timedelta(days=365)
+        positions, _ = decode_cursor(collect_changes(None, ['area.provinsi'], 10)[1])
+        payload, _, _, reset = collect_changes(encode_cursor(positions, old), ['area.provinsi'], 10)
+        self.assertEqual(reset, ['area.provinsi'])
+        self.assertEqual(len(payload['area.provinsi']['rows']), 1)
+
+        SyncTombstone.objects.create(resource='area.provinsi', object_id=99, deleted_at=old)
+        self.assertEqual(prune_tombstones(), 1)
@@ -0,0 +1,52 @@
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.permission import HasValidAppKey
+
+from .resources import RESOURCES, collect_changes
+
+
+@method_decorator(gzip_page, name="dispatch")
+class SyncView(APIView):
+    """Delta sync for the offline mirror of the Flutter app.
+
+    ``GET /api/sync/?since=<cursor>&resources=a,b&limit=N`` returns the rows
+    changed and the ids deleted since ``cursor`` (everything when omitted),
+    column-oriented per resource, plus the next cursor. Apply ``rows`` then
+    ``deleted``; call again with the new cursor while ``has_more`` is true.
+    """
+    permission_classes = [HasValidAppKey]
+    default_limit = 500
+    max_limit = 2000
+
+    def get(self, request):
+        names = request.query_params.get("resources")
+        names = [name.strip() for name in names.split(",") if name.strip()] if names else list(RESOURCES)
+        unknown = [name for name in names if name not in RESOURCES]
+        if unknown:
+            return Response(
+                {"detail": f"Resource tidak dikenal: {', '.join(unknown)}.", "available": list(RESOURCES)},
+                status=400,
+            )
+
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            return Response({"detail": "Parameter limit harus berupa angka."}, status=400)
+        limit = max(1, min(limit, self.max_limit))
+
+        try:
+            payload, cursor, has_more, reset = collect_changes(
+                request.query_params.get("since"), names, limit
+            )
+        except ValueError:
+            return Response(
+                {"detail": "Cursor sinkronisasi tidak valid. Lakukan sinkronisasi penuh tanpa since."},
+                status=400,
+            )
+
+        return Response(
+            {"cursor": cursor, "has_more": has_more, "reset": reset, "resources": payload}
+        )
@@ -1,8 +1,11 @@
 from rest_framework import serializers
+
+from api.listing import SparseFieldsMixin
+from apps.core.services.media_pipeline import rendition_url
 from .models import Tip, TipContributor, TipDiscussion
 
 
-class TipSerializer(serializers.ModelSerializer):
+class TipSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     contributor_name = serializers.CharField(source='contributor.name', read_only=True)
     consultant_name = serializers.CharField(source='contributor.consultant_name', read_only=True)
     image_url = serializers.SerializerMethodField()
@@ -21,16 +24,17 @@ class TipSerializer(serializers.ModelSerializer):
             'discussion',
             'created_at'
         ]
+        sparse_sources = {'image_url': ['image_url']}
 
     def get_image_url(self, obj):
+        # The 800x450 rendition; the original until the media worker made it.
+        url = rendition_url(obj, 'image_url', 'list', 'jpeg')
         request = self.context.get('request')
-        if obj.image_url:
-            if request is not None:
-                return request.build_absolute_uri(obj.image_url.url)
-            return obj.image_url.url
-        return None
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
 
-class TipContributorSerializer(serializers.ModelSerializer):
+class TipContributorSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TipContributor
         fields = '__all__'
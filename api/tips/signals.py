@@ -0,0 +1,5 @@
+from apps.core.services import media_pipeline
+
+from .models import Tip
+
+media_pipeline.register(Tip, 'image_url', 'cover')
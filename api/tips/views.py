@@ -3,21 +3,23 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.views.decorators.http import conditional_page
 from django.views.generic import TemplateView
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 
 from .models import Tip, TipContributor, TipDiscussion
 from .serializers import TipSerializer, TipContributorSerializer, TipDiscussionSerializer
+from api.listing import list_response
 from api.permission import HasValidAppKey
 
+@conditional_page
 @api_view(['GET', 'POST'])
 @permission_classes([HasValidAppKey])
 def tips_list(request):
     if request.method == 'GET':
-        tips = Tip.objects.all().order_by('-created_at')
-        serializer = TipSerializer(tips, many=True, context={'request': request})
-        return Response(serializer.data)
+        tips = Tip.objects.select_related('contributor').prefetch_related('media_assets').order_by('-created_at')
+        return list_response(request, tips, TipSerializer)
     elif request.method == 'POST':
         # Get user identifier from request headers
         user_identifier = getattr(request, 'user_identifier', None)
@@ -89,13 +91,12 @@ class TipContributorDashboardView(LoginRequiredMixin, TemplateView):
         messages.error(request, 'Periksa kembali formulir Anda.')
         return self.get(request, *args, **kwargs)
 
+@conditional_page
 @api_view(['GET', 'POST'])
 @permission_classes([HasValidAppKey])
 def contributors_list(request):
     if request.method == 'GET':
-        contributors = TipContributor.objects.all()
-        serializer = TipContributorSerializer(contributors, many=True)
-        return Response(serializer.data)
+        return list_response(request, TipContributor.objects.all(), TipContributorSerializer, ordering=('id',))
     elif request.method == 'POST':
         serializer = TipContributorSerializer(data=request.data)
         if serializer.is_valid():
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UserFlutterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api.user_flutter'
+
+    def ready(self):
+        from . import signals
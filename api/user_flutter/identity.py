@@ -0,0 +1,134 @@
+"""Resolve the FlutterUser behind a mobile request without hitting the DB.
+
+The identifier built from ``X-EMAIL`` / ``X-PHONE`` is mapped to the
+FlutterUser row through a small process-local LRU, backed by the shared
+Django cache, and only falls back to ``get_or_create`` on a miss. The
+instance handed to views is rebuilt from the cached column values with
+``from_db``, so FK assignments and ``.id`` work as before.
+
+``updated_at`` doubles as "last seen"; it is written at most once per
+``FLUTTER_USER_TOUCH_INTERVAL`` seconds per user instead of on every call.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import EMAIL_HEADER, PHONE_HEADER, FlutterUser
+
+CACHE_FIELDS = ("id", "identifier", "email", "phone_number", "created_at", "updated_at")
+
+DEFAULT_TOUCH_INTERVAL = 15 * 60
+DEFAULT_CACHE_TIMEOUT = 24 * 60 * 60
+LOCAL_TTL = 300
+LOCAL_SIZE = 2048
+
+
+class _LocalLRU:
+    """Thread-safe LRU of identifier -> cached row, entries expire after ``ttl``."""
+
+    def __init__(self, size: int, ttl: int):
+        self.size = size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: tuple) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_local = _LocalLRU(LOCAL_SIZE, LOCAL_TTL)
+
+
+def _cache_key(identifier: str) -> str:
+    return "flutter_user:" + hashlib.md5(identifier.encode()).hexdigest()
+
+
+def _row(user: FlutterUser) -> tuple:
+    return tuple(getattr(user, name) for name in CACHE_FIELDS)
+
+
+def _store(identifier: str, row: tuple) -> None:
+    _local.set(identifier, row)
+    cache.set(_cache_key(identifier), row, getattr(settings, "FLUTTER_USER_CACHE_TIMEOUT", DEFAULT_CACHE_TIMEOUT))
+
+
+def forget(identifier: str) -> None:
+    _local.delete(identifier)
+    cache.delete(_cache_key(identifier))
+
+
+def clear_local() -> None:
+    _local.clear()
+
+
+def identify(request) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """``(identifier, email, phone)`` from the request headers."""
+    email = FlutterUser._normalize_email(request.headers.get(EMAIL_HEADER))
+    phone = FlutterUser._normalize_phone(request.headers.get(PHONE_HEADER))
+    return FlutterUser.build_identifier(email, phone), email, phone
+
+
+def _touch(identifier: str, row: tuple) -> tuple:
+    interval = getattr(settings, "FLUTTER_USER_TOUCH_INTERVAL", DEFAULT_TOUCH_INTERVAL)
+    now = timezone.now()
+    position = CACHE_FIELDS.index("updated_at")
+    last_seen = row[position]
+    if last_seen and (now - last_seen).total_seconds() < interval:
+        return row
+    FlutterUser.objects.filter(pk=row[0]).update(updated_at=now)
+    row = row[:position] + (now,) + row[position + 1:]
+    _store(identifier, row)
+    return row
+
+
+def resolve_request_user(request) -> Tuple[Optional[FlutterUser], Optional[str]]:
+    """Resolve (and memoize on ``request``) the FlutterUser of a mobile request."""
+    identifier, email, phone = identify(request)
+    if not identifier:
+        return None, None
+
+    row = _local.get(identifier)
+    if row is None:
+        row = cache.get(_cache_key(identifier))
+        if row is not None:
+            _local.set(identifier, row)
+    if row is None:
+        row = _row(FlutterUser.get_or_create_identity(identifier, email, phone))
+        _store(identifier, row)
+    else:
+        row = _touch(identifier, row)
+
+    flutter_user = FlutterUser.from_db(FlutterUser.objects.db, CACHE_FIELDS, row)
+    request.flutter_user = flutter_user
+    request.flutter_user_identifier = identifier
+    return flutter_user, identifier
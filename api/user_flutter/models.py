@@ -40,17 +40,14 @@ class FlutterUser(models.Model):
 
     @classmethod
     def resolve_from_request(cls, request) -> Tuple[Optional["FlutterUser"], Optional[str]]:
-        """Ambil atau buat FlutterUser berdasarkan header request."""
-        raw_email = request.headers.get(EMAIL_HEADER)
-        raw_phone = request.headers.get(PHONE_HEADER)
+        """Ambil atau buat FlutterUser berdasarkan header request (lewat cache identitas)."""
+        from .identity import resolve_request_user
 
-        email = cls._normalize_email(raw_email)
-        phone = cls._normalize_phone(raw_phone)
-        identifier = cls.build_identifier(email, phone)
-
-        if not identifier:
-            return None, None
+        return resolve_request_user(request)
 
+    @classmethod
+    def get_or_create_identity(cls, identifier: str, email: Optional[str], phone: Optional[str]) -> "FlutterUser":
+        """Ambil atau buat FlutterUser untuk ``identifier`` dan samakan email/telepon."""
         defaults = {}
         if email:
             defaults["email"] = email
@@ -71,10 +68,7 @@ class FlutterUser(models.Model):
             update_fields.append("phone_number")
         if update_fields:
             flutter_user.save(update_fields=update_fields + ["updated_at"])
-
-        setattr(request, "flutter_user", flutter_user)
-        setattr(request, "flutter_user_identifier", identifier)
-        return flutter_user, identifier
+        return flutter_user
 
     @staticmethod
     def _normalize_email(raw_email: Optional[str]) -> Optional[str]:
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import identity
+from .models import FlutterUser
+
+
+@receiver(post_save, sender=FlutterUser)
+@receiver(post_delete, sender=FlutterUser)
+def forget_cached_identity(sender, instance, **kwargs):
+    identity.forget(instance.identifier)
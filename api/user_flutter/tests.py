@@ -1,3 +1,46 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import identity
+from .models import FlutterUser
+
+
+@override_settings(APP_SECRET_KEY='test-key')
+class FlutterIdentityTest(TestCase):
+    headers = {'HTTP_X_EMAIL': 'Petani@Example.com', 'HTTP_X_PHONE': '0812'}
+
+    def setUp(self):
+        cache.clear()
+        identity.clear_local()
+
+    def get(self, key='test-key'):
+        return self.client.get('/api/consultation/consultations/', HTTP_X_APP_KEY=key, **self.headers)
+
+    def test_rejected_requests_do_not_touch_flutter_users(self):
+        self.assertEqual(self.get(key='wrong').status_code, 403)
+        self.assertFalse(FlutterUser.objects.exists())
+
+    def test_identity_is_cached_and_touched_once_per_interval(self):
+        self.assertEqual(self.get().status_code, 200)
+        user = FlutterUser.objects.get()
+        self.assertEqual(user.identifier, 'email:petani@example.com|phone:0812')
+
+        # Only the consultation list query remains.
+        with self.assertNumQueries(1):
+            self.get()
+
+        identity.clear_local()
+        stale = timezone.now() - timedelta(hours=1)
+        FlutterUser.objects.filter(pk=user.pk).update(updated_at=stale)
+        cache.set(identity._cache_key(user.identifier), identity._row(FlutterUser.objects.get()), None)
+        self.get()
+        self.assertGreater(FlutterUser.objects.get().updated_at, stale)
+
+    def test_deleting_user_drops_cached_identity(self):
+        self.get()
+        FlutterUser.objects.get().delete()
+        self.get()
+        self.assertEqual(FlutterUser.objects.count(), 1)
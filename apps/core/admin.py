@@ -208,3 +208,14 @@ class TipContributorAdmin(admin.ModelAdmin):
             'fields': ('name', 'consultant_name')
         }),
     )
+
+
+from .models import MediaAsset
+
+
+@admin.register(MediaAsset)
+class MediaAssetAdmin(admin.ModelAdmin):
+    list_display = ['content_type', 'object_id', 'field', 'profile', 'status', 'source_exists', 'attempts', 'processed_at']
+    list_filter = ['status', 'source_exists', 'profile', 'content_type']
+    search_fields = ['source_name', 'source_hash']
+    readonly_fields = [field.name for field in MediaAsset._meta.fields]
@@ -0,0 +1,84 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.core.services.media_pipeline import (
+    DEFAULT_STALE_AFTER,
+    claim_assets,
+    default_worker_name,
+    process_assets,
+    queue_missing,
+)
+
+
+class Command(BaseCommand):
+    help = "Process queued MediaAsset jobs (render image renditions in the background)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process every runnable asset and exit instead of polling forever",
+        )
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="First queue registered image fields that have no MediaAsset yet",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=0,
+            help="Render in this many worker processes (default: 0, render in this process)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=8,
+            help="Assets claimed per round (default: 8)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when the queue is empty (default: 5)",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=int(DEFAULT_STALE_AFTER.total_seconds()),
+            help="Seconds before an asset left in processing is claimed again (default: 300)",
+        )
+        parser.add_argument(
+            "--worker-name",
+            default=default_worker_name(),
+            help="Name recorded on claimed assets (default: hostname:pid)",
+        )
+
+    def handle(self, *args, **options):
+        worker = options["worker_name"]
+        stale_after = timedelta(seconds=options["stale_after"])
+        if options["backfill"]:
+            self.stdout.write(f"{queue_missing()} gambar lama diantrikan")
+
+        executor = ProcessPoolExecutor(options["processes"]) if options["processes"] > 0 else None
+        self.stdout.write(f"Media worker {worker} started")
+        try:
+            while True:
+                assets = claim_assets(worker, limit=options["batch_size"], stale_after=stale_after)
+                if not assets:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                ready = process_assets(assets, executor=executor)
+                style = self.style.SUCCESS if ready == len(assets) else self.style.WARNING
+                self.stdout.write(style(f"{ready}/{len(assets)} gambar selesai diproses"))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Media worker stopped"))
+        finally:
+            if executor is not None:
+                executor.shutdown()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.services.org_hierarchy import rebuild_hierarchy
+
+
+class Command(BaseCommand):
+    help = "Rebuild the EmployeeHierarchy closure table from Employee.manager"
+
+    def handle(self, *args, **options):
+        count = rebuild_hierarchy()
+        self.stdout.write(self.style.SUCCESS(f"Struktur organisasi dibangun ulang: {count} relasi"))
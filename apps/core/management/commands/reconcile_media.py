@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.services.media_pipeline import reconcile_assets
+
+
+class Command(BaseCommand):
+    help = "Check recorded image files against storage and queue what is missing or stale"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows fetched per query (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        counts = reconcile_assets(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['checked']} gambar dicek: {counts['missing']} hilang, {counts['found']} ditemukan kembali, "
+            f"{counts['requeued']} diproses ulang, {counts['queued']} baru diantrikan"
+        ))
@@ -0,0 +1,18 @@
+from django.utils.functional import SimpleLazyObject
+
+from apps.core.services.user_roles import get_role_context
+
+
+class UserRoleMiddleware:
+    """Expose the user's role context as ``request.user_role``.
+
+    The context is built lazily on first access and shared by everything that
+    asks for it during the request (views, template tags, services).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.user_role = SimpleLazyObject(lambda: get_role_context(request.user))
+        return self.get_response(request)
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def closure_paths(parents):
+    # Frozen copy of org_hierarchy.closure_paths as of this migration: yields
+    # (ancestor, descendant, depth) and cuts manager chains that loop.
+    for employee_id in parents:
+        seen = {employee_id}
+        yield employee_id, employee_id, 0
+        depth, current = 0, parents[employee_id]
+        while current is not None and current not in seen:
+            depth += 1
+            seen.add(current)
+            yield current, employee_id, depth
+            current = parents.get(current)
+
+
+def build_hierarchy(apps, schema_editor):
+    Employee = apps.get_model('core', 'Employee')
+    EmployeeHierarchy = apps.get_model('core', 'EmployeeHierarchy')
+    parents = dict(Employee.objects.values_list('id', 'manager_id'))
+    EmployeeHierarchy.objects.bulk_create([
+        EmployeeHierarchy(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+        for ancestor_id, descendant_id, depth in closure_paths(parents)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeHierarchy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField(help_text='Jumlah level antara atasan dan bawahan (0 = diri sendiri)')),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='core.employee')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='core.employee')),
+            ],
+            options={
+                'verbose_name_plural': 'Employee hierarchy',
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='core_employ_descend_2fcdd5_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+        migrations.RunPython(build_hierarchy, migrations.RunPython.noop),
+    ]
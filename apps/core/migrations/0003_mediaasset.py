@@ -0,0 +1,40 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0002_employeehierarchy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaAsset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('field', models.CharField(max_length=50)),
+                ('profile', models.CharField(max_length=20)),
+                ('source_name', models.CharField(help_text='Nama file asli yang terakhir diproses/diantrikan', max_length=255)),
+                ('source_hash', models.CharField(blank=True, db_index=True, help_text='SHA-256 isi file asli', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Menunggu'), ('processing', 'Diproses'), ('ready', 'Siap'), ('failed', 'Gagal')], db_index=True, default='pending', max_length=20)),
+                ('renditions', models.JSONField(blank=True, default=dict)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['profile', 'source_hash'], name='core_mediaa_profile_f90fc8_idx')],
+                'unique_together': {('content_type', 'object_id', 'field')},
+            },
+        ),
+    ]
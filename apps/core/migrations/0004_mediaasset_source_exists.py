@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_mediaasset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='source_exists',
+            field=models.BooleanField(default=True, help_text='File asli ada di storage saat terakhir dicek'),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='verified_at',
+            field=models.DateTimeField(blank=True, help_text='Waktu keberadaan file asli terakhir dicatat', null=True),
+        ),
+    ]
@@ -2,11 +2,13 @@ from .person import Person
 from .company import Company
 from .department import Department
 from .employee import Employee, Borongan
+from .hierarchy import EmployeeHierarchy
 from .person import Person
 from .position import Position
 from .order import Order  # noqa: F401
 from .consultant import Consultant
 from .contributor import TipContributor
+from .media import MediaAsset
 
 __all__ = [
     'Person',
@@ -15,6 +17,8 @@ __all__ = [
     'Position',
     'Employee',
     'Borongan',
+    'EmployeeHierarchy',
     'Consultant',
     'TipContributor',
+    'MediaAsset',
 ]
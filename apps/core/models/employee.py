@@ -1,7 +1,6 @@
 from datetime import date
-from io import BytesIO
-from PIL import Image
 
+from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator
@@ -67,6 +66,8 @@ class Employee(Person):
     ktp = models.FileField(upload_to='document/ktp', null=True, blank=True)
     npwp = models.FileField(upload_to='document/npwp', null=True, blank=True)
     emergency_contact = models.CharField(max_length=225, blank=True)
+    # Renditions of photo, see apps.core.services.media_pipeline.
+    media_assets = GenericRelation('MediaAsset')
     
     # Area/Location
     desa = models.ForeignKey(
@@ -89,42 +90,10 @@ class Employee(Person):
         verbose_name='Status Pajak PPh 21'
     )
 
-    def save(self, *args, **kwargs):
-        if self.photo:
-            self.photo = self.compress_image(self.photo)
-        super().save(*args, **kwargs)
-    
-    def compress_image(self, image_field):
-        img = Image.open(image_field)
-        img_format = img.format or 'JPEG'
-        
-        # Convert to RGB if necessary (for JPEG compatibility)
-        if img_format == 'PNG' and img.mode in ('RGBA', 'LA', 'P'):
-            img = img.convert('RGB')
-            img_format = 'JPEG'
-        
-        # Compress image to target 150KB
-        quality = 85
-        while True:
-            output = BytesIO()
-            if img_format == 'JPEG':
-                img.save(output, format='JPEG', quality=quality, optimize=True)
-            else:
-                img.save(output, format=img_format, optimize=True)
-            
-            size = output.tell()
-            if size <= 150 * 1024 or quality <= 10:  # 150KB target or minimum quality
-                break
-            quality -= 10
-        
-        output.seek(0)
-        # Save with same name but compressed content
-        from django.core.files.base import ContentFile
-        import os
-        name = os.path.basename(image_field.name)
-        if img_format == 'JPEG':
-            name = os.path.splitext(name)[0] + '.jpg'
-        return ContentFile(output.getvalue(), name)
+    def clean(self):
+        super().clean()
+        from apps.core.services.org_hierarchy import validate_manager
+        validate_manager(self.pk, self.manager_id)
 
     @property
     def age(self):
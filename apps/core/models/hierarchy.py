@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class EmployeeHierarchy(models.Model):
+    """
+    Closure table dari relasi Employee.manager.
+
+    Satu baris untuk setiap pasangan (atasan, bawahan) pada semua level,
+    termasuk baris diri sendiri dengan depth 0. Dipelihara oleh
+    ``apps.core.services.org_hierarchy``; jangan diubah langsung.
+    """
+    ancestor = models.ForeignKey(
+        'Employee', on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(
+        'Employee', on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveSmallIntegerField(
+        help_text='Jumlah level antara atasan dan bawahan (0 = diri sendiri)')
+
+    class Meta:
+        unique_together = ('ancestor', 'descendant')
+        indexes = [
+            models.Index(fields=['descendant', 'depth']),
+        ]
+        verbose_name_plural = 'Employee hierarchy'
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
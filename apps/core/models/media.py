@@ -0,0 +1,51 @@
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class MediaAsset(models.Model):
+    """
+    Status pemrosesan satu field gambar (mis. Employee.photo) beserta
+    rendisinya (thumb, list, full dalam WebP dan JPEG).
+
+    Dibuat oleh ``apps.core.services.media_pipeline`` saat file field
+    berganti dan diproses oleh worker ``media_worker``; file asli tidak
+    diubah. ``renditions`` berisi path storage per rendisi dan format.
+
+    ``source_exists`` dicatat saat upload dan diperbarui oleh worker atau
+    perintah ``reconcile_media``, sehingga serializer dapat membentuk URL
+    foto tanpa mengecek storage per baris.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Menunggu'
+        PROCESSING = 'processing', 'Diproses'
+        READY = 'ready', 'Siap'
+        FAILED = 'failed', 'Gagal'
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    field = models.CharField(max_length=50)
+    profile = models.CharField(max_length=20)
+    source_name = models.CharField(max_length=255, help_text='Nama file asli yang terakhir diproses/diantrikan')
+    source_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text='SHA-256 isi file asli')
+    source_exists = models.BooleanField(default=True, help_text='File asli ada di storage saat terakhir dicek')
+    verified_at = models.DateTimeField(null=True, blank=True, help_text='Waktu keberadaan file asli terakhir dicatat')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING, db_index=True)
+    renditions = models.JSONField(default=dict, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('content_type', 'object_id', 'field')
+        indexes = [
+            models.Index(fields=['profile', 'source_hash']),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model}#{self.object_id}.{self.field} ({self.status})"
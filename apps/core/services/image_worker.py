@@ -0,0 +1,102 @@
+"""Pillow rendering of image renditions, run inside media worker processes.
+
+Like ``compensation6.services.pdf_worker`` this module avoids Django imports
+so ``media_worker`` can hand it to a ``ProcessPoolExecutor``. The caller
+reads the original from storage and passes its bytes plus the rendition
+specs; the encoded renditions come back as bytes.
+
+Each rendition has a byte budget. Instead of stepping the quality down in
+fixed increments, the highest quality that fits is found by binary search:
+one encode when ``MAX_QUALITY`` already fits, otherwise about six.
+"""
+from io import BytesIO
+
+MIN_QUALITY = 35
+MAX_QUALITY = 90
+
+FORMATS = {
+    'jpeg': {'format': 'JPEG', 'optimize': True, 'progressive': True},
+    'webp': {'format': 'WEBP', 'method': 4},
+}
+
+
+def _encode(img, fmt, quality):
+    output = BytesIO()
+    img.save(output, quality=quality, **FORMATS[fmt])
+    return output.getvalue()
+
+
+def encode_within(img, fmt, max_bytes):
+    """Encode ``img`` at the highest quality whose output fits ``max_bytes``.
+
+    Returns ``(data, quality)``; falls back to ``MIN_QUALITY`` when nothing fits.
+    """
+    data = _encode(img, fmt, MAX_QUALITY)
+    if len(data) <= max_bytes:
+        return data, MAX_QUALITY
+
+    best, best_quality = None, MIN_QUALITY
+    low, high = MIN_QUALITY, MAX_QUALITY - 1
+    while low <= high:
+        quality = (low + high) // 2
+        candidate = _encode(img, fmt, quality)
+        if len(candidate) <= max_bytes:
+            best, best_quality = candidate, quality
+            low = quality + 1
+        else:
+            high = quality - 1
+    if best is None:
+        best = _encode(img, fmt, MIN_QUALITY)
+    return best, best_quality
+
+
+def _crop(img, ratio):
+    width, height = img.size
+    if width / height > ratio:
+        new_width, new_height = int(height * ratio), height
+    else:
+        new_width, new_height = width, int(width / ratio)
+    left = (width - new_width) // 2
+    top = (height - new_height) // 2
+    return img.crop((left, top, left + new_width, top + new_height))
+
+
+def _prepare(img, spec):
+    from PIL import Image
+
+    box = (spec['width'], spec['height'])
+    if spec.get('crop'):
+        img = _crop(img, spec['crop'])
+        if img.width >= box[0] and img.height >= box[1]:
+            # Exact size; the crop may be a pixel off the ratio.
+            return img.resize(box, Image.Resampling.LANCZOS)
+    img = img.copy()
+    # thumbnail() only ever shrinks and keeps the aspect ratio.
+    img.thumbnail(box, Image.Resampling.LANCZOS)
+    return img
+
+
+def render(data, specs, formats=('webp', 'jpeg')):
+    """Render ``specs`` (dicts with name, width, height, crop, max_bytes) from image ``data``.
+
+    Returns ``{name: {"width", "height", fmt: (bytes, quality), ...}}``.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(BytesIO(data)) as source:
+        source.load()
+        img = ImageOps.exif_transpose(source)
+    if img.mode not in ('RGB', 'L'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        img = img.convert('RGBA')
+        background.paste(img, mask=img.getchannel('A'))
+        img = background
+
+    results = {}
+    for spec in specs:
+        prepared = _prepare(img, spec)
+        result = {'width': prepared.width, 'height': prepared.height}
+        for fmt in formats:
+            result[fmt] = encode_within(prepared, fmt, spec['max_bytes'])
+        results[spec['name']] = result
+    return results
@@ -0,0 +1,101 @@
+"""Cache-aside reads of slowly changing master data.
+
+Values live in the shared cache (see ``CACHES``) under
+``master:<namespace>:v<version>:<key>``. Every namespace has its own version
+counter; ``invalidate`` bumps it, so all keys of the namespace miss at once
+without having to enumerate them (the old entries simply expire).
+``invalidate_on_change`` bumps the version from post_save / post_delete of
+the models a namespace is built from; bulk writers, which send no signals
+(e.g. ``area_import``), call ``invalidate`` themselves.
+
+The counters live in the ``master_versions`` cache (falling back to the
+default one) with no timeout, away from the values: a cull of the value
+cache must not take a counter with it and invalidate the whole namespace.
+Versions start from a timestamp rather than 1, so a counter that was evicted
+or cleared never comes back with a value an old entry (or a process-local
+copy such as the area index) was stored under.
+"""
+import hashlib
+import time
+from functools import partial
+from typing import Any, Callable, Iterable, Optional, Type, Union
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+DEFAULT_TIMEOUT = 60 * 60
+MAX_KEY_LENGTH = 200
+VERSION_CACHE_ALIAS = 'master_versions'
+
+_MISSING = object()
+
+
+def _version_key(namespace: str) -> str:
+    return f'master:{namespace}:version'
+
+
+def _version_cache():
+    alias = VERSION_CACHE_ALIAS if VERSION_CACHE_ALIAS in settings.CACHES else DEFAULT_CACHE_ALIAS
+    return caches[alias]
+
+
+def _fresh_version() -> int:
+    return time.time_ns() // 1000
+
+
+def version(namespace: str) -> int:
+    return _version_cache().get_or_set(_version_key(namespace), _fresh_version, None)
+
+
+def make_key(namespace: str, key: Union[str, Iterable[Any]]) -> str:
+    if not isinstance(key, str):
+        key = ':'.join(str(part) for part in key)
+    prefix = f'master:{namespace}:v{version(namespace)}:'
+    if len(prefix) + len(key) > MAX_KEY_LENGTH:
+        key = hashlib.md5(key.encode()).hexdigest()
+    return prefix + key
+
+
+def get_or_set(namespace: str, key: Union[str, Iterable[Any]], producer: Callable[[], Any],
+               timeout: Optional[int] = None) -> Any:
+    """Cached value of ``key`` in ``namespace``; computed by ``producer`` on a miss.
+
+    ``None`` results are cached too, exceptions are not.
+    """
+    cache_key = make_key(namespace, key)
+    value = cache.get(cache_key, _MISSING)
+    if value is _MISSING:
+        value = producer()
+        if timeout is None:
+            timeout = getattr(settings, 'MASTER_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+        cache.set(cache_key, value, timeout)
+    return value
+
+
+def invalidate(namespace: str) -> None:
+    """Drop every cached value of ``namespace``."""
+    versions = _version_cache()
+    try:
+        versions.incr(_version_key(namespace))
+    except ValueError:
+        versions.set(_version_key(namespace), _fresh_version(), None)
+
+
+def _invalidate_signal(namespace: str, sender, raw=False, **kwargs) -> None:
+    if raw:
+        return
+    invalidate(namespace)
+    # A reader in another worker may refill the cache from the old row
+    # before this transaction commits; bump once more when it does.
+    transaction.on_commit(partial(invalidate, namespace))
+
+
+def invalidate_on_change(namespace: str, *model_classes: Type[models.Model]) -> None:
+    """Invalidate ``namespace`` whenever a row of ``model_classes`` is saved or deleted."""
+    for model in model_classes:
+        receiver = partial(_invalidate_signal, namespace)
+        uid = f'master_cache:{namespace}:{model._meta.label}'
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f'{uid}:save')
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'{uid}:delete')
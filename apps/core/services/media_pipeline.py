@@ -0,0 +1,438 @@
+"""Off-request processing of uploaded images into renditions.
+
+Models register their image fields with a rendition profile::
+
+    media_pipeline.register(Employee, "photo", "avatar")
+
+and declare ``media_assets = GenericRelation("core.MediaAsset")`` so assets
+are deleted with them and can be prefetched. Saving a registered model only
+queues work: when the field's file name differs from the one recorded on its
+``MediaAsset``, the asset goes back to PENDING. An unrelated field edit costs
+one indexed lookup and never opens the file.
+
+The ``media_worker`` command claims pending assets and hashes each
+original. Unchanged content, or content another asset of the same profile
+already has, reuses the existing renditions. Everything else is rendered by
+``image_worker`` (optionally in a process pool) into thumb/list/full WebP and
+JPEG files under ``<upload dir>/renditions/<sha256>/``; the original file is
+left untouched.
+
+Readers call ``media_urls``/``rendition_url``, which fall back to the
+original until the asset is READY. They never touch storage: whether the
+original exists is recorded on the asset when it is queued (the file was just
+saved), when the worker fails to open it, and by ``reconcile_assets`` (the
+``reconcile_media`` command), which is the only place that stats files.
+"""
+import hashlib
+import logging
+import os
+import posixpath
+import socket
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_save
+from django.dispatch import Signal
+from django.utils import timezone
+
+from ..models.media import MediaAsset
+from . import image_worker
+
+logger = logging.getLogger(__name__)
+
+
+MAX_ATTEMPTS = 3
+DEFAULT_STALE_AFTER = timedelta(minutes=5)
+FORMATS = ("webp", "jpeg")
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+
+@dataclass(frozen=True)
+class RenditionSpec:
+    name: str
+    width: int
+    height: int
+    max_bytes: int
+    crop: Optional[float] = None
+
+
+PROFILES: Dict[str, Tuple[RenditionSpec, ...]] = {
+    # Profile photos (employees, consultants).
+    "avatar": (
+        RenditionSpec("thumb", 96, 96, 8 * 1024, crop=1.0),
+        RenditionSpec("list", 320, 320, 30 * 1024, crop=1.0),
+        RenditionSpec("full", 1080, 1080, 150 * 1024),
+    ),
+    # 16:9 article/cover images (tips); "list" is the former 800x450 <=100KB image.
+    "cover": (
+        RenditionSpec("thumb", 320, 180, 20 * 1024, crop=16 / 9),
+        RenditionSpec("list", 800, 450, 100 * 1024, crop=16 / 9),
+        RenditionSpec("full", 1600, 900, 250 * 1024, crop=16 / 9),
+    ),
+    # Marketplace photos: fixed-size square feed thumbnails, uncropped detail image.
+    "product": (
+        RenditionSpec("thumb", 400, 400, 40 * 1024, crop=1.0),
+        RenditionSpec("list", 800, 800, 100 * 1024, crop=1.0),
+        RenditionSpec("full", 1600, 1600, 300 * 1024),
+    ),
+}
+
+# Sent with the owner model as sender once an asset's renditions are ready.
+media_ready = Signal()
+
+_registry: Dict[type, Dict[str, str]] = {}
+
+
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def register(model, field: str, profile: str) -> None:
+    """Queue rendition processing whenever ``model.<field>`` gets a new file."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown media profile {profile!r}")
+    _registry.setdefault(model, {})[field] = profile
+    post_save.connect(_queue_changed_fields, sender=model, dispatch_uid=f"media_pipeline:{model._meta.label}")
+
+
+def registered_fields() -> Dict[type, Dict[str, str]]:
+    return {model: dict(fields) for model, fields in _registry.items()}
+
+
+def _queue_changed_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    for field, profile in _registry.get(sender, {}).items():
+        if update_fields is not None and field not in update_fields:
+            continue
+        queue_field(instance, field, profile)
+
+
+def _asset_lookup(instance, field: str) -> Dict[str, object]:
+    return {
+        "content_type": ContentType.objects.get_for_model(instance),
+        "object_id": instance.pk,
+        "field": field,
+    }
+
+
+def queue_field(instance, field: str, profile: Optional[str] = None) -> Optional[MediaAsset]:
+    """Mark ``instance.<field>`` for processing if its file changed; returns its asset."""
+    profile = profile or _registry[type(instance)][field]
+    name = getattr(instance, field).name or ""
+    lookup = _asset_lookup(instance, field)
+    asset = MediaAsset.objects.filter(**lookup).first()
+    if not name:
+        if asset is not None:
+            asset.delete()
+        return None
+    if asset is not None and asset.source_name == name and asset.profile == profile:
+        return asset
+
+    asset, _ = MediaAsset.objects.update_or_create(
+        **lookup,
+        defaults={
+            "profile": profile,
+            "source_name": name,
+            "status": MediaAsset.Status.PENDING,
+            "source_exists": True,
+            "verified_at": timezone.now(),
+            "attempts": 0,
+            "error": "",
+            "worker": "",
+            "heartbeat_at": None,
+        },
+    )
+    if getattr(settings, "MEDIA_PROCESS_INLINE", False):
+        transaction.on_commit(partial(process_pending, [asset.pk]))
+    return asset
+
+
+def queue_missing(batch_size: int = 500) -> int:
+    """Queue every registered field that has a file but no asset yet."""
+    queued = 0
+    for model, fields in _registry.items():
+        content_type = ContentType.objects.get_for_model(model)
+        for field, profile in fields.items():
+            known = MediaAsset.objects.filter(content_type=content_type, field=field).values("object_id")
+            missing = model._default_manager.exclude(**{f"{field}__in": ["", None]}).exclude(pk__in=known)
+            for instance in missing.only("pk", field).iterator(chunk_size=batch_size):
+                queue_field(instance, field, profile)
+                queued += 1
+    return queued
+
+
+def get_asset(instance, field: str) -> Optional[MediaAsset]:
+    """The asset of ``instance.<field>``; uses prefetched ``media_assets`` when available."""
+    related = getattr(instance, "media_assets", None)
+    if related is not None:
+        return next((asset for asset in related.all() if asset.field == field), None)
+    return MediaAsset.objects.filter(**_asset_lookup(instance, field)).first()
+
+
+def media_urls(instance, field: str, renditions: Iterable[str] = ("thumb", "full"),
+               fmt: str = "jpeg") -> Optional[Dict[str, str]]:
+    """URLs of ``instance.<field>`` keyed "original" plus each of ``renditions``.
+
+    Built from the names recorded on the asset, without storage calls.
+    Renditions fall back to the original until the asset is READY. Returns
+    None when there is no file or the original was last seen missing.
+    """
+    file = getattr(instance, field)
+    if not file:
+        return None
+    asset = get_asset(instance, field)
+    if asset is not None and asset.source_name != file.name:
+        asset = None
+    if asset is not None and not asset.source_exists:
+        return None
+    original = file.storage.url(file.name)
+    ready = asset is not None and asset.status == MediaAsset.Status.READY
+    urls = {"original": original}
+    for name in renditions:
+        path = asset.renditions.get(name, {}).get(fmt) if ready else None
+        urls[name] = file.storage.url(path) if path else original
+    return urls
+
+
+def rendition_url(instance, field: str, rendition: str = "full", fmt: str = "jpeg") -> Optional[str]:
+    """URL of a rendition of ``instance.<field>``, or of the original until it is ready."""
+    urls = media_urls(instance, field, (rendition,), fmt)
+    return urls[rendition] if urls else None
+
+
+# --- Worker side ------------------------------------------------------------
+
+def claim_assets(worker: str, limit: int = 8, stale_after: timedelta = DEFAULT_STALE_AFTER,
+                 asset_ids: Optional[Iterable[int]] = None) -> List[MediaAsset]:
+    """Lock and return up to ``limit`` runnable assets (optionally only ``asset_ids``).
+
+    Assets stuck in PROCESSING longer than ``stale_after`` were abandoned by a
+    crashed worker and are claimed again, up to ``MAX_ATTEMPTS`` times; once
+    the last attempt was abandoned too they are marked FAILED.
+    """
+    now = timezone.now()
+    stale = (
+        Q(status=MediaAsset.Status.PROCESSING, heartbeat_at__lt=now - stale_after)
+        | Q(status=MediaAsset.Status.PROCESSING, heartbeat_at__isnull=True)
+    )
+    runnable = MediaAsset.objects.select_for_update(skip_locked=True).filter(
+        Q(status=MediaAsset.Status.PENDING) | stale,
+        attempts__lt=MAX_ATTEMPTS,
+    )
+    exhausted = MediaAsset.objects.filter(stale, attempts__gte=MAX_ATTEMPTS)
+    if asset_ids is not None:
+        asset_ids = list(asset_ids)
+        runnable = runnable.filter(pk__in=asset_ids)
+        exhausted = exhausted.filter(pk__in=asset_ids)
+    with transaction.atomic():
+        failed = exhausted.update(
+            status=MediaAsset.Status.FAILED,
+            error=f"Worker stopped during attempt {MAX_ATTEMPTS} of {MAX_ATTEMPTS}",
+            updated_at=now,
+        )
+        if failed:
+            logger.warning("%s media assets abandoned on their last attempt marked failed", failed)
+        assets = list(runnable.order_by("updated_at")[:limit])
+        MediaAsset.objects.filter(pk__in=[asset.pk for asset in assets]).update(
+            status=MediaAsset.Status.PROCESSING, worker=worker, heartbeat_at=now, attempts=F("attempts") + 1
+        )
+    for asset in assets:
+        asset.status, asset.worker, asset.heartbeat_at = MediaAsset.Status.PROCESSING, worker, now
+        asset.attempts += 1
+    return assets
+
+
+def _submit(executor, fn, *args) -> Future:
+    if executor is not None:
+        return executor.submit(fn, *args)
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+def _finish(asset: MediaAsset, **values) -> bool:
+    """Store the outcome unless the asset was re-queued or taken over meanwhile."""
+    updated = MediaAsset.objects.filter(
+        pk=asset.pk, worker=asset.worker, status=MediaAsset.Status.PROCESSING, source_name=asset.source_name
+    ).update(updated_at=timezone.now(), **values)
+    if not updated:
+        logger.info("Media asset %s changed while processing; result discarded", asset.pk)
+    return bool(updated)
+
+
+def _fail(asset: MediaAsset, exc: Exception) -> None:
+    logger.warning("Processing media asset %s failed: %s", asset.pk, exc)
+    status = MediaAsset.Status.FAILED if asset.attempts >= MAX_ATTEMPTS else MediaAsset.Status.PENDING
+    _finish(asset, status=status, error=str(exc)[:2000])
+
+
+def _read_source(asset: MediaAsset):
+    owner = asset.content_object
+    file = getattr(owner, asset.field, None) if owner is not None else None
+    if not file or file.name != asset.source_name:
+        return None, None
+    with file.storage.open(file.name, "rb") as handle:
+        return file, handle.read()
+
+
+def _store(file, digest: str, rendered: Dict[str, dict]) -> Dict[str, dict]:
+    folder = posixpath.join(posixpath.dirname(file.name), "renditions", digest)
+    renditions = {}
+    for name, result in rendered.items():
+        entry = {"width": result["width"], "height": result["height"]}
+        for fmt in FORMATS:
+            data, quality = result[fmt]
+            path = posixpath.join(folder, f"{name}.{EXTENSIONS[fmt]}")
+            if file.storage.exists(path):
+                file.storage.delete(path)
+            entry[fmt] = file.storage.save(path, ContentFile(data))
+            entry[f"{fmt}_quality"] = quality
+        renditions[name] = entry
+    return renditions
+
+
+def _release(storage, profile: str, digest: str, renditions: Dict[str, dict]) -> None:
+    """Delete rendition files no other asset of the same content still uses."""
+    if not digest or MediaAsset.objects.filter(profile=profile, source_hash=digest).exists():
+        return
+    for entry in renditions.values():
+        for fmt in FORMATS:
+            if entry.get(fmt):
+                storage.delete(entry[fmt])
+
+
+def _complete(asset: MediaAsset, file, digest: str, renditions: Dict[str, dict]) -> None:
+    previous_hash, previous = asset.source_hash, asset.renditions
+    if not _finish(
+        asset, status=MediaAsset.Status.READY, source_hash=digest, renditions=renditions,
+        error="", processed_at=timezone.now(),
+    ):
+        return
+    if previous_hash and previous_hash != digest:
+        _release(file.storage, asset.profile, previous_hash, previous)
+    asset.status, asset.source_hash, asset.renditions = MediaAsset.Status.READY, digest, renditions
+    media_ready.send(sender=asset.content_type.model_class(), asset=asset)
+
+
+def process_assets(assets: Iterable[MediaAsset], executor=None) -> int:
+    """Process claimed ``assets``; rendering runs on ``executor`` when given.
+
+    Returns the number of assets that became READY.
+    """
+    pending = []
+    ready = 0
+    for asset in assets:
+        try:
+            file, data = _read_source(asset)
+            if file is None:
+                # The owner or its file is gone; a newer save re-queues it.
+                _finish(asset, status=MediaAsset.Status.FAILED, error="File asli tidak ditemukan.")
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            if digest == asset.source_hash and asset.renditions:
+                _complete(asset, file, digest, asset.renditions)
+                ready += 1
+                continue
+            twin = (
+                MediaAsset.objects.filter(profile=asset.profile, source_hash=digest, status=MediaAsset.Status.READY)
+                .exclude(pk=asset.pk)
+                .values_list("renditions", flat=True)
+                .first()
+            )
+            if twin:
+                _complete(asset, file, digest, twin)
+                ready += 1
+                continue
+            specs = [asdict(spec) for spec in PROFILES[asset.profile]]
+            pending.append((asset, file, digest, _submit(executor, image_worker.render, data, specs, FORMATS)))
+        except FileNotFoundError:
+            # Readers stop linking the file until reconcile_assets sees it again.
+            _finish(
+                asset, status=MediaAsset.Status.FAILED, source_exists=False, verified_at=timezone.now(),
+                error="File asli tidak ada di storage.",
+            )
+        except Exception as exc:
+            # One bad image must not stop the batch.
+            _fail(asset, exc)
+
+    for asset, file, digest, future in pending:
+        try:
+            _complete(asset, file, digest, _store(file, digest, future.result()))
+            ready += 1
+        except Exception as exc:
+            _fail(asset, exc)
+    return ready
+
+
+def process_pending(asset_ids: Optional[Iterable[int]] = None, limit: int = 100) -> int:
+    """Claim and process pending assets in this process (``MEDIA_PROCESS_INLINE``, tests)."""
+    return process_assets(claim_assets(default_worker_name(), limit=limit, asset_ids=asset_ids))
+
+
+def _field_storage(asset: MediaAsset):
+    model = asset.content_type.model_class()
+    if model is None:
+        return None
+    return model._meta.get_field(asset.field).storage
+
+
+def release_deleted_asset(asset: MediaAsset) -> None:
+    """Delete the renditions of a deleted asset after commit, unless shared."""
+    storage = _field_storage(asset)
+    if not asset.renditions or storage is None:
+        return
+    transaction.on_commit(partial(_release, storage, asset.profile, asset.source_hash, asset.renditions))
+
+
+# --- Reconciliation ---------------------------------------------------------
+
+def _renditions_exist(storage, renditions: Dict[str, dict]) -> bool:
+    return all(
+        storage.exists(entry[fmt]) for entry in renditions.values() for fmt in FORMATS if entry.get(fmt)
+    )
+
+
+def reconcile_assets(batch_size: int = 500) -> Dict[str, int]:
+    """Check recorded files against storage and fix what drifted.
+
+    Queues registered fields that have no asset yet, records whether each
+    original exists, and re-queues assets whose original came back or whose
+    rendition files are gone. Returns counts per outcome.
+    """
+    counts = {"queued": queue_missing(batch_size), "checked": 0, "missing": 0, "found": 0, "requeued": 0}
+    now = timezone.now()
+    assets = MediaAsset.objects.select_related("content_type").order_by("pk")
+    for asset in assets.iterator(chunk_size=batch_size):
+        storage = _field_storage(asset)
+        if storage is None:
+            continue
+        counts["checked"] += 1
+        exists = storage.exists(asset.source_name)
+        values = {"source_exists": exists, "verified_at": now}
+        if exists != asset.source_exists:
+            counts["found" if exists else "missing"] += 1
+        requeue = exists and (
+            (asset.status == MediaAsset.Status.FAILED and not asset.source_exists)
+            or (asset.status == MediaAsset.Status.READY and not _renditions_exist(storage, asset.renditions))
+        )
+        if requeue:
+            values.update(
+                status=MediaAsset.Status.PENDING, source_hash="", renditions={}, attempts=0, error="",
+                updated_at=now,
+            )
+            counts["requeued"] += 1
+        # Skip the write if a new upload replaced the file meanwhile.
+        MediaAsset.objects.filter(pk=asset.pk, source_name=asset.source_name).update(**values)
+    return counts
@@ -0,0 +1,164 @@
+"""Organisation tree built on ``Employee.manager``.
+
+``EmployeeHierarchy`` stores the transitive closure of the manager relation:
+one row per (ancestor, descendant) pair with the number of levels between
+them, plus a depth-0 row for every employee. "Everyone below X" is therefore
+a single indexed lookup on ``ancestor_id`` instead of one query per node.
+
+The closure is kept in sync by the Employee signals in ``apps.core.signals``.
+Writes that bypass signals (``QuerySet.update``, ``bulk_create``, raw SQL)
+must be followed by ``rebuild_hierarchy()`` or the ``rebuild_org_hierarchy``
+management command.
+"""
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from apps.core.models import Employee, EmployeeHierarchy
+
+logger = logging.getLogger(__name__)
+
+
+def _pk(employee) -> Optional[int]:
+    return getattr(employee, 'pk', employee)
+
+
+def descendant_ids(employee, include_self: bool = False) -> List[int]:
+    """Ids of every employee below ``employee`` (an Employee or an id)."""
+    employee_id = _pk(employee)
+    if employee_id is None:
+        return []
+    return list(
+        EmployeeHierarchy.objects.filter(
+            ancestor_id=employee_id, depth__gte=0 if include_self else 1
+        ).values_list('descendant_id', flat=True)
+    )
+
+
+def descendants(employee, include_self: bool = False):
+    """Employee queryset of everyone below ``employee``."""
+    return Employee.objects.filter(
+        ancestor_links__ancestor_id=_pk(employee),
+        ancestor_links__depth__gte=0 if include_self else 1,
+    )
+
+
+def ancestor_ids(employee, include_self: bool = False) -> List[int]:
+    """Ids of the management chain above ``employee``, nearest first."""
+    employee_id = _pk(employee)
+    if employee_id is None:
+        return []
+    return list(
+        EmployeeHierarchy.objects.filter(
+            descendant_id=employee_id, depth__gte=0 if include_self else 1
+        ).order_by('depth').values_list('ancestor_id', flat=True)
+    )
+
+
+def is_descendant(employee, ancestor) -> bool:
+    """True if ``employee`` sits anywhere below ``ancestor``."""
+    return EmployeeHierarchy.objects.filter(
+        ancestor_id=_pk(ancestor), descendant_id=_pk(employee), depth__gte=1
+    ).exists()
+
+
+def visible_employee_ids(person) -> List[int]:
+    """Employees a non-owner user may see: themselves and everyone below them."""
+    if person is None:
+        return []
+    return descendant_ids(person, include_self=True)
+
+
+def validate_manager(employee_id: Optional[int], manager_id: Optional[int]) -> None:
+    """Reject a manager that would turn the organisation tree into a cycle."""
+    if employee_id is None or manager_id is None:
+        return
+    if manager_id == employee_id or is_descendant(manager_id, employee_id):
+        raise ValidationError({'manager': 'Atasan tidak boleh diri sendiri atau bawahan dari karyawan ini.'})
+
+
+def add_employee(employee_id: int, manager_id: Optional[int]) -> None:
+    """Insert the closure rows of a newly created employee."""
+    EmployeeHierarchy.objects.get_or_create(
+        ancestor_id=employee_id, descendant_id=employee_id, defaults={'depth': 0}
+    )
+    if manager_id is not None:
+        _attach_subtree(employee_id, manager_id)
+
+
+def detach_subtree(employee_id: int) -> int:
+    """Cut the subtree rooted at ``employee_id`` loose from its former ancestors."""
+    subtree = list(
+        EmployeeHierarchy.objects.filter(ancestor_id=employee_id).values_list('descendant_id', flat=True)
+    )
+    deleted, _ = (
+        EmployeeHierarchy.objects.filter(descendant_id__in=subtree)
+        .exclude(ancestor_id__in=subtree)
+        .delete()
+    )
+    return deleted
+
+
+def _attach_subtree(employee_id: int, manager_id: int) -> None:
+    subtree = list(
+        EmployeeHierarchy.objects.filter(ancestor_id=employee_id).values_list('descendant_id', 'depth')
+    ) or [(employee_id, 0)]
+    above = list(
+        EmployeeHierarchy.objects.filter(descendant_id=manager_id).values_list('ancestor_id', 'depth')
+    ) or [(manager_id, 0)]
+    EmployeeHierarchy.objects.bulk_create(
+        [
+            EmployeeHierarchy(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+            for ancestor_id, up in above
+            for descendant_id, down in subtree
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def move_subtree(employee_id: int, manager_id: Optional[int]) -> None:
+    """Re-hang ``employee_id`` and everyone below it under ``manager_id``."""
+    with transaction.atomic():
+        detach_subtree(employee_id)
+        if manager_id is not None:
+            _attach_subtree(employee_id, manager_id)
+
+
+def closure_paths(parents: Dict[int, Optional[int]]) -> Iterator[Tuple[int, int, int]]:
+    """Yield ``(ancestor, descendant, depth)`` for an ``{employee: manager}`` map.
+
+    A manager chain that loops back on itself is cut where the loop closes.
+    """
+    for employee_id in parents:
+        seen = {employee_id}
+        yield employee_id, employee_id, 0
+        depth, current = 0, parents[employee_id]
+        while current is not None and current not in seen:
+            depth += 1
+            seen.add(current)
+            yield current, employee_id, depth
+            current = parents.get(current)
+
+
+def rebuild_hierarchy(employees: Optional[Iterable[Tuple[int, Optional[int]]]] = None) -> int:
+    """Recompute the whole closure table from ``Employee.manager``.
+
+    Returns the number of rows written.
+    """
+    if employees is None:
+        employees = Employee.objects.values_list('id', 'manager_id')
+    parents = dict(employees)
+    rows = [
+        EmployeeHierarchy(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+        for ancestor_id, descendant_id, depth in closure_paths(parents)
+    ]
+    with transaction.atomic():
+        EmployeeHierarchy.objects.all().delete()
+        EmployeeHierarchy.objects.bulk_create(rows, batch_size=1000)
+    from apps.core.services.user_roles import invalidate_role_contexts
+    invalidate_role_contexts()
+    logger.debug("Rebuilt employee hierarchy: %s rows for %s employees", len(rows), len(parents))
+    return len(rows)
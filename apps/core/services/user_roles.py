@@ -0,0 +1,126 @@
+"""Role context of a logged-in user.
+
+Owner / supervisor checks used to be recomputed several times per page
+(``user.is_owner()`` dereferences ``company.owner``, supervisor checks query
+``subordinates``). ``get_role_context`` computes everything once, memoizes it
+on the user object for the rest of the request and keeps it in the cache
+across requests. ``UserRoleMiddleware`` exposes it as ``request.user_role``.
+
+Cached contexts are keyed by a global version that the Employee, Company,
+SystemUser and permission/group signals bump, so any change to the org
+structure or to permissions invalidates them.
+"""
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.models import Company, Employee
+from apps.core.services import org_hierarchy
+
+VERSION_KEY = 'user_role:version'
+DEFAULT_TIMEOUT = 300
+
+
+@dataclass(frozen=True)
+class UserRoleContext:
+    user_id: Optional[int] = None
+    company_id: Optional[int] = None
+    employee_id: Optional[int] = None
+    is_owner: bool = False
+    is_supervisor: bool = False
+    # Self plus everyone below in the org tree; None means unrestricted (owner).
+    visible_employee_ids: Optional[Tuple[int, ...]] = ()
+    is_staff: bool = False
+    is_superuser: bool = False
+    permissions: FrozenSet[str] = frozenset()
+
+    @property
+    def has_employee(self) -> bool:
+        return self.employee_id is not None
+
+    @property
+    def is_regular_employee(self) -> bool:
+        """Employee without subordinates."""
+        return self.has_employee and not self.is_supervisor
+
+    def has_perm(self, perm: str) -> bool:
+        """Same answer as ``user.has_perm`` for model-level permissions."""
+        return self.is_superuser or perm in self.permissions
+
+    def can_see_employee(self, employee_id: int) -> bool:
+        if self.visible_employee_ids is None:
+            return True
+        return employee_id in self.visible_employee_ids
+
+
+ANONYMOUS_CONTEXT = UserRoleContext()
+
+
+def _timeout() -> int:
+    return getattr(settings, 'USER_ROLE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def _version() -> int:
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_role_contexts() -> None:
+    """Drop every cached role context (call after org-structure changes)."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def build_role_context(user) -> UserRoleContext:
+    """Compute a fresh role context from the database."""
+    company_id = getattr(user, 'company_id', None)
+    is_owner = bool(
+        company_id and Company.objects.filter(pk=company_id, owner_id=user.pk).exists()
+    )
+    employee_id = Employee.objects.filter(user_id=user.pk).values_list('id', flat=True).first()
+
+    visible_ids: Optional[Tuple[int, ...]] = None if is_owner else ()
+    is_supervisor = False
+    if employee_id is not None:
+        below = org_hierarchy.descendant_ids(employee_id)
+        is_supervisor = bool(below)
+        if not is_owner:
+            visible_ids = tuple(sorted([employee_id, *below]))
+
+    is_superuser = bool(user.is_active and user.is_superuser)
+    permissions = frozenset()
+    if user.is_active and not is_superuser:
+        permissions = frozenset(user.get_all_permissions())
+
+    return UserRoleContext(
+        user_id=user.pk,
+        company_id=company_id,
+        employee_id=employee_id,
+        is_owner=is_owner,
+        is_supervisor=is_supervisor,
+        visible_employee_ids=visible_ids,
+        is_staff=bool(user.is_staff),
+        is_superuser=is_superuser,
+        permissions=permissions,
+    )
+
+
+def get_role_context(user) -> UserRoleContext:
+    """Role context of ``user``: once per request, cached across requests."""
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return ANONYMOUS_CONTEXT
+
+    memo = getattr(user, '_role_context', None)
+    if memo is not None:
+        return memo
+
+    key = f'user_role:{_version()}:{user.pk}'
+    role = cache.get(key)
+    if role is None:
+        role = build_role_context(user)
+        cache.set(key, role, _timeout())
+    user._role_context = role
+    return role
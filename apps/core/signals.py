@@ -2,8 +2,15 @@ from django.dispatch import receiver
 from django_registration.signals import user_activated
 from django.contrib.auth.models import Group
 from django.db import transaction
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from .models import Company, Consultant, Employee, MediaAsset
+from .services import master_cache, media_pipeline, org_hierarchy
+from .services.user_roles import invalidate_role_contexts
+
+User = get_user_model()
 
-from .models import Company
 
 @receiver(user_activated)
 def user_activated_handler(sender, request, user, **kwargs):
@@ -18,3 +25,90 @@ def user_activated_handler(sender, request, user, **kwargs):
 
     group = Group.objects.get(name='Owner')
     user.groups.add(group)
+
+
+# --- Organisation tree (EmployeeHierarchy closure table) -----------------
+
+@receiver(pre_save, sender=Employee)
+def employee_remember_manager(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and 'manager' not in update_fields:
+        return
+    previous = Employee.objects.filter(pk=instance.pk).values_list('manager_id', flat=True).first()
+    if previous != instance.manager_id:
+        org_hierarchy.validate_manager(instance.pk, instance.manager_id)
+    instance._previous_manager_id = previous
+
+
+@receiver(post_save, sender=Employee)
+def employee_sync_hierarchy(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        org_hierarchy.add_employee(instance.pk, instance.manager_id)
+        return
+    if not hasattr(instance, '_previous_manager_id'):
+        return
+    previous = instance.__dict__.pop('_previous_manager_id')
+    if previous != instance.manager_id:
+        org_hierarchy.move_subtree(instance.pk, instance.manager_id)
+
+
+@receiver(pre_delete, sender=Employee)
+def employee_detach_hierarchy(sender, instance, **kwargs):
+    # Subordinates lose their manager (SET_NULL) without post_save; cut their
+    # subtrees loose from the deleted employee's ancestors here.
+    org_hierarchy.detach_subtree(instance.pk)
+
+
+# --- Cached user role contexts -------------------------------------------
+
+ROLE_USER_FIELDS = {'company', 'is_active', 'is_staff', 'is_superuser'}
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def org_structure_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_role_contexts)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login; don't flush every cached context for them.
+    if update_fields is not None and not ROLE_USER_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(invalidate_role_contexts)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def permissions_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(invalidate_role_contexts)
+
+
+# --- Cached master data ----------------------------------------------------
+
+master_cache.invalidate_on_change('consultant', Consultant)
+
+
+# --- Image renditions ------------------------------------------------------
+
+media_pipeline.register(Employee, 'photo', 'avatar')
+media_pipeline.register(Consultant, 'profile_picture', 'avatar')
+
+
+@receiver(post_delete, sender=MediaAsset)
+def media_asset_deleted(sender, instance, **kwargs):
+    media_pipeline.release_deleted_asset(instance)
+
+
+@receiver(media_pipeline.media_ready, sender=Consultant)
+def consultant_picture_ready(sender, **kwargs):
+    # Cached consultant lists embed the picture URL.
+    master_cache.invalidate('consultant')
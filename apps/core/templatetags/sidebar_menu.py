@@ -1,4 +1,15 @@
+import hashlib
+import re
+from functools import lru_cache
+
 from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import NoReverseMatch, get_script_prefix, reverse
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from apps.core.services.user_roles import get_role_context
 
 register = template.Library()
 
@@ -27,9 +38,77 @@ EMPLOYEE_MENU_PERMISSIONS = {
 }
 
 
-def _callable_attr(obj, name):
-    attr = getattr(obj, name, False)
-    return attr() if callable(attr) else attr
+MENU_ITEMS = [
+    {'label': '1. Perencanaan Tenaga Kerja', 'id': 'modul1', 'sub': [
+        {'label':'Dashboard LCR', 'url': 'm1planning:dashboard'},
+        {'label':'Rasio Biaya Karyawan', 'url': 'm1planning:list'},
+
+    ]},
+    {'label': '2. Rekrutmen dan Seleksi', 'id': 'modul2', 'sub': [
+        {'label': 'Dashboard', 'url': 'recruit_dashboard'},
+        {'label': 'Link Kandidat', 'url': 'generate_link'},
+        {'label': 'Matrix Interview', 'url': 'pertanyaan_interviews'},
+    ]},
+    {'label': '. Onboarding', 'id': 'modul3', 'sub': [
+        {'label': 'Tabel Struktur Mitra', 'url': 'm3onboarding:struktur_organisasi'},
+        {'label': 'Struktur Mitra', 'url': 'm3onboarding:organization_chart'},
+        {'label': 'Dokumen Standar', 'url': 'm3onboarding:document'},
+    ]},
+    {'label': '4. Manajemen Kinerja', 'id': 'modul4', 'sub': [
+        {'label': 'Dashboard KPI', 'url': 'kinerja4:dashboard'},
+        {'label': 'Daftar KPI', 'url': 'kinerja4:kpi_list'},
+        {'label': 'Buat Siklus KPI', 'url': 'kinerja4:cycle_create', 'perm': 'kinerja4.add_kpiperiodtarget'},
+    ]},
+    {'label': '5. Pengembangan Karyawan', 'id': 'modul5', 'sub': [
+        {"label": "Analisis Kebutuhan Pelatihan", "url": "learning5:trainingneed_list"},
+        {"label": "Kompetensi", "url": "learning5:competency_add"},
+    ]},
+    {'label': '. Kompensasi', 'id': 'modul6', 'sub': [
+        {"label": "Payroll Period", "url": "compensation6:payroll_period_list"},
+        {"label": "Komponen Gaji", "url": "compensation6:komponen_gaji"},
+        {"label": "Absensi Pemborong", "url": "compensation6:absensi_harian"},
+        {"label": "Riwayat Absensi", "url": "compensation6:riwayat_absensi"},
+        {"label": "Pengajuan Cuti", "url": "compensation6:pengajuan_cuti"},
+        {"label": "Slip Borongan", "url": "compensation6:payslip_select"},
+        {"label": "Kalender", "url": "compensation6:work_calendar"}
+    ]},
+    {'label': '7. Industrial Relation', 'id': 'modul8', 'sub': [
+        {'label':'Complaint', 'url': 'ir8:complaint_list'},
+    ]},
+    {'label': '8. Continues Improvement', 'id': 'modul9', 'sub': [
+        {'label':'OCAI', 'url': 'm9improvement:dashboard'},
+        {'label':'Link Test OCAI', 'url': 'm9improvement:ocai_form'},
+        {'label':'Hasil Test OCAI', 'url': 'm9improvement:result_ocai'},
+    ]},
+    {'label': 'Inbox', 'id': 'inbox', 'sub': [
+        {'label': 'Percakapan', 'url': 'inbox:thread_list'},
+    ]},
+]
+
+HR_MENU = [
+    {'label': 'Add Job', 'url': 'jobs:create-job'},
+    {'label': 'All Users', 'url': 'user:list'},
+    {'label': 'Create Blog', 'url': 'blog:create_blog'},
+]
+
+OWNER_MENU = [
+    {'label': 'Company Profile', 'url': 'company:profile'},
+    {'label': 'Departments', 'url': 'company:department'},
+    {'label': 'Positions', 'url': 'company:position'},
+]
+
+MENU_PERMISSIONS = tuple(sorted({
+    sub['perm'] for item in MENU_ITEMS for sub in item['sub'] if 'perm' in sub
+}))
+
+SIDEBAR_TEMPLATE = 'dashboard/partials/sidebar_nav.html'
+SIDEBAR_CACHE_TIMEOUT = 60 * 60
+# Changes whenever the menu definitions above change, so deploys never serve
+# a fragment rendered from an older menu.
+MENU_VERSION = hashlib.md5(repr((MENU_ITEMS, HR_MENU, OWNER_MENU)).encode()).hexdigest()[:8]
+
+ACTIVE_MARKER = '__sidebar_active_%d__'
+ACTIVE_MARKER_RE = re.compile(r'__sidebar_active_(\d+)__')
 
 
 def _merge_permissions(target, source):
@@ -37,63 +116,14 @@ def _merge_permissions(target, source):
         target.setdefault(module_id, set()).update(urls)
 
 
-@register.simple_tag
-def create_menu(user):
-    menu_items = [
-        {'label': '1. Perencanaan Tenaga Kerja', 'id': 'modul1', 'sub': [
-            {'label':'Dashboard LCR', 'url': 'm1planning:dashboard'},
-            {'label':'Rasio Biaya Karyawan', 'url': 'm1planning:list'},
-            
-        ]},
-        {'label': '2. Rekrutmen dan Seleksi', 'id': 'modul2', 'sub': [
-            {'label': 'Dashboard', 'url': 'recruit_dashboard'},
-            {'label': 'Link Kandidat', 'url': 'generate_link'},
-            {'label': 'Matrix Interview', 'url': 'pertanyaan_interviews'},
-        ]},
-        {'label': '. Onboarding', 'id': 'modul3', 'sub': [
-            {'label': 'Tabel Struktur Mitra', 'url': 'm3onboarding:struktur_organisasi'},
-            {'label': 'Struktur Mitra', 'url': 'm3onboarding:organization_chart'},
-            {'label': 'Dokumen Standar', 'url': 'm3onboarding:document'},
-        ]},
-        {'label': '4. Manajemen Kinerja', 'id': 'modul4', 'sub': [
-            {'label': 'Dashboard KPI', 'url': 'kinerja4:dashboard'},
-            {'label': 'Daftar KPI', 'url': 'kinerja4:kpi_list'},
-            {'label': 'Buat Siklus KPI', 'url': 'kinerja4:cycle_create', 'perm': 'kinerja4.add_kpiperiodtarget'},
-        ]},
-        {'label': '5. Pengembangan Karyawan', 'id': 'modul5', 'sub': [
-            {"label": "Analisis Kebutuhan Pelatihan", "url": "learning5:trainingneed_list"},
-            {"label": "Kompetensi", "url": "learning5:competency_add"},
-        ]},
-        {'label': '. Kompensasi', 'id': 'modul6', 'sub': [
-            {"label": "Payroll Period", "url": "compensation6:payroll_period_list"},
-            {"label": "Komponen Gaji", "url": "compensation6:komponen_gaji"},
-            {"label": "Absensi Pemborong", "url": "compensation6:absensi_harian"},
-            {"label": "Riwayat Absensi", "url": "compensation6:riwayat_absensi"},
-            {"label": "Pengajuan Cuti", "url": "compensation6:pengajuan_cuti"},
-            {"label": "Slip Borongan", "url": "compensation6:payslip_select"},
-            {"label": "Kalender", "url": "compensation6:work_calendar"}
-        ]},
-        {'label': '7. Industrial Relation', 'id': 'modul8', 'sub': [
-            {'label':'Complaint', 'url': 'ir8:complaint_list'},
-        ]},
-        {'label': '8. Continues Improvement', 'id': 'modul9', 'sub': [
-            {'label':'OCAI', 'url': 'm9improvement:dashboard'},
-            {'label':'Link Test OCAI', 'url': 'm9improvement:ocai_form'},
-            {'label':'Hasil Test OCAI', 'url': 'm9improvement:result_ocai'},
-        ]},
-        {'label': 'Inbox', 'id': 'inbox', 'sub': [
-            {'label': 'Percakapan', 'url': 'inbox:thread_list'},
-        ]},
-    ]
-
-    is_owner = _callable_attr(user, 'is_owner')
-    person = getattr(user, 'person', None)
-    
-    # Supervisor = person has subordinates = True
-    # Employee = person has subordinates = False  
-    is_supervisor = bool(person and person.subordinates.exists())
-    is_employee = bool(person and not person.subordinates.exists())
+def _menu_key(role):
+    granted = tuple(perm for perm in MENU_PERMISSIONS if role.has_perm(perm))
+    return role.is_owner, role.is_supervisor, role.is_regular_employee, granted
+
 
+@lru_cache(maxsize=64)
+def compile_menu(is_owner, is_supervisor, is_employee, granted_perms):
+    """Module menu for one role / permission combination."""
     role_permissions = {}
     if not is_owner:
         if is_supervisor:
@@ -102,9 +132,9 @@ def create_menu(user):
             _merge_permissions(role_permissions, EMPLOYEE_MENU_PERMISSIONS)
 
     result = []
-    for item in menu_items:
+    for item in MENU_ITEMS:
         sub_items = item.get('sub', [])
-        filtered_subs = [sub for sub in sub_items if 'perm' not in sub or user.has_perm(sub['perm'])]
+        filtered_subs = [sub for sub in sub_items if 'perm' not in sub or sub['perm'] in granted_perms]
 
         if not filtered_subs:
             continue
@@ -118,25 +148,88 @@ def create_menu(user):
         if filtered_subs:
             result.append({**item, 'sub': filtered_subs})
 
-    return result
+    return tuple(result)
+
+
+@register.simple_tag
+def create_menu(user):
+    return list(compile_menu(*_menu_key(get_role_context(user))))
+
+
+def _reverse(url_name):
+    try:
+        return reverse(url_name)
+    except NoReverseMatch:
+        return ''
+
+
+def _render_sidebar(role):
+    """Render the sidebar links with placeholders for the active class.
+
+    Returns ``(html, links)`` where ``links[i]`` is ``(href, exact)`` for the
+    ``i``-th placeholder.
+    """
+    links = []
+
+    def resolve(entries, exact):
+        resolved = []
+        for entry in entries:
+            href = _reverse(entry['url'])
+            resolved.append({'label': entry['label'], 'href': href, 'active': ACTIVE_MARKER % len(links)})
+            links.append((href, exact))
+        return resolved
+
+    context = {
+        'hr_menu': resolve(HR_MENU, True) if role.is_staff else [],
+        'owner_menu': resolve(OWNER_MENU, True) if role.is_owner else [],
+        'nav_menu': [],
+    }
+    if role.is_owner or role.company_id:
+        context['nav_menu'] = [
+            {**item, 'sub': resolve(item['sub'], False)}
+            for item in compile_menu(*_menu_key(role))
+        ]
+    return render_to_string(SIDEBAR_TEMPLATE, context), links
+
+
+@register.simple_tag(takes_context=True)
+def sidebar_nav(context):
+    """Sidebar navigation, rendered once per role and cached.
+
+    Only the active-link highlighting depends on the current path; it is
+    applied to the cached fragment on every request.
+    """
+    user = context.get('user')
+    request = context.get('request')
+    role = get_role_context(user)
+    key_parts = (MENU_VERSION, _menu_key(role), role.is_staff, bool(role.company_id),
+                 get_language(), get_script_prefix())
+    key = 'sidebar:' + hashlib.md5(repr(key_parts).encode()).hexdigest()
+
+    cached = cache.get(key)
+    if cached is None:
+        cached = _render_sidebar(role)
+        cache.set(key, cached, SIDEBAR_CACHE_TIMEOUT)
+    html, links = cached
+
+    path = request.path if request is not None else ''
+
+    def active(match):
+        href, exact = links[int(match.group(1))]
+        is_current = path == href if exact else bool(href) and path.startswith(href)
+        return ' active' if is_current else ''
+
+    return mark_safe(ACTIVE_MARKER_RE.sub(active, html))
 
 
 @register.simple_tag
 def create_hr_menu():
-    return [
-        {'label': 'Add Job', 'url': 'jobs:create-job'},
-        {'label': 'All Users', 'url': 'user:list'},
-        {'label': 'Create Blog', 'url': 'blog:create_blog'},
-    ]
+    return HR_MENU
 
 
 @register.simple_tag
 def create_owner_menu():
-    return [
-        {'label': 'Company Profile', 'url': 'company:profile'},
-        {'label': 'Departments', 'url': 'company:department'},
-        {'label': 'Positions', 'url': 'company:position'},
-    ]
+    return OWNER_MENU
 
 
 @register.filter
@@ -1,3 +1,240 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from apps.core.models import Company, Consultant, Employee, EmployeeHierarchy, MediaAsset
+from apps.core.services import image_worker, media_pipeline, org_hierarchy
+from apps.core.services.user_roles import get_role_context
+
+User = get_user_model()
+
+
+class OrgHierarchyTest(TestCase):
+    def setUp(self):
+        self.ceo = Employee.objects.create(name='CEO', email='ceo@example.com')
+        self.mgr = Employee.objects.create(name='Manager', email='mgr@example.com', manager=self.ceo)
+        self.staff = Employee.objects.create(name='Staff', email='staff@example.com', manager=self.mgr)
+        self.other = Employee.objects.create(name='Other', email='other@example.com')
+
+    def test_descendants_follow_manager_chain(self):
+        self.assertCountEqual(org_hierarchy.descendant_ids(self.ceo), [self.mgr.id, self.staff.id])
+        self.assertCountEqual(
+            org_hierarchy.visible_employee_ids(self.mgr), [self.mgr.id, self.staff.id]
+        )
+        self.assertEqual(org_hierarchy.ancestor_ids(self.staff), [self.mgr.id, self.ceo.id])
+        self.assertTrue(org_hierarchy.is_descendant(self.staff, self.ceo))
+        self.assertFalse(org_hierarchy.is_descendant(self.ceo, self.staff))
+
+    def test_moving_a_manager_moves_the_subtree(self):
+        self.mgr.manager = self.other
+        self.mgr.save()
+
+        self.assertEqual(org_hierarchy.descendant_ids(self.ceo), [])
+        self.assertCountEqual(org_hierarchy.descendant_ids(self.other), [self.mgr.id, self.staff.id])
+        self.assertEqual(
+            EmployeeHierarchy.objects.get(ancestor=self.other, descendant=self.staff).depth, 2
+        )
+
+    def test_deleting_a_manager_detaches_subordinates(self):
+        self.mgr.delete()
+
+        self.assertEqual(org_hierarchy.descendant_ids(self.ceo), [])
+        self.assertEqual(org_hierarchy.ancestor_ids(self.staff), [])
+
+    def test_cycles_are_rejected(self):
+        self.ceo.manager = self.staff
+        with self.assertRaises(ValidationError):
+            self.ceo.save()
+
+    def test_rebuild_matches_incremental_maintenance(self):
+        maintained = set(EmployeeHierarchy.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+        org_hierarchy.rebuild_hierarchy()
+        rebuilt = set(EmployeeHierarchy.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+        self.assertEqual(maintained, rebuilt)
+
+
+class UserRoleContextTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name='Test Company')
+        self.owner = User.objects.create_user(username='owner', password='x', company=self.company)
+        self.company.owner = self.owner
+        self.company.save()
+        self.boss_user = User.objects.create_user(username='boss', password='x', company=self.company)
+        self.boss = Employee.objects.create(
+            name='Boss', email='boss@example.com', company=self.company, user=self.boss_user
+        )
+        self.staff = Employee.objects.create(
+            name='Staff', email='staff@example.com', company=self.company, manager=self.boss
+        )
+
+    def test_roles(self):
+        owner_role = get_role_context(self.owner)
+        self.assertTrue(owner_role.is_owner)
+        self.assertIsNone(owner_role.visible_employee_ids)
+
+        boss_role = get_role_context(self.boss_user)
+        self.assertFalse(boss_role.is_owner)
+        self.assertTrue(boss_role.is_supervisor)
+        self.assertEqual(boss_role.employee_id, self.boss.id)
+        self.assertEqual(set(boss_role.visible_employee_ids), {self.boss.id, self.staff.id})
+
+    def test_cached_across_requests_and_invalidated_on_employee_change(self):
+        get_role_context(self.boss_user)
+        fresh_user = User.objects.get(pk=self.boss_user.pk)
+        with self.assertNumQueries(0):
+            role = get_role_context(fresh_user)
+        self.assertTrue(role.is_supervisor)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.staff.manager = None
+            self.staff.save()
+        role = get_role_context(User.objects.get(pk=self.boss_user.pk))
+        self.assertFalse(role.is_supervisor)
+        self.assertEqual(role.visible_employee_ids, (self.boss.id,))
+
+    def test_index_picks_dashboard_from_role(self):
+        outsider = User.objects.create_user(username='outsider', password='x')
+        for user, template in (
+            (self.owner, 'dashboard/hr-dashboard.html'),
+            (self.boss_user, 'dashboard/tl-dashboard.html'),
+            (outsider, 'dashboard/i-dashboard.html'),
+        ):
+            self.client.force_login(user)
+            self.assertTemplateUsed(self.client.get(reverse('index')), template)
+
+
+class SidebarMenuTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name='Test Company')
+        self.owner = User.objects.create_user(username='owner', password='x', company=self.company)
+        self.company.owner = self.owner
+        self.company.save()
+
+    def render(self, path, user):
+        request = RequestFactory().get(path)
+        request.user = user
+        template = Template('{% load sidebar_menu %}{% sidebar_nav %}')
+        return template.render(Context({'request': request, 'user': request.user}))
+
+    def test_fragment_is_cached_and_highlights_current_path(self):
+        self.render('/', self.owner)
+        path = reverse('compensation6:riwayat_absensi')
+        user = User.objects.get(pk=self.owner.pk)
+        with self.assertNumQueries(0):
+            html = self.render(path, user)
+        self.assertIn('Company Profile', html)
+        self.assertIn(f'px-2 active"\n                   href="{path}"', html)
+        self.assertNotIn('__sidebar_active_', html)
+
+
+def noisy_png(width, height):
+    gradient = Image.linear_gradient('L').resize((width, height))
+    img = Image.merge('RGB', (Image.effect_noise((width, height), 20), gradient, gradient.rotate(180)))
+    output = BytesIO()
+    img.save(output, format='PNG')
+    return output.getvalue()
+
+
+class MediaPipelineTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.png = noisy_png(600, 400)
+
+    def test_binary_search_fits_budget(self):
+        img = Image.open(BytesIO(self.png)).convert('RGB')
+        data, quality = image_worker.encode_within(img, 'jpeg', 20 * 1024)
+        self.assertLessEqual(len(data), 20 * 1024)
+        self.assertLess(quality, image_worker.MAX_QUALITY)
+        self.assertGreater(len(image_worker._encode(img, 'jpeg', quality + 1)), 20 * 1024)
+
+    def test_upload_is_queued_once_and_rendered_by_worker(self):
+        consultant = Consultant(name='Dr. Sawit')
+        consultant.profile_picture.save('dr.png', ContentFile(self.png), save=False)
+        consultant.save()
+        asset = MediaAsset.objects.get()
+        self.assertEqual((asset.status, asset.source_name), (MediaAsset.Status.PENDING, consultant.profile_picture.name))
+        self.assertEqual(media_pipeline.rendition_url(consultant, 'profile_picture'), consultant.profile_picture.url)
+
+        self.assertEqual(media_pipeline.process_pending(), 1)
+        asset.refresh_from_db()
+        self.assertEqual(asset.status, MediaAsset.Status.READY)
+        self.assertEqual((asset.renditions['thumb']['width'], asset.renditions['thumb']['height']), (96, 96))
+        full = os.path.join(self.media_root, asset.renditions['full']['webp'])
+        self.assertLessEqual(os.path.getsize(full), 150 * 1024)
+        self.assertTrue(media_pipeline.rendition_url(consultant, 'profile_picture', 'list', 'webp').endswith('/list.webp'))
+
+        consultant.bio = 'Ahli agronomi'
+        consultant.save()
+        asset.refresh_from_db()
+        self.assertEqual(asset.status, MediaAsset.Status.READY)
+
+        # Same picture uploaded again: the renditions are reused, not re-encoded.
+        consultant.profile_picture.save('dr-lagi.png', ContentFile(self.png))
+        self.assertEqual(MediaAsset.objects.get().status, MediaAsset.Status.PENDING)
+        original_render = image_worker.render
+        image_worker.render = None
+        try:
+            self.assertEqual(media_pipeline.process_pending(), 1)
+        finally:
+            image_worker.render = original_render
+        self.assertEqual(MediaAsset.objects.get().renditions, asset.renditions)
+
+    def test_stale_asset_on_its_last_attempt_fails(self):
+        consultant = Consultant(name='Dr. Sawit')
+        consultant.profile_picture.save('dr.png', ContentFile(self.png))
+        MediaAsset.objects.update(
+            status=MediaAsset.Status.PROCESSING, attempts=media_pipeline.MAX_ATTEMPTS, heartbeat_at=None
+        )
+        self.assertEqual(media_pipeline.claim_assets('worker-b'), [])
+        asset = MediaAsset.objects.get()
+        self.assertEqual(asset.status, MediaAsset.Status.FAILED)
+        self.assertTrue(asset.error)
+
+    def test_deleting_owner_releases_renditions(self):
+        consultant = Consultant(name='Dr. Sawit')
+        consultant.profile_picture.save('dr.png', ContentFile(self.png))
+        media_pipeline.process_pending()
+        path = os.path.join(self.media_root, MediaAsset.objects.get().renditions['thumb']['jpeg'])
+        self.assertTrue(os.path.exists(path))
+        with self.captureOnCommitCallbacks(execute=True):
+            consultant.delete()
+        self.assertFalse(MediaAsset.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_urls_come_from_recorded_state_and_reconcile_updates_it(self):
+        consultant = Consultant(name='Dr. Sawit')
+        consultant.profile_picture.save('dr.png', ContentFile(self.png))
+        media_pipeline.process_pending()
+        consultant = Consultant.objects.prefetch_related('media_assets').get()
+        storage = consultant.profile_picture.storage
+        with self.assertNumQueries(0), mock.patch.object(storage, 'exists', side_effect=AssertionError):
+            urls = media_pipeline.media_urls(consultant, 'profile_picture')
+        self.assertEqual(urls['original'], consultant.profile_picture.url)
+        self.assertTrue(urls['thumb'].endswith('/thumb.jpg'))
+
+        source = os.path.join(self.media_root, consultant.profile_picture.name)
+        os.rename(source, source + '.bak')
+        self.assertEqual(media_pipeline.reconcile_assets()['missing'], 1)
+        self.assertIsNone(media_pipeline.rendition_url(Consultant.objects.get(), 'profile_picture'))
+
+        os.rename(source + '.bak', source)
+        counts = media_pipeline.reconcile_assets()
+        self.assertEqual((counts['found'], counts['requeued']), (1, 0))
+        self.assertIsNotNone(media_pipeline.rendition_url(Consultant.objects.get(), 'profile_picture'))
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AreaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.modules.area'
+
+    def ready(self):
+        from apps.core.services import master_cache
+        from .models import Desa, KabupatenKota, Kecamatan, Provinsi
+
+        master_cache.invalidate_on_change('area', Provinsi, KabupatenKota, Kecamatan, Desa)
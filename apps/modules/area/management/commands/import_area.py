@@ -0,0 +1,40 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.modules.area.services.area_import import import_area
+
+
+class Command(BaseCommand):
+    help = "Import provinsi/kabupaten/kecamatan/desa from the national area CSV (e.g. import/area.csv)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", help="Path to the area CSV")
+        parser.add_argument("--encoding", default="utf-8-sig", help="CSV encoding (default: utf-8-sig)")
+        parser.add_argument("--dry-run", action="store_true", help="Run the import and roll it back")
+        parser.add_argument("--show-warnings", action="store_true", help="Print every skipped row")
+
+    def handle(self, *args, **options):
+        path = options["csv_path"]
+        if not os.path.exists(path):
+            raise CommandError(f"File {path} tidak ditemukan")
+
+        result = import_area(
+            path,
+            encoding=options["encoding"],
+            dry_run=options["dry_run"],
+            progress=lambda rows: self.stdout.write(f"{rows} baris dibaca..."),
+        )
+
+        if options["show_warnings"]:
+            for warning in result.warnings:
+                self.stdout.write(self.style.WARNING(warning))
+        summary = (
+            f"{result.rows} baris: {result.desa_created} desa baru, {result.desa_updated} desa diperbarui, "
+            f"{result.kabupaten_created} kabupaten baru, {result.kecamatan_created} kecamatan baru, "
+            f"{result.skipped} dilewati"
+        )
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"Dry run (tidak disimpan) - {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Import area selesai - {summary}"))
@@ -0,0 +1,52 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('area', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='provinsi',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Waktu perubahan terakhir (untuk sinkronisasi)'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='kabupatenkota',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Waktu perubahan terakhir (untuk sinkronisasi)'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='kecamatan',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Waktu perubahan terakhir (untuk sinkronisasi)'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='desa',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Waktu perubahan terakhir (untuk sinkronisasi)'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='desa',
+            index=models.Index(fields=['updated_at', 'id'], name='area_desa_updated_a2ed8d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kabupatenkota',
+            index=models.Index(fields=['updated_at', 'id'], name='area_kabupa_updated_0f79ae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kecamatan',
+            index=models.Index(fields=['updated_at', 'id'], name='area_kecama_updated_f5f4cb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='provinsi',
+            index=models.Index(fields=['updated_at', 'id'], name='area_provin_updated_998c46_idx'),
+        ),
+    ]
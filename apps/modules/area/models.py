@@ -7,11 +7,13 @@ class Provinsi(models.Model):
     """
     kode = models.CharField(max_length=2, unique=True, help_text="Kode provinsi (2 digit)")
     nama = models.CharField(max_length=100, help_text="Nama provinsi")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Waktu perubahan terakhir (untuk sinkronisasi)")
     
     class Meta:
         verbose_name = "Provinsi"
         verbose_name_plural = "Provinsi"
         ordering = ['nama']
+        indexes = [models.Index(fields=['updated_at', 'id'])]
     
     def __str__(self):
         return self.nama
@@ -34,11 +36,13 @@ class KabupatenKota(models.Model):
     kode = models.CharField(max_length=4, unique=True, help_text="Kode kabupaten/kota (4 digit)")
     nama = models.CharField(max_length=100, help_text="Nama kabupaten/kota")
     jenis = models.CharField(max_length=10, choices=JENIS_CHOICES, default='KABUPATEN')
+    updated_at = models.DateTimeField(auto_now=True, help_text="Waktu perubahan terakhir (untuk sinkronisasi)")
     
     class Meta:
         verbose_name = "Kabupaten/Kota"
         verbose_name_plural = "Kabupaten/Kota"
         ordering = ['nama']
+        indexes = [models.Index(fields=['updated_at', 'id'])]
     
     def __str__(self):
         return f"{self.get_jenis_display()} {self.nama}"
@@ -55,11 +59,13 @@ class Kecamatan(models.Model):
     )
     kode = models.CharField(max_length=6, unique=True, help_text="Kode kecamatan (6 digit)")
     nama = models.CharField(max_length=100, help_text="Nama kecamatan")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Waktu perubahan terakhir (untuk sinkronisasi)")
     
     class Meta:
         verbose_name = "Kecamatan"
         verbose_name_plural = "Kecamatan"
         ordering = ['nama']
+        indexes = [models.Index(fields=['updated_at', 'id'])]
     
     def __str__(self):
         return f"Kec. {self.nama}"
@@ -83,11 +89,13 @@ class Desa(models.Model):
     nama = models.CharField(max_length=100, help_text="Nama desa/kelurahan")
     jenis = models.CharField(max_length=10, choices=JENIS_CHOICES, default='DESA')
     kode_pos = models.CharField(max_length=5, blank=True, null=True, help_text="Kode pos")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Waktu perubahan terakhir (untuk sinkronisasi)")
     
     class Meta:
         verbose_name = "Desa/Kelurahan"
         verbose_name_plural = "Desa/Kelurahan"
         ordering = ['nama']
+        indexes = [models.Index(fields=['updated_at', 'id'])]
     
     def __str__(self):
         return f"{self.get_jenis_display()} {self.nama}"
@@ -1,15 +1,17 @@
 from rest_framework import serializers
 
+from api.listing import SparseFieldsMixin
+
 from apps.modules.area.models import Provinsi, KabupatenKota, Kecamatan, Desa
 
 
-class ProvinsiSerializer(serializers.ModelSerializer):
+class ProvinsiSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Provinsi
         fields = ["id", "kode", "nama"]
 
 
-class KabupatenKotaSerializer(serializers.ModelSerializer):
+class KabupatenKotaSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     provinsi_id = serializers.IntegerField(read_only=True)
     provinsi = ProvinsiSerializer(read_only=True)
 
@@ -18,7 +20,7 @@ class KabupatenKotaSerializer(serializers.ModelSerializer):
         fields = ["id", "kode", "nama", "jenis", "provinsi_id", "provinsi"]
 
 
-class KecamatanSerializer(serializers.ModelSerializer):
+class KecamatanSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     kabupaten_kota_id = serializers.IntegerField(read_only=True)
     kabupaten_kota = KabupatenKotaSerializer(read_only=True)
 
@@ -27,7 +29,7 @@ class KecamatanSerializer(serializers.ModelSerializer):
         fields = ["id", "kode", "nama", "kabupaten_kota_id", "kabupaten_kota"]
 
 
-class DesaSerializer(serializers.ModelSerializer):
+class DesaSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     kecamatan_id = serializers.IntegerField(read_only=True)
     kecamatan = KecamatanSerializer(read_only=True)
 
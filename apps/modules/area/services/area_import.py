@@ -0,0 +1,238 @@
+"""Bulk import of the national area dataset (``import/area.csv``).
+
+The CSV has one row per desa::
+
+    Kode Provinsi,Provinsi,kode kabupaten,Kabupaten,kode kecamatan,Kecamatan,kode desa,Desa
+
+Provinsi, kabupaten/kota and kecamatan are resolved against dictionaries
+loaded once up front (by kode, then by nama within the parent); missing
+kabupaten/kecamatan are created with one ``bulk_create`` per level. Desa
+rows are then staged with ``COPY`` into a temporary table and merged with a
+single ``INSERT ... ON CONFLICT (kode) DO UPDATE``. Everything runs in one
+transaction; ``dry_run`` rolls it back after counting.
+
+Unchanged desa keep their ``updated_at`` so ``/api/sync/`` clients do not
+download the whole table again after a re-import.
+"""
+import csv
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.core.services import master_cache
+
+from ..models import Desa, KabupatenKota, Kecamatan, Provinsi
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_EVERY = 10000
+DESA_JENIS = "DESA"
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    skipped: int = 0
+    kabupaten_created: int = 0
+    kecamatan_created: int = 0
+    desa_created: int = 0
+    desa_updated: int = 0
+    warnings: List[str] = field(default_factory=list)
+
+
+def _pk(ref: Union[int, object]) -> int:
+    return getattr(ref, "pk", ref)
+
+
+def _key(ref: Union[int, object]):
+    # Unsaved model instances are unhashable; key them by identity.
+    return ref if isinstance(ref, int) else ("new", id(ref))
+
+
+class _Resolver:
+    """kode/nama -> row of one level: an id, or an instance still to be created."""
+
+    def __init__(self, rows):
+        self.by_kode: Dict[str, Tuple[object, object]] = {}
+        self.by_nama: Dict[Tuple[object, str], object] = {}
+        self.new: List[Tuple[object, object]] = []
+        for pk, parent_id, kode, nama in rows:
+            self.by_kode[kode] = (pk, parent_id)
+            self.by_nama[(parent_id, nama)] = pk
+
+    def resolve(self, parent, kode: str, nama: str):
+        """The matching row, ``False`` if it must be created, ``None`` if it cannot be."""
+        found = self.by_kode.get(kode) if kode else None
+        if found and _key(found[1]) == _key(parent):
+            return found[0]
+        match = self.by_nama.get((_key(parent), nama))
+        if match is not None:
+            return match
+        # A blank kode, or one that already belongs to another parent.
+        return None if not kode or found else False
+
+    def add(self, instance, parent, kode: str, nama: str):
+        self.by_kode[kode] = (instance, parent)
+        self.by_nama[(_key(parent), nama)] = instance
+        self.new.append((instance, parent))
+        return instance
+
+
+def _read(path: str, encoding: str, result: ImportResult, progress: Optional[Callable[[int], None]]):
+    provinsi = dict(Provinsi.objects.values_list("kode", "id"))
+    kabupaten = _Resolver(KabupatenKota.objects.values_list("id", "provinsi_id", "kode", "nama"))
+    kecamatan = _Resolver(Kecamatan.objects.values_list("id", "kabupaten_kota_id", "kode", "nama"))
+    desa: Dict[str, Tuple[object, str]] = {}
+    unnamed: List[Tuple[object, str, str]] = []
+
+    with open(path, newline="", encoding=encoding) as handle:
+        for line, row in enumerate(csv.DictReader(handle), start=2):
+            result.rows += 1
+            if progress and result.rows % PROGRESS_EVERY == 0:
+                progress(result.rows)
+
+            prov_kode = row["Kode Provinsi"].strip()
+            kab_kode, kab_nama = row["kode kabupaten"].strip(), row["Kabupaten"].strip()
+            kec_kode, kec_nama = row["kode kecamatan"].strip()[:6], row["Kecamatan"].strip()
+            desa_kode, desa_nama = row["kode desa"].strip(), row["Desa"].strip()
+
+            prov_id = provinsi.get(prov_kode)
+            if prov_id is None:
+                result.skipped += 1
+                result.warnings.append(f"baris {line}: provinsi {prov_kode} tidak ditemukan")
+                continue
+
+            kab = kabupaten.resolve(prov_id, kab_kode, kab_nama)
+            if kab is False:
+                kab = kabupaten.add(
+                    KabupatenKota(provinsi_id=prov_id, kode=kab_kode, nama=kab_nama, jenis="KABUPATEN"),
+                    prov_id, kab_kode, kab_nama,
+                )
+            kec = None if kab is None else kecamatan.resolve(kab, kec_kode, kec_nama)
+            if kec is False:
+                kec = kecamatan.add(Kecamatan(kode=kec_kode, nama=kec_nama), kab, kec_kode, kec_nama)
+            if kab is None or kec is None:
+                result.skipped += 1
+                result.warnings.append(f"baris {line}: kabupaten/kecamatan {kab_kode}/{kec_kode} tidak valid")
+                continue
+
+            if desa_kode:
+                desa[desa_kode] = (kec, desa_nama)
+            else:
+                unnamed.append((kec, kec_kode, desa_nama))
+    return kabupaten, kecamatan, desa, unnamed
+
+
+def _assign_codes(desa: Dict[str, Tuple[object, str]], unnamed: List[Tuple[object, str, str]]) -> None:
+    """Give desa without a kode the kode of the same-named desa in its kecamatan,
+    or ``<kode kecamatan><next 4-digit number>``."""
+    if not unnamed:
+        return
+    last: Dict[int, int] = {}
+    by_nama: Dict[Tuple[int, str], str] = {}
+    kecamatan_ids = {_pk(kec) for kec, _, _ in unnamed}
+    existing = Desa.objects.filter(kecamatan_id__in=kecamatan_ids).values_list("kecamatan_id", "kode", "nama")
+    known = list(existing) + [(_pk(kec), kode, nama) for kode, (kec, nama) in desa.items()]
+    for kecamatan_id, kode, nama in known:
+        if kecamatan_id not in kecamatan_ids:
+            continue
+        by_nama[(kecamatan_id, nama)] = kode
+        if kode[-4:].isdigit():
+            last[kecamatan_id] = max(last.get(kecamatan_id, 0), int(kode[-4:]))
+    for kec, kec_kode, nama in unnamed:
+        if (_pk(kec), nama) in by_nama:
+            desa[by_nama[(_pk(kec), nama)]] = (kec, nama)
+            continue
+        number = last.get(_pk(kec), 0) + 1
+        last[_pk(kec)] = number
+        desa[f"{kec_kode}{number:04d}"] = (kec, nama)
+        by_nama[(_pk(kec), nama)] = f"{kec_kode}{number:04d}"
+
+
+def _merge_postgresql(rows: List[Tuple[str, str, str, int]], now) -> Tuple[int, int]:
+    table = connection.ops.quote_name(Desa._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMP TABLE area_desa_import "
+            "(kode varchar(10), nama varchar(100), jenis varchar(10), kecamatan_id bigint) ON COMMIT DROP"
+        )
+        with cursor.copy("COPY area_desa_import (kode, nama, jenis, kecamatan_id) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+        cursor.execute(
+            f"""
+            WITH merged AS (
+                INSERT INTO {table} (kode, nama, jenis, kecamatan_id, updated_at)
+                SELECT kode, nama, jenis, kecamatan_id, %s FROM area_desa_import
+                ON CONFLICT (kode) DO UPDATE
+                SET nama = EXCLUDED.nama, jenis = EXCLUDED.jenis, updated_at = EXCLUDED.updated_at
+                WHERE ({table}.nama, {table}.jenis) IS DISTINCT FROM (EXCLUDED.nama, EXCLUDED.jenis)
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged
+            """,
+            [now],
+        )
+        created, updated = cursor.fetchone()
+    return created, updated
+
+
+def _merge_generic(rows: List[Tuple[str, str, str, int]], now) -> Tuple[int, int]:
+    """Same merge through the ORM, for backends without COPY (tests, SQLite)."""
+    wanted = {kode: (nama, jenis) for kode, nama, jenis, _ in rows}
+    existing = {}
+    codes = list(wanted)
+    for start in range(0, len(codes), 500):
+        existing.update(
+            (kode, (nama, jenis))
+            for kode, nama, jenis in Desa.objects.filter(kode__in=codes[start:start + 500])
+            .values_list("kode", "nama", "jenis")
+        )
+    changed = [row for row in rows if existing.get(row[0]) != wanted[row[0]]]
+    Desa.objects.bulk_create(
+        [
+            Desa(kode=kode, nama=nama, jenis=jenis, kecamatan_id=kecamatan_id, updated_at=now)
+            for kode, nama, jenis, kecamatan_id in changed
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["kode"],
+        update_fields=["nama", "jenis", "updated_at"],
+    )
+    created = sum(1 for row in changed if row[0] not in existing)
+    return created, len(changed) - created
+
+
+def import_area(path: str, encoding: str = "utf-8-sig", dry_run: bool = False,
+                progress: Optional[Callable[[int], None]] = None) -> ImportResult:
+    """Import ``path``; with ``dry_run`` everything is rolled back after counting."""
+    result = ImportResult()
+    now = timezone.now()
+    with transaction.atomic():
+        kabupaten, kecamatan, desa, unnamed = _read(path, encoding, result, progress)
+
+        KabupatenKota.objects.bulk_create([kab for kab, _ in kabupaten.new], batch_size=1000)
+        for kec, kab in kecamatan.new:
+            kec.kabupaten_kota_id = _pk(kab)
+        Kecamatan.objects.bulk_create([kec for kec, _ in kecamatan.new], batch_size=1000)
+        result.kabupaten_created = len(kabupaten.new)
+        result.kecamatan_created = len(kecamatan.new)
+
+        _assign_codes(desa, unnamed)
+        rows = [(kode, nama, DESA_JENIS, _pk(kec)) for kode, (kec, nama) in desa.items()]
+        merge = _merge_postgresql if connection.vendor == "postgresql" else _merge_generic
+        result.desa_created, result.desa_updated = merge(rows, now)
+
+        if dry_run:
+            transaction.set_rollback(True)
+        else:
+            transaction.on_commit(lambda: master_cache.invalidate("area"))
+
+    logger.info(
+        "Area import%s: %s rows, %s desa created, %s updated, %s skipped",
+        " (dry run)" if dry_run else "", result.rows, result.desa_created, result.desa_updated, result.skipped,
+    )
+    return result
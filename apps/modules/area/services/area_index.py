@@ -0,0 +1,217 @@
+"""In-memory index of the area hierarchy (provinsi > kabupaten/kota > kecamatan > desa).
+
+The four tables are read once per process into parallel arrays per level
+(id, parent position, kode, nama, display label), so a full address is a
+few array hops instead of a three-level join per row, and autocomplete
+never touches the database:
+
+- ``lookup(kode)`` / ``desa_address(id)``: O(1) dict lookups.
+- ``search(q)``: prefix match on every word of ``nama`` via bisect over a
+  sorted key list, topped up with a trigram match for typos and infixes.
+
+The index is stamped with the ``area`` version of ``master_cache``; any
+save/delete of an area row (or a bulk import calling
+``master_cache.invalidate("area")``) makes every worker rebuild it on its
+next use.
+"""
+import logging
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from apps.core.services import master_cache
+
+from ..models import Desa, KabupatenKota, Kecamatan, Provinsi
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("provinsi", "kabupaten_kota", "kecamatan", "desa")
+FIELDS = ("id", "kode", "level", "nama", "alamat")
+
+TRIGRAM_MIN_SCORE = 0.5
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def trigrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Level:
+    """Column arrays of one level, ordered by id."""
+
+    def __init__(self):
+        self.ids = array("q")
+        self.parents = array("l")
+        self.kode: List[str] = []
+        self.nama: List[str] = []
+        self.labels: List[str] = []
+        self.by_id: Dict[int, int] = {}
+        self.keys: List[str] = []
+        self.key_positions = array("l")
+        self.trigrams: Dict[str, array] = {}
+
+    def append(self, pk: int, parent: int, kode: str, nama: str, label: str):
+        self.by_id[pk] = len(self.ids)
+        self.ids.append(pk)
+        self.parents.append(parent)
+        self.kode.append(kode)
+        self.nama.append(nama)
+        self.labels.append(label)
+
+    def build_search(self) -> None:
+        pairs: List[Tuple[str, int]] = []
+        postings: Dict[str, array] = {}
+        for position, nama in enumerate(self.nama):
+            text = normalize(nama)
+            pairs.append((text, position))
+            # Every word start is a key, so "raya" finds "Sungai Raya".
+            for match in re.finditer(r" ", text):
+                pairs.append((text[match.end():], position))
+            for gram in trigrams(text):
+                postings.setdefault(gram, array("l")).append(position)
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.key_positions = array("l", (position for _, position in pairs))
+        self.trigrams = postings
+
+
+class AreaIndex:
+    def __init__(self, version: int):
+        self.version = version
+        self.levels = tuple(_Level() for _ in LEVELS)
+        self.by_kode: Dict[str, Tuple[int, int]] = {}
+
+    @classmethod
+    def build(cls, version: int) -> "AreaIndex":
+        index = cls(version)
+        provinsi, kabupaten, kecamatan, desa = index.levels
+        jenis_kabupaten = dict(KabupatenKota.JENIS_CHOICES)
+        jenis_desa = dict(Desa.JENIS_CHOICES)
+
+        for pk, kode, nama in Provinsi.objects.order_by("id").values_list("id", "kode", "nama"):
+            provinsi.append(pk, -1, kode, nama, nama)
+        # A child written between two of these queries may point at a parent
+        # that was not read; it is skipped and picked up by the rebuild its
+        # save triggers.
+        rows = KabupatenKota.objects.order_by("id").values_list("id", "provinsi_id", "kode", "nama", "jenis")
+        for pk, parent_id, kode, nama, jenis in rows:
+            if parent_id in provinsi.by_id:
+                kabupaten.append(
+                    pk, provinsi.by_id[parent_id], kode, nama, f"{jenis_kabupaten.get(jenis, jenis)} {nama}"
+                )
+        rows = Kecamatan.objects.order_by("id").values_list("id", "kabupaten_kota_id", "kode", "nama")
+        for pk, parent_id, kode, nama in rows:
+            if parent_id in kabupaten.by_id:
+                kecamatan.append(pk, kabupaten.by_id[parent_id], kode, nama, f"Kec. {nama}")
+        rows = (
+            Desa.objects.order_by("id")
+            .values_list("id", "kecamatan_id", "kode", "nama", "jenis")
+            .iterator(chunk_size=5000)
+        )
+        for pk, parent_id, kode, nama, jenis in rows:
+            if parent_id in kecamatan.by_id:
+                desa.append(pk, kecamatan.by_id[parent_id], kode, nama, f"{jenis_desa.get(jenis, jenis)} {nama}")
+
+        for level_no, level in enumerate(index.levels):
+            level.build_search()
+            for position, kode in enumerate(level.kode):
+                index.by_kode[kode] = (level_no, position)
+        logger.info(
+            "Built area index: %s", ", ".join(f"{len(lvl.ids)} {name}" for name, lvl in zip(LEVELS, index.levels))
+        )
+        return index
+
+    def address(self, level_no: int, position: int) -> str:
+        parts = []
+        while position >= 0:
+            level = self.levels[level_no]
+            parts.append(level.labels[position])
+            position = level.parents[position]
+            level_no -= 1
+        return ", ".join(parts)
+
+    def row(self, level_no: int, position: int) -> list:
+        level = self.levels[level_no]
+        return [
+            level.ids[position], level.kode[position], LEVELS[level_no], level.nama[position],
+            self.address(level_no, position),
+        ]
+
+    def lookup(self, kode: str) -> Optional[list]:
+        found = self.by_kode.get(kode)
+        return self.row(*found) if found else None
+
+    def desa_address(self, desa_id: int) -> Optional[str]:
+        position = self.levels[3].by_id.get(desa_id)
+        return None if position is None else self.address(3, position)
+
+    def _prefix_matches(self, level: _Level, query: str):
+        start = bisect_left(level.keys, query)
+        for index in range(start, len(level.keys)):
+            if not level.keys[index].startswith(query):
+                break
+            yield level.key_positions[index]
+
+    def _trigram_matches(self, level: _Level, query: str):
+        wanted = trigrams(query)
+        counts: Counter = Counter()
+        for gram in wanted:
+            counts.update(level.trigrams.get(gram, ()))
+        needed = TRIGRAM_MIN_SCORE * len(wanted)
+        for position, shared in counts.most_common():
+            if shared < needed:
+                break
+            yield position
+
+    def search(self, query: str, level: Optional[str] = None, within: str = "", limit: int = 20) -> List[list]:
+        """Rows whose ``nama`` matches ``query``, coarser levels first.
+
+        ``within`` restricts results to the subtree of an area ``kode``
+        (area codes are hierarchical prefixes).
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        level_numbers = [LEVELS.index(level)] if level else range(len(LEVELS))
+        results: List[list] = []
+        seen = set()
+        matchers = [self._prefix_matches]
+        if len(query) >= 3:
+            matchers.append(self._trigram_matches)
+        for matcher in matchers:
+            for level_no in level_numbers:
+                entries = self.levels[level_no]
+                for position in matcher(entries, query):
+                    if (level_no, position) in seen or not entries.kode[position].startswith(within):
+                        continue
+                    seen.add((level_no, position))
+                    results.append(self.row(level_no, position))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+
+_lock = threading.Lock()
+_index: Optional[AreaIndex] = None
+
+
+def get_index() -> AreaIndex:
+    """The current area index, rebuilt when the ``area`` cache version moved."""
+    global _index
+    current = master_cache.version("area")
+    index = _index
+    if index is not None and index.version == current:
+        return index
+    with _lock:
+        if _index is None or _index.version != current:
+            _index = AreaIndex.build(current)
+        return _index
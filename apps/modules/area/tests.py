@@ -1,3 +1,132 @@
-from django.test import TestCase
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from api.mitra_borongan.serializers import EmployeeAvailabilitySerializer
+from apps.core.models import Employee
+from apps.core.services import master_cache
+
+from .models import Desa, KabupatenKota, Kecamatan, Provinsi
+from .services import area_index
+from .services.area_import import import_area
+
+
+@override_settings(APP_SECRET_KEY='test-key')
+class ProvinsiListCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.jambi = Provinsi.objects.create(kode='15', nama='Jambi')
+        Provinsi.objects.create(kode='14', nama='Riau')
+
+    def get(self, params=None):
+        return self.client.get('/area/provinsi/', params or {}, HTTP_X_APP_KEY='test-key')
+
+    def test_list_is_cached_until_a_provinsi_changes(self):
+        self.assertEqual([row['nama'] for row in self.get().json()], ['Jambi', 'Riau'])
+        with self.assertNumQueries(0):
+            self.assertEqual([row['nama'] for row in self.get().json()], ['Jambi', 'Riau'])
+
+        self.jambi.nama = 'Kalimantan Barat'
+        self.jambi.save()
+        self.assertEqual([row['nama'] for row in self.get().json()], ['Kalimantan Barat', 'Riau'])
+
+    def test_query_string_gets_its_own_entry(self):
+        self.get()
+        response = self.get({'fields': 'nama'})
+        self.assertEqual(response.json(), [{'nama': 'Jambi'}, {'nama': 'Riau'}])
+
+    def test_unknown_params_share_the_entry(self):
+        self.get({'fields': 'nama,id'})
+        with self.assertNumQueries(0):
+            self.get({'fields': 'id,nama', 'utm_source': 'wa'})
+
+    def test_version_survives_culling_the_value_cache(self):
+        version = master_cache.version('area')
+        cache.clear()
+        self.assertEqual(master_cache.version('area'), version)
+
+
+@override_settings(APP_SECRET_KEY='test-key')
+class AreaIndexTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        kalbar = Provinsi.objects.create(kode='61', nama='Kalimantan Barat')
+        kubu_raya = KabupatenKota.objects.create(provinsi=kalbar, kode='6112', nama='Kubu Raya')
+        sungai_raya = Kecamatan.objects.create(kabupaten_kota=kubu_raya, kode='611201', nama='Sungai Raya')
+        self.desa = Desa.objects.create(kecamatan=sungai_raya, kode='6112012001', nama='Kapur', kode_pos='78391')
+
+    def test_lookup_matches_model_address(self):
+        row = area_index.get_index().lookup('6112012001')
+        self.assertEqual(row[:4], [self.desa.id, '6112012001', 'desa', 'Kapur'])
+        self.assertEqual(row[4], self.desa.alamat_lengkap)
+        self.assertEqual(area_index.get_index().desa_address(self.desa.id), self.desa.alamat_lengkap)
+
+    def test_search_by_word_prefix_and_typo(self):
+        index = area_index.get_index()
+        self.assertEqual([row[1] for row in index.search('raya')], ['6112', '611201'])
+        self.assertEqual([row[1] for row in index.search('raya', level='kecamatan')], ['611201'])
+        self.assertEqual([row[1] for row in index.search('kalimantn')], ['61'])
+
+    def test_index_rebuilds_after_change(self):
+        version = area_index.get_index().version
+        Desa.objects.create(kecamatan=self.desa.kecamatan, kode='6112012002', nama='Kuala Dua')
+        self.assertNotEqual(area_index.get_index().version, version)
+        self.assertEqual([row[3] for row in area_index.get_index().search('kuala')], ['Kuala Dua'])
+
+    def test_employee_areas_resolve_the_index_once(self):
+        for name in ('Budi', 'Sari', 'Joko'):
+            Employee.objects.create(name=name, email=f'{name.lower()}@example.com', desa=self.desa)
+        with mock.patch.object(area_index, 'get_index', wraps=area_index.get_index) as get_index:
+            data = EmployeeAvailabilitySerializer(Employee.objects.select_related('desa'), many=True).data
+        self.assertEqual(get_index.call_count, 1)
+        self.assertEqual({row['area']['alamat_lengkap'] for row in data}, {self.desa.alamat_lengkap})
+
+    def test_autocomplete_endpoint(self):
+        response = self.client.get('/area/autocomplete/', {'q': 'kap', 'within': '6112'}, HTTP_X_APP_KEY='test-key')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age=86400', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(response.json()['rows'][0][1], '6112012001')
+        self.assertEqual(
+            self.client.get('/area/autocomplete/', {'q': 'k'}, HTTP_X_APP_KEY='test-key').status_code, 400
+        )
+
+
+class ImportAreaCommandTest(TestCase):
+    HEADER = 'Kode Provinsi,Provinsi,kode kabupaten,Kabupaten,kode kecamatan,Kecamatan,kode desa,Desa\n'
+
+    def setUp(self):
+        Provinsi.objects.create(kode='61', nama='Kalimantan Barat')
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+        handle.write(self.HEADER)
+        handle.write('61,KALIMANTAN BARAT,6101,SAMBAS,6101010,SELAKAU,6101010001,SEMELAGI BESAR\n')
+        handle.write('61,KALIMANTAN BARAT,6101,SAMBAS,6101010,SELAKAU,6101010002,SUNGAI DAUN\n')
+        handle.write('61,KALIMANTAN BARAT,6101,SAMBAS,6101010,SELAKAU,,SUNGAI RUSA\n')
+        handle.write('99,ENTAH,9901,X,9901010,Y,9901010001,Z\n')
+        handle.close()
+        self.path = handle.name
+        self.addCleanup(os.remove, self.path)
+
+    def test_import_creates_hierarchy_and_is_idempotent(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = import_area(self.path)
+        self.assertEqual((result.rows, result.skipped, result.desa_created), (4, 1, 3))
+        self.assertEqual((result.kabupaten_created, result.kecamatan_created), (1, 1))
+        self.assertEqual(Desa.objects.get(nama='SUNGAI RUSA').kode, '6101010003')
+        self.assertEqual(Kecamatan.objects.get().kode, '610101')
+
+        again = import_area(self.path)
+        self.assertEqual((again.desa_created, again.desa_updated, again.kabupaten_created), (0, 0, 0))
+        self.assertEqual(Desa.objects.count(), 3)
+
+    def test_dry_run_writes_nothing(self):
+        out = StringIO()
+        call_command('import_area', self.path, '--dry-run', stdout=out)
+        self.assertIn('3 desa baru', out.getvalue())
+        self.assertFalse(KabupatenKota.objects.exists())
+        self.assertFalse(Desa.objects.exists())
@@ -9,4 +9,6 @@ urlpatterns = [
     path("kabupaten-kota/", views.KabupatenKotaListView.as_view(), name="kabupaten-kota-list"),
     path("kecamatan/", views.KecamatanListView.as_view(), name="kecamatan-list"),
     path("desa/", views.DesaListView.as_view(), name="desa-list"),
+    path("autocomplete/", views.AreaAutocompleteView.as_view(), name="autocomplete"),
+    path("lookup/", views.AreaLookupView.as_view(), name="lookup"),
 ]
@@ -1,6 +1,13 @@
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import conditional_page
 from rest_framework.generics import ListAPIView
 from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from api.listing import CachedListMixin, KeysetListMixin
 from api.permission import HasValidAppKey
 from apps.modules.area.models import Provinsi, KabupatenKota, Kecamatan, Desa
 from apps.modules.area.serializers import (
@@ -9,20 +16,30 @@ from apps.modules.area.serializers import (
     KecamatanSerializer,
     DesaSerializer,
 )
+from apps.modules.area.services import area_index
 
+DEFAULT_INDEX_MAX_AGE = 24 * 60 * 60
+AUTOCOMPLETE_MAX_LIMIT = 50
+LOOKUP_MAX_CODES = 100
 
-class ProvinsiListView(ListAPIView):
+
+class ProvinsiListView(CachedListMixin, KeysetListMixin, ListAPIView):
     """Daftar provinsi untuk kebutuhan master data frontend."""
 
     permission_classes = [HasValidAppKey]
+    cache_namespace = "area"
+    cursor_ordering = ("nama", "id")
     serializer_class = ProvinsiSerializer
     queryset = Provinsi.objects.all().order_by("nama")
 
 
-class KabupatenKotaListView(ListAPIView):
+class KabupatenKotaListView(CachedListMixin, KeysetListMixin, ListAPIView):
     """Daftar kabupaten/kota, bisa difilter berdasarkan provinsi."""
 
     permission_classes = [HasValidAppKey]
+    cache_namespace = "area"
+    cache_query_params = ("provinsi_id",)
+    cursor_ordering = ("nama", "id")
     serializer_class = KabupatenKotaSerializer
 
     def get_queryset(self):
@@ -41,10 +58,13 @@ class KabupatenKotaListView(ListAPIView):
         return queryset
 
 
-class KecamatanListView(ListAPIView):
+class KecamatanListView(CachedListMixin, KeysetListMixin, ListAPIView):
     """Daftar kecamatan, bisa difilter berdasarkan kabupaten/kota."""
 
     permission_classes = [HasValidAppKey]
+    cache_namespace = "area"
+    cache_query_params = ("kabupaten_kota_id",)
+    cursor_ordering = ("nama", "id")
     serializer_class = KecamatanSerializer
 
     def get_queryset(self):
@@ -63,10 +83,13 @@ class KecamatanListView(ListAPIView):
         return queryset
 
 
-class DesaListView(ListAPIView):
+class DesaListView(CachedListMixin, KeysetListMixin, ListAPIView):
     """Daftar desa/kelurahan, bisa difilter berdasarkan kecamatan."""
 
     permission_classes = [HasValidAppKey]
+    cache_namespace = "area"
+    cache_query_params = ("kecamatan_id",)
+    cursor_ordering = ("nama", "id")
     serializer_class = DesaSerializer
 
     def get_queryset(self):
@@ -87,3 +110,63 @@ class DesaListView(ListAPIView):
                 raise ValidationError({"kecamatan_id": "Harus berupa angka."})
             queryset = queryset.filter(kecamatan_id=kecamatan_id_int)
         return queryset
+
+
+def _index_response(index, rows, **extra):
+    """Compact ``fields`` + ``rows`` payload, cacheable by the app itself.
+
+    ``private``: the endpoints require the app key, so shared proxies must
+    not serve the response to requests that never presented one.
+    """
+    response = Response({"version": index.version, "fields": area_index.FIELDS, "rows": rows, **extra})
+    patch_cache_control(
+        response, private=True, max_age=getattr(settings, "AREA_INDEX_MAX_AGE", DEFAULT_INDEX_MAX_AGE)
+    )
+    return response
+
+
+@method_decorator(conditional_page, name="dispatch")
+class AreaAutocompleteView(APIView):
+    """Autocomplete nama wilayah (semua level) dari indeks area di memori."""
+
+    permission_classes = [HasValidAppKey]
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if len(query) < 2:
+            raise ValidationError({"q": "Minimal 2 karakter."})
+        level = request.query_params.get("level") or None
+        if level and level not in area_index.LEVELS:
+            raise ValidationError({"level": f"Harus salah satu dari: {', '.join(area_index.LEVELS)}."})
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 20)), AUTOCOMPLETE_MAX_LIMIT))
+        except (TypeError, ValueError):
+            raise ValidationError({"limit": "Harus berupa angka."})
+
+        index = area_index.get_index()
+        rows = index.search(query, level=level, within=request.query_params.get("within", ""), limit=limit)
+        return _index_response(index, rows)
+
+
+@method_decorator(conditional_page, name="dispatch")
+class AreaLookupView(APIView):
+    """Alamat lengkap untuk satu atau beberapa kode wilayah (``?kode=61,6101``)."""
+
+    permission_classes = [HasValidAppKey]
+
+    def get(self, request):
+        codes = [code.strip() for code in request.query_params.get("kode", "").split(",") if code.strip()]
+        if not codes:
+            raise ValidationError({"kode": "Wajib diisi."})
+        if len(codes) > LOOKUP_MAX_CODES:
+            raise ValidationError({"kode": f"Maksimal {LOOKUP_MAX_CODES} kode per permintaan."})
+
+        index = area_index.get_index()
+        rows, missing = [], []
+        for code in codes:
+            row = index.lookup(code)
+            if row is None:
+                missing.append(code)
+            else:
+                rows.append(row)
+        return _index_response(index, rows, missing=missing)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Payroll, PayrollPeriod, Allowance, Deduction, WorkRequest
+from .models import Payroll, PayrollPeriod, PayrollRun, Allowance, Deduction, WorkRequest
 from api.user_flutter.models import FlutterUser
 
 @admin.register(PayrollPeriod)
@@ -10,6 +10,12 @@ class PayrollPeriodAdmin(admin.ModelAdmin):
 class PayrollAdmin(admin.ModelAdmin):
     list_display = ('employee', 'period', 'net_salary')
 
+@admin.register(PayrollRun)
+class PayrollRunAdmin(admin.ModelAdmin):
+    list_display = ('id', 'period', 'status', 'processed_employees', 'total_employees', 'worker', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'heartbeat_at')
+
 @admin.register(Allowance)
 class AllowanceAdmin(admin.ModelAdmin):
     list_display = ('employee', 'name', 'amount')
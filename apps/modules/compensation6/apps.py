@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class Compensation6Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.modules.compensation6'
+
+    def ready(self):
+        from . import signals
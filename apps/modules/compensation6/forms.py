@@ -2,6 +2,7 @@ from django import forms
 import calendar
 from .models import PayrollPeriod, Allowance, Deduction, BPJSConfig, Attendance, LeaveRequest, WorkRequest
 from apps.core.models import Employee, Borongan
+from apps.core.services.user_roles import get_role_context
 
 class PayrollPeriodForm(forms.ModelForm):
     class Meta:
@@ -175,113 +176,30 @@ class PayslipSelectionForm(forms.Form):
     def __init__(self, *args, user=None, **kwargs):
         super().__init__(*args, **kwargs)
         
-        print(f"\n=== PAYSLIP FORM DEBUG ===")
-        print(f"User: {user}")
-        
         # Filter employees based on user role
         if user:
             person = getattr(user, 'person', None)
-            is_owner_attr = getattr(user, 'is_owner', False)
-            is_owner = is_owner_attr() if callable(is_owner_attr) else is_owner_attr
-            
-            print(f"Person: {person}")
-            print(f"Is Owner: {is_owner}")
-            print(f"Is Owner Callable: {callable(is_owner_attr)}")
+            role = get_role_context(user)
             
-            if is_owner:
-                print("Branch: OWNER")
+            if role.is_owner:
                 # Owner sees all employees in their company
                 self.fields['employee'].queryset = Employee.objects.filter(
                     company=user.company, 
                     is_active=True
                 ).order_by('name')
             elif person:
-                print("Branch: HAS PERSON")
-                # Check if person is an employee (supervisor or regular employee)
-                has_employee = hasattr(person, 'employee')
-                print(f"Has employee attribute: {has_employee}")
-                
-                if has_employee:
-                    print("Sub-branch: PERSON IS EMPLOYEE")
-                    # Person is an employee - can be supervisor or regular employee
-                    employee = person.employee
-                    
-                    # Get all subordinates recursively
-                    def get_descendants(emp):
-                        descendants = set()
-                        direct_subs = emp.subordinates.all()
-                        print(f"Direct subordinates of {emp.name}: {list(direct_subs)}")
-                        for sub in direct_subs:
-                            descendants.add(sub.id)
-                            descendants.update(get_descendants(sub))
-                        return descendants
-                    
-                    subordinate_ids = get_descendants(employee)
-                    # Include self for supervisor and regular employee
-                    allowed_ids = subordinate_ids | {employee.id}
-                    
-                    print(f"Allowed employee IDs: {allowed_ids}")
-                    
-                    self.fields['employee'].queryset = Employee.objects.filter(
-                        id__in=allowed_ids,
-                        is_active=True
-                    ).order_by('name')
-                else:
-                    print("Sub-branch: PERSON WITHOUT EMPLOYEE RECORD")
-                    # Person without employee record - supervisor yang hanya Person
-                    # Include self if exists as Employee
-                    allowed_ids = set()
-                    
-                    # Check if person exists as employee (by same ID)
-                    try:
-                        self_employee = Employee.objects.get(id=person.id)
-                        allowed_ids.add(self_employee.id)
-                        print(f"Found self as employee: {self_employee.id} - {self_employee.name}")
-                    except Employee.DoesNotExist:
-                        print("Self not found as employee")
-                    
-                    # Get all person subordinates and check if they're employees
-                    person_subordinates = person.subordinates.all()
-                    print(f"Person subordinates: {list(person_subordinates)}")
-                    
-                    for subordinate in person_subordinates:
-                        print(f"  Checking subordinate: {subordinate}")
-                        # Check if this person is also an employee
-                        if hasattr(subordinate, 'employee'):
-                            allowed_ids.add(subordinate.employee.id)
-                            print(f"    Found as employee via attribute: {subordinate.employee.id}")
-                        else:
-                            # Person subordinate might have the same ID as Employee
-                            try:
-                                emp = Employee.objects.get(id=subordinate.id)
-                                allowed_ids.add(emp.id)
-                                print(f"    Found as employee by ID: {emp.id} - {emp.name}")
-                            except Employee.DoesNotExist:
-                                print(f"    Not found as employee")
-                    
-                    print(f"Final allowed employee IDs: {allowed_ids}")
-                    
-                    if allowed_ids:
-                        self.fields['employee'].queryset = Employee.objects.filter(
-                            id__in=allowed_ids,
-                            is_active=True
-                        ).order_by('name')
-                        print(f"Queryset count: {self.fields['employee'].queryset.count()}")
-                    else:
-                        self.fields['employee'].queryset = Employee.objects.none()
-                        print("No allowed IDs - empty queryset")
+                # Supervisor or regular employee: self plus everyone below them
+                self.fields['employee'].queryset = Employee.objects.filter(
+                    id__in=role.visible_employee_ids,
+                    is_active=True
+                ).order_by('name')
             else:
-                print("Branch: NO PERSON - FALLBACK")
                 # No person record - no access
                 self.fields['employee'].queryset = Employee.objects.none()
         else:
-            print("No user provided to form")
             # No user - no access
             self.fields['employee'].queryset = Employee.objects.none()
         
-        print(f"Final employee queryset: {list(self.fields['employee'].queryset.values_list('id', 'name'))}")
-        print(f"===========================\n")
-        
         closed_periods = PayrollPeriod.objects.filter(is_closed=True).order_by('-year', '-month')
 
         month_choices = []
@@ -364,110 +282,25 @@ class AttendanceForm(forms.ModelForm):
             label='Pekerjaan Borongan'
         )
         
-        print(f"\n=== ATTENDANCE FORM DEBUG ===")
-        print(f"User: {user}")
-        
         if user:
             person = getattr(user, 'person', None)
-            is_owner_attr = getattr(user, 'is_owner', False)
-            # is_owner might be a method, so call it if callable
-            is_owner = is_owner_attr() if callable(is_owner_attr) else is_owner_attr
+            role = get_role_context(user)
             
-            print(f"Person: {person}")
-            print(f"Is Owner: {is_owner}")
-            print(f"Is Owner Callable: {callable(is_owner_attr)}")
-            
-            if is_owner:
-                print("Branch: OWNER")
+            if role.is_owner:
                 # Owner sees all active employees in their company
                 self.fields['employee'].queryset = Employee.objects.filter(
                     company=user.company, 
                     is_active=True
                 ).order_by('name')
             elif person:
-                print("Branch: HAS PERSON")
-                # Check if person is an employee
-                has_employee = hasattr(person, 'employee')
-                print(f"Has employee attribute: {has_employee}")
-                
-                if has_employee:
-                    print("Sub-branch: PERSON IS EMPLOYEE")
-                    # Regular employee or Supervisor (with Employee record)
-                    employee = person.employee
-                    
-                    # Get all subordinates recursively
-                    def get_descendants(emp):
-                        descendants = set()
-                        direct_subs = emp.subordinates.all()
-                        for sub in direct_subs:
-                            descendants.add(sub.id)
-                            descendants.update(get_descendants(sub))
-                        return descendants
-                    
-                    subordinate_ids = get_descendants(employee)
-                    # Include self
-                    allowed_ids = subordinate_ids | {employee.id}
-                    
-                    print(f"Allowed employee IDs: {allowed_ids}")
-                    
-                    self.fields['employee'].queryset = Employee.objects.filter(
-                        id__in=allowed_ids,
-                        is_active=True
-                    ).order_by('name')
-                else:
-                    print("Sub-branch: PERSON WITHOUT EMPLOYEE RECORD")
-                    # Person without Employee record (e.g., supervisor that's just a Person)
-                    # Get their person subordinates
-                    allowed_ids = set()
-                    
-                    # Include themselves if they exist as an Employee
-                    try:
-                        self_employee = Employee.objects.get(id=person.id)
-                        allowed_ids.add(self_employee.id)
-                        print(f"Found self as employee: {self_employee.id}")
-                    except Employee.DoesNotExist:
-                        print("Self not found as employee")
-                    
-                    # Get all person subordinates and check if they're employees
-                    person_subordinates = person.subordinates.all()
-                    print(f"Person subordinates: {list(person_subordinates)}")
-                    
-                    for subordinate in person_subordinates:
-                        print(f"  Checking subordinate: {subordinate}")
-                        # Check if this person is also an employee
-                        if hasattr(subordinate, 'employee'):
-                            allowed_ids.add(subordinate.employee.id)
-                            print(f"    Found as employee via attribute: {subordinate.employee.id}")
-                        else:
-                            # Person subordinate might have the same ID as Employee
-                            try:
-                                emp = Employee.objects.get(id=subordinate.id)
-                                allowed_ids.add(emp.id)
-                                print(f"    Found as employee by ID: {emp.id}")
-                            except Employee.DoesNotExist:
-                                print(f"    Not found as employee")
-                    
-                    print(f"Final allowed employee IDs: {allowed_ids}")
-                    
-                    if allowed_ids:
-                        self.fields['employee'].queryset = Employee.objects.filter(
-                            id__in=allowed_ids,
-                            is_active=True
-                        ).order_by('name')
-                        print(f"Queryset count: {self.fields['employee'].queryset.count()}")
-                    else:
-                        self.fields['employee'].queryset = Employee.objects.none()
-                        print("No allowed IDs - empty queryset")
+                # Supervisor or regular employee: self plus everyone below them
+                self.fields['employee'].queryset = Employee.objects.filter(
+                    id__in=role.visible_employee_ids,
+                    is_active=True
+                ).order_by('name')
             else:
-                print("Branch: NO PERSON - FALLBACK")
                 # Fallback for users without person record
                 self.fields['employee'].queryset = Employee.objects.none()
-        else:
-            print("No user provided to form")
-            
-        print(f"Final employee queryset: {list(self.fields['employee'].queryset.values_list('id', 'name'))}")
-        
-        print(f"===========================\n")
 
     def clean_borongan(self):
         """Custom validation for borongan field to handle dynamically loaded options"""
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.modules.compensation6.models import PayrollPeriod
+from apps.modules.compensation6.services.payslip_export import EXPORT_FORMATS, export_period
+
+
+class Command(BaseCommand):
+    help = "Export every payslip of a PayrollPeriod as a ZIP of PDFs or one merged PDF"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period-id", type=int, required=True, help="ID of the PayrollPeriod to export")
+        parser.add_argument("--output", required=True, help="Destination file path")
+        parser.add_argument(
+            "--format",
+            choices=EXPORT_FORMATS,
+            default="zip",
+            help="zip: one PDF per employee (default); pdf: one merged PDF",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Rendering processes (default: PAYSLIP_EXPORT_WORKERS or the number of CPUs)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            period = PayrollPeriod.objects.get(pk=options["period_id"])
+        except PayrollPeriod.DoesNotExist:
+            raise CommandError(f"PayrollPeriod with ID {options['period_id']} does not exist")
+
+        with open(options["output"], "wb") as target:
+            export_period(period, target, fmt=options["format"], workers=options["workers"])
+        self.stdout.write(self.style.SUCCESS(f"Slip gaji periode {period} disimpan ke {options['output']}"))
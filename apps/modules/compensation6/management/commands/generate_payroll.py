@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.modules.compensation6.models import PayrollPeriod
+from apps.modules.compensation6.services.payroll_engine import run_payroll
+
+
+class Command(BaseCommand):
+    help = "Generate payroll for a PayrollPeriod using the set-based payroll engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--period-id",
+            type=int,
+            help="ID of the PayrollPeriod to generate",
+        )
+        parser.add_argument("--month", type=int, help="Month of the period (1-12), used with --year")
+        parser.add_argument("--year", type=int, help="Year of the period, used with --month")
+        parser.add_argument(
+            "--employee-id",
+            type=int,
+            action="append",
+            dest="employee_ids",
+            help="Restrict the run to this employee (can be repeated)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows per bulk INSERT/UPDATE statement (default: 500)",
+        )
+
+    def get_period(self, options):
+        if options["period_id"] is not None:
+            try:
+                return PayrollPeriod.objects.get(pk=options["period_id"])
+            except PayrollPeriod.DoesNotExist:
+                raise CommandError(f"PayrollPeriod with ID {options['period_id']} does not exist")
+
+        if options["month"] is None or options["year"] is None:
+            raise CommandError("Provide --period-id or both --month and --year")
+        try:
+            return PayrollPeriod.objects.get(month=options["month"], year=options["year"])
+        except PayrollPeriod.DoesNotExist:
+            raise CommandError(f"PayrollPeriod {options['month']:02d}/{options['year']} does not exist")
+
+    def handle(self, *args, **options):
+        period = self.get_period(options)
+        if period.is_closed:
+            raise CommandError(f"Periode {period} sudah ditutup")
+
+        plan = run_payroll(period, employee_ids=options["employee_ids"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Payroll periode {period}: {plan.payroll_count} slip, "
+            f"{len(plan.allowances_to_create)} tunjangan baru, "
+            f"{len(plan.deductions_to_create)} potongan baru"
+        ))
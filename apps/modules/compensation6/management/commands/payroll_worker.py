@@ -0,0 +1,64 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.modules.compensation6.services.payroll_jobs import (
+    DEFAULT_STALE_AFTER,
+    claim_next_run,
+    default_worker_name,
+    process_run,
+)
+
+
+class Command(BaseCommand):
+    help = "Process queued PayrollRun jobs (generate payroll in the background)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process every runnable job and exit instead of polling forever",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when the queue is empty (default: 5)",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=int(DEFAULT_STALE_AFTER.total_seconds()),
+            help="Seconds without heartbeat before a running job is resumed by another worker (default: 300)",
+        )
+        parser.add_argument(
+            "--worker-name",
+            default=default_worker_name(),
+            help="Name recorded on claimed jobs (default: hostname:pid)",
+        )
+
+    def handle(self, *args, **options):
+        worker = options["worker_name"]
+        stale_after = timedelta(seconds=options["stale_after"])
+        self.stdout.write(f"Payroll worker {worker} started")
+
+        try:
+            while True:
+                run = claim_next_run(worker, stale_after=stale_after)
+                if run is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                self.stdout.write(f"Processing {run}")
+                process_run(run)
+                run.refresh_from_db()
+                style = self.style.SUCCESS if run.status == run.Status.COMPLETED else self.style.ERROR
+                self.stdout.write(style(
+                    f"{run}: {run.processed_employees}/{run.total_employees} karyawan"
+                    + (f" - {run.error}" if run.error else "")
+                ))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Payroll worker stopped"))
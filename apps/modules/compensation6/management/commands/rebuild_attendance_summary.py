@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.modules.compensation6.models import PayrollPeriod
+from apps.modules.compensation6.services.attendance_summary import rebuild_period_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild AttendancePeriodSummary rows from Attendance"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--period-id",
+            type=int,
+            action="append",
+            dest="period_ids",
+            help="Only rebuild this PayrollPeriod (can be repeated; default: all periods)",
+        )
+
+    def handle(self, *args, **options):
+        periods = PayrollPeriod.objects.order_by("year", "month")
+        if options["period_ids"]:
+            periods = periods.filter(id__in=options["period_ids"])
+            if not periods.exists():
+                raise CommandError("No matching PayrollPeriod found")
+
+        for period in periods:
+            count = rebuild_period_summaries(period)
+            self.stdout.write(f"Periode {period}: {count} ringkasan absensi")
+        self.stdout.write(self.style.SUCCESS("Ringkasan absensi selesai dibangun ulang"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.modules.compensation6.services.availability import rebuild_request_days
+
+
+class Command(BaseCommand):
+    help = "Rebuild the WorkRequestDay availability index from WorkRequest"
+
+    def handle(self, *args, **options):
+        count = rebuild_request_days()
+        self.stdout.write(self.style.SUCCESS(f"Indeks ketersediaan dibangun ulang: {count} hari kerja"))
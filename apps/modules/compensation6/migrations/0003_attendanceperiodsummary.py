@@ -0,0 +1,92 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:35
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of services.attendance_summary as of this migration, so later
+# changes to the service do not change what this backfill does.
+STANDARD_DAY_MINUTES = 8 * 60
+STATUS_FIELDS = {
+    'present': 'present_days',
+    'late': 'late_days',
+    'absent': 'absent_days',
+    'half_day': 'half_days',
+}
+ROW_FIELDS = ('employee_id', 'status', 'clock_in', 'clock_out', 'borongan_id', 'realisasi', 'borongan__harga_borongan')
+
+
+def _empty_totals():
+    return {
+        'present_days': 0,
+        'late_days': 0,
+        'absent_days': 0,
+        'half_days': 0,
+        'overtime_minutes': 0,
+        'borongan_realisasi': Decimal('0'),
+        'hasil_akhir': Decimal('0'),
+    }
+
+
+def _accumulate(totals, row):
+    status_field = STATUS_FIELDS.get(row['status'])
+    if status_field:
+        totals[status_field] += 1
+    if row['clock_in'] and row['clock_out']:
+        worked = (row['clock_out'].hour * 60 + row['clock_out'].minute) - (row['clock_in'].hour * 60 + row['clock_in'].minute)
+        totals['overtime_minutes'] += max(0, worked - STANDARD_DAY_MINUTES)
+    if row['borongan_id'] and row['realisasi']:
+        realisasi = Decimal(row['realisasi'])
+        totals['borongan_realisasi'] += realisasi
+        totals['hasil_akhir'] += realisasi * Decimal(row['borongan__harga_borongan'] or 0)
+
+
+def build_existing_summaries(apps, schema_editor):
+    # Summaries of existing attendance; afterwards signals keep them current.
+    PayrollPeriod = apps.get_model('compensation6', 'PayrollPeriod')
+    Attendance = apps.get_model('compensation6', 'Attendance')
+    AttendancePeriodSummary = apps.get_model('compensation6', 'AttendancePeriodSummary')
+
+    for period in PayrollPeriod.objects.all():
+        totals_by_employee = defaultdict(_empty_totals)
+        rows = Attendance.objects.filter(date__year=period.year, date__month=period.month).values(*ROW_FIELDS)
+        for row in rows:
+            _accumulate(totals_by_employee[row['employee_id']], row)
+        AttendancePeriodSummary.objects.bulk_create([
+            AttendancePeriodSummary(employee_id=employee_id, period=period, **totals)
+            for employee_id, totals in totals_by_employee.items()
+        ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compensation6', '0002_payrollrun'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendancePeriodSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present_days', models.PositiveSmallIntegerField(default=0)),
+                ('late_days', models.PositiveSmallIntegerField(default=0)),
+                ('absent_days', models.PositiveSmallIntegerField(default=0)),
+                ('half_days', models.PositiveSmallIntegerField(default=0)),
+                ('overtime_minutes', models.PositiveIntegerField(default=0, help_text='Total menit kerja di atas 8 jam per hari')),
+                ('borongan_realisasi', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('hasil_akhir', models.DecimalField(decimal_places=2, default=0, help_text='Total realisasi × harga borongan', max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='core.employee')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='compensation6.payrollperiod')),
+            ],
+            options={
+                'unique_together': {('employee', 'period')},
+            },
+        ),
+        migrations.RunPython(build_existing_summaries, migrations.RunPython.noop),
+    ]
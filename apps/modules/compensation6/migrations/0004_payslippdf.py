@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compensation6', '0003_attendanceperiodsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayslipPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64)),
+                ('pdf', models.FileField(upload_to='payslip_pdf/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('payroll', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pdf_cache', to='compensation6.payroll')),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:50
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_days(apps, schema_editor):
+    WorkRequest = apps.get_model('compensation6', 'WorkRequest')
+    WorkRequestDay = apps.get_model('compensation6', 'WorkRequestDay')
+    batch = []
+    for work_request in WorkRequest.objects.exclude(start_date=None).exclude(end_date=None).iterator():
+        for offset in range((work_request.end_date - work_request.start_date).days + 1):
+            batch.append(WorkRequestDay(
+                work_request_id=work_request.pk,
+                employee_id=work_request.employee_id,
+                date=work_request.start_date + timedelta(days=offset),
+            ))
+        if len(batch) >= 1000:
+            WorkRequestDay.objects.bulk_create(batch)
+            batch = []
+    WorkRequestDay.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compensation6', '0004_payslippdf'),
+        ('core', '0002_employeehierarchy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkRequestDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='work_days', to='core.employee')),
+                ('work_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='days', to='compensation6.workrequest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'employee'], name='compensatio_date_ad917b_idx'), models.Index(fields=['employee', 'date'], name='compensatio_employe_e4b363_idx')],
+                'unique_together': {('work_request', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_days, migrations.RunPython.noop),
+    ]
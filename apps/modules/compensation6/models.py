@@ -100,6 +100,72 @@ class Payroll(models.Model):
         return f"{self.employee} - {self.period}"
 
 
+class PayrollRun(models.Model):
+    """Antrian generate payroll yang diproses oleh worker `payroll_worker`.
+
+    Karyawan diproses per chunk berurutan berdasarkan id; `last_employee_id`
+    disimpan dalam transaksi yang sama dengan hasil chunk sehingga run dapat
+    dilanjutkan setelah worker crash tanpa menduplikasi Allowance.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Menunggu'
+        RUNNING = 'running', 'Diproses'
+        COMPLETED = 'completed', 'Selesai'
+        FAILED = 'failed', 'Gagal'
+
+    ACTIVE_STATUSES = (Status.QUEUED, Status.RUNNING)
+
+    period = models.ForeignKey(PayrollPeriod, on_delete=models.CASCADE, related_name='runs')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED, db_index=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='payroll_runs'
+    )
+    chunk_size = models.PositiveIntegerField(default=200)
+    total_employees = models.PositiveIntegerField(default=0)
+    processed_employees = models.PositiveIntegerField(default=0)
+    last_employee_id = models.BigIntegerField(null=True, blank=True, help_text="Id karyawan terakhir yang selesai diproses")
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"PayrollRun {self.period} ({self.status})"
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+    @property
+    def progress_percent(self):
+        if self.status == self.Status.COMPLETED:
+            return 100
+        if not self.total_employees:
+            return 0
+        return min(100, int(self.processed_employees * 100 / self.total_employees))
+
+
+class PayslipPDF(models.Model):
+    """PDF slip gaji yang sudah dirender, dialamatkan oleh hash isinya.
+
+    `digest` adalah hash Payroll, Allowance, Deduction, ringkasan absensi dan
+    versi template (lihat services.payslip_cache). Baris dihapus oleh signal
+    begitu salah satu komponen berubah.
+    """
+    payroll = models.OneToOneField(Payroll, on_delete=models.CASCADE, related_name='pdf_cache')
+    digest = models.CharField(max_length=64)
+    pdf = models.FileField(upload_to='payslip_pdf/')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"PDF {self.payroll} ({self.digest[:12]})"
+
+
 class BPJSConfig(models.Model):
     """Konfigurasi persentase BPJS untuk potongan karyawan dan kontribusi perusahaan.
     Nilai disimpan dalam persen (mis. 2.0 artinya 2%).
@@ -193,6 +259,39 @@ class Attendance(models.Model):
         return f"{self.employee} - {self.date} ({self.status})"
 
 
+class AttendancePeriodSummary(models.Model):
+    """Ringkasan absensi per karyawan per periode penggajian.
+
+    Dijaga oleh signal Attendance (lihat services.attendance_summary) sehingga
+    payroll dan slip gaji cukup membaca satu baris, bukan memindai absensi sebulan.
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='attendance_summaries')
+    period = models.ForeignKey(PayrollPeriod, on_delete=models.CASCADE, related_name='attendance_summaries')
+    present_days = models.PositiveSmallIntegerField(default=0)
+    late_days = models.PositiveSmallIntegerField(default=0)
+    absent_days = models.PositiveSmallIntegerField(default=0)
+    half_days = models.PositiveSmallIntegerField(default=0)
+    overtime_minutes = models.PositiveIntegerField(default=0, help_text="Total menit kerja di atas 8 jam per hari")
+    borongan_realisasi = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    hasil_akhir = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Total realisasi × harga borongan")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('employee', 'period')
+
+    def __str__(self):
+        return f"{self.employee} - {self.period}"
+
+    @property
+    def alfa_days(self):
+        """Hari alfa untuk potongan gaji; setengah hari dihitung 0,5."""
+        return Decimal(self.absent_days) + Decimal(self.half_days) / 2
+
+    @property
+    def overtime_hours(self):
+        return Decimal(self.overtime_minutes) / 60
+
+
 class WorkRequest(models.Model):
     """Permintaan penugasan kerja per karyawan."""
 
@@ -253,3 +352,24 @@ class WorkRequest(models.Model):
         """Check if this work request covers the given date."""
         return self.start_date <= date <= self.end_date
 
+
+
+class WorkRequestDay(models.Model):
+    """Satu baris per hari kerja dari WorkRequest, untuk query ketersediaan.
+
+    Dipelihara oleh signal WorkRequest (lihat ``services.availability``).
+    """
+
+    work_request = models.ForeignKey(WorkRequest, on_delete=models.CASCADE, related_name="days")
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="work_days")
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ("work_request", "date")
+        indexes = [
+            models.Index(fields=["date", "employee"]),
+            models.Index(fields=["employee", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.employee_id} @ {self.date}"
@@ -0,0 +1,128 @@
+"""Batch upsert of Attendance rows (field checker / Flutter ingestion).
+
+Records arrive already type-checked (see ``AttendanceRecordSerializer``).
+Everything that needs the database is looked up once per batch: open
+PayrollPeriod ranges, the referenced employees and borongan, and which
+``(employee, date)`` keys already exist. Valid rows are then written with a
+single ``bulk_create(update_conflicts=True)`` on the ``(employee, date)``
+unique key.
+
+``bulk_create`` bypasses the Attendance signals, so the affected
+AttendancePeriodSummary rows are rebuilt per period afterwards.
+"""
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.db import transaction
+
+from apps.core.models import Borongan, Employee
+
+from ..models import Attendance, PayrollPeriod
+from .attendance_summary import rebuild_period_summaries
+
+logger = logging.getLogger(__name__)
+
+UPSERT_FIELDS = ["clock_in", "clock_out", "status", "borongan", "realisasi", "notes", "updated_at"]
+
+
+def _open_ranges() -> List[Tuple[date, date]]:
+    return list(PayrollPeriod.objects.filter(is_closed=False).values_list("start_date", "end_date"))
+
+
+def _in_open_period(day: date, ranges: List[Tuple[date, date]]) -> bool:
+    return any(start <= day <= end for start, end in ranges)
+
+
+def _rebuild_summaries(keys: Set[Tuple[int, date]]) -> None:
+    employees_by_month: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+    for employee_id, day in keys:
+        employees_by_month[(day.year, day.month)].add(employee_id)
+
+    years = {year for year, _ in employees_by_month}
+    months = {month for _, month in employees_by_month}
+    periods = PayrollPeriod.objects.filter(year__in=years, month__in=months)
+    for period in periods:
+        employee_ids = employees_by_month.get((period.year, period.month))
+        if employee_ids:
+            rebuild_period_summaries(period, employee_ids)
+
+
+def upsert_attendance(records: List[dict], employee_ids: Optional[Set[int]] = None) -> List[dict]:
+    """Validate and upsert ``records``; return one result dict per record.
+
+    ``employee_ids`` optionally restricts which employees may be written.
+    Each result has ``row``, ``employee``, ``date`` and ``result``
+    (``created``/``updated``/``error``, with ``errors`` on failure).
+    """
+    ranges = _open_ranges()
+    wanted_employees = {record["employee"] for record in records}
+    employees = set(
+        Employee.objects.filter(pk__in=wanted_employees, is_active=True).values_list("id", flat=True)
+    )
+    if employee_ids is not None:
+        employees &= set(employee_ids)
+    borongan_owner = dict(
+        Borongan.objects.filter(
+            pk__in={record["borongan"] for record in records if record.get("borongan")}
+        ).values_list("id", "employee_id")
+    )
+
+    results: List[dict] = []
+    valid: Dict[Tuple[int, date], Tuple[dict, Attendance]] = {}
+    for index, record in enumerate(records):
+        key = (record["employee"], record["date"])
+        result = {"row": index, "employee": key[0], "date": key[1]}
+        results.append(result)
+
+        errors: Dict[str, List[str]] = {}
+        if key[0] not in employees:
+            errors["employee"] = ["Karyawan tidak ditemukan atau tidak aktif."]
+        if not _in_open_period(key[1], ranges):
+            errors["date"] = ["Tanggal tidak berada dalam periode penggajian yang aktif."]
+        borongan_id = record.get("borongan")
+        if borongan_id and borongan_owner.get(borongan_id) != key[0]:
+            errors["borongan"] = ["Pekerjaan borongan yang dipilih tidak valid untuk karyawan ini."]
+        if key in valid:
+            errors["non_field_errors"] = [f"Duplikat dengan baris {valid[key][0]['row']} pada batch ini."]
+        if errors:
+            result.update(result="error", errors=errors)
+            continue
+
+        valid[key] = (result, Attendance(
+            employee_id=key[0],
+            date=key[1],
+            clock_in=record.get("clock_in"),
+            clock_out=record.get("clock_out"),
+            status=record.get("status") or Attendance.Status.PRESENT,
+            borongan_id=borongan_id or None,
+            realisasi=record.get("realisasi") or 0,
+            notes=record.get("notes", ""),
+        ))
+
+    if not valid:
+        return results
+
+    existing = set(
+        Attendance.objects.filter(
+            employee_id__in={employee_id for employee_id, _ in valid},
+            date__in={day for _, day in valid},
+        ).values_list("employee_id", "date")
+    )
+    with transaction.atomic():
+        Attendance.objects.bulk_create(
+            [attendance for _, attendance in valid.values()],
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["employee", "date"],
+            update_fields=UPSERT_FIELDS,
+        )
+        _rebuild_summaries(set(valid))
+
+    for key, (result, attendance) in valid.items():
+        result["result"] = "updated" if key in existing else "created"
+        if attendance.pk:
+            result["id"] = attendance.pk
+    logger.info("Upserted %s attendance rows (%s rejected)", len(valid), len(records) - len(valid))
+    return results
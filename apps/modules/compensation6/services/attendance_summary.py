@@ -0,0 +1,162 @@
+"""Maintenance of ``AttendancePeriodSummary`` rows.
+
+Attendance belongs to the PayrollPeriod of its calendar month (the same
+month/year match the payroll engine uses). Saving or deleting an Attendance
+refreshes only the affected (employee, period) summary; bulk writers call
+``rebuild_period_summaries`` instead.
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Attendance, AttendancePeriodSummary, PayrollPeriod, PayslipPDF
+
+logger = logging.getLogger(__name__)
+
+
+STANDARD_DAY_MINUTES = 8 * 60
+
+SUMMARY_FIELDS = [
+    "present_days",
+    "late_days",
+    "absent_days",
+    "half_days",
+    "overtime_minutes",
+    "borongan_realisasi",
+    "hasil_akhir",
+]
+
+STATUS_FIELDS = {
+    Attendance.Status.PRESENT: "present_days",
+    Attendance.Status.LATE: "late_days",
+    Attendance.Status.ABSENT: "absent_days",
+    Attendance.Status.HALF_DAY: "half_days",
+}
+
+_ROW_FIELDS = ("employee_id", "status", "clock_in", "clock_out", "borongan_id", "realisasi", "borongan__harga_borongan")
+
+
+def overtime_minutes(clock_in, clock_out) -> int:
+    """Minutes worked beyond a standard 8 hour day for one attendance row."""
+    if not clock_in or not clock_out:
+        return 0
+    in_minutes = clock_in.hour * 60 + clock_in.minute
+    out_minutes = clock_out.hour * 60 + clock_out.minute
+    return max(0, out_minutes - in_minutes - STANDARD_DAY_MINUTES)
+
+
+def _empty_totals() -> Dict[str, object]:
+    totals: Dict[str, object] = {name: 0 for name in SUMMARY_FIELDS}
+    totals["borongan_realisasi"] = Decimal("0")
+    totals["hasil_akhir"] = Decimal("0")
+    return totals
+
+
+def _accumulate(totals: Dict[str, object], row: dict) -> None:
+    status_field = STATUS_FIELDS.get(row["status"])
+    if status_field:
+        totals[status_field] += 1
+    totals["overtime_minutes"] += overtime_minutes(row["clock_in"], row["clock_out"])
+    if row["borongan_id"] and row["realisasi"]:
+        realisasi = Decimal(row["realisasi"])
+        totals["borongan_realisasi"] += realisasi
+        totals["hasil_akhir"] += realisasi * Decimal(row["borongan__harga_borongan"] or 0)
+
+
+def _month_rows(period: PayrollPeriod, employee_ids: Optional[Iterable[int]] = None):
+    rows = Attendance.objects.filter(date__year=period.year, date__month=period.month)
+    if employee_ids is not None:
+        rows = rows.filter(employee_id__in=list(employee_ids))
+    return rows.values(*_ROW_FIELDS)
+
+
+def period_for_date(day) -> Optional[PayrollPeriod]:
+    return PayrollPeriod.objects.filter(month=day.month, year=day.year).first()
+
+
+def refresh_summary(employee_id: int, day) -> Optional[AttendancePeriodSummary]:
+    """Recompute the summary of one employee for the period containing ``day``."""
+    period = period_for_date(day)
+    if period is None:
+        return None
+
+    rows = list(_month_rows(period, [employee_id]))
+    if not rows:
+        AttendancePeriodSummary.objects.filter(employee_id=employee_id, period=period).delete()
+        return None
+
+    totals = _empty_totals()
+    for row in rows:
+        _accumulate(totals, row)
+    summary, _ = AttendancePeriodSummary.objects.update_or_create(
+        employee_id=employee_id, period=period, defaults=totals
+    )
+    return summary
+
+
+def rebuild_period_summaries(period: PayrollPeriod, employee_ids: Optional[Iterable[int]] = None) -> int:
+    """Rebuild summaries of ``period`` from Attendance in one pass.
+
+    Returns the number of summary rows written.
+    """
+    if employee_ids is not None:
+        employee_ids = list(employee_ids)
+
+    totals_by_employee: Dict[int, Dict[str, object]] = defaultdict(_empty_totals)
+    for row in _month_rows(period, employee_ids):
+        _accumulate(totals_by_employee[row["employee_id"]], row)
+
+    existing_qs = AttendancePeriodSummary.objects.filter(period=period)
+    if employee_ids is not None:
+        existing_qs = existing_qs.filter(employee_id__in=employee_ids)
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {summary.employee_id: summary for summary in existing_qs.select_for_update()}
+        stale_ids = [summary.pk for emp_id, summary in existing.items() if emp_id not in totals_by_employee]
+        to_create: List[AttendancePeriodSummary] = []
+        to_update: List[AttendancePeriodSummary] = []
+        for emp_id, totals in totals_by_employee.items():
+            summary = existing.get(emp_id)
+            if summary is None:
+                to_create.append(AttendancePeriodSummary(employee_id=emp_id, period=period, **totals))
+                continue
+            for name, value in totals.items():
+                setattr(summary, name, value)
+            summary.updated_at = now
+            to_update.append(summary)
+
+        if stale_ids:
+            AttendancePeriodSummary.objects.filter(pk__in=stale_ids).delete()
+        AttendancePeriodSummary.objects.bulk_create(to_create, batch_size=500)
+        AttendancePeriodSummary.objects.bulk_update(to_update, SUMMARY_FIELDS + ["updated_at"], batch_size=500)
+        payslips = PayslipPDF.objects.filter(payroll__period=period)
+        if employee_ids is not None:
+            payslips = payslips.filter(payroll__employee_id__in=employee_ids)
+        payslips.delete()
+
+    logger.debug("Rebuilt %s attendance summaries for period %s", len(to_create) + len(to_update), period)
+    return len(to_create) + len(to_update)
+
+
+def refresh_keys(keys: Iterable[Tuple[int, object]]) -> None:
+    """Refresh summaries for a set of ``(employee_id, date)`` keys, once per month."""
+    seen: Set[Tuple[int, int, int]] = set()
+    for employee_id, day in keys:
+        month_key = (employee_id, day.year, day.month)
+        if month_key in seen:
+            continue
+        seen.add(month_key)
+        refresh_summary(employee_id, day)
+
+
+def get_summary(employee, period: PayrollPeriod) -> AttendancePeriodSummary:
+    """Stored summary for ``employee``/``period``, or an unsaved all-zero one."""
+    summary = AttendancePeriodSummary.objects.filter(employee=employee, period=period).first()
+    if summary is None:
+        summary = AttendancePeriodSummary(employee=employee, period=period, **_empty_totals())
+    return summary
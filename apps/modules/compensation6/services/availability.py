@@ -0,0 +1,115 @@
+"""Availability of employees (mitra) against their WorkRequests.
+
+``WorkRequestDay`` expands every WorkRequest into one row per covered day,
+indexed on ``(date, employee)`` and ``(employee, date)``. "Is X busy between
+D1 and D2" then becomes an equality/range lookup on an index instead of the
+``start_date <= D2 AND end_date >= D1`` predicate on WorkRequest, which a
+B-tree cannot serve well once history grows.
+
+Rows are kept in sync by the WorkRequest signals; bulk writers call
+``rebuild_request_days``.
+"""
+import logging
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from apps.core.models import Borongan, Employee
+
+from ..models import WorkRequest, WorkRequestDay
+
+logger = logging.getLogger(__name__)
+
+
+def _day_rows(work_request: WorkRequest) -> List[WorkRequestDay]:
+    if not (work_request.start_date and work_request.end_date):
+        return []
+    span = (work_request.end_date - work_request.start_date).days
+    return [
+        WorkRequestDay(
+            work_request_id=work_request.pk,
+            employee_id=work_request.employee_id,
+            date=work_request.start_date + timedelta(days=offset),
+        )
+        for offset in range(span + 1)
+    ]
+
+
+def sync_request_days(work_request: WorkRequest) -> None:
+    """Replace the day rows of one WorkRequest."""
+    with transaction.atomic():
+        WorkRequestDay.objects.filter(work_request_id=work_request.pk).delete()
+        WorkRequestDay.objects.bulk_create(_day_rows(work_request), batch_size=1000)
+
+
+def rebuild_request_days(work_requests: Optional[Iterable[WorkRequest]] = None) -> int:
+    """Rebuild day rows for ``work_requests`` (default: all). Returns rows written."""
+    if work_requests is None:
+        existing = WorkRequestDay.objects.all()
+        work_requests = (
+            WorkRequest.objects.only("id", "employee_id", "start_date", "end_date").iterator(chunk_size=2000)
+        )
+    else:
+        work_requests = list(work_requests)
+        existing = WorkRequestDay.objects.filter(work_request_id__in=[wr.pk for wr in work_requests])
+
+    written = 0
+    with transaction.atomic():
+        existing.delete()
+        batch: List[WorkRequestDay] = []
+        for work_request in work_requests:
+            batch.extend(_day_rows(work_request))
+            if len(batch) >= 1000:
+                WorkRequestDay.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        WorkRequestDay.objects.bulk_create(batch)
+        written += len(batch)
+    logger.debug("Rebuilt %s work request days", written)
+    return written
+
+
+def busy_days(start: date, end: Optional[date] = None):
+    """WorkRequestDay rows inside ``[start, end]`` (a single day if ``end`` is None)."""
+    if end is None or end == start:
+        return WorkRequestDay.objects.filter(date=start)
+    return WorkRequestDay.objects.filter(date__range=(start, end))
+
+
+def busy_employee_ids(start: date, end: Optional[date] = None) -> set:
+    return set(busy_days(start, end).values_list("employee_id", flat=True).distinct())
+
+
+def work_request_ids_between(start: date, end: date, employee_ids: Optional[Iterable[int]] = None):
+    """Subquery of WorkRequest ids occupying any day of ``[start, end]``."""
+    days = busy_days(start, end)
+    if employee_ids is not None:
+        days = days.filter(employee_id__in=list(employee_ids))
+    return days.values("work_request_id")
+
+
+def free_employees(start: date, end: Optional[date] = None, queryset=None):
+    """Employees with no WorkRequest on any day of ``[start, end]``.
+
+    A single anti-join on the ``(employee, date)`` index; ``queryset``
+    defaults to all active employees.
+    """
+    if queryset is None:
+        queryset = Employee.objects.filter(is_active=True)
+    busy = busy_days(start, end).filter(employee_id=OuterRef("pk"))
+    return queryset.filter(~Exists(busy))
+
+
+def first_free_workers(start: date, end: Optional[date] = None, skill: Optional[str] = None,
+                       desa_id: Optional[int] = None, limit: int = 10):
+    """First ``limit`` free employees, optionally with a borongan ``skill`` in ``desa_id``."""
+    queryset = Employee.objects.filter(is_active=True)
+    if desa_id is not None:
+        queryset = queryset.filter(desa_id=desa_id)
+    if skill:
+        queryset = queryset.filter(
+            Exists(Borongan.objects.filter(employee_id=OuterRef("pk"), pekerjaan__icontains=skill))
+        )
+    return free_employees(start, end, queryset).order_by("name", "id")[:limit]
@@ -0,0 +1,384 @@
+"""Set-based payroll computation for a PayrollPeriod.
+
+The engine runs in three steps:
+
+1. ``load_period_data`` pulls the AttendancePeriodSummary, borongan
+   Attendance, LeaveRequest, Allowance, Deduction and Payroll rows needed for
+   the period in a handful of bulk queries (Borongan is joined onto
+   Attendance).
+2. ``compute_payroll_plan`` derives every payslip in memory, reproducing the
+   rules of the original per-employee ``generate_payroll`` view.
+3. ``apply_payroll_plan`` writes the result with ``bulk_create`` /
+   ``bulk_update`` inside one transaction.
+
+``run_payroll`` chains the three steps and is used by the view and by the
+``generate_payroll`` management command.
+"""
+import logging
+from calendar import monthrange
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+
+from apps.core.models import Employee
+from apps.core.services import master_cache
+
+from ..models import (
+    Allowance,
+    Attendance,
+    AttendancePeriodSummary,
+    BPJSConfig,
+    Deduction,
+    LeaveRequest,
+    Payroll,
+    PayrollPeriod,
+    PayslipPDF,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_bpjs_config() -> Optional[BPJSConfig]:
+    """The BPJSConfig row, served from the master-data cache."""
+    return master_cache.get_or_set("bpjs_config", "first", BPJSConfig.objects.first)
+
+
+WHOLE = Decimal("1.")
+CENTS = Decimal("0.01")
+HUNDRED = Decimal("100")
+
+DEFAULT_WORKING_DAYS = 30
+DEFAULT_OVERTIME_RATE = Decimal("1.5")
+HOURS_PER_DAY = 8
+
+DEFAULT_ALLOWANCE_NAME = "Tunjangan Tetap"
+OVERTIME_ALLOWANCE_NAME = "Lembur"
+ALFA_DEDUCTION_NAME = "Potongan Alfa"
+UNPAID_LEAVE_DEDUCTION_NAME = "Potongan Cuti Tanpa Bayar"
+
+# (BPJSConfig field, Deduction name) for employee-side BPJS deductions.
+EMPLOYEE_BPJS_DEDUCTIONS = (
+    ("emp_jkk_pct", "BPJS TK - JKK Karyawan"),
+    ("emp_jkm_pct", "BPJS TK - JKM Karyawan"),
+    ("emp_jht_pct", "BPJS TK - JHT Karyawan"),
+    ("emp_jp_pct", "BPJS TK - JP Karyawan"),
+    ("emp_jkn_pct", "BPJS Kesehatan Karyawan"),
+)
+
+# (Payroll field, BPJSConfig field) for employer contributions.
+EMPLOYER_CONTRIBUTIONS = (
+    ("tk_jkk_company", "com_jkk_pct"),
+    ("tk_jkm_company", "com_jkm_pct"),
+    ("tk_jht_company", "com_jht_pct"),
+    ("tk_jp_company", "com_jp_pct"),
+    ("jkn_company", "com_jkn_pct"),
+)
+
+PAYROLL_UPDATE_FIELDS = [
+    "basic_salary",
+    "total_allowance",
+    "total_deduction",
+    "net_salary",
+    *[payroll_field for payroll_field, _ in EMPLOYER_CONTRIBUTIONS],
+]
+
+
+def _round(value: Decimal) -> Decimal:
+    return value.quantize(WHOLE, rounding=ROUND_HALF_UP)
+
+
+def _percentage_of(base: Decimal, pct) -> Decimal:
+    return _round(base * Decimal(pct or 0) / HUNDRED)
+
+
+def borongan_allowance_name(borongan) -> str:
+    return f"Borongan: {borongan.pekerjaan} ({borongan.satuan})"
+
+
+def calendar_month_bounds(period: PayrollPeriod) -> Tuple[date, date]:
+    """First and last day of the calendar month a period belongs to."""
+    last_day = monthrange(period.year, period.month)[1]
+    return date(period.year, period.month, 1), date(period.year, period.month, last_day)
+
+
+@dataclass
+class EmployeePeriodData:
+    """Everything the engine needs to compute one employee's payslip."""
+
+    employee: Employee
+    summary: Optional[AttendancePeriodSummary] = None
+    borongan_attendances: List[Attendance] = field(default_factory=list)
+    leaves: List[LeaveRequest] = field(default_factory=list)
+    allowances: List[Allowance] = field(default_factory=list)
+    deductions: List[Deduction] = field(default_factory=list)
+    payroll: Optional[Payroll] = None
+
+
+@dataclass
+class PeriodData:
+    period: PayrollPeriod
+    config: Optional[BPJSConfig]
+    employees: Dict[int, EmployeePeriodData]
+
+
+@dataclass
+class PayrollPlan:
+    """Pending writes produced by ``compute_payroll_plan``."""
+
+    period: PayrollPeriod
+    payrolls_to_create: List[Payroll] = field(default_factory=list)
+    payrolls_to_update: List[Payroll] = field(default_factory=list)
+    allowances_to_create: List[Allowance] = field(default_factory=list)
+    allowances_to_update: List[Allowance] = field(default_factory=list)
+    deductions_to_create: List[Deduction] = field(default_factory=list)
+    deductions_to_update: List[Deduction] = field(default_factory=list)
+
+    @property
+    def payroll_count(self) -> int:
+        return len(self.payrolls_to_create) + len(self.payrolls_to_update)
+
+
+def load_period_data(
+    period: PayrollPeriod,
+    employee_ids: Optional[Iterable[int]] = None,
+    config: Optional[BPJSConfig] = None,
+) -> PeriodData:
+    """Bulk-load the rows needed to compute payroll for ``period``.
+
+    ``employee_ids`` restricts the run to a subset of employees; by default
+    every employee is included, as the original view did.
+    """
+    employees = Employee.objects.all().order_by("id")
+    if employee_ids is not None:
+        employees = employees.filter(id__in=list(employee_ids))
+    bundles = {emp.id: EmployeePeriodData(employee=emp) for emp in employees}
+    ids = list(bundles)
+
+    if config is None:
+        config = get_bpjs_config()
+
+    if not ids:
+        return PeriodData(period=period, config=config, employees=bundles)
+
+    month_start, month_end = calendar_month_bounds(period)
+
+    for summary in AttendancePeriodSummary.objects.filter(employee_id__in=ids, period=period):
+        bundles[summary.employee_id].summary = summary
+
+    attendances = (
+        Attendance.objects.filter(
+            employee_id__in=ids,
+            date__year=period.year,
+            date__month=period.month,
+            borongan__isnull=False,
+        )
+        .select_related("borongan")
+        .order_by("employee_id", "date", "id")
+    )
+    for att in attendances:
+        bundles[att.employee_id].borongan_attendances.append(att)
+
+    leaves = (
+        LeaveRequest.objects.filter(
+            employee_id__in=ids,
+            start_date__lte=month_end,
+            end_date__gte=month_start,
+            status=LeaveRequest.Status.APPROVED_HR,
+        )
+        .exclude(leave_type=LeaveRequest.LeaveType.ANNUAL)
+        .order_by("id")
+    )
+    for leave in leaves:
+        bundles[leave.employee_id].leaves.append(leave)
+
+    for allowance in Allowance.objects.filter(employee_id__in=ids, period=period).order_by("id"):
+        bundles[allowance.employee_id].allowances.append(allowance)
+
+    for deduction in Deduction.objects.filter(employee_id__in=ids, period=period).order_by("id"):
+        bundles[deduction.employee_id].deductions.append(deduction)
+
+    for payroll in Payroll.objects.filter(employee_id__in=ids, period=period).order_by("id"):
+        bundle = bundles[payroll.employee_id]
+        if bundle.payroll is None:
+            bundle.payroll = payroll
+
+    return PeriodData(period=period, config=config, employees=bundles)
+
+
+class _EmployeeLedger:
+    """In-memory view of one employee's Allowance/Deduction rows for a period.
+
+    Mirrors the ``exists()``/``create``/``update_or_create`` calls of the
+    original view while recording which rows must be inserted or updated.
+    """
+
+    def __init__(self, employee: Employee, period: PayrollPeriod, allowances, deductions):
+        self.employee = employee
+        self.period = period
+        self.allowances: List[Allowance] = list(allowances)
+        self.deductions: List[Deduction] = list(deductions)
+        self.new_allowances: List[Allowance] = []
+        self.new_deductions: List[Deduction] = []
+        self.changed_allowances: Dict[int, Allowance] = {}
+        self.changed_deductions: Dict[int, Deduction] = {}
+        self.borongan_keys: Set[Tuple[str, str]] = {
+            (allowance.name, str(borongan_date))
+            for allowance in self.allowances
+            for borongan_date in (allowance.borongan_dates or [])
+        }
+
+    def has_allowance(self, name: str) -> bool:
+        return any(allowance.name == name for allowance in self.allowances)
+
+    def has_borongan_allowance(self, name: str, day: str) -> bool:
+        return (name, day) in self.borongan_keys
+
+    def add_allowance(self, name: str, amount: Decimal, borongan_dates=None) -> None:
+        allowance = Allowance(
+            employee=self.employee,
+            period=self.period,
+            name=name,
+            amount=amount,
+            borongan_dates=borongan_dates or [],
+        )
+        self.allowances.append(allowance)
+        self.new_allowances.append(allowance)
+        for borongan_date in allowance.borongan_dates:
+            self.borongan_keys.add((name, borongan_date))
+
+    def set_allowance(self, name: str, amount: Decimal) -> None:
+        self._upsert(Allowance, self.allowances, self.new_allowances, self.changed_allowances, name, amount)
+
+    def set_deduction(self, name: str, amount: Decimal) -> None:
+        self._upsert(Deduction, self.deductions, self.new_deductions, self.changed_deductions, name, amount)
+
+    def _upsert(self, model, rows, new_rows, changed_rows, name, amount) -> None:
+        existing = next((row for row in rows if row.name == name), None)
+        if existing is None:
+            row = model(employee=self.employee, period=self.period, name=name, amount=amount)
+            rows.append(row)
+            new_rows.append(row)
+            return
+        existing.amount = amount
+        if existing.pk is not None:
+            changed_rows[existing.pk] = existing
+
+    def total_allowance(self):
+        return sum(allowance.amount for allowance in self.allowances)
+
+    def total_deduction(self):
+        return sum(deduction.amount for deduction in self.deductions)
+
+
+def _compute_employee(bundle: EmployeePeriodData, period: PayrollPeriod, cfg: Optional[BPJSConfig], plan: PayrollPlan) -> None:
+    emp = bundle.employee
+    ledger = _EmployeeLedger(emp, period, bundle.allowances, bundle.deductions)
+
+    payroll = bundle.payroll
+    if payroll is None:
+        payroll = Payroll(employee=emp, period=period)
+        plan.payrolls_to_create.append(payroll)
+    else:
+        plan.payrolls_to_update.append(payroll)
+
+    payroll.basic_salary = getattr(emp, "basic_salary", 0)
+
+    default_allowance = getattr(emp, "default_allowance", 0)
+    if default_allowance and default_allowance > 0 and not ledger.has_allowance(DEFAULT_ALLOWANCE_NAME):
+        ledger.add_allowance(DEFAULT_ALLOWANCE_NAME, default_allowance)
+
+    # One borongan allowance per attendance date.
+    for att in bundle.borongan_attendances:
+        name = borongan_allowance_name(att.borongan)
+        day = str(att.date)
+        if not ledger.has_borongan_allowance(name, day):
+            hasil_akhir = att.get_hasil_akhir().quantize(CENTS, rounding=ROUND_HALF_UP)
+            ledger.add_allowance(name, hasil_akhir, borongan_dates=[day])
+
+    working_days = cfg.working_days_per_month if cfg else DEFAULT_WORKING_DAYS
+    daily_salary = Decimal(payroll.basic_salary or 0) / Decimal(working_days)
+    hourly_rate = daily_salary / HOURS_PER_DAY
+
+    summary = bundle.summary
+    total_alfa_days = summary.alfa_days if summary else Decimal("0")
+    total_overtime_hours = summary.overtime_hours if summary else Decimal("0")
+
+    if total_alfa_days > 0:
+        ledger.set_deduction(ALFA_DEDUCTION_NAME, _round(total_alfa_days * daily_salary))
+
+    if total_overtime_hours > 0:
+        overtime_rate = cfg.overtime_rate if cfg else DEFAULT_OVERTIME_RATE
+        ledger.set_allowance(OVERTIME_ALLOWANCE_NAME, _round(total_overtime_hours * hourly_rate * overtime_rate))
+
+    # Unpaid (non-annual) leave overlapping the calendar month.
+    month_start, month_end = calendar_month_bounds(period)
+    total_leave_days = Decimal("0")
+    for leave in bundle.leaves:
+        start = max(leave.start_date, month_start)
+        end = min(leave.end_date, month_end)
+        if end >= start:
+            total_leave_days += Decimal((end - start).days + 1)
+    if total_leave_days > 0:
+        ledger.set_deduction(UNPAID_LEAVE_DEDUCTION_NAME, _round(total_leave_days * daily_salary))
+
+    base = Decimal(payroll.basic_salary or 0)
+    if cfg and base > 0:
+        for pct_field, name in EMPLOYEE_BPJS_DEDUCTIONS:
+            pct = getattr(cfg, pct_field, None)
+            if pct and pct > 0:
+                ledger.set_deduction(name, _percentage_of(base, pct))
+
+    payroll.total_allowance = ledger.total_allowance()
+    payroll.total_deduction = ledger.total_deduction()
+    payroll.net_salary = payroll.basic_salary + payroll.total_allowance - payroll.total_deduction
+
+    if cfg and base > 0:
+        for payroll_field, pct_field in EMPLOYER_CONTRIBUTIONS:
+            setattr(payroll, payroll_field, _percentage_of(base, getattr(cfg, pct_field)))
+
+    plan.allowances_to_create.extend(ledger.new_allowances)
+    plan.allowances_to_update.extend(ledger.changed_allowances.values())
+    plan.deductions_to_create.extend(ledger.new_deductions)
+    plan.deductions_to_update.extend(ledger.changed_deductions.values())
+
+
+def compute_payroll_plan(data: PeriodData) -> PayrollPlan:
+    """Compute every payslip of ``data`` in memory without touching the DB."""
+    plan = PayrollPlan(period=data.period)
+    for bundle in data.employees.values():
+        _compute_employee(bundle, data.period, data.config, plan)
+    return plan
+
+
+def apply_payroll_plan(plan: PayrollPlan, batch_size: int = 500) -> None:
+    """Persist a computed plan in a single transaction."""
+    with transaction.atomic():
+        Allowance.objects.bulk_create(plan.allowances_to_create, batch_size=batch_size)
+        Allowance.objects.bulk_update(plan.allowances_to_update, ["amount"], batch_size=batch_size)
+        Deduction.objects.bulk_create(plan.deductions_to_create, batch_size=batch_size)
+        Deduction.objects.bulk_update(plan.deductions_to_update, ["amount"], batch_size=batch_size)
+        Payroll.objects.bulk_create(plan.payrolls_to_create, batch_size=batch_size)
+        Payroll.objects.bulk_update(plan.payrolls_to_update, PAYROLL_UPDATE_FIELDS, batch_size=batch_size)
+        PayslipPDF.objects.filter(payroll__in=plan.payrolls_to_update).delete()
+
+
+def run_payroll(
+    period: PayrollPeriod,
+    employee_ids: Optional[Iterable[int]] = None,
+    batch_size: int = 500,
+) -> PayrollPlan:
+    """Load, compute and persist payroll for ``period``."""
+    data = load_period_data(period, employee_ids=employee_ids)
+    plan = compute_payroll_plan(data)
+    apply_payroll_plan(plan, batch_size=batch_size)
+    logger.info(
+        "Generated payroll for period %s: %s payslips, %s new allowances, %s new deductions",
+        period,
+        plan.payroll_count,
+        len(plan.allowances_to_create),
+        len(plan.deductions_to_create),
+    )
+    return plan
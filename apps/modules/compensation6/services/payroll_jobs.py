@@ -0,0 +1,155 @@
+"""Database-backed job queue for payroll generation.
+
+A ``PayrollRun`` is enqueued by the web view and picked up by the
+``payroll_worker`` management command. Employees are processed in chunks
+ordered by id; each chunk's payroll writes and the run's progress cursor are
+committed in the same transaction, so a run interrupted by a crash resumes
+from the last committed chunk. Re-processing a chunk is harmless anyway
+because the payroll engine skips allowances that already exist.
+"""
+import logging
+import os
+import socket
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.core.models import Employee
+
+from ..models import PayrollPeriod, PayrollRun
+from .payroll_engine import run_payroll
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CHUNK_SIZE = 200
+DEFAULT_STALE_AFTER = timedelta(minutes=5)
+
+
+class PayrollRunLost(Exception):
+    """Raised when another worker has taken over a run mid-chunk."""
+
+
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_payroll_run(period: PayrollPeriod, user=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[PayrollRun, bool]:
+    """Queue a payroll run for ``period`` unless one is already active.
+
+    Returns ``(run, created)``.
+    """
+    with transaction.atomic():
+        active = (
+            PayrollRun.objects.select_for_update()
+            .filter(period=period, status__in=PayrollRun.ACTIVE_STATUSES)
+            .order_by("created_at")
+            .first()
+        )
+        if active is not None:
+            return active, False
+
+        run = PayrollRun.objects.create(
+            period=period,
+            requested_by=user if getattr(user, "is_authenticated", False) else None,
+            chunk_size=chunk_size,
+            total_employees=Employee.objects.count(),
+        )
+    return run, True
+
+
+def claim_next_run(worker: str, stale_after: timedelta = DEFAULT_STALE_AFTER) -> Optional[PayrollRun]:
+    """Lock and return the oldest runnable PayrollRun, or ``None``.
+
+    Running runs whose heartbeat is older than ``stale_after`` are treated as
+    abandoned by a crashed worker and resumed from their cursor.
+    """
+    now = timezone.now()
+    stale_before = now - stale_after
+    with transaction.atomic():
+        run = (
+            PayrollRun.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=PayrollRun.Status.QUEUED)
+                | Q(status=PayrollRun.Status.RUNNING, heartbeat_at__lt=stale_before)
+                | Q(status=PayrollRun.Status.RUNNING, heartbeat_at__isnull=True)
+            )
+            .select_related("period")
+            .order_by("created_at")
+            .first()
+        )
+        if run is None:
+            return None
+
+        if run.status == PayrollRun.Status.RUNNING:
+            logger.warning("Resuming stale payroll run %s previously held by %s", run.pk, run.worker or "-")
+        if run.started_at is None:
+            run.started_at = now
+            run.total_employees = Employee.objects.count()
+        run.status = PayrollRun.Status.RUNNING
+        run.worker = worker
+        run.heartbeat_at = now
+        run.save(update_fields=["status", "worker", "heartbeat_at", "started_at", "total_employees"])
+    return run
+
+
+def _next_chunk(run: PayrollRun) -> list:
+    employees = Employee.objects.order_by("id")
+    if run.last_employee_id is not None:
+        employees = employees.filter(id__gt=run.last_employee_id)
+    return list(employees.values_list("id", flat=True)[: run.chunk_size])
+
+
+def process_next_chunk(run: PayrollRun) -> bool:
+    """Process one chunk of ``run``. Returns ``False`` once the run is done."""
+    chunk = _next_chunk(run)
+    if not chunk:
+        _finish(run, PayrollRun.Status.COMPLETED)
+        return False
+
+    with transaction.atomic():
+        run_payroll(run.period, employee_ids=chunk)
+        updated = PayrollRun.objects.filter(
+            pk=run.pk, worker=run.worker, status=PayrollRun.Status.RUNNING
+        ).update(
+            last_employee_id=chunk[-1],
+            processed_employees=F("processed_employees") + len(chunk),
+            heartbeat_at=timezone.now(),
+        )
+        if not updated:
+            raise PayrollRunLost(f"PayrollRun {run.pk} is no longer owned by {run.worker}")
+
+    run.refresh_from_db(fields=["last_employee_id", "processed_employees", "heartbeat_at"])
+    return True
+
+
+def _finish(run: PayrollRun, status: str, error: str = "") -> bool:
+    """Store the outcome unless another worker has taken the run over meanwhile."""
+    finished_at = timezone.now()
+    updated = PayrollRun.objects.filter(
+        pk=run.pk, worker=run.worker, status=PayrollRun.Status.RUNNING
+    ).update(status=status, error=error, finished_at=finished_at, heartbeat_at=finished_at)
+    if not updated:
+        logger.warning("Payroll run %s is no longer owned by %s; result discarded", run.pk, run.worker)
+        return False
+    run.status = status
+    run.error = error
+    run.finished_at = run.heartbeat_at = finished_at
+    return True
+
+
+def process_run(run: PayrollRun) -> None:
+    """Process ``run`` chunk by chunk until it completes or fails."""
+    try:
+        while process_next_chunk(run):
+            logger.info(
+                "Payroll run %s: %s/%s employees", run.pk, run.processed_employees, run.total_employees
+            )
+    except PayrollRunLost:
+        logger.warning("Payroll run %s was taken over by another worker", run.pk)
+    except Exception as exc:
+        logger.exception("Payroll run %s failed", run.pk)
+        _finish(run, PayrollRun.Status.FAILED, error=str(exc))
@@ -0,0 +1,101 @@
+"""Content-addressed cache of rendered payslip PDFs.
+
+A payslip's digest hashes every row that ends up on the slip (Payroll,
+Allowance, Deduction, employee, attendance summary) plus the version of the
+payslip template and stylesheet. A stored ``PayslipPDF`` is reused only while
+its digest still matches; for closed periods the stored file is served
+without recomputing anything. Signals drop the cached file as soon as a
+component row changes. ``bulk_create`` / ``bulk_update`` send no signals, so
+the bulk writers (``payroll_engine.apply_payroll_plan`` and
+``attendance_summary.rebuild_period_summaries``) delete the affected
+``PayslipPDF`` rows themselves.
+"""
+import hashlib
+import json
+from functools import lru_cache
+from typing import Optional
+
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.template.loader import get_template
+
+from ..models import PayslipPDF
+from .payslip_export import PAYSLIP_STYLESHEET, PAYSLIP_TEMPLATE
+
+
+def _template_source(name: str) -> str:
+    return get_template(name).template.source
+
+
+@lru_cache(maxsize=1)
+def template_version() -> str:
+    """Hash of the payslip template and stylesheet sources."""
+    digest = hashlib.sha256()
+    for name in (PAYSLIP_TEMPLATE, PAYSLIP_STYLESHEET):
+        digest.update(_template_source(name).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _row(instance) -> Optional[list]:
+    if instance is None:
+        return None
+    return [(field.attname, getattr(instance, field.attname)) for field in instance._meta.concrete_fields]
+
+
+def payslip_digest(ctx: dict) -> str:
+    """Digest of everything a payslip context renders."""
+    employee = ctx['employee']
+    payload = {
+        'template': template_version(),
+        'payroll': _row(ctx['payroll']),
+        'allowances': sorted((_row(a) for a in ctx['allowances']), key=repr),
+        'deductions': sorted((_row(d) for d in ctx['deductions']), key=repr),
+        'employee': [_row(employee), str(employee.position or ''), str(employee.department or '')],
+        'attendance_summary': _row(ctx.get('attendance_summary')),
+    }
+    encoded = json.dumps(payload, default=str, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def get_closed_period_pdf(employee_id: int, month: int, year: int) -> Optional[PayslipPDF]:
+    """Stored PDF of a closed period, served without rebuilding the context."""
+    return (
+        PayslipPDF.objects.select_related('payroll__employee')
+        .filter(
+            payroll__employee_id=employee_id,
+            payroll__period__month=month,
+            payroll__period__year=year,
+            payroll__period__is_closed=True,
+        )
+        .first()
+    )
+
+
+def get_cached_pdf(payroll, digest: str) -> Optional[PayslipPDF]:
+    cached = PayslipPDF.objects.filter(payroll=payroll).first()
+    if cached is None:
+        return None
+    if cached.digest != digest or not cached.pdf.storage.exists(cached.pdf.name):
+        cached.delete()
+        return None
+    return cached
+
+
+def store_pdf(payroll, digest: str, pdf: bytes) -> PayslipPDF:
+    PayslipPDF.objects.filter(payroll=payroll).delete()
+    cached = PayslipPDF(payroll=payroll, digest=digest)
+    cached.pdf.save(f"{payroll.period_id}/{payroll.employee_id}-{digest[:16]}.pdf", ContentFile(pdf), save=False)
+    try:
+        with transaction.atomic():
+            cached.save()
+    except IntegrityError:
+        # A concurrent request stored the same payslip first.
+        cached.pdf.delete(save=False)
+        return PayslipPDF.objects.get(payroll=payroll)
+    return cached
+
+
+def invalidate(employee_id: Optional[int], period_id: Optional[int]) -> None:
+    if employee_id is None or period_id is None:
+        return
+    PayslipPDF.objects.filter(payroll__employee_id=employee_id, payroll__period_id=period_id).delete()
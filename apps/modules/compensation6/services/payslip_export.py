@@ -0,0 +1,299 @@
+"""Bulk export of every payslip of a PayrollPeriod.
+
+Payslip contexts are built chunk by chunk from a few bulk queries (one
+BPJSConfig lookup for the whole export), rendered to HTML with a single
+loaded template, and converted to PDF by a pool of worker processes that
+share one parsed stylesheet and font configuration each (see
+``pdf_worker``). The pool is created once per process and shared by every
+export, so concurrent downloads queue on the same workers instead of each
+starting their own. Only a bounded window of documents is in flight at a
+time and the ZIP archive is written incrementally, so memory for the ZIP
+export stays flat however large the period is.
+
+The merged PDF is rendered in batches of ``MERGE_BATCH_SIZE`` payslips; each
+batch becomes a small PDF that ``pypdf`` appends to the output. That keeps
+finished pages rather than laid-out WeasyPrint documents, but the writer
+still holds every page until the end, so memory grows with the period. It
+is only offered by the ``export_payslips`` command, never by a web request.
+"""
+import atexit
+import io
+import logging
+import os
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.template.loader import get_template, render_to_string
+
+from ..models import Allowance, AttendancePeriodSummary, BPJSConfig, Deduction, Payroll, PayrollPeriod
+from . import pdf_worker
+from .payroll_engine import get_bpjs_config
+
+logger = logging.getLogger(__name__)
+
+
+PAYSLIP_TEMPLATE = 'compensation6/payslip_pdf_clean.html'
+PAYSLIP_STYLESHEET = 'compensation6/payslip_pdf_clean.css'
+
+EXPORT_FORMATS = ('zip', 'pdf')
+DEFAULT_CHUNK_SIZE = 200
+MERGE_BATCH_SIZE = 50
+
+# (context key, BPJSConfig field) for employer contributions shown on the slip.
+EMPLOYER_CONTRIBUTION_PCTS = (
+    ('tk_jkk_company', 'com_jkk_pct'),
+    ('tk_jkm_company', 'com_jkm_pct'),
+    ('tk_jht_company', 'com_jht_pct'),
+    ('tk_jp_company', 'com_jp_pct'),
+    ('jkn_company', 'com_jkn_pct'),
+)
+
+
+def employer_contributions(payroll: Payroll, cfg: Optional[BPJSConfig]) -> Dict[str, Decimal]:
+    base = Decimal(payroll.basic_salary or 0)
+    contributions = {key: Decimal('0.00') for key, _ in EMPLOYER_CONTRIBUTION_PCTS}
+    if cfg and base > 0:
+        for key, pct_field in EMPLOYER_CONTRIBUTION_PCTS:
+            contributions[key] = base * Decimal(getattr(cfg, pct_field) or 0) / Decimal('100')
+    contributions['total_employer_contrib'] = sum(contributions.values())
+    return contributions
+
+
+def build_payslip_context(payroll, allowances, deductions, cfg, attendance_summary) -> dict:
+    return {
+        'payroll': payroll,
+        'allowances': allowances,
+        'deductions': deductions,
+        'period': payroll.period,
+        'employee': payroll.employee,
+        **employer_contributions(payroll, cfg),
+        'attendance_summary': attendance_summary,
+    }
+
+
+def payslip_filename(employee, period: PayrollPeriod) -> str:
+    return f"slip_borongan_{employee.name}_{int(period.month):02d}-{period.year}.pdf"
+
+
+def _archive_name(employee, period: PayrollPeriod) -> str:
+    # Employee names are not unique; prefix the id to keep ZIP entries distinct.
+    return f"{employee.id}_{payslip_filename(employee, period)}".replace('/', '-')
+
+
+def iter_period_contexts(period: PayrollPeriod, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """Yield a payslip context for every Payroll of ``period``, ordered by employee."""
+    cfg = get_bpjs_config()
+    payroll_ids = list(
+        Payroll.objects.filter(period=period, employee__isnull=False)
+        .order_by('employee__name', 'employee_id')
+        .values_list('id', flat=True)
+    )
+    for start in range(0, len(payroll_ids), chunk_size):
+        chunk_ids = payroll_ids[start:start + chunk_size]
+        payrolls = {
+            p.id: p
+            for p in Payroll.objects.filter(id__in=chunk_ids).select_related(
+                'period', 'employee', 'employee__position', 'employee__department'
+            )
+        }
+        employee_ids = [p.employee_id for p in payrolls.values()]
+
+        allowances: Dict[int, List[Allowance]] = {emp_id: [] for emp_id in employee_ids}
+        for allowance in Allowance.objects.filter(period=period, employee_id__in=employee_ids).order_by('id'):
+            allowances[allowance.employee_id].append(allowance)
+        deductions: Dict[int, List[Deduction]] = {emp_id: [] for emp_id in employee_ids}
+        for deduction in Deduction.objects.filter(period=period, employee_id__in=employee_ids).order_by('id'):
+            deductions[deduction.employee_id].append(deduction)
+        summaries = {
+            s.employee_id: s
+            for s in AttendancePeriodSummary.objects.filter(period=period, employee_id__in=employee_ids)
+        }
+
+        for payroll_id in chunk_ids:
+            payroll = payrolls[payroll_id]
+            yield build_payslip_context(
+                payroll,
+                allowances[payroll.employee_id],
+                deductions[payroll.employee_id],
+                cfg,
+                summaries.get(payroll.employee_id),
+            )
+
+
+def iter_payslip_html(period: PayrollPeriod) -> Iterator[Tuple[str, str]]:
+    """Yield ``(archive name, html)`` for every payslip of ``period``.
+
+    The HTML omits the inline stylesheet; workers apply the shared one.
+    """
+    template = get_template(PAYSLIP_TEMPLATE)
+    for ctx in iter_period_contexts(period):
+        html = template.render({**ctx, 'preview': False, 'shared_stylesheet': True})
+        yield _archive_name(ctx['employee'], period), html
+
+
+def default_worker_count() -> int:
+    return getattr(settings, 'PAYSLIP_EXPORT_WORKERS', None) or os.cpu_count() or 1
+
+
+_shared_pool: Optional[ProcessPoolExecutor] = None
+_shared_pool_lock = threading.Lock()
+
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=pdf_worker.init_worker,
+        initargs=(render_to_string(PAYSLIP_STYLESHEET),),
+    )
+
+
+def shared_pool() -> ProcessPoolExecutor:
+    """The process pool every export in this process renders on."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = _new_pool(default_worker_count())
+            atexit.register(_shared_pool.shutdown, cancel_futures=True)
+        return _shared_pool
+
+
+def _discard_shared_pool(pool: ProcessPoolExecutor) -> None:
+    # A worker died (e.g. killed for memory); the next export starts a fresh pool.
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is pool:
+            _shared_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_windowed(pool: ProcessPoolExecutor, render: Callable, items, window: int) -> Iterator[Tuple[str, bytes]]:
+    pending = deque()
+    try:
+        for name, source in items:
+            pending.append((name, pool.submit(render, source)))
+            if len(pending) >= window:
+                done_name, future = pending.popleft()
+                yield done_name, future.result()
+        while pending:
+            done_name, future = pending.popleft()
+            yield done_name, future.result()
+    finally:
+        # A cancelled download must not leave its queued documents on the shared pool.
+        for _, future in pending:
+            future.cancel()
+
+
+def render_pdfs(items: Iterable[Tuple[str, object]], workers: Optional[int] = None, window: Optional[int] = None,
+                render: Callable = pdf_worker.render_pdf) -> Iterator[Tuple[str, bytes]]:
+    """Render ``(name, html)`` items to ``(name, pdf bytes)`` in input order.
+
+    ``render`` runs in the worker processes on each item's source. Without
+    ``workers`` the shared pool is used; an explicit count gets a dedicated
+    pool (the management command). At most ``window`` items are queued at once.
+    """
+    count = workers or default_worker_count()
+    if count <= 1:
+        pdf_worker.init_worker(render_to_string(PAYSLIP_STYLESHEET))
+        for name, source in items:
+            yield name, render(source)
+        return
+
+    window = window or count * 2
+    if workers:
+        with _new_pool(workers) as pool:
+            yield from _render_windowed(pool, render, items, window)
+        return
+
+    pool = shared_pool()
+    try:
+        yield from _render_windowed(pool, render, items, window)
+    except BrokenProcessPool:
+        _discard_shared_pool(pool)
+        raise
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only buffer that ``zipfile`` streams into and the caller drains."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """Yield a ZIP archive of ``entries`` piece by piece."""
+    sink = _ZipSink()
+    # PDFs are already compressed; storing avoids burning CPU for nothing.
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def stream_period_zip(period: PayrollPeriod, workers: Optional[int] = None) -> Iterator[bytes]:
+    return stream_zip(render_pdfs(iter_payslip_html(period), workers=workers))
+
+
+def _html_batches(period: PayrollPeriod, size: int) -> Iterator[Tuple[str, List[str]]]:
+    """Yield ``(first archive name, [html, ...])`` batches of at most ``size`` payslips."""
+    batch: List[Tuple[str, str]] = []
+    for item in iter_payslip_html(period):
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch[0][0], [html for _, html in batch]
+            batch = []
+    if batch:
+        yield batch[0][0], [html for _, html in batch]
+
+
+def write_period_pdf(period: PayrollPeriod, target, workers: Optional[int] = None,
+                     batch_size: int = MERGE_BATCH_SIZE) -> int:
+    """Write every payslip of ``period`` into one merged PDF. Returns the page count."""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    batches = _html_batches(period, batch_size)
+    for _, data in render_pdfs(batches, workers=workers, render=pdf_worker.render_merged_pdf):
+        writer.append(io.BytesIO(data))
+    if not writer.pages:
+        return 0
+    writer.write(target)
+    return len(writer.pages)
+
+
+def export_period(period: PayrollPeriod, target, fmt: str = 'zip', workers: Optional[int] = None) -> None:
+    """Export every payslip of ``period`` to the binary file object ``target``."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown payslip export format: {fmt}")
+    if fmt == 'pdf':
+        write_period_pdf(period, target, workers=workers)
+        return
+    for chunk in stream_period_zip(period, workers=workers):
+        target.write(chunk)
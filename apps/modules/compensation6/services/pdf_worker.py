@@ -0,0 +1,39 @@
+"""WeasyPrint rendering helpers that run inside export worker processes.
+
+This module deliberately avoids Django imports so it can be used by a
+``ProcessPoolExecutor`` regardless of the start method. Each worker parses
+the payslip stylesheet and builds its FontConfiguration once in
+``init_worker`` and reuses them for every document it renders.
+"""
+_state = {}
+
+
+def init_worker(css_text, base_url=None):
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    font_config = FontConfiguration()
+    _state['font_config'] = font_config
+    _state['stylesheet'] = CSS(string=css_text, font_config=font_config)
+    _state['base_url'] = base_url
+
+
+def render_document(html):
+    """Lay out one HTML payslip with the shared stylesheet (no PDF output)."""
+    from weasyprint import HTML
+
+    return HTML(string=html, base_url=_state['base_url']).render(
+        stylesheets=[_state['stylesheet']], font_config=_state['font_config']
+    )
+
+
+def render_pdf(html):
+    """Render one HTML payslip to PDF bytes with the shared stylesheet."""
+    return render_document(html).write_pdf()
+
+
+def render_merged_pdf(htmls):
+    """Render several HTML payslips into one PDF; used for batches of a merged export."""
+    documents = [render_document(html) for html in htmls]
+    pages = [page for document in documents for page in document.pages]
+    return documents[0].copy(pages).write_pdf()
@@ -0,0 +1,92 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.core.models import Borongan
+
+from apps.core.services import master_cache
+
+from .models import (
+    Allowance, Attendance, AttendancePeriodSummary, BPJSConfig, Deduction, Payroll, PayrollPeriod, PayslipPDF,
+    WorkRequest,
+)
+from .services import availability, payslip_cache
+from .services.attendance_summary import rebuild_period_summaries, refresh_keys
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_attendance_key(sender, instance, **kwargs):
+    # Employee/date may change on edit; the old month must be refreshed too.
+    instance._previous_summary_key = None
+    if instance.pk:
+        instance._previous_summary_key = (
+            Attendance.objects.filter(pk=instance.pk).values_list('employee_id', 'date').first()
+        )
+
+
+@receiver(post_save, sender=Attendance)
+def refresh_summary_on_attendance_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    keys = [(instance.employee_id, instance.date)]
+    previous = getattr(instance, '_previous_summary_key', None)
+    if previous:
+        keys.append(previous)
+    refresh_keys(keys)
+
+
+@receiver(post_delete, sender=Attendance)
+def refresh_summary_on_attendance_delete(sender, instance, **kwargs):
+    refresh_keys([(instance.employee_id, instance.date)])
+
+
+@receiver(post_save, sender=Borongan)
+def refresh_summary_on_borongan_save(sender, instance, created=False, raw=False, **kwargs):
+    # hasil_akhir depends on harga_borongan; a new borongan has no attendance yet.
+    if created or raw:
+        return
+    refresh_keys(Attendance.objects.filter(borongan=instance).values_list('employee_id', 'date'))
+
+
+@receiver(pre_delete, sender=Borongan)
+def remember_borongan_attendance(sender, instance, **kwargs):
+    instance._summary_keys = list(Attendance.objects.filter(borongan=instance).values_list('employee_id', 'date'))
+
+
+@receiver(post_delete, sender=Borongan)
+def refresh_summary_on_borongan_delete(sender, instance, **kwargs):
+    refresh_keys(getattr(instance, '_summary_keys', []))
+
+
+@receiver(post_save, sender=PayrollPeriod)
+def build_summaries_for_new_period(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        rebuild_period_summaries(instance)
+
+
+@receiver(post_save, sender=Allowance)
+@receiver(post_delete, sender=Allowance)
+@receiver(post_save, sender=Deduction)
+@receiver(post_delete, sender=Deduction)
+@receiver(post_save, sender=Payroll)
+@receiver(post_save, sender=AttendancePeriodSummary)
+@receiver(post_delete, sender=AttendancePeriodSummary)
+def invalidate_payslip_pdf(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    payslip_cache.invalidate(instance.employee_id, instance.period_id)
+
+
+@receiver(post_delete, sender=PayslipPDF)
+def delete_payslip_pdf_file(sender, instance, **kwargs):
+    if instance.pdf:
+        instance.pdf.delete(save=False)
+
+
+@receiver(post_save, sender=WorkRequest)
+def sync_work_request_days(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    availability.sync_request_days(instance)
+
+
+master_cache.invalidate_on_change('bpjs_config', BPJSConfig)
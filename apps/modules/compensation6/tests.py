@@ -1,3 +1,341 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, time, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from apps.core.models import Borongan, Company, Employee
+
+from .models import (
+    Allowance, Attendance, AttendancePeriodSummary, BPJSConfig, Deduction, LeaveRequest, Payroll, PayrollPeriod, PayrollRun,
+    PayslipPDF, WorkRequest, WorkRequestDay,
+)
+from .services import availability, payslip_cache
+from .services.attendance_import import upsert_attendance
+from .services.payroll_engine import run_payroll
+from .services.payroll_jobs import _finish, claim_next_run, enqueue_payroll_run, process_next_chunk, process_run
+from .services.work_calendar import build_work_calendar
+
+
+class PayrollEngineTest(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Kebun Sawit')
+        self.period = PayrollPeriod.objects.create(
+            month=3, year=2025, start_date=date(2025, 3, 1), end_date=date(2025, 3, 31)
+        )
+        BPJSConfig.objects.create(
+            emp_jht_pct=Decimal('2.00'),
+            com_jht_pct=Decimal('3.70'),
+            working_days_per_month=30,
+            overtime_rate=Decimal('1.50'),
+        )
+        self.employee = Employee.objects.create(
+            name='Pemanen',
+            email='pemanen@test.com',
+            company=self.company,
+            basic_salary=Decimal('3000000'),
+            default_allowance=Decimal('200000'),
+        )
+        self.borongan = Borongan.objects.create(
+            employee=self.employee, pekerjaan='Panen TBS', satuan='janjang', harga_borongan=Decimal('1500')
+        )
+        Attendance.objects.create(
+            employee=self.employee, date=date(2025, 3, 3), status='present',
+            clock_in=time(7, 0), clock_out=time(17, 0),
+            borongan=self.borongan, realisasi=Decimal('100'),
+        )
+        Attendance.objects.create(employee=self.employee, date=date(2025, 3, 4), status='absent')
+        Attendance.objects.create(employee=self.employee, date=date(2025, 3, 5), status='half_day')
+        LeaveRequest.objects.create(
+            employee=self.employee, start_date=date(2025, 3, 10), end_date=date(2025, 3, 11),
+            leave_type='sick', reason='Sakit', status='approved_hr',
+        )
+
+    def test_generates_payslip_in_bulk(self):
+        run_payroll(self.period)
+
+        payroll = Payroll.objects.get(employee=self.employee, period=self.period)
+        allowances = dict(
+            Allowance.objects.filter(employee=self.employee, period=self.period).values_list('name', 'amount')
+        )
+        deductions = dict(
+            Deduction.objects.filter(employee=self.employee, period=self.period).values_list('name', 'amount')
+        )
+
+        self.assertEqual(allowances['Tunjangan Tetap'], Decimal('200000'))
+        self.assertEqual(allowances['Borongan: Panen TBS (janjang)'], Decimal('150000'))
+        # 2 jam lembur x (100.000 / 8) x 1.5
+        self.assertEqual(allowances['Lembur'], Decimal('37500'))
+        self.assertEqual(deductions['Potongan Alfa'], Decimal('150000'))
+        self.assertEqual(deductions['Potongan Cuti Tanpa Bayar'], Decimal('200000'))
+        self.assertEqual(deductions['BPJS TK - JHT Karyawan'], Decimal('60000'))
+
+        self.assertEqual(payroll.total_allowance, Decimal('387500'))
+        self.assertEqual(payroll.total_deduction, Decimal('410000'))
+        self.assertEqual(payroll.net_salary, Decimal('2977500'))
+        self.assertEqual(payroll.tk_jht_company, Decimal('111000'))
+
+    def test_rerun_does_not_duplicate_rows(self):
+        run_payroll(self.period)
+        run_payroll(self.period)
+
+        self.assertEqual(Payroll.objects.filter(employee=self.employee, period=self.period).count(), 1)
+        self.assertEqual(Allowance.objects.filter(employee=self.employee, period=self.period).count(), 3)
+        self.assertEqual(Deduction.objects.filter(employee=self.employee, period=self.period).count(), 3)
+
+
+class PayrollJobQueueTest(TestCase):
+    def setUp(self):
+        self.period = PayrollPeriod.objects.create(
+            month=4, year=2025, start_date=date(2025, 4, 1), end_date=date(2025, 4, 30)
+        )
+        self.employees = [
+            Employee.objects.create(
+                name=f'Pemanen {i}', email=f'pemanen{i}@test.com',
+                basic_salary=Decimal('3000000'), default_allowance=Decimal('100000'),
+            )
+            for i in range(5)
+        ]
+
+    def test_enqueue_reuses_active_run(self):
+        run, created = enqueue_payroll_run(self.period)
+        again, created_again = enqueue_payroll_run(self.period)
+
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(run.pk, again.pk)
+        self.assertEqual(run.total_employees, 5)
+
+    def test_stale_run_resumes_without_duplicates(self):
+        run, _ = enqueue_payroll_run(self.period, chunk_size=2)
+        run = claim_next_run('worker-a')
+        self.assertTrue(process_next_chunk(run))
+
+        # Worker A "crashes": its heartbeat goes stale and worker B takes over.
+        PayrollRun.objects.filter(pk=run.pk).update(heartbeat_at=run.heartbeat_at - timedelta(hours=1))
+        resumed = claim_next_run('worker-b')
+        self.assertEqual(resumed.pk, run.pk)
+        self.assertEqual(resumed.processed_employees, 2)
+        # Worker A wakes up and reports a failure for a run it no longer owns.
+        self.assertFalse(_finish(run, PayrollRun.Status.FAILED, error='timeout'))
+
+        process_run(resumed)
+        resumed.refresh_from_db()
+
+        self.assertEqual(resumed.status, PayrollRun.Status.COMPLETED)
+        self.assertEqual(resumed.progress_percent, 100)
+        self.assertEqual(Payroll.objects.filter(period=self.period).count(), 5)
+        self.assertEqual(Allowance.objects.filter(period=self.period, name='Tunjangan Tetap').count(), 5)
+
+
+class AttendancePeriodSummaryTest(TestCase):
+    def setUp(self):
+        self.march = PayrollPeriod.objects.create(
+            month=3, year=2025, start_date=date(2025, 3, 1), end_date=date(2025, 3, 31)
+        )
+        self.april = PayrollPeriod.objects.create(
+            month=4, year=2025, start_date=date(2025, 4, 1), end_date=date(2025, 4, 30)
+        )
+        self.employee = Employee.objects.create(name='Pemanen', email='ringkasan@test.com')
+        self.borongan = Borongan.objects.create(
+            employee=self.employee, pekerjaan='Panen TBS', satuan='janjang', harga_borongan=Decimal('1500')
+        )
+
+    def summary(self, period):
+        return AttendancePeriodSummary.objects.get(employee=self.employee, period=period)
+
+    def test_summary_follows_attendance_changes(self):
+        att = Attendance.objects.create(
+            employee=self.employee, date=date(2025, 3, 3), status='present',
+            clock_in=time(7, 0), clock_out=time(16, 30), borongan=self.borongan, realisasi=Decimal('10'),
+        )
+        Attendance.objects.create(employee=self.employee, date=date(2025, 3, 4), status='half_day')
+
+        summary = self.summary(self.march)
+        self.assertEqual((summary.present_days, summary.half_days), (1, 1))
+        self.assertEqual(summary.overtime_minutes, 90)
+        self.assertEqual(summary.hasil_akhir, Decimal('15000'))
+        self.assertEqual(summary.alfa_days, Decimal('0.5'))
+
+        self.borongan.harga_borongan = Decimal('2000')
+        self.borongan.save()
+        self.assertEqual(self.summary(self.march).hasil_akhir, Decimal('20000'))
+
+        att.date = date(2025, 4, 1)
+        att.save()
+        self.assertEqual(self.summary(self.march).present_days, 0)
+        self.assertEqual(self.summary(self.april).present_days, 1)
+
+        att.delete()
+        self.assertFalse(AttendancePeriodSummary.objects.filter(period=self.april).exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class PayslipPDFCacheTest(TestCase):
+    def setUp(self):
+        self.period = PayrollPeriod.objects.create(
+            month=5, year=2025, start_date=date(2025, 5, 1), end_date=date(2025, 5, 31)
+        )
+        self.employee = Employee.objects.create(
+            name='Pemanen', email='slip@test.com', basic_salary=Decimal('3000000'), default_allowance=Decimal('50000'),
+        )
+        run_payroll(self.period)
+        self.payroll = Payroll.objects.get(employee=self.employee, period=self.period)
+
+    def context(self):
+        return {
+            'payroll': Payroll.objects.get(pk=self.payroll.pk),
+            'employee': self.employee,
+            'allowances': Allowance.objects.filter(employee=self.employee, period=self.period),
+            'deductions': Deduction.objects.filter(employee=self.employee, period=self.period),
+        }
+
+    def test_cached_pdf_is_reused_until_a_component_changes(self):
+        digest = payslip_cache.payslip_digest(self.context())
+        payslip_cache.store_pdf(self.payroll, digest, b'%PDF-1.7 test')
+
+        self.assertEqual(payslip_cache.payslip_digest(self.context()), digest)
+        self.assertIsNotNone(payslip_cache.get_cached_pdf(self.payroll, digest))
+
+        Allowance.objects.filter(employee=self.employee).first().save()
+        self.assertFalse(PayslipPDF.objects.exists())
+
+    def test_closed_period_served_from_store(self):
+        digest = payslip_cache.payslip_digest(self.context())
+        payslip_cache.store_pdf(self.payroll, digest, b'%PDF-1.7 test')
+        self.assertIsNone(payslip_cache.get_closed_period_pdf(self.employee.id, 5, 2025))
+
+        self.period.is_closed = True
+        self.period.save()
+        cached = payslip_cache.get_closed_period_pdf(self.employee.id, 5, 2025)
+        self.assertEqual(cached.pdf.read(), b'%PDF-1.7 test')
+
+
+class WorkCalendarTest(TestCase):
+    def setUp(self):
+        self.worker = Employee.objects.create(name='Budi', email='budi@example.com')
+        self.idle = Employee.objects.create(name='Sari', email='sari@example.com')
+        self.first = WorkRequest.objects.create(
+            employee=self.worker, title='Panen', start_date=date(2025, 2, 26), end_date=date(2025, 3, 3)
+        )
+        self.second = WorkRequest.objects.create(
+            employee=self.worker, title='Pupuk', start_date=date(2025, 3, 3), end_date=date(2025, 3, 5)
+        )
+
+    def test_spans_and_bitmap(self):
+        calendar = build_work_calendar(date(2025, 3, 1), date(2025, 3, 7), [self.worker, self.idle])
+
+        spans = calendar.busy_spans(self.worker.id)
+        self.assertEqual(
+            [(s.start_date, s.length, s.work_request) for s in spans],
+            [(date(2025, 3, 1), 2, self.first), (date(2025, 3, 3), 3, self.second)],
+        )
+        self.assertEqual(calendar.occupancy(self.worker.id), 0b0011111)
+        self.assertTrue(calendar.is_busy(self.worker.id, date(2025, 3, 5)))
+        self.assertFalse(calendar.is_busy(self.worker.id, date(2025, 3, 6)))
+        self.assertEqual(calendar.busy_day_count(self.worker.id), 5)
+
+        self.assertFalse(calendar.is_busy(self.idle.id))
+        self.assertEqual([(s.length, s.is_busy) for s in calendar.spans(self.idle.id)], [(7, False)])
+        self.assertEqual(len(list(calendar.day_entries(self.worker.id))), 7)
+
+
+class WorkRequestAvailabilityTest(TestCase):
+    def setUp(self):
+        self.busy = Employee.objects.create(name='Budi', email='budi@example.com')
+        self.free = Employee.objects.create(name='Sari', email='sari@example.com')
+        for employee in (self.busy, self.free):
+            Borongan.objects.create(
+                employee=employee, pekerjaan='Panen TBS', satuan='kg', harga_borongan=Decimal('150')
+            )
+        self.request = WorkRequest.objects.create(
+            employee=self.busy, title='Panen', start_date=date(2025, 3, 1), end_date=date(2025, 3, 3)
+        )
+
+    def test_day_rows_follow_work_request(self):
+        self.assertEqual(self.request.days.count(), 3)
+        self.request.end_date = date(2025, 3, 5)
+        self.request.save()
+        self.assertEqual(availability.busy_employee_ids(date(2025, 3, 5)), {self.busy.id})
+        self.assertEqual(availability.rebuild_request_days(), 5)
+        self.request.delete()
+        self.assertFalse(WorkRequestDay.objects.exists())
+
+    def test_free_workers(self):
+        self.assertEqual(availability.busy_employee_ids(date(2025, 2, 25), date(2025, 3, 1)), {self.busy.id})
+        self.assertEqual(
+            list(availability.first_free_workers(date(2025, 3, 2), skill='panen')), [self.free]
+        )
+        self.assertEqual(
+            list(availability.first_free_workers(date(2025, 3, 4), date(2025, 3, 10), skill='panen')),
+            [self.busy, self.free],
+        )
+        self.assertEqual(list(availability.first_free_workers(date(2025, 3, 4), skill='pupuk')), [])
+
+
+@override_settings(APP_SECRET_KEY='test-key')
+class AttendanceBulkUpsertTest(TestCase):
+    def setUp(self):
+        self.period = PayrollPeriod.objects.create(
+            month=3, year=2025, start_date=date(2025, 3, 1), end_date=date(2025, 3, 31)
+        )
+        company = Company.objects.create(name='Kebun Sawit')
+        Employee.objects.create(name='Checker', email='checker@example.com', company=company)
+        self.worker = Employee.objects.create(name='Budi', email='budi@example.com', company=company)
+        self.other = Employee.objects.create(name='Sari', email='sari@example.com', company=company)
+        self.foreign = Employee.objects.create(
+            name='Joko', email='joko@example.com', company=Company.objects.create(name='Kebun Lain')
+        )
+        self.borongan = Borongan.objects.create(
+            employee=self.worker, pekerjaan='Panen TBS', satuan='kg', harga_borongan=Decimal('150')
+        )
+        Attendance.objects.create(employee=self.worker, date=date(2025, 3, 3), status=Attendance.Status.LATE)
+
+    def post(self, body, content_type, email='checker@example.com'):
+        return self.client.post(
+            '/api/mitra/attendance/bulk/', body, content_type=content_type,
+            HTTP_X_APP_KEY='test-key', HTTP_X_EMAIL=email,
+        )
+
+    def test_upsert_validates_in_memory_and_rebuilds_summary(self):
+        results = upsert_attendance([
+            {'employee': self.worker.id, 'date': date(2025, 3, 3), 'status': 'present',
+             'borongan': self.borongan.id, 'realisasi': Decimal('10')},
+            {'employee': self.worker.id, 'date': date(2025, 3, 4), 'status': 'absent'},
+            {'employee': self.other.id, 'date': date(2025, 3, 4), 'borongan': self.borongan.id},
+            {'employee': self.worker.id, 'date': date(2025, 4, 1)},
+            {'employee': self.worker.id, 'date': date(2025, 3, 4)},
+        ])
+
+        self.assertEqual(
+            [result['result'] for result in results], ['updated', 'created', 'error', 'error', 'error']
+        )
+        self.assertIn('borongan', results[2]['errors'])
+        self.assertIn('date', results[3]['errors'])
+        self.assertIn('non_field_errors', results[4]['errors'])
+
+        summary = AttendancePeriodSummary.objects.get(employee=self.worker, period=self.period)
+        self.assertEqual((summary.present_days, summary.late_days, summary.absent_days), (1, 0, 1))
+        self.assertEqual(summary.hasil_akhir, Decimal('1500'))
+
+    def test_csv_endpoint(self):
+        body = (
+            f'employee,date,clock_in,status\n{self.other.id},2025-03-05,07:00,late\n{self.other.id},bad,,present\n'
+            f'{self.foreign.id},2025-03-05,07:00,present\n'
+        )
+        response = self.post(body, 'text/csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['errors']), (1, 2))
+        self.assertIn('date', response.data['results'][1]['errors'])
+        self.assertIn('employee', response.data['results'][2]['errors'])
+        self.assertTrue(Attendance.objects.filter(employee=self.other, status='late').exists())
+        self.assertFalse(Attendance.objects.filter(employee=self.foreign).exists())
+
+    def test_endpoint_requires_a_known_checker(self):
+        body = f'employee,date\n{self.other.id},2025-03-05\n'
+        self.assertEqual(self.post(body, 'text/csv', email='asing@example.com').status_code, 403)
+        self.assertFalse(Attendance.objects.filter(employee=self.other).exists())
+
+    def test_ndjson_that_is_not_utf8_is_rejected(self):
+        self.assertEqual(self.post(b'\xff\xfe{}\n', 'application/x-ndjson').status_code, 400)
@@ -10,6 +10,7 @@ urlpatterns = [
     path('deduction/add/', penggajian.add_deduction, name='add_deduction'),
     path('periods/', penggajian.payroll_period_list, name='payroll_period_list'),
     path('periods/<int:period_id>/generate/', penggajian.generate_payroll, name='generate_payroll'),
+    path('runs/<int:run_id>/status/', penggajian.payroll_run_status, name='payroll_run_status'),
     path('periods/<int:period_id>/close/', penggajian.close_period, name='close_period'),
     path('payrolls/', penggajian.payroll_list, name='payroll_list'),
     path('payrolls/<int:pk>/', penggajian.payroll_detail, name='payroll_detail'),
@@ -30,6 +31,7 @@ urlpatterns = [
     path('payslip/', payslip.payslip_select, name='payslip_select'),
     path('payslip/<int:employee_id>/<int:month>/<int:year>/', payslip.payslip_preview, name='payslip_preview'),
     path('payslip/<int:employee_id>/<int:month>/<int:year>/pdf/', payslip.payslip_pdf, name='payslip_pdf'),
+    path('periods/<int:period_id>/payslips/export/', payslip.payslip_period_export, name='payslip_period_export'),
    
     # absensi and cuti
     path('absensi-harian/', absensi.absensi_harian, name='absensi_harian'),
@@ -5,6 +5,7 @@ from decimal import Decimal
 from datetime import date, timedelta
 from apps.core.models import Employee, Borongan
 from ..models import Payroll, PayrollPeriod, Allowance, Deduction, BPJSConfig, Attendance, LeaveRequest, WorkRequest
+from ..services.work_calendar import WorkCalendar
 from ..forms import (
     AllowanceForm, DeductionForm, PayrollPeriodForm,
     BPJSTKForm, BPJSTKJPForm, BPJSKesehatanForm, PajakForm,
@@ -20,40 +21,8 @@ from django.template.loader import render_to_string
 def absensi_harian(request):
     """Absensi harian: form clock in/out, list attendance."""
     
-    # Debug: Print user information
-    print(f"=== USER DEBUG INFO ===")
-    print(f"User: {request.user}")
-    print(f"User ID: {request.user.id}")
-    print(f"Username: {request.user.username}")
-    print(f"Email: {request.user.email}")
-    print(f"Is Owner: {getattr(request.user, 'is_owner', False)()}")
-    person = getattr(request.user, 'person', None)
-    is_supervisor = bool(person and person.subordinates.exists())
-    print(f"Is Supervisor: {is_supervisor}")
-    print(f"Is Staff: {request.user.is_staff}")
-    print(f"Is Superuser: {request.user.is_superuser}")
-    
-    # Check if user has person
-    try:
-        person = request.user.person
-        print(f"Has Person: YES")
-        print(f"Person: {person}")
-        print(f"Person Name: {person.name if hasattr(person, 'name') else 'N/A'}")
-        print(f"Person Company: {person.company if hasattr(person, 'company') else 'N/A'}")
-    except AttributeError:
-        print(f"Has Person: NO")
-        person = None
-    
-    # Check if person is employee
-    if person and hasattr(person, 'employee'):
-        print(f"Is Employee: YES")
-        print(f"Employee: {person.employee}")
-        print(f"Employee Position: {person.employee.position if person.employee.position else 'N/A'}")
-    else:
-        print(f"Is Employee: NO")
-    
-    print(f"========================")
-    
+    role = request.user_role
+
     # Temukan periode penggajian yang aktif untuk membatasi input tanggal
     open_periods = PayrollPeriod.objects.filter(is_closed=False)
     min_date, max_date = None, None
@@ -112,7 +81,7 @@ def absensi_harian(request):
     # Debug information
     debug_info = {
         'user': request.user,
-        'is_owner': getattr(request.user, 'is_owner', False),
+        'is_owner': role.is_owner,
         'has_person': person is not None,
         'person': person,
     }
@@ -131,10 +100,9 @@ def absensi_harian(request):
     
     if person:
         debug_info['person_subordinates'] = list(person.subordinates.all())
-        debug_info['is_supervisor'] = person.subordinates.exists()
     else:
         debug_info['person_subordinates'] = []
-        debug_info['is_supervisor'] = False
+    debug_info['is_supervisor'] = role.is_supervisor
 
     # Ambil semua opsi borongan untuk dropdown
     borongan_options = Borongan.objects.all().select_related('employee')
@@ -186,189 +154,52 @@ def get_borongan_by_employee(request):
 def riwayat_absensi(request):
     """View for displaying attendance history."""
     
-    print(f"\n=== RIWAYAT ABSENSI DEBUG ===")
-    print(f"User: {request.user}")
-    
     # Get filter parameters
     selected_employee_id = request.GET.get('employee')
     selected_month = request.GET.get('month')
     selected_year = request.GET.get('year')
     
-    print(f"Filters - Employee: {selected_employee_id}, Month: {selected_month}, Year: {selected_year}")
-    
     # Get current user's person
     person = getattr(request.user, 'person', None)
-    is_owner = getattr(request.user, 'is_owner', False)
-    is_owner = is_owner() if callable(is_owner) else is_owner
-    
-    print(f"Person: {person}")
-    print(f"Is Owner: {is_owner}")
-    
-    if person:
-        print(f"Person has subordinates: {person.subordinates.exists()}")
-        if person.subordinates.exists():
-            print(f"Direct subordinates: {list(person.subordinates.all())}")
+    role = request.user_role
+    is_owner = role.is_owner
     
     # Owner bisa mengakses seluruh riwayat absensi
     if is_owner:
-        print("Branch: OWNER - FULL ACCESS")
         # Owner sees all attendance records
         attendances = Attendance.objects.select_related('employee', 'borongan').order_by('-date')
         
         # Apply filters if provided
         if selected_employee_id:
             attendances = attendances.filter(employee__id=selected_employee_id)
-            print(f"Filtered by employee: {selected_employee_id}")
         
         if selected_month and selected_year:
             attendances = attendances.filter(date__month=selected_month, date__year=selected_year)
-            print(f"Filtered by month/year: {selected_month}/{selected_year}")
-            
-        print(f"Attendances count: {attendances.count()}")
     elif person:
-        print("Branch: HAS PERSON")
-        # Check if person is an employee (supervisor or regular employee)
-        has_employee = hasattr(person, 'employee')
-        print(f"Has employee attribute: {has_employee}")
-        
-        if has_employee:
-            print("Sub-branch: PERSON IS EMPLOYEE")
-            # Person is an employee - can be supervisor or regular employee
-            employee = person.employee
-            
-            # Get all subordinates recursively
-            def get_descendants(emp):
-                descendants = set()
-                direct_subs = emp.subordinates.all()
-                print(f"Direct subordinates of {emp.name}: {list(direct_subs)}")
-                for sub in direct_subs:
-                    descendants.add(sub.id)
-                    descendants.update(get_descendants(sub))
-                return descendants
-            
-            subordinate_ids = get_descendants(employee)
-            # Include self for supervisor and regular employee
-            allowed_ids = subordinate_ids | {employee.id}
-            
-            print(f"Allowed employee IDs: {allowed_ids}")
-            
-            # Build attendance query with filters
-            attendances = Attendance.objects.filter(
-                employee__id__in=allowed_ids
-            ).select_related('employee', 'borongan').order_by('-date')
-            
-            # Apply filters if provided
-            if selected_employee_id:
-                attendances = attendances.filter(employee__id=selected_employee_id)
-                print(f"Filtered by employee: {selected_employee_id}")
-            
-            if selected_month and selected_year:
-                attendances = attendances.filter(date__month=selected_month, date__year=selected_year)
-                print(f"Filtered by month/year: {selected_month}/{selected_year}")
-                
-        else:
-            print("Sub-branch: PERSON WITHOUT EMPLOYEE RECORD")
-            # Person without employee record - supervisor yang hanya Person
-            # Include self if exists as Employee
-            allowed_ids = set()
-            
-            # Check if person exists as employee (by same ID)
-            try:
-                self_employee = Employee.objects.get(id=person.id)
-                allowed_ids.add(self_employee.id)
-                print(f"Found self as employee: {self_employee.id} - {self_employee.name}")
-            except Employee.DoesNotExist:
-                print("Self not found as employee")
-            
-            # Get all person subordinates and check if they're employees
-            person_subordinates = person.subordinates.all()
-            print(f"Person subordinates: {list(person_subordinates)}")
-            
-            for subordinate in person_subordinates:
-                print(f"  Checking subordinate: {subordinate}")
-                # Check if this person is also an employee
-                if hasattr(subordinate, 'employee'):
-                    allowed_ids.add(subordinate.employee.id)
-                    print(f"    Found as employee via attribute: {subordinate.employee.id}")
-                else:
-                    # Person subordinate might have the same ID as Employee
-                    try:
-                        emp = Employee.objects.get(id=subordinate.id)
-                        allowed_ids.add(emp.id)
-                        print(f"    Found as employee by ID: {emp.id} - {emp.name}")
-                    except Employee.DoesNotExist:
-                        print(f"    Not found as employee")
-            
-            print(f"Final allowed employee IDs: {allowed_ids}")
-            
-            if allowed_ids:
-                attendances = Attendance.objects.filter(
-                    employee__id__in=allowed_ids
-                ).select_related('employee', 'borongan').order_by('-date')
-                
-                # Apply filters if provided
-                if selected_employee_id:
-                    attendances = attendances.filter(employee__id=selected_employee_id)
-                    print(f"Filtered by employee: {selected_employee_id}")
-                
-                if selected_month and selected_year:
-                    attendances = attendances.filter(date__month=selected_month, date__year=selected_year)
-                    print(f"Filtered by month/year: {selected_month}/{selected_year}")
-                    
-                print(f"Attendances count: {attendances.count()}")
-            else:
-                attendances = Attendance.objects.none()
-                print("No allowed IDs - empty queryset")
+        # Supervisor sees themselves and every employee below them
+        allowed_ids = role.visible_employee_ids
+
+        attendances = Attendance.objects.filter(
+            employee__id__in=allowed_ids
+        ).select_related('employee', 'borongan').order_by('-date')
+
+        # Apply filters if provided
+        if selected_employee_id:
+            attendances = attendances.filter(employee__id=selected_employee_id)
+
+        if selected_month and selected_year:
+            attendances = attendances.filter(date__month=selected_month, date__year=selected_year)
     else:
-        print("Branch: NO PERSON - NO ACCESS")
         # No person record - no access
         attendances = Attendance.objects.none()
         messages.error(request, 'Profil karyawan tidak ditemukan. Tidak dapat mengakses riwayat absensi.')
 
-    print(f"Final attendances count: {attendances.count()}")
-    print(f"===========================\n")
-
     # Get available employees for filter dropdown
     if is_owner:
         # Owner sees all employees
         available_employees = Employee.objects.filter(is_active=True).order_by('name')
-    elif person and hasattr(person, 'employee'):
-        employee = person.employee
-        subordinate_ids = set()
-        direct_subs = employee.subordinates.all()
-        for sub in direct_subs:
-            subordinate_ids.add(sub.id)
-            # Get recursive subordinates
-            def get_recursive_descendants(emp):
-                descendants = set()
-                for sub_emp in emp.subordinates.all():
-                    descendants.add(sub_emp.id)
-                    descendants.update(get_recursive_descendants(sub_emp))
-                return descendants
-            subordinate_ids.update(get_recursive_descendants(sub))
-        
-        allowed_ids = subordinate_ids | {employee.id}
-        available_employees = Employee.objects.filter(id__in=allowed_ids).order_by('name')
     elif person:
-        # Person without employee record
-        allowed_ids = set()
-        try:
-            self_employee = Employee.objects.get(id=person.id)
-            allowed_ids.add(self_employee.id)
-        except Employee.DoesNotExist:
-            pass
-        
-        for subordinate in person.subordinates.all():
-            if hasattr(subordinate, 'employee'):
-                allowed_ids.add(subordinate.employee.id)
-            else:
-                try:
-                    emp = Employee.objects.get(id=subordinate.id)
-                    allowed_ids.add(emp.id)
-                except Employee.DoesNotExist:
-                    pass
-        
-        available_employees = Employee.objects.filter(id__in=allowed_ids).order_by('name')
+        available_employees = Employee.objects.filter(id__in=role.visible_employee_ids).order_by('name')
     else:
         available_employees = Employee.objects.none()
 
@@ -474,8 +305,8 @@ class WorkCalendarView(TemplateView):
 
         # Filter employees based on user role (similar to other views)
         person = getattr(self.request.user, 'person', None)
-        is_owner_attr = getattr(self.request.user, 'is_owner', False)
-        is_owner = is_owner_attr() if callable(is_owner_attr) else is_owner_attr
+        role = self.request.user_role
+        is_owner = role.is_owner
         
         print(f"Work Calendar - Is Owner: {is_owner}, Person: {person}")
         
@@ -484,69 +315,11 @@ class WorkCalendarView(TemplateView):
             employees = Employee.objects.filter(is_active=True).order_by('name')
             print("Work Calendar - Owner sees all employees")
         elif person:
-            # Check if person is an employee (supervisor or regular employee)
-            has_employee = hasattr(person, 'employee')
-            print(f"Work Calendar - Has employee attribute: {has_employee}")
-            
-            if has_employee:
-                # Person is an employee - can be supervisor or regular employee
-                employee = person.employee
-                
-                # Get all subordinates recursively
-                def get_descendants(emp):
-                    descendants = set()
-                    direct_subs = emp.subordinates.all()
-                    print(f"Direct subordinates of {emp.name}: {list(direct_subs)}")
-                    for sub in direct_subs:
-                        descendants.add(sub.id)
-                        descendants.update(get_descendants(sub))
-                    return descendants
-                
-                subordinate_ids = get_descendants(employee)
-                # Include self for supervisor and regular employee
-                allowed_ids = subordinate_ids | {employee.id}
-                
-                print(f"Work Calendar - Allowed employee IDs: {allowed_ids}")
-                employees = Employee.objects.filter(
-                    id__in=allowed_ids,
-                    is_active=True
-                ).order_by('name')
-                print(f"Work Calendar - Employees count: {employees.count()}")
-            else:
-                # Person without employee record - supervisor yang hanya Person
-                allowed_ids = set()
-                
-                # Check if person exists as employee (by same ID)
-                try:
-                    self_employee = Employee.objects.get(id=person.id)
-                    allowed_ids.add(self_employee.id)
-                    print(f"Work Calendar - Found self as employee: {self_employee.id}")
-                except Employee.DoesNotExist:
-                    print("Work Calendar - Self not found as employee")
-                
-                # Get all person subordinates and check if they're employees
-                person_subordinates = person.subordinates.all()
-                print(f"Work Calendar - Person subordinates: {list(person_subordinates)}")
-                
-                for subordinate in person_subordinates:
-                    if hasattr(subordinate, 'employee'):
-                        allowed_ids.add(subordinate.employee.id)
-                    else:
-                        try:
-                            emp = Employee.objects.get(id=subordinate.id)
-                            allowed_ids.add(emp.id)
-                        except Employee.DoesNotExist:
-                            pass
-                
-                print(f"Work Calendar - Final allowed employee IDs: {allowed_ids}")
-                
-                if allowed_ids:
-                    employees = Employee.objects.filter(
-                        id__in=allowed_ids,
-                        is_active=True
-                    ).order_by('name')
-                else:
-                    employees = Employee.objects.none()
+            # Supervisor sees themselves and every employee below them
+            employees = Employee.objects.filter(
+                id__in=role.visible_employee_ids,
+                is_active=True
+            ).order_by('name')
         else:
             # No person record - no access
             employees = Employee.objects.none()
@@ -562,21 +335,18 @@ class WorkCalendarView(TemplateView):
             .order_by('employee__name', 'start_date')
         )
 
-        request_map = {}
-        for wr in work_requests:
-            for date in date_range:
-                if wr.covers_date(date):
-                    request_map[(wr.employee_id, date)] = wr
+        employees = list(employees)
+        work_calendar = WorkCalendar(
+            active_period.start_date, active_period.end_date,
+            [employee.id for employee in employees], work_requests,
+        )
 
         calendar_data = []
         for employee in employees:
-            days = {}
-            for current_date in date_range:
-                work_request = request_map.get((employee.id, current_date))
-                days[current_date] = work_request
             calendar_data.append({
                 'employee': employee,
-                'days': days,
+                'spans': work_calendar.spans(employee.id),
+                'status': 'sibuk' if work_calendar.is_busy(employee.id) else 'available',
             })
 
         context['date_range'] = date_range
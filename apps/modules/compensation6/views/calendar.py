@@ -6,6 +6,7 @@ from datetime import date, timedelta
 from django.core.cache import cache
 from apps.core.models import Employee, Borongan
 from ..models import Payroll, PayrollPeriod, Allowance, Deduction, BPJSConfig, Attendance, LeaveRequest, WorkRequest
+from ..services.work_calendar import WorkCalendar
 from ..forms import WorkRequestForm
 from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.template.loader import render_to_string
@@ -70,25 +71,21 @@ class WorkCalendarView(TemplateView):
         )
         
         # Filter out pending requests (only show approved ones)
-        pending_ids = cache.get('pending_work_requests', [])
+        pending_ids = get_pending_ids()
         work_requests = all_work_requests.exclude(id__in=pending_ids)
 
-        request_map = {}
-        for wr in work_requests:
-            for date in date_range:
-                if wr.covers_date(date):
-                    request_map[(wr.employee_id, date)] = wr
+        employees = list(employees)
+        work_calendar = WorkCalendar(
+            active_period.start_date, active_period.end_date,
+            [employee.id for employee in employees], work_requests,
+        )
 
         calendar_data = []
         for employee in employees:
-            days = {}
-            for current_date in date_range:
-                work_request = request_map.get((employee.id, current_date))
-                days[current_date] = work_request
             calendar_data.append({
                 'employee': employee,
-                'days': days,
-                'status': 'available' if not any(days.values()) else 'sibuk',
+                'spans': work_calendar.spans(employee.id),
+                'status': 'sibuk' if work_calendar.is_busy(employee.id) else 'available',
             })
 
         context['date_range'] = date_range
@@ -155,33 +152,36 @@ class WorkCalendarView(TemplateView):
 
 
 # Helper functions for approval system (without modifying model)
+# The list lives in the shared cache (CACHES) so every worker sees it.
+PENDING_KEY = 'compensation6:pending_work_requests'
+PENDING_TIMEOUT = 3600
+
+
+def get_pending_ids():
+    return cache.get(PENDING_KEY, [])
+
+
 def get_pending_requests():
-    """Get pending work requests from session or database"""
-    from django.core.cache import cache
-    pending_ids = cache.get('pending_work_requests', [])
-    return WorkRequest.objects.filter(id__in=pending_ids)
+    """Get pending work requests from the shared cache"""
+    return WorkRequest.objects.filter(id__in=get_pending_ids())
 
 def add_to_pending(work_request):
     """Add work request to pending list"""
-    from django.core.cache import cache
-    pending_ids = cache.get('pending_work_requests', [])
+    pending_ids = get_pending_ids()
     if work_request.id not in pending_ids:
         pending_ids.append(work_request.id)
-        cache.set('pending_work_requests', pending_ids, timeout=3600)  # 1 hour timeout
+        cache.set(PENDING_KEY, pending_ids, timeout=PENDING_TIMEOUT)
 
 def remove_from_pending(work_request_id):
     """Remove work request from pending list"""
-    from django.core.cache import cache
-    pending_ids = cache.get('pending_work_requests', [])
+    pending_ids = get_pending_ids()
     if work_request_id in pending_ids:
         pending_ids.remove(work_request_id)
-        cache.set('pending_work_requests', pending_ids, timeout=3600)
+        cache.set(PENDING_KEY, pending_ids, timeout=PENDING_TIMEOUT)
 
 def is_pending(work_request_id):
     """Check if work request is pending"""
-    from django.core.cache import cache
-    pending_ids = cache.get('pending_work_requests', [])
-    return work_request_id in pending_ids
+    return work_request_id in get_pending_ids()
 
 
 @login_required
@@ -13,42 +13,23 @@ from ..forms import (
     PayslipSelectionForm,
     AttendanceForm, LeaveRequestForm
 )
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.http import FileResponse, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.template.loader import render_to_string
+from ..services import payslip_cache
+from ..services.attendance_summary import get_summary
+from ..services.payroll_engine import get_bpjs_config
+from ..services.payslip_export import build_payslip_context, stream_period_zip
 
 
 
 def _get_payroll_bundle(employee_id, month, year):
     period = get_object_or_404(PayrollPeriod, month=month, year=year)
     employee = get_object_or_404(Employee, id=employee_id)
-    payroll = get_object_or_404(Payroll, employee=employee, period=period)
+    payroll = get_object_or_404(Payroll.objects.select_related('employee', 'period'), employee=employee, period=period)
     allowances = Allowance.objects.filter(employee=employee, period=period)
     deductions = Deduction.objects.filter(employee=employee, period=period)
-    cfg = BPJSConfig.objects.first()
-    # employer contributions
-    base = Decimal(payroll.basic_salary or 0)
-    tk_jkk_company = tk_jkm_company = tk_jht_company = tk_jp_company = jkn_company = Decimal('0.00')
-    if cfg and base > 0:
-        tk_jkk_company = (base * Decimal(cfg.com_jkk_pct or 0) / Decimal('100'))
-        tk_jkm_company = (base * Decimal(cfg.com_jkm_pct or 0) / Decimal('100'))
-        tk_jht_company = (base * Decimal(cfg.com_jht_pct or 0) / Decimal('100'))
-        tk_jp_company = (base * Decimal(cfg.com_jp_pct or 0) / Decimal('100'))
-        jkn_company = (base * Decimal(cfg.com_jkn_pct or 0) / Decimal('100'))
-    total_employer_contrib = tk_jkk_company + tk_jkm_company + tk_jht_company + tk_jp_company + jkn_company
-    ctx = {
-        'payroll': payroll,
-        'allowances': allowances,
-        'deductions': deductions,
-        'period': period,
-        'employee': employee,
-        'tk_jkk_company': tk_jkk_company,
-        'tk_jkm_company': tk_jkm_company,
-        'tk_jht_company': tk_jht_company,
-        'tk_jp_company': tk_jp_company,
-        'jkn_company': jkn_company,
-        'total_employer_contrib': total_employer_contrib,
-    }
-    return ctx
+    cfg = get_bpjs_config()
+    return build_payslip_context(payroll, allowances, deductions, cfg, get_summary(employee, period))
 
 
 def payslip_preview(request, employee_id, month, year):
@@ -59,16 +40,31 @@ def payslip_preview(request, employee_id, month, year):
     return render(request, 'compensation6/payslip_pdf.html', {**ctx, 'preview': True})
 
 
+def _pdf_response(pdf_file, employee, month, year):
+    filename = f"slip_borongan_{employee.name}_{int(month):02d}-{year}.pdf"
+    return FileResponse(pdf_file, as_attachment=True, filename=filename, content_type='application/pdf')
+
+
 def payslip_pdf(request, employee_id, month, year):
     print(f"PDF Request - Employee: {employee_id}, Month: {month}, Year: {year}")
-    
+
+    # Periode yang sudah ditutup tidak berubah lagi: langsung kirim file tersimpan.
+    cached = payslip_cache.get_closed_period_pdf(employee_id, month, year)
+    if cached and cached.pdf.storage.exists(cached.pdf.name):
+        return _pdf_response(cached.pdf.open('rb'), cached.payroll.employee, month, year)
+
     try:
         ctx = _get_payroll_bundle(employee_id, month, year)
         print(f"Context loaded for employee: {ctx['employee'].name}")
     except Exception as e:
         print(f"Context error: {e}")
         return HttpResponseBadRequest(str(e))
-    
+
+    digest = payslip_cache.payslip_digest(ctx)
+    cached = payslip_cache.get_cached_pdf(ctx['payroll'], digest)
+    if cached:
+        return _pdf_response(cached.pdf.open('rb'), ctx['employee'], month, year)
+
     # Use clean template for PDF (no layout, no navigation)
     html = render_to_string('compensation6/payslip_pdf_clean.html', {**ctx, 'preview': False}, request=request)
     print(f"HTML rendered, length: {len(html)}")
@@ -77,12 +73,8 @@ def payslip_pdf(request, employee_id, month, year):
         from weasyprint import HTML
         pdf = HTML(string=html).write_pdf()
         print(f"PDF generated, size: {len(pdf)} bytes")
-        
-        response = HttpResponse(pdf, content_type='application/pdf')
-        filename = f"slip_borongan_{ctx['employee'].name}_{int(month):02d}-{year}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        print(f"Returning PDF with filename: {filename}")
-        return response
+        cached = payslip_cache.store_pdf(ctx['payroll'], digest, pdf)
+        return _pdf_response(cached.pdf.open('rb'), ctx['employee'], month, year)
     except Exception as e:
         print(f"WeasyPrint error: {e}")
         import traceback
@@ -93,18 +85,6 @@ def payslip_pdf(request, employee_id, month, year):
 
 # Payslip: select and preview
 def payslip_select(request):
-    print(f"\n=== PAYSLIP VIEW DEBUG ===")
-    print(f"Request user: {request.user}")
-    person = getattr(request.user, 'person', None)
-    print(f"Person: {person}")
-    
-    if person:
-        print(f"Person has subordinates: {person.subordinates.exists()}")
-        if person.subordinates.exists():
-            print(f"Direct subordinates: {list(person.subordinates.all())}")
-    
-    print(f"===========================\n")
-    
     form = PayslipSelectionForm(request.POST or None, user=request.user)
 
     if request.method == 'POST' and form.is_valid():
@@ -113,3 +93,20 @@ def payslip_select(request):
         year = form.cleaned_data['year']
         return redirect('compensation6:payslip_preview', employee_id=emp_id, month=month, year=year)
     return render(request, 'compensation6/payslip_form.html', {'form': form})
+
+
+def payslip_period_export(request, period_id):
+    """Stream every payslip of a period as a ZIP.
+
+    The merged PDF of a whole period is produced offline with the
+    ``export_payslips --format pdf`` command, not inside a web request.
+    """
+    period = get_object_or_404(PayrollPeriod, id=period_id)
+    fmt = request.GET.get('format', 'zip')
+    if fmt != 'zip':
+        return HttpResponseBadRequest(f"Format tidak dikenal: {fmt}")
+
+    basename = f"slip_borongan_{int(period.month):02d}-{period.year}"
+    response = StreamingHttpResponse(stream_period_zip(period), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{basename}.zip"'
+    return response
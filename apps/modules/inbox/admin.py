@@ -5,7 +5,15 @@ from .models import ChatMessage, ChatThread
 
 @admin.register(ChatThread)
 class ChatThreadAdmin(admin.ModelAdmin):
-    list_display = ["id", "admin", "supervisor", "subject", "updated_at"]
+    list_display = [
+        "id",
+        "admin",
+        "supervisor",
+        "subject",
+        "last_message_at",
+        "admin_unread",
+        "supervisor_unread",
+    ]
     list_filter = ["admin", "supervisor"]
     search_fields = [
         "subject",
@@ -14,6 +22,15 @@ class ChatThreadAdmin(admin.ModelAdmin):
         "supervisor__name",
     ]
     autocomplete_fields = ["admin", "supervisor"]
+    readonly_fields = [
+        "last_message_id",
+        "last_message_at",
+        "last_message_preview",
+        "admin_read_id",
+        "supervisor_read_id",
+        "admin_unread",
+        "supervisor_unread",
+    ]
 
 
 @admin.register(ChatMessage)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InboxConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.modules.inbox'
+
+    def ready(self):
+        from . import signals
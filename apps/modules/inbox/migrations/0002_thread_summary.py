@@ -0,0 +1,68 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:38
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Replace, Substr
+
+
+def backfill_thread_summary(apps, schema_editor):
+    ChatThread = apps.get_model('inbox', 'ChatThread')
+    ChatMessage = apps.get_model('inbox', 'ChatMessage')
+    last = ChatMessage.objects.filter(thread=OuterRef('pk')).order_by('-id')
+    # Line breaks become spaces; new messages get the fully normalised preview.
+    preview = Replace(Replace(Substr('content', 1, 140), Value('\r\n'), Value(' ')), Value('\n'), Value(' '))
+    ChatThread.objects.update(
+        last_message_id=Subquery(last.values('id')[:1]),
+        last_message_at=Subquery(last.values('created_at')[:1]),
+        last_message_preview=Coalesce(Subquery(last.annotate(preview=preview).values('preview')[:1]), Value('')),
+    )
+    # Existing history counts as read; badges start with the next message.
+    ChatThread.objects.filter(last_message_id__isnull=False).update(
+        admin_read_id=F('last_message_id'), supervisor_read_id=F('last_message_id')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatthread',
+            name='admin_read_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='admin_unread',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='last_message_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='last_message_preview',
+            field=models.CharField(blank=True, max_length=140),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='supervisor_read_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='supervisor_unread',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_thread_summary, migrations.RunPython.noop),
+    ]
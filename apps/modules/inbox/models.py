@@ -33,6 +33,16 @@ class ChatThread(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Maintained by apps.modules.inbox.services on every new message so the
+    # thread list never has to load messages.
+    last_message_id = models.BigIntegerField(null=True, blank=True)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_preview = models.CharField(max_length=140, blank=True)
+    admin_read_id = models.BigIntegerField(default=0)
+    supervisor_read_id = models.BigIntegerField(default=0)
+    admin_unread = models.PositiveIntegerField(default=0)
+    supervisor_unread = models.PositiveIntegerField(default=0)
+
     class Meta:
         ordering = ["-updated_at"]
         constraints = [
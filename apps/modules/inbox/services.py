@@ -0,0 +1,89 @@
+"""Thread summaries and message paging for the inbox.
+
+``message_created`` (post_save of ChatMessage) copies the new message's time
+and a preview onto its thread and bumps the other participant's unread
+counter in one UPDATE, so the thread list reads columns instead of
+prefetching every message. ``mark_read`` moves a participant's read marker
+and recounts what is left.
+
+Messages of the open thread are paged by id (keyset): ``messages_before``
+gives the latest page or an older one, ``messages_after`` the new messages a
+polling client has not seen yet.
+"""
+from typing import List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils.text import Truncator
+
+from .models import ChatMessage, ChatThread
+
+ADMIN = "admin"
+SUPERVISOR = "supervisor"
+PARTICIPANTS = {
+    ADMIN: ("admin_read_id", "admin_unread"),
+    SUPERVISOR: ("supervisor_read_id", "supervisor_unread"),
+}
+SENDER_FIELDS = {ADMIN: "sender_admin", SUPERVISOR: "sender_supervisor"}
+
+PREVIEW_LENGTH = 140
+PAGE_SIZE = 30
+
+
+def preview(content: str) -> str:
+    return Truncator(" ".join((content or "").split())).chars(PREVIEW_LENGTH)
+
+
+def message_created(message: ChatMessage) -> None:
+    values = {
+        "last_message_id": message.pk,
+        "last_message_at": message.created_at,
+        "last_message_preview": preview(message.content),
+        "updated_at": message.created_at,
+    }
+    if message.sender_admin_id:
+        values["supervisor_unread"] = F("supervisor_unread") + 1
+    else:
+        values["admin_unread"] = F("admin_unread") + 1
+    ChatThread.objects.filter(pk=message.thread_id).update(**values)
+
+
+def mark_read(thread_id: int, participant: str, up_to_id: Optional[int] = None) -> Tuple[int, int]:
+    """Mark messages up to ``up_to_id`` (default: all) read; returns (read_id, unread)."""
+    read_field, unread_field = PARTICIPANTS[participant]
+    with transaction.atomic():
+        thread = ChatThread.objects.select_for_update().get(pk=thread_id)
+        last_id = thread.last_message_id or 0
+        target = last_id if up_to_id is None else min(up_to_id, last_id)
+        read_id = max(getattr(thread, read_field), target)
+        unread = (
+            thread.messages.filter(id__gt=read_id)
+            .exclude(**{f"{SENDER_FIELDS[participant]}__isnull": False})
+            .count()
+        )
+        ChatThread.objects.filter(pk=thread.pk).update(**{read_field: read_id, unread_field: unread})
+    return read_id, unread
+
+
+def _messages(thread_id: int):
+    return ChatMessage.objects.filter(thread_id=thread_id).select_related("sender_admin", "sender_supervisor")
+
+
+def messages_before(thread_id: int, before_id: Optional[int] = None,
+                    limit: int = PAGE_SIZE) -> Tuple[List[ChatMessage], bool]:
+    """The ``limit`` messages before ``before_id`` (default: the latest), oldest first.
+
+    Returns ``(messages, has_older)``.
+    """
+    queryset = _messages(thread_id).order_by("-id")
+    if before_id:
+        queryset = queryset.filter(id__lt=before_id)
+    page = list(queryset[:limit + 1])
+    has_older = len(page) > limit
+    page = page[:limit]
+    page.reverse()
+    return page, has_older
+
+
+def messages_after(thread_id: int, after_id: int, limit: int = 100) -> List[ChatMessage]:
+    return list(_messages(thread_id).filter(id__gt=after_id).order_by("id")[:limit])
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import services
+from .models import ChatMessage
+
+
+@receiver(post_save, sender=ChatMessage)
+def chat_message_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        services.message_created(instance)
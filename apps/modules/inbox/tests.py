@@ -1,3 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from apps.core.models import Company, Employee
+
+from . import services
+from .models import ChatMessage, ChatThread
+
+User = get_user_model()
+
+
+class ThreadSummaryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        company = Company.objects.create(name='Kebun Sawit')
+        self.admin = User.objects.create_user(username='admin', password='pass12345', company=company, is_staff=True)
+        self.supervisor_user = User.objects.create_user(username='mandor', password='pass12345', company=company)
+        self.supervisor = Employee.objects.create(
+            name='Mandor', email='mandor@example.com', company=company, user=self.supervisor_user
+        )
+        Employee.objects.create(name='Pekerja', email='pekerja@example.com', company=company, manager=self.supervisor)
+        self.thread = ChatThread.objects.create(admin=self.admin, supervisor=self.supervisor, subject='Panen')
+
+    def send(self, content, from_admin=True):
+        if from_admin:
+            return ChatMessage.objects.create(thread=self.thread, sender_admin=self.admin, content=content)
+        return ChatMessage.objects.create(thread=self.thread, sender_supervisor=self.supervisor, content=content)
+
+    def test_insert_updates_summary_and_unread_counters(self):
+        self.send('Halo')
+        last = self.send('Laporan   panen\nminggu ini ' + 'x' * 200, from_admin=False)
+        self.thread.refresh_from_db()
+        self.assertEqual((self.thread.last_message_id, self.thread.last_message_at), (last.pk, last.created_at))
+        self.assertTrue(self.thread.last_message_preview.startswith('Laporan panen minggu ini'))
+        self.assertEqual(len(self.thread.last_message_preview), services.PREVIEW_LENGTH)
+        self.assertEqual((self.thread.admin_unread, self.thread.supervisor_unread), (1, 1))
+
+        self.assertEqual(services.mark_read(self.thread.pk, services.ADMIN), (last.pk, 0))
+        self.thread.refresh_from_db()
+        self.assertEqual((self.thread.admin_unread, self.thread.supervisor_unread), (0, 1))
+
+    def test_messages_are_paged_by_id(self):
+        sent = [self.send(f'Pesan {i}') for i in range(5)]
+        page, has_older = services.messages_before(self.thread.pk, limit=2)
+        self.assertEqual(([m.pk for m in page], has_older), ([sent[3].pk, sent[4].pk], True))
+        page, has_older = services.messages_before(self.thread.pk, before_id=sent[1].pk, limit=2)
+        self.assertEqual(([m.pk for m in page], has_older), ([sent[0].pk], False))
+
+    def test_inbox_does_not_load_every_message(self):
+        for i in range(services.PAGE_SIZE + 5):
+            self.send(f'Pesan {i}', from_admin=False)
+        self.client.force_login(self.admin)
+        url = reverse('inbox:thread_list')
+        self.client.get(url)  # warm the role-context cache
+
+        ChatThread.objects.filter(pk=self.thread.pk).update(admin_unread=0)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'thread': self.thread.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['thread_messages']), services.PAGE_SIZE)
+        self.assertIsNotNone(response.context['older_before_id'])
+        self.assertLessEqual(len(queries), 8)
+
+    def test_poll_returns_only_new_messages_and_marks_them_read(self):
+        first = self.send('Halo')
+        self.client.force_login(self.supervisor_user)
+        url = reverse('inbox:poll')
+
+        response = self.client.get(url, {'thread': self.thread.pk, 'after': first.pk})
+        self.assertEqual(response.json(), {'messages': [], 'last_id': first.pk})
+
+        second = self.send('Ada kabar?')
+        body = self.client.get(url, {'thread': self.thread.pk, 'after': first.pk}).json()
+        self.assertEqual([m['id'] for m in body['messages']], [second.pk])
+        self.assertEqual(body['last_id'], second.pk)
+        self.thread.refresh_from_db()
+        self.assertEqual((self.thread.supervisor_read_id, self.thread.supervisor_unread), (second.pk, 0))
+
+        other = User.objects.create_user(username='lain', password='pass12345')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url, {'thread': self.thread.pk}).status_code, 404)
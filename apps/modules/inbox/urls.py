@@ -1,9 +1,10 @@
 from django.urls import path
 
-from .views import InboxView
+from .views import InboxPollView, InboxView
 
 app_name = "inbox"
 
 urlpatterns = [
     path("", InboxView.as_view(), name="thread_list"),
+    path("poll/", InboxPollView.as_view(), name="poll"),
 ]
@@ -1,106 +1,98 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Prefetch
-from django.http import Http404
+from django.http import Http404, JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.views import View
 from django.views.generic import TemplateView
 
-from apps.core.models import Employee
+from apps.core.services.user_roles import get_role_context
 
+from . import services
 from .forms import MessageForm, ThreadStartForm
 from .models import ChatMessage, ChatThread
 
 
-def _get_supervisor_employee(user):
-    person = getattr(user, "person", None)
-    print(f"  _get_supervisor_employee - Person: {person}")
-    if not person:
-        print("  _get_supervisor_employee - No person found")
-        return None
+def _participant(user):
+    """``(ADMIN|SUPERVISOR, role)`` for users who may use the inbox, else ``(None, role)``."""
+    role = get_role_context(user)
+    if user.is_staff or role.is_owner:
+        return services.ADMIN, role
+    if role.is_supervisor:
+        return services.SUPERVISOR, role
+    return None, role
 
-    # Prefer explicit employee relation
-    if hasattr(person, "employee") and person.employee:
-        print(f"  _get_supervisor_employee - Found explicit employee: {person.employee}")
-        return person.employee
 
-    # Fallback: person and employee share PK
+def _thread_queryset(user):
+    participant, role = _participant(user)
+    if participant == services.ADMIN:
+        return ChatThread.objects.filter(admin=user)
+    if participant == services.SUPERVISOR:
+        # Supervisor can only see their own threads
+        return ChatThread.objects.filter(supervisor_id=role.employee_id)
+    return ChatThread.objects.none()
+
+
+def _positive_int(value):
     try:
-        employee = Employee.objects.get(pk=person.pk)
-        print(f"  _get_supervisor_employee - Found employee by PK: {employee}")
-        return employee
-    except Employee.DoesNotExist:
-        print("  _get_supervisor_employee - No employee found by PK")
-        return None
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _message_data(message: ChatMessage):
+    return {
+        "id": message.pk,
+        "sender_label": message.sender_label,
+        "from_admin": bool(message.sender_admin_id),
+        "content": message.content,
+        "created_at": message.created_at.isoformat(),
+    }
 
 
 class InboxView(LoginRequiredMixin, TemplateView):
     template_name = "inbox/thread_list.html"
 
     def get_thread_queryset(self):
-        user = self.request.user
-        
-        # Debug: Print user info
-        print(f"=== INBOX VIEW DEBUG ===")
-        print(f"User: {user}")
-        print(f"User ID: {user.id}")
-        print(f"Username: {user.username}")
-        print(f"Is Staff: {user.is_staff}")
-        
-        # Properly check is_owner
-        is_owner_attr = getattr(user, 'is_owner', False)
-        is_owner = is_owner_attr() if callable(is_owner_attr) else is_owner_attr
-        print(f"Is Owner: {is_owner}")
-        
-        if user.is_staff or is_owner:
-            # Owner/staff can see all threads where they are admin
-            print("User is staff/owner - filtering by admin=user")
-            queryset = ChatThread.objects.filter(admin=user)
-            print(f"Admin threads count: {queryset.count()}")
-            return queryset
-        
-        supervisor = _get_supervisor_employee(user)
-        print(f"Supervisor employee found: {supervisor}")
-        if supervisor:
-            print(f"Supervisor name: {supervisor.name}")
-            print(f"Supervisor has subordinates: {supervisor.subordinates.exists()}")
-            if supervisor.subordinates.exists():
-                # Supervisor can only see their own threads
-                print("User is supervisor - filtering by supervisor=supervisor")
-                queryset = ChatThread.objects.filter(supervisor=supervisor)
-                print(f"Supervisor threads count: {queryset.count()}")
-                return queryset
-        
-        print("User has no access - returning empty queryset")
-        return ChatThread.objects.none()
+        return _thread_queryset(self.request.user)
 
     def get_selected_thread(self, threads):
         thread_id = self.request.GET.get("thread")
         if thread_id:
-            try:
-                return threads.get(pk=thread_id)
-            except ChatThread.DoesNotExist:
+            selected = next((thread for thread in threads if str(thread.pk) == thread_id), None)
+            if selected is None:
                 raise Http404("Thread tidak ditemukan")
-        return threads.first()
+            return selected
+        return threads[0] if threads else None
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        threads = (
-            self.get_thread_queryset()
-            .select_related("admin", "supervisor")
-            .prefetch_related(Prefetch("messages", queryset=ChatMessage.objects.select_related("sender_admin", "sender_supervisor")))
-            .order_by("-updated_at")
-        )
+        participant, _ = _participant(self.request.user)
+        threads = list(self.get_thread_queryset().select_related("supervisor").order_by("-updated_at"))
+        if participant:
+            unread_field = services.PARTICIPANTS[participant][1]
+            for thread in threads:
+                thread.unread = getattr(thread, unread_field)
 
         selected_thread = self.get_selected_thread(threads)
+        thread_messages, has_older, before_id = [], False, None
+        if selected_thread:
+            before_id = _positive_int(self.request.GET.get("before")) or None
+            thread_messages, has_older = services.messages_before(selected_thread.pk, before_id)
+            if selected_thread.unread:
+                _, selected_thread.unread = services.mark_read(selected_thread.pk, participant)
 
         context.update(
             {
                 "threads": threads,
                 "selected_thread": selected_thread,
+                "thread_messages": thread_messages,
+                "older_before_id": thread_messages[0].pk if has_older else None,
+                # Only the latest page follows new messages.
+                "poll_after_id": None if before_id else (thread_messages[-1].pk if thread_messages else 0),
                 "message_form": MessageForm(),
                 "thread_form": ThreadStartForm(user=self.request.user)
-                if (self.request.user.is_staff or (getattr(self.request.user, 'is_owner', False)() if callable(getattr(self.request.user, 'is_owner', None)) else getattr(self.request.user, 'is_owner', False)))
+                if participant == services.ADMIN
                 else None,
             }
         )
@@ -118,10 +110,8 @@ class InboxView(LoginRequiredMixin, TemplateView):
         return redirect(reverse("inbox:thread_list"))
 
     def handle_start_thread(self, request):
-        is_owner_attr = getattr(request.user, 'is_owner', False)
-        is_owner = is_owner_attr() if callable(is_owner_attr) else is_owner_attr
-        
-        if not (request.user.is_staff or is_owner):
+        participant, _ = _participant(request.user)
+        if participant != services.ADMIN:
             messages.error(request, "Hanya admin yang dapat memulai percakapan.")
             return redirect(reverse("inbox:thread_list"))
 
@@ -156,7 +146,7 @@ class InboxView(LoginRequiredMixin, TemplateView):
 
         try:
             thread = self.get_thread_queryset().get(pk=thread_id)
-        except ChatThread.DoesNotExist:
+        except (ChatThread.DoesNotExist, ValueError):
             messages.error(request, "Anda tidak memiliki akses ke percakapan ini.")
             return redirect(reverse("inbox:thread_list"))
 
@@ -168,19 +158,33 @@ class InboxView(LoginRequiredMixin, TemplateView):
         content = form.cleaned_data["content"]
         message_kwargs = {"thread": thread, "content": content}
 
-        is_owner_attr = getattr(request.user, 'is_owner', False)
-        is_owner = is_owner_attr() if callable(is_owner_attr) else is_owner_attr
-        
-        if request.user.is_staff or is_owner:
+        participant, role = _participant(request.user)
+        if participant == services.ADMIN:
             message_kwargs["sender_admin"] = request.user
         else:
-            supervisor = _get_supervisor_employee(request.user)
-            if not supervisor:
-                messages.error(request, "Profil supervisor tidak ditemukan.")
-                return redirect(reverse("inbox:thread_list"))
-            message_kwargs["sender_supervisor"] = supervisor
+            message_kwargs["sender_supervisor_id"] = role.employee_id
 
+        # The post_save signal moves the thread's last message and unread counter.
         ChatMessage.objects.create(**message_kwargs)
-        thread.save(update_fields=["updated_at"])  # touch timestamp
         messages.success(request, "Pesan terkirim.")
         return redirect(f"{reverse('inbox:thread_list')}?thread={thread.id}")
+
+
+class InboxPollView(LoginRequiredMixin, View):
+    """New messages of a thread after ``?after=<id>``, for the open inbox page."""
+
+    def get(self, request, *args, **kwargs):
+        participant, _ = _participant(request.user)
+        thread = _thread_queryset(request.user).filter(pk=_positive_int(request.GET.get("thread"))).first()
+        if thread is None:
+            raise Http404("Thread tidak ditemukan")
+
+        after_id = _positive_int(request.GET.get("after"))
+        if thread.last_message_id is None or thread.last_message_id <= after_id:
+            return JsonResponse({"messages": [], "last_id": after_id})
+
+        new_messages = services.messages_after(thread.pk, after_id)
+        last_id = new_messages[-1].pk if new_messages else after_id
+        # The page is open on this thread: what it shows has been read.
+        services.mark_read(thread.pk, participant, last_id)
+        return JsonResponse({"messages": [_message_data(message) for message in new_messages], "last_id": last_id})
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import KPICycle, KPI, KPIEvaluation, KPIPeriodTarget
+from .models import KPICycle, KPI, KPIEvaluation, KPIPeriodTarget, KPIScoreRollup
 
 
 @admin.register(KPICycle)
@@ -32,3 +32,11 @@ class KPIPeriodTargetAdmin(admin.ModelAdmin):
     list_display = ('kpi', 'label', 'period_start', 'target_value')
     list_filter = ('kpi__cycle__period', 'kpi__status')
     search_fields = ('kpi__title', 'label')
+
+
+@admin.register(KPIScoreRollup)
+class KPIScoreRollupAdmin(admin.ModelAdmin):
+    list_display = ('kpi', 'employee', 'month', 'target', 'actual', 'approved_actual', 'pct', 'weighted_pct', 'updated_at')
+    list_filter = ('company', 'cycle', 'month')
+    search_fields = ('kpi__title', 'employee__name')
+    readonly_fields = [field.name for field in KPIScoreRollup._meta.fields]
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class Kinerja4Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.modules.kinerja4'
+
+    def ready(self):
+        from . import signals
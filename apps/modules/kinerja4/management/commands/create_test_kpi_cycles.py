@@ -4,8 +4,10 @@ from datetime import timedelta
 from django.db import transaction
 from faker import Faker
 import random
-from apps.core.models import Company
-from apps.modules.kinerja4.models import KPICycle
+from decimal import Decimal
+from apps.core.models import Company, Employee
+from apps.modules.kinerja4.models import KPI, KPICycle
+from apps.modules.kinerja4.services.period_service import create_period_targets
 
 fake = Faker("id_ID")  # Using Indonesian locale for more realistic local data
 
@@ -25,6 +27,12 @@ class Command(BaseCommand):
             default=5,
             help="Number of KPI cycles to create (default: 3)",
         )
+        parser.add_argument(
+            "--kpis-per-employee",
+            type=int,
+            default=0,
+            help="Also create this many KPIs per employee and cycle, with all their period targets (default: 0)",
+        )
 
     def display_companies(self):
         """Display a list of available companies and return the selected company"""
@@ -79,7 +87,9 @@ class Command(BaseCommand):
             if not company:
                 return  # User cancelled or no companies available
 
-        self.create_kpi_cycles(company, num_cycles)
+        cycles = self.create_kpi_cycles(company, num_cycles)
+        if options["kpis_per_employee"] > 0:
+            self.create_kpis(company, cycles, options["kpis_per_employee"])
 
     def create_kpi_cycles(self, company, num_cycles):
         """Create test KPI cycles for the given company with random data"""
@@ -88,6 +98,7 @@ class Command(BaseCommand):
 
         today = timezone.now().date()
         created_count = 0
+        cycles = []
 
         with transaction.atomic():
             for _ in range(num_cycles):
@@ -129,6 +140,7 @@ class Command(BaseCommand):
                     end_date=end_date,
                     active=is_active,
                 )
+                cycles.append(kpi_cycle)
                 created_count += 1
                 self.stdout.write(self.style.SUCCESS(f"Created KPI Cycle: {kpi_cycle}"))
 
@@ -137,3 +149,34 @@ class Command(BaseCommand):
                 f"Successfully created {created_count} KPI cycles for {company.name}."
             )
         )
+        return cycles
+
+    def create_kpis(self, company, cycles, per_employee):
+        """Create random KPIs for every employee and cycle, then all period targets in one batch"""
+        employees = list(Employee.objects.filter(company=company).only("id", "manager_id"))
+        if not employees:
+            self.stderr.write(self.style.WARNING("No employees found; no KPIs created."))
+            return
+
+        kpis = [
+            KPI(
+                company=company,
+                employee=employee,
+                supervisor_id=employee.manager_id,
+                title=fake.sentence(nb_words=4).rstrip("."),
+                target=Decimal(random.randint(10, 500)),
+                weight=Decimal(100 // per_employee),
+                status=KPI.Status.APPROVED,
+                cycle=cycle,
+            )
+            for cycle in cycles
+            for employee in employees
+            for _ in range(per_employee)
+        ]
+        with transaction.atomic():
+            KPI.objects.bulk_create(kpis, batch_size=1000)
+            target_count = create_period_targets(kpis)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully created {len(kpis)} KPIs with {target_count} period targets.")
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.models import Company
+from apps.modules.kinerja4.services.score_rollup import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild KPIScoreRollup rows from KPI period targets and evaluations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company-id",
+            type=int,
+            help="Only rebuild KPIs of this company (default: all companies)",
+        )
+
+    def handle(self, *args, **options):
+        company = None
+        if options["company_id"]:
+            company = Company.objects.filter(id=options["company_id"]).first()
+            if company is None:
+                raise CommandError("Company not found")
+
+        count = rebuild_rollups(company)
+        self.stdout.write(self.style.SUCCESS(f"{count} ringkasan skor KPI selesai dibangun ulang"))
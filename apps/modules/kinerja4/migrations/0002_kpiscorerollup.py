@@ -0,0 +1,102 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:15
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+# Frozen copy of services.score_rollup as of this migration, so later changes
+# to the service do not change what this backfill does.
+TWO_PLACES = Decimal('0.01')
+
+
+def _percentage(score, target):
+    if score is None or not target:
+        return None
+    return (Decimal(score) / Decimal(target) * 100).quantize(TWO_PLACES)
+
+
+def _weighted_percentage(pct, weight):
+    if pct is None:
+        return None
+    return (pct * Decimal(weight or 0) / 100).quantize(TWO_PLACES)
+
+
+def build_existing_rollups(apps, schema_editor):
+    # Rollups of existing targets; afterwards signals keep them current.
+    KPI = apps.get_model('kinerja4', 'KPI')
+    KPIPeriodTarget = apps.get_model('kinerja4', 'KPIPeriodTarget')
+    KPIScoreRollup = apps.get_model('kinerja4', 'KPIScoreRollup')
+
+    kpis = {row[0]: row[1:] for row in KPI.objects.values_list('id', 'company_id', 'employee_id', 'cycle_id', 'weight')}
+    rows = (
+        KPIPeriodTarget.objects.annotate(month=TruncMonth('period_start'))
+        .values('kpi_id', 'month')
+        .annotate(
+            target=Sum('target_value'),
+            actual=Sum('evaluations__score'),
+            approved_actual=Sum('evaluations__score', filter=Q(evaluations__status='APPROVED')),
+            period_count=Count('id'),
+            evaluated_count=Count('evaluations'),
+        )
+        .order_by()
+    )
+    rollups = []
+    for row in rows:
+        company_id, employee_id, cycle_id, weight = kpis[row['kpi_id']]
+        pct = _percentage(row['approved_actual'], row['target'])
+        rollups.append(KPIScoreRollup(
+            kpi_id=row['kpi_id'],
+            month=row['month'],
+            company_id=company_id,
+            employee_id=employee_id,
+            cycle_id=cycle_id,
+            weight=weight,
+            target=row['target'],
+            actual=row['actual'],
+            approved_actual=row['approved_actual'],
+            pct=pct,
+            weighted_pct=_weighted_percentage(pct, weight),
+            period_count=row['period_count'],
+            evaluated_count=row['evaluated_count'],
+        ))
+    KPIScoreRollup.objects.bulk_create(rollups, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_employeehierarchy'),
+        ('kinerja4', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KPIScoreRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month of the period targets')),
+                ('weight', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('target', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('actual', models.DecimalField(blank=True, decimal_places=2, help_text='Sum of all evaluation scores', max_digits=14, null=True)),
+                ('approved_actual', models.DecimalField(blank=True, decimal_places=2, help_text='Sum of approved evaluation scores', max_digits=14, null=True)),
+                ('pct', models.DecimalField(blank=True, decimal_places=2, help_text='approved_actual / target × 100', max_digits=9, null=True)),
+                ('weighted_pct', models.DecimalField(blank=True, decimal_places=2, help_text='pct × weight / 100', max_digits=9, null=True)),
+                ('period_count', models.PositiveSmallIntegerField(default=0)),
+                ('evaluated_count', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kpi_score_rollups', to='core.company')),
+                ('cycle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_rollups', to='kinerja4.kpicycle')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kpi_score_rollups', to='core.employee')),
+                ('kpi', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_rollups', to='kinerja4.kpi')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'month'], name='kinerja4_kp_company_699f6f_idx'), models.Index(fields=['employee', 'month'], name='kinerja4_kp_employe_f05d54_idx')],
+                'unique_together': {('kpi', 'month')},
+            },
+        ),
+        migrations.RunPython(build_existing_rollups, migrations.RunPython.noop),
+    ]
@@ -94,3 +94,36 @@ class KPIEvaluation(models.Model):
     def __str__(self):
 
         return f"Eval {self.period_target.label} for {self.period_target.kpi}"
+
+
+class KPIScoreRollup(models.Model):
+    """Ringkasan target dan realisasi satu KPI per bulan.
+
+    Dijaga oleh signal KPIPeriodTarget/KPIEvaluation (lihat
+    services.score_rollup) sehingga daftar KPI, dashboard, dan peringkat
+    cukup membaca tabel ini, bukan menjumlahkan target dan evaluasi.
+    """
+    company = models.ForeignKey('core.Company', on_delete=models.CASCADE, related_name='kpi_score_rollups')
+    kpi = models.ForeignKey(KPI, on_delete=models.CASCADE, related_name='score_rollups')
+    employee = models.ForeignKey('core.Employee', on_delete=models.CASCADE, related_name='kpi_score_rollups')
+    cycle = models.ForeignKey(KPICycle, on_delete=models.CASCADE, related_name='score_rollups')
+    month = models.DateField(help_text=_("First day of the month of the period targets"))
+    weight = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    target = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    actual = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True, help_text=_("Sum of all evaluation scores"))
+    approved_actual = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True, help_text=_("Sum of approved evaluation scores"))
+    pct = models.DecimalField(max_digits=9, decimal_places=2, null=True, blank=True, help_text=_("approved_actual / target × 100"))
+    weighted_pct = models.DecimalField(max_digits=9, decimal_places=2, null=True, blank=True, help_text=_("pct × weight / 100"))
+    period_count = models.PositiveSmallIntegerField(default=0)
+    evaluated_count = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (('kpi', 'month'),)
+        indexes = [
+            models.Index(fields=['company', 'month']),
+            models.Index(fields=['employee', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.kpi} - {self.month:%Y-%m}"
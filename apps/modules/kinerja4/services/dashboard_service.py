@@ -1,10 +1,11 @@
+from datetime import date
 from django.utils import timezone
-from django.db.models import Sum
-from django.db.models.functions import TruncMonth
 import json
 from collections import defaultdict
 from ..models import KPI
+from . import score_rollup
 from .kpi_service import get_visible_kpis
+from apps.core.services.user_roles import get_role_context
 
 
 def get_dashboard_data(user):
@@ -21,7 +22,7 @@ def get_dashboard_data(user):
     visible_kpis = get_visible_kpis(user, company)
 
     # Get supervised KPIs - for owners and supervisors
-    if user.is_owner:
+    if get_role_context(user).is_owner:
         supervised_kpis = visible_kpis.exclude(employee=person)
     else:
         # For non-owners, get KPIs where the user is the supervisor
@@ -49,39 +50,25 @@ def get_dashboard_data(user):
             m -= 1
     months.reverse()
 
-    # sum target and actual per month
-    kpi_monthly_data = visible_kpis.annotate(
-        month=TruncMonth('period_targets__period_start')
-    ).values('month').annotate(
-        target=Sum('period_targets__target_value'),
-        actual=Sum('period_targets__evaluations__score')
-    )
-    grouped_kpi_monthly_data = {}
-    for group in kpi_monthly_data:
-        if not group['month']:
-            continue
-        key = group['month'].strftime('%Y-%m')
-        target = group['target'] or 0
-        actual = group['actual'] or 0
-        grouped_kpi_monthly_data[key] = {'target': target, 'actual': actual}
+    # sum target and actual per month from the precomputed rollups
+    monthly_totals = score_rollup.monthly_totals(visible_kpis, date(*months[0], 1))
 
     # Prepare monthly chart data
     recent_labels = []
     sum_targets = []
     sum_actuals = []
     for (yy, mm) in months:
-        key = f"{yy}-{mm:02d}"
-        from datetime import date as _d
-        lbl = _d(yy, mm, 1).strftime('%b %Y')
-        recent_labels.append(lbl)
-        sum_targets.append(grouped_kpi_monthly_data.get(key, {}).get('target', 0))
-        sum_actuals.append(grouped_kpi_monthly_data.get(key, {}).get('actual', 0))
-
+        month = date(yy, mm, 1)
+        recent_labels.append(month.strftime('%b %Y'))
+        sum_targets.append(monthly_totals.get(month, {}).get('target') or 0)
+        sum_actuals.append(monthly_totals.get(month, {}).get('actual') or 0)
 
+    leaderboard = score_rollup.get_leaderboard(company, today, kpis=visible_kpis)
 
     return {
         'grouped_supervised': grouped_supervised,
         'recent_labels_json': json.dumps(recent_labels, default=float),
         'sum_targets_json': json.dumps(sum_targets, default=float),
         'sum_actuals_json': json.dumps(sum_actuals, default=float),
+        'leaderboard': leaderboard,
     }
@@ -1,13 +1,15 @@
 import logging
-from collections import defaultdict
-from decimal import Decimal, InvalidOperation
+from datetime import datetime
+from decimal import Decimal
 from typing import Dict, Iterable, List
 
-from django.db.models import Case, When, Sum, Q
+from django.db.models import Case, When, Q
 
-from apps.core.models import Employee
+from apps.core.services.user_roles import get_role_context
 
 from ..models import KPI, KPIPeriodTarget, KPIEvaluation
+from . import score_rollup
+from .period_grid_service import parse_decimal, save_period_targets
 
 logger = logging.getLogger(__name__)
 
@@ -23,58 +25,9 @@ def _decimal(value: object) -> Decimal:
     return Decimal(str(value))
 
 
-def _build_subordinate_map(company) -> Dict[int, List[int]]:
-    """Build an adjacency list of employees keyed by manager id within a company."""
-    relations = Employee.objects.filter(company=company).values_list("manager_id", "id")
-    tree: Dict[int, List[int]] = defaultdict(list)
-    for manager_id, employee_id in relations:
-        if manager_id is None:
-            continue
-        tree[manager_id].append(employee_id)
-    return tree
-
-
-def _collect_subordinate_ids(tree: Dict[int, List[int]], manager_id: int) -> List[int]:
-    """Collect ids for all nested subordinates of a manager using the provided tree."""
-    if manager_id is None:
-        return []
-
-    seen: set[int] = set()
-    stack: List[int] = list(tree.get(manager_id, []))
-
-    while stack:
-        current = stack.pop()
-        if current in seen:
-            continue
-        seen.add(current)
-        stack.extend(tree.get(current, []))
-
-    return list(seen)
-
-
-def _annotate_kpis_with_totals(queryset):
-    return queryset.annotate(
-        total_target=Sum("period_targets__target_value"),
-        approved_score=Sum(
-            "period_targets__evaluations__score",
-            filter=Q(period_targets__evaluations__status=KPIEvaluation.Status.APPROVED),
-        ),
-    )
-
-
 def _compute_percentage(score, target) -> float | None:
-    if target is None:
-        return None
-
-    target_dec = _decimal(target)
-    if target_dec == 0:
-        return None
-
-    if score is None:
-        return None
-
-    pct = (_decimal(score) / target_dec) * Decimal("100")
-    return float(pct.quantize(TWO_PLACES))
+    pct = score_rollup.percentage(score, target)
+    return None if pct is None else float(pct)
 
 
 def _compute_weighted_percentage(pct: float | None, weight, total_weight: Decimal) -> float | None:
@@ -90,13 +43,14 @@ def _compute_weighted_percentage(pct: float | None, weight, total_weight: Decima
 
 
 def _build_kpi_data(kpi_queryset) -> List[Dict[str, object]]:
-    kpis = list(_annotate_kpis_with_totals(kpi_queryset))
+    kpis = list(kpi_queryset)
+    totals = score_rollup.kpi_totals(kpi.id for kpi in kpis)
     total_weight = sum((_decimal(kpi.weight) for kpi in kpis), Decimal("0"))
 
     result: List[Dict[str, object]] = []
     for kpi in kpis:
-        target = getattr(kpi, "total_target", None)
-        score = getattr(kpi, "approved_score", None)
+        target = totals.get(kpi.id, {}).get("target")
+        score = totals.get(kpi.id, {}).get("score")
         pct = _compute_percentage(score, target)
         weighted_pct = _compute_weighted_percentage(pct, kpi.weight, total_weight)
 
@@ -115,7 +69,8 @@ def get_visible_kpis(user, company):
     """Get KPIs visible to the user based on their role."""
     base_qs = KPI.objects.filter(company=company).select_related("employee", "supervisor", "cycle")
 
-    if user.is_owner:
+    role = get_role_context(user)
+    if role.is_owner:
         return base_qs
 
     person = getattr(user, 'person', None)
@@ -125,12 +80,9 @@ def get_visible_kpis(user, company):
     # Check if user is a supervisor (has supervised KPIs)
     is_supervisor = KPI.objects.filter(company=company, supervisor=person).exists()
     if is_supervisor:
-        tree = _build_subordinate_map(company)
-        subordinate_ids = _collect_subordinate_ids(tree, person.id)
-        subordinate_filter = Q(employee__id__in=subordinate_ids) if subordinate_ids else Q()
         # Supervisor can see their own KPIs and KPIs supervised by them, and KPIs of subordinates recursive
         return base_qs.filter(
-            Q(employee=person) | Q(supervisor=person) | subordinate_filter
+            Q(employee__id__in=role.visible_employee_ids) | Q(supervisor=person)
         )
     else:
         # Regular employee can only see their own KPIs
@@ -221,21 +173,12 @@ def create_kpi_period_targets(kpi, post_data):
     starts = post_data.getlist('pt_start[]')
     targets = post_data.getlist('pt_target[]')
     try:
-        for lbl, st, tv in zip(labels, starts, targets):
-            if not st:
-                continue
-            from datetime import datetime
-            period_start = datetime.strptime(st, '%Y-%m-%d').date()
-            tv_val = None
-            if tv not in (None, '',):
-                try:
-                    tv_val = Decimal(str(tv))
-                except (InvalidOperation, ValueError, TypeError):
-                    tv_val = None
-            KPIPeriodTarget.objects.update_or_create(
-                kpi=kpi, period_start=period_start,
-                defaults={'label': lbl, 'target_value': tv_val}
-            )
+        periods = [
+            (datetime.strptime(st, '%Y-%m-%d').date(), lbl, parse_decimal(tv))
+            for lbl, st, tv in zip(labels, starts, targets)
+            if st
+        ]
+        save_period_targets(kpi, periods)
     except Exception as e:
         logger.warning(f"Error saving period grid for KPI {kpi.id}: {e}")
         raise
@@ -0,0 +1,191 @@
+"""Batch persistence of a KPI's period grid (targets and evaluations).
+
+Both the KPI create/edit grid and the period input table used to touch the
+database once or twice per period row. Here the KPI's existing
+KPIPeriodTarget and KPIEvaluation rows are loaded once, diffed in memory
+against the submission, and written with ``bulk_create``/``bulk_update``
+inside one transaction. The HTML form handlers and the JSON PATCH endpoint
+share these functions.
+
+A grid row is a dict. Keys that are absent are left untouched:
+
+- ``period_start`` (date) or ``label``: which period the row is for;
+- ``target_value``: the new target (``None`` is ignored, as in the form);
+- ``actual``, ``notes``, ``notes_supervisor``: evaluation input.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+
+from ..models import KPIEvaluation, KPIPeriodTarget
+from . import score_rollup
+
+logger = logging.getLogger(__name__)
+
+EVALUATION_FIELDS = ["score", "notes", "notes_supervisor", "evaluated_by", "status"]
+MAX_GRID_ROWS = 1000
+
+
+@dataclass
+class GridResult:
+    targets_created: int = 0
+    targets_updated: int = 0
+    evaluations_created: int = 0
+    evaluations_updated: int = 0
+    missing: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "targets_created": self.targets_created,
+            "targets_updated": self.targets_updated,
+            "evaluations_created": self.evaluations_created,
+            "evaluations_updated": self.evaluations_updated,
+            "missing": self.missing,
+        }
+
+
+def parse_decimal(value: object) -> Optional[Decimal]:
+    """``value`` as a Decimal, or None when blank or not a number."""
+    if value in (None, ""):
+        return None
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError, TypeError):
+        return None
+
+
+@transaction.atomic
+def save_period_targets(kpi, periods: Iterable[Tuple[date, str, Optional[Decimal]]]) -> GridResult:
+    """Create or update the ``(period_start, label, target_value)`` targets of ``kpi``."""
+    result = GridResult()
+    existing = {pt.period_start: pt for pt in KPIPeriodTarget.objects.filter(kpi=kpi)}
+    to_create: Dict[date, KPIPeriodTarget] = {}
+    to_update: Dict[date, KPIPeriodTarget] = {}
+    for period_start, label, target_value in periods:
+        target = existing.get(period_start)
+        if target is None:
+            to_create[period_start] = KPIPeriodTarget(
+                kpi=kpi, period_start=period_start, label=label, target_value=target_value
+            )
+        elif target.label != label or target.target_value != target_value:
+            target.label, target.target_value = label, target_value
+            to_update[period_start] = target
+
+    KPIPeriodTarget.objects.bulk_create(to_create.values(), batch_size=500)
+    KPIPeriodTarget.objects.bulk_update(to_update.values(), ["label", "target_value"], batch_size=500)
+    result.targets_created, result.targets_updated = len(to_create), len(to_update)
+    if to_create or to_update:
+        # bulk writes bypass the signals that keep the score rollups current.
+        score_rollup.schedule_refresh([kpi.pk])
+    return result
+
+
+def _apply_evaluation(evaluation: KPIEvaluation, row: dict, user, is_supervisor: bool) -> None:
+    actual = row.get("actual")
+    if actual is not None:
+        evaluation.score = actual
+    if row.get("notes"):
+        evaluation.notes = row["notes"]
+    if row.get("notes_supervisor"):
+        evaluation.notes_supervisor = row["notes_supervisor"]
+    evaluation.evaluated_by = user
+    evaluation.status = KPIEvaluation.Status.APPROVED if is_supervisor else KPIEvaluation.Status.PENDING
+
+
+@transaction.atomic
+def save_period_grid(kpi, rows: Iterable[dict], user, is_supervisor: bool) -> GridResult:
+    """Apply grid ``rows`` to the existing period targets of ``kpi``.
+
+    Rows for periods the KPI has no target for are skipped and reported in
+    ``missing``. An evaluation is created or updated when the row carries an
+    actual value or a note; its status is APPROVED when a supervisor saves
+    it, PENDING otherwise.
+    """
+    result = GridResult()
+    targets = list(KPIPeriodTarget.objects.select_for_update().filter(kpi=kpi))
+    by_start = {pt.period_start: pt for pt in targets}
+    by_label = {pt.label: pt for pt in targets}
+    evaluations = {
+        evaluation.period_target_id: evaluation
+        for evaluation in KPIEvaluation.objects.filter(period_target__in=targets)
+    }
+
+    changed_targets: Dict[int, KPIPeriodTarget] = {}
+    new_evaluations: Dict[int, KPIEvaluation] = {}
+    changed_evaluations: Dict[int, KPIEvaluation] = {}
+    for row in rows:
+        if row.get("period_start") is not None:
+            target = by_start.get(row["period_start"])
+        else:
+            target = by_label.get(row.get("label"))
+        if target is None:
+            result.missing.append(str(row.get("period_start") or row.get("label")))
+            continue
+
+        target_value = row.get("target_value")
+        if target_value is not None and target.target_value != target_value:
+            target.target_value = target_value
+            changed_targets[target.pk] = target
+
+        if row.get("actual") is None and not row.get("notes") and not row.get("notes_supervisor"):
+            continue
+        evaluation = evaluations.get(target.pk)
+        if evaluation is None:
+            # score is NOT NULL; a note without an actual value starts at 0.
+            evaluation = KPIEvaluation(period_target=target, score=Decimal("0"))
+            evaluations[target.pk] = new_evaluations[target.pk] = evaluation
+        elif target.pk not in new_evaluations:
+            changed_evaluations[target.pk] = evaluation
+        _apply_evaluation(evaluation, row, user, is_supervisor)
+
+    KPIPeriodTarget.objects.bulk_update(changed_targets.values(), ["target_value"], batch_size=500)
+    KPIEvaluation.objects.bulk_create(new_evaluations.values(), batch_size=500)
+    KPIEvaluation.objects.bulk_update(changed_evaluations.values(), EVALUATION_FIELDS, batch_size=500)
+    result.targets_updated = len(changed_targets)
+    result.evaluations_created = len(new_evaluations)
+    result.evaluations_updated = len(changed_evaluations)
+    if changed_targets or new_evaluations or changed_evaluations:
+        score_rollup.schedule_refresh([kpi.pk])
+    logger.debug("Saved period grid of KPI %s: %s", kpi.pk, result)
+    return result
+
+
+def parse_grid_payload(payload: object) -> Tuple[List[dict], Dict[str, object]]:
+    """Grid rows from a JSON PATCH body ``{"rows": [...]}``; returns ``(rows, errors)``."""
+    raw_rows = payload.get("rows") if isinstance(payload, dict) else None
+    if not isinstance(raw_rows, list) or not raw_rows:
+        return [], {"rows": "Wajib berupa daftar baris yang tidak kosong."}
+    if len(raw_rows) > MAX_GRID_ROWS:
+        return [], {"rows": f"Maksimal {MAX_GRID_ROWS} baris per permintaan."}
+
+    rows: List[dict] = []
+    errors: Dict[str, object] = {}
+    for index, raw in enumerate(raw_rows):
+        if not isinstance(raw, dict):
+            errors[str(index)] = "Baris harus berupa objek."
+            continue
+        row_errors = {}
+        row = {"label": raw.get("label")}
+        if raw.get("period_start"):
+            try:
+                row["period_start"] = date.fromisoformat(str(raw["period_start"]))
+            except ValueError:
+                row_errors["period_start"] = "Format tanggal tidak valid (YYYY-MM-DD)."
+        elif not row["label"]:
+            row_errors["period_start"] = "Isi period_start atau label."
+        for name in ("target_value", "actual"):
+            if raw.get(name) not in (None, ""):
+                row[name] = parse_decimal(raw[name])
+                if row[name] is None:
+                    row_errors[name] = "Harus berupa angka."
+        for name in ("notes", "notes_supervisor"):
+            row[name] = str(raw.get(name) or "")
+        if row_errors:
+            errors[str(index)] = row_errors
+        else:
+            rows.append(row)
+    return rows, errors
@@ -3,24 +3,34 @@ from django.utils import timezone
 from django.db import transaction
 from django.contrib import messages
 
+from apps.core.services.user_roles import get_role_context
+
 from ..models import KPI, KPICycle, KPIEvaluation, KPIPeriodTarget
 from ..forms import MonthlyActualTargetForm
+from .period_grid_service import parse_decimal, save_period_grid
 
 
 def compute_roles(user, kpi):
     person = getattr(user, 'person', None)
     is_employee = kpi.employee == person
     is_supervisor = kpi.supervisor == person
-    is_manager = person.subordinates.exists() if person else False
+    is_manager = get_role_context(user).is_supervisor
     return person, is_employee, is_supervisor, is_manager
 
 
-def check_access(request, kpi, person):
-    if not (request.user.is_staff or kpi.employee == person or kpi.supervisor == person):
-        messages.error(request, 'Anda tidak memiliki izin untuk mengakses halaman ini.')
-        return False
+def access_error(user, kpi, person):
+    """Why ``user`` may not fill in the periods of ``kpi``, or None."""
+    if not (user.is_staff or kpi.employee == person or kpi.supervisor == person):
+        return 'Anda tidak memiliki izin untuk mengakses halaman ini.'
     if kpi.status != KPI.Status.APPROVED:
-        messages.error(request, 'Hanya KPI yang sudah disetujui yang dapat diisi target/nilai per periode.')
+        return 'Hanya KPI yang sudah disetujui yang dapat diisi target/nilai per periode.'
+    return None
+
+
+def check_access(request, kpi, person):
+    error = access_error(request.user, kpi, person)
+    if error:
+        messages.error(request, error)
         return False
     return True
 
@@ -69,50 +79,19 @@ def prefill_form_initial(kpi, form: MonthlyActualTargetForm, today):
         form.initial['month'] = today.strftime('%Y-%m')
 
 
-@transaction.atomic
 def handle_table_submit(request, kpi, is_supervisor):
-    period_labels = [pt.label for pt in KPIPeriodTarget.objects.filter(kpi=kpi)]
-    for period_label in period_labels:
-        actual_val = request.POST.get(f'actual_{period_label}')
-        notes = request.POST.get(f'notes_{period_label}', '')
-        target_val = request.POST.get(f'target_{period_label}')
-        notes_supervisor = request.POST.get(f'notes_supervisor_{period_label}', '')
-
-        if actual_val:
-            try:
-                actual_val = float(actual_val)
-            except ValueError:
-                actual_val = None
-
-        if target_val:
-            try:
-                target_val = float(target_val)
-            except ValueError:
-                target_val = None
-
-        if target_val is not None:
-            try:
-                pt = KPIPeriodTarget.objects.get(kpi=kpi, label=period_label)
-                pt.target_value = target_val
-                pt.save()
-            except KPIPeriodTarget.DoesNotExist:
-                pass
-
-        if actual_val is not None or notes or notes_supervisor:
-            try:
-                pt = KPIPeriodTarget.objects.get(kpi=kpi, label=period_label)
-                ev, _ = KPIEvaluation.objects.get_or_create(period_target=pt)
-                if actual_val is not None:
-                    ev.score = actual_val
-                if notes:
-                    ev.notes = notes
-                if notes_supervisor:
-                    ev.notes_supervisor = notes_supervisor
-                ev.evaluated_by = request.user
-                ev.status = KPIEvaluation.Status.APPROVED if is_supervisor else KPIEvaluation.Status.PENDING
-                ev.save()
-            except KPIPeriodTarget.DoesNotExist:
-                pass
+    labels = KPIPeriodTarget.objects.filter(kpi=kpi).values_list('label', flat=True)
+    rows = [
+        {
+            'label': label,
+            'target_value': parse_decimal(request.POST.get(f'target_{label}')),
+            'actual': parse_decimal(request.POST.get(f'actual_{label}')),
+            'notes': request.POST.get(f'notes_{label}', ''),
+            'notes_supervisor': request.POST.get(f'notes_supervisor_{label}', ''),
+        }
+        for label in labels
+    ]
+    save_period_grid(kpi, rows, request.user, is_supervisor)
     messages.success(request, 'Data berhasil disimpan.')
 
 
@@ -188,13 +167,13 @@ def process_form_submission(request, form, kpi, can_edit_actual, is_employee, is
 
 def build_summary(kpi):
     period_targets = KPIPeriodTarget.objects.filter(kpi=kpi).order_by('-period_start')
-    eval_map = {e.period_target.label: e for e in KPIEvaluation.objects.filter(period_target__kpi=kpi)}
+    eval_map = {e.period_target_id: e for e in KPIEvaluation.objects.filter(period_target__kpi=kpi)}
     rows = []
     total_target = 0
     total_actual = 0
 
     for pt in period_targets:
-        e = eval_map.get(pt.label)
+        e = eval_map.get(pt.id)
         row = make_row(pt, e)
         rows.append(row)
         total_target += (pt.target_value or 0)
@@ -1,28 +1,110 @@
+"""Period boundaries of KPI cycles.
+
+Boundaries are computed with calendar arithmetic instead of stepping a date
+through a loop: weekly periods are day ordinals seven apart, the other types
+are month indices (``year * 12 + month - 1``) a fixed number of months apart.
+``period_arrays`` memoizes the result per (type, start, end); cycles that
+share bounds share one result, so the period grid AJAX and company-wide
+setups compute each distinct cycle once per process.
+"""
+import calendar
 import datetime
-from typing import List, Dict, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.db import transaction
+
 from ..models import KPIPeriodTarget
+from . import score_rollup
+
+PERIOD_MONTHS = {
+    'monthly': 1,
+    'quarterly': 3,
+    'semiannual': 6,
+    'annual': 12,
+}
+
+_ONE_DAY = datetime.timedelta(days=1)
+
 
 def monday(d: datetime.date) -> datetime.date:
     """Get the Monday of the week containing the given date."""
-    dt = datetime.date(d.year, d.month, d.day)
-    day = dt.weekday()  # Monday is 0, Sunday is 6
-    return dt - datetime.timedelta(days=day)
+    return datetime.date.fromordinal(d.toordinal() - d.weekday())
 
 
 def iso_week(d: datetime.date) -> Dict[str, int]:
     """Get ISO week number and year for the given date."""
-    # Thursday in the target week (ISO weeks start on Monday)
-    d = d - datetime.timedelta(days=d.weekday() - 3)
-    # January 4th is always in week 1 (ISO 8601)
-    week1 = datetime.date(d.year, 1, 4)
-    week1_monday = week1 - datetime.timedelta(days=week1.weekday())
-
-    if d < week1_monday:
-        week1 = datetime.date(d.year - 1, 1, 4)
-        week1_monday = week1 - datetime.timedelta(days=week1.weekday())
-
-    week_num = (d - week1_monday).days // 7 + 1
-    return {'year': week1.year + (1 if week_num > 0 and d.month == 1 else 0), 'week': week_num}
+    year, week, _ = d.isocalendar()
+    return {'year': year, 'week': week}
+
+
+@dataclass(frozen=True)
+class PeriodArrays:
+    """Parallel tuples describing the periods of one cycle."""
+    starts: Tuple[datetime.date, ...] = ()
+    ends: Tuple[datetime.date, ...] = ()
+    labels: Tuple[str, ...] = ()
+    keys: Tuple[str, ...] = ()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+def _month_start(index: int) -> datetime.date:
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _month_label(period_type: str, start: datetime.date) -> str:
+    if period_type == 'monthly':
+        return f"{calendar.month_abbr[start.month]} {start.year}"
+    if period_type == 'quarterly':
+        return f"Q{(start.month - 1) // 3 + 1} {start.year}"
+    if period_type == 'semiannual':
+        return f"Semester {1 if start.month <= 6 else 2} {start.year}"
+    return f"Tahun {start.year}"
+
+
+def _weekly(start_date: datetime.date, end_date: datetime.date) -> PeriodArrays:
+    first = start_date.toordinal() - start_date.weekday()
+    last = end_date.toordinal()
+    starts = tuple(datetime.date.fromordinal(ordinal) for ordinal in range(first, last + 1, 7))
+    ends = tuple(min(start + datetime.timedelta(days=6), end_date) for start in starts)
+    labels = []
+    for start in starts:
+        year, week, _ = start.isocalendar()
+        labels.append(f"W{week:02d} {year}")
+    return PeriodArrays(starts, ends, tuple(labels), tuple(start.isoformat() for start in starts))
+
+
+def _monthly(period_type: str, start_date: datetime.date, end_date: datetime.date) -> PeriodArrays:
+    step = PERIOD_MONTHS[period_type]
+    first = start_date.year * 12 + start_date.month - 1
+    first -= first % 12 % step
+    last = end_date.year * 12 + end_date.month - 1
+    starts = tuple(_month_start(index) for index in range(first, last + 1, step))
+    ends = tuple(
+        min(_month_start(index + step) - _ONE_DAY, end_date) for index in range(first, last + 1, step)
+    )
+    labels = tuple(_month_label(period_type, start) for start in starts)
+    return PeriodArrays(starts, ends, labels, tuple(start.isoformat() for start in starts))
+
+
+@lru_cache(maxsize=1024)
+def period_arrays(period_type: str, start_date: datetime.date, end_date: datetime.date) -> PeriodArrays:
+    """Periods of a cycle; an unknown type or an empty range gives no periods."""
+    period_type = period_type.lower()
+    if end_date < start_date:
+        return PeriodArrays()
+    if period_type == 'weekly':
+        return _weekly(start_date, end_date)
+    if period_type in PERIOD_MONTHS:
+        return _monthly(period_type, start_date, end_date)
+    return PeriodArrays()
+
+
+def cycle_periods(cycle) -> PeriodArrays:
+    return period_arrays(cycle.period, cycle.start_date, cycle.end_date)
 
 
 def generate_periods(
@@ -47,123 +129,50 @@ def generate_periods(
     """
     if kpi_id is not None and period_targets is None:
         period_targets = {
-            str(target.period_start): str(target.target_value) if target.target_value else ''
-            for target in KPIPeriodTarget.objects.filter(kpi_id=kpi_id)
+            period_start.isoformat(): str(target_value) if target_value else ''
+            for period_start, target_value in KPIPeriodTarget.objects.filter(kpi_id=kpi_id)
+            .values_list('period_start', 'target_value')
         }
     elif period_targets is None:
         period_targets = {}
 
-    periods = []
-    current = start_date
-
-    if period_type.lower() == 'monthly':
-        current = start_date.replace(day=1)
-        while current <= end_date:
-            # Calculate last day of current month
-            if current.month == 12:
-                next_month = current.replace(
-                    year=current.year + 1, month=1, day=1)
-            else:
-                next_month = current.replace(month=current.month + 1, day=1)
-            period_end = next_month - datetime.timedelta(days=1)
-
-            if period_end > end_date:
-                period_end = end_date
-
-            period_key = current.strftime('%Y-%m-%d')
-            periods.append({
-                'label': current.strftime('%b %Y'),
-                'start_date': current,
-                'end_date': period_end,
-                'target_value': period_targets.get(period_key, '')
-            })
-
-            current = next_month
-
-    elif period_type.lower() == 'weekly':
-        current = monday(start_date)
-        while current <= end_date:
-            period_end = current + datetime.timedelta(days=6)
-            if period_end > end_date:
-                period_end = end_date
-
-            iw = iso_week(current)
-            period_key = current.strftime('%Y-%m-%d')
-            periods.append({
-                'label': f"W{iw['week']:02d} {iw['year']}",
-                'start_date': current,
-                'end_date': period_end,
-                'target_value': period_targets.get(period_key, '')
-            })
-
-            current += datetime.timedelta(weeks=1)
-
-    elif period_type.lower() == 'quarterly':
-        current = start_date.replace(day=1)
-        while current <= end_date:
-            quarter = (current.month - 1) // 3 + 1
-            quarter_start = datetime.date(
-                current.year, 3 * (quarter - 1) + 1, 1)
-
-            if quarter == 4:
-                quarter_end = datetime.date(current.year, 12, 31)
-            else:
-                quarter_end = datetime.date(
-                    current.year, 3 * quarter + 1, 1) - datetime.timedelta(days=1)
-
-            if quarter_end > end_date:
-                quarter_end = end_date
-
-            period_key = quarter_start.strftime('%Y-%m-%d')
-            periods.append({
-                'label': f"Q{quarter} {quarter_start.year}",
-                'start_date': quarter_start,
-                'end_date': quarter_end,
-                'target_value': period_targets.get(period_key, '')
-            })
-
-            current = quarter_end + datetime.timedelta(days=1)
-
-    elif period_type.lower() == 'semiannual':
-        current = start_date.replace(day=1)
-        while current <= end_date:
-            semester = 1 if current.month <= 6 else 2
-            semester_start = datetime.date(
-                current.year, 6 * (semester - 1) + 1, 1)
-
-            if semester == 1:
-                semester_end = datetime.date(current.year, 6, 30)
-            else:
-                semester_end = datetime.date(current.year, 12, 31)
-
-            if semester_end > end_date:
-                semester_end = end_date
-
-            period_key = semester_start.strftime('%Y-%m-%d')
-            periods.append({
-                'label': f"Semester {semester} {semester_start.year}",
-                'start_date': semester_start,
-                'end_date': semester_end,
-                'target_value': period_targets.get(period_key, '')
-            })
-
-            current = semester_end + datetime.timedelta(days=1)
-
-    elif period_type.lower() == 'annual':
-        current = start_date.replace(month=1, day=1)
-        while current <= end_date:
-            year_end = datetime.date(current.year, 12, 31)
-            if year_end > end_date:
-                year_end = end_date
-
-            period_key = current.strftime('%Y-%m-%d')
-            periods.append({
-                'label': f"Tahun {current.year}",
-                'start_date': current,
-                'end_date': year_end,
-                'target_value': period_targets.get(period_key, '')
-            })
-
-            current = datetime.date(current.year + 1, 1, 1)
-
-    return periods
+    arrays = period_arrays(period_type, start_date, end_date)
+    return [
+        {
+            'label': label,
+            'start_date': start,
+            'end_date': end,
+            'target_value': period_targets.get(key, ''),
+        }
+        for start, end, label, key in zip(arrays.starts, arrays.ends, arrays.labels, arrays.keys)
+    ]
+
+
+def build_period_targets(kpis: Iterable, target_value=None) -> List[KPIPeriodTarget]:
+    """Unsaved targets for every period of every KPI's cycle.
+
+    ``target_value`` defaults to each KPI's own ``target`` (None when 0).
+    """
+    targets = []
+    for kpi in kpis:
+        arrays = cycle_periods(kpi.cycle)
+        value = target_value if target_value is not None else (kpi.target or None)
+        targets.extend(
+            KPIPeriodTarget(kpi_id=kpi.pk, period_start=start, label=label, target_value=value)
+            for start, label in zip(arrays.starts, arrays.labels)
+        )
+    return targets
+
+
+def create_period_targets(kpis: Iterable, target_value=None, batch_size: int = 1000) -> int:
+    """Create the missing period targets of ``kpis`` in one batch.
+
+    Existing (kpi, period_start) rows are left alone. Returns the number of
+    targets offered to the database.
+    """
+    kpis = list(kpis)
+    targets = build_period_targets(kpis, target_value)
+    with transaction.atomic():
+        KPIPeriodTarget.objects.bulk_create(targets, batch_size=batch_size, ignore_conflicts=True)
+        score_rollup.schedule_refresh(kpi.pk for kpi in kpis)
+    return len(targets)
@@ -0,0 +1,191 @@
+"""Maintenance of ``KPIScoreRollup`` rows.
+
+One row per (KPI, month of ``period_start``) holds the summed target, the
+summed evaluation scores (all, and approved only) and the achievement
+percentage, so list, dashboard and leaderboard reads never join targets to
+evaluations. Saving or deleting a KPI, KPIPeriodTarget or KPIEvaluation
+refreshes the rollups of that KPI once the transaction commits; the bulk
+writers in ``period_grid_service`` and ``period_service`` call
+``schedule_refresh`` themselves.
+
+``weighted_pct`` is ``pct × weight / 100``, the KPI's share of the score
+when an employee's weights add up to 100. Views showing another subset of
+KPIs normalise by that subset's total weight.
+"""
+import logging
+from datetime import date
+from decimal import Decimal
+from functools import partial
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Avg, Case, Count, DecimalField, F, Q, Sum, When
+from django.db.models.functions import TruncMonth
+
+from apps.core.models import Employee
+
+from ..models import KPI, KPIEvaluation, KPIPeriodTarget, KPIScoreRollup
+
+logger = logging.getLogger(__name__)
+
+
+TWO_PLACES = Decimal("0.01")
+REBUILD_CHUNK = 500
+
+_KPI_FIELDS = ("id", "company_id", "employee_id", "cycle_id", "weight")
+
+
+def percentage(score, target) -> Optional[Decimal]:
+    """``score / target × 100``, or None without a score or a non-zero target."""
+    if score is None or not target:
+        return None
+    return (Decimal(score) / Decimal(target) * 100).quantize(TWO_PLACES)
+
+
+def weighted_percentage(pct: Optional[Decimal], weight) -> Optional[Decimal]:
+    if pct is None:
+        return None
+    return (pct * Decimal(weight or 0) / 100).quantize(TWO_PLACES)
+
+
+def aggregate_months(period_targets):
+    """Per (kpi_id, month) totals of a KPIPeriodTarget queryset."""
+    approved = Q(evaluations__status=KPIEvaluation.Status.APPROVED)
+    return (
+        period_targets.annotate(month=TruncMonth("period_start"))
+        .values("kpi_id", "month")
+        .annotate(
+            target=Sum("target_value"),
+            actual=Sum("evaluations__score"),
+            approved_actual=Sum("evaluations__score", filter=approved),
+            period_count=Count("id"),
+            evaluated_count=Count("evaluations"),
+        )
+        .order_by()
+    )
+
+
+def build_rollups(model, kpis: Dict[int, tuple], rows) -> List[KPIScoreRollup]:
+    """Unsaved ``model`` rows for ``aggregate_months`` output.
+
+    ``kpis`` maps a KPI id to ``(company_id, employee_id, cycle_id, weight)``.
+    """
+    rollups = []
+    for row in rows:
+        company_id, employee_id, cycle_id, weight = kpis[row["kpi_id"]]
+        pct = percentage(row["approved_actual"], row["target"])
+        rollups.append(model(
+            kpi_id=row["kpi_id"],
+            month=row["month"],
+            company_id=company_id,
+            employee_id=employee_id,
+            cycle_id=cycle_id,
+            weight=weight,
+            target=row["target"],
+            actual=row["actual"],
+            approved_actual=row["approved_actual"],
+            pct=pct,
+            weighted_pct=weighted_percentage(pct, weight),
+            period_count=row["period_count"],
+            evaluated_count=row["evaluated_count"],
+        ))
+    return rollups
+
+
+@transaction.atomic
+def refresh_kpis(kpi_ids: Iterable[int]) -> int:
+    """Recompute every rollup row of ``kpi_ids``; returns the number of rows written."""
+    # Locking the KPIs serialises concurrent refreshes of the same KPI.
+    kpis = {
+        row[0]: row[1:]
+        for row in KPI.objects.select_for_update().filter(id__in=set(kpi_ids)).values_list(*_KPI_FIELDS)
+    }
+    if not kpis:
+        return 0
+    rollups = build_rollups(KPIScoreRollup, kpis, aggregate_months(KPIPeriodTarget.objects.filter(kpi_id__in=kpis)))
+    KPIScoreRollup.objects.filter(kpi_id__in=kpis).delete()
+    KPIScoreRollup.objects.bulk_create(rollups, batch_size=500)
+    logger.debug("Refreshed %s KPI score rollups for %s KPIs", len(rollups), len(kpis))
+    return len(rollups)
+
+
+def schedule_refresh(kpi_ids: Iterable[int]) -> None:
+    """Refresh the rollups of ``kpi_ids`` after the current transaction commits.
+
+    Called by the signals, and directly by every bulk writer of targets or
+    evaluations since ``bulk_create`` / ``bulk_update`` skip those signals.
+    """
+    ids = {kpi_id for kpi_id in kpi_ids if kpi_id}
+    if ids:
+        transaction.on_commit(partial(refresh_kpis, ids))
+
+
+def rebuild_rollups(company=None) -> int:
+    """Rebuild the rollups of all KPIs (of ``company``) in chunks."""
+    kpi_ids = KPI.objects.order_by("id")
+    if company is not None:
+        kpi_ids = kpi_ids.filter(company=company)
+    kpi_ids = list(kpi_ids.values_list("id", flat=True))
+    written = 0
+    for start in range(0, len(kpi_ids), REBUILD_CHUNK):
+        written += refresh_kpis(kpi_ids[start:start + REBUILD_CHUNK])
+    return written
+
+
+def kpi_totals(kpi_ids: Iterable[int]) -> Dict[int, Dict[str, Optional[Decimal]]]:
+    """KPI id -> ``{"target", "score"}`` summed over all months (approved scores only)."""
+    rows = (
+        KPIScoreRollup.objects.filter(kpi_id__in=list(kpi_ids))
+        .values("kpi_id")
+        .annotate(target=Sum("target"), score=Sum("approved_actual"))
+        .order_by()
+    )
+    return {row["kpi_id"]: row for row in rows}
+
+
+def monthly_totals(kpis, first_month: date) -> Dict[date, Dict[str, Optional[Decimal]]]:
+    """Month -> ``{"target", "actual"}`` of the ``kpis`` queryset from ``first_month``."""
+    rows = (
+        KPIScoreRollup.objects.filter(kpi__in=kpis.values("id"), month__gte=first_month)
+        .values("month")
+        .annotate(target=Sum("target"), actual=Sum("actual"))
+        .order_by()
+    )
+    return {row["month"]: row for row in rows}
+
+
+def get_leaderboard(company, month: date, kpis=None, limit: int = 10) -> List[Dict[str, object]]:
+    """Employees of ``company`` ranked by their weighted achievement in ``month``.
+
+    An employee's score is ``Σ weighted_pct / Σ weight × 100`` over the KPIs
+    with a percentage that month (the plain average when all weights are 0).
+    ``kpis`` optionally limits the ranking to a KPI queryset.
+    """
+    rows = KPIScoreRollup.objects.filter(company=company, month=month.replace(day=1), pct__isnull=False)
+    if kpis is not None:
+        rows = rows.filter(kpi__in=kpis.values("id"))
+    rows = (
+        rows.values("employee_id")
+        .annotate(
+            total_weighted=Sum("weighted_pct"),
+            total_weight=Sum("weight"),
+            average=Avg("pct"),
+            kpi_count=Count("id"),
+        )
+        .annotate(score=Case(
+            When(total_weight__gt=0, then=F("total_weighted") * 100 / F("total_weight")),
+            default=F("average"),
+            output_field=DecimalField(max_digits=9, decimal_places=2),
+        ))
+        .order_by("-score", "employee_id")[:limit]
+    )
+    rows = list(rows)
+    employees = Employee.objects.in_bulk([row["employee_id"] for row in rows])
+    return [
+        {
+            "employee": employees.get(row["employee_id"]),
+            "score": Decimal(row["score"]).quantize(TWO_PLACES),
+            "kpi_count": row["kpi_count"],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import KPI, KPIEvaluation, KPIPeriodTarget
+from .services.score_rollup import schedule_refresh
+
+
+@receiver(post_save, sender=KPI)
+def refresh_rollups_on_kpi_save(sender, instance, created=False, raw=False, **kwargs):
+    # Rollups copy employee/cycle/weight; a new KPI has no targets yet.
+    if created or raw:
+        return
+    schedule_refresh([instance.pk])
+
+
+@receiver(post_save, sender=KPIPeriodTarget)
+@receiver(post_delete, sender=KPIPeriodTarget)
+def refresh_rollups_on_target_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_refresh([instance.kpi_id])
+
+
+@receiver(post_save, sender=KPIEvaluation)
+@receiver(post_delete, sender=KPIEvaluation)
+def refresh_rollups_on_evaluation_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # The target may already be gone when deleted along with it.
+    kpi_id = KPIPeriodTarget.objects.filter(pk=instance.period_target_id).values_list("kpi_id", flat=True).first()
+    schedule_refresh([kpi_id])
@@ -1,3 +1,187 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.models import Company, Employee
+
+from .models import KPI, KPICycle, KPIEvaluation, KPIPeriodTarget, KPIScoreRollup
+from .services import score_rollup
+from .services.kpi_service import _build_kpi_data
+from .services.period_grid_service import save_period_grid, save_period_targets
+from .services.period_service import create_period_targets, generate_periods, period_arrays
+
+User = get_user_model()
+
+
+class PeriodGridTest(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Kebun Sawit')
+        self.user = User.objects.create_user(username='pekerja', password='pass12345', company=self.company)
+        self.boss_user = User.objects.create_user(username='mandor', password='pass12345', company=self.company)
+        boss = Employee.objects.create(name='Mandor', email='mandor@example.com', company=self.company, user=self.boss_user)
+        employee = Employee.objects.create(
+            name='Pekerja', email='pekerja@example.com', company=self.company, user=self.user, manager=boss
+        )
+        cycle = KPICycle.objects.create(
+            company=self.company, name='2025', period=KPICycle.Period.WEEKLY,
+            start_date=date(2025, 1, 6), end_date=date(2025, 1, 26),
+        )
+        self.kpi = KPI.objects.create(
+            company=self.company, employee=employee, supervisor=boss, title='Panen TBS',
+            cycle=cycle, status=KPI.Status.APPROVED,
+        )
+        save_period_targets(self.kpi, [
+            (date(2025, 1, 6), 'W02 2025', Decimal('10')),
+            (date(2025, 1, 13), 'W03 2025', Decimal('10')),
+            (date(2025, 1, 20), 'W04 2025', None),
+        ])
+        self.url = f'/kinerja/kpi/{self.kpi.id}/period-grid/'
+
+    def patch(self, rows):
+        return self.client.patch(self.url, json.dumps({'rows': rows}), content_type='application/json')
+
+    def test_save_period_targets_diffs_against_existing(self):
+        result = save_period_targets(self.kpi, [
+            (date(2025, 1, 6), 'W02 2025', Decimal('10.00')),
+            (date(2025, 1, 13), 'W03 2025', Decimal('12')),
+            (date(2025, 1, 27), 'W05 2025', None),
+        ])
+        self.assertEqual((result.targets_created, result.targets_updated), (1, 1))
+        self.assertEqual(KPIPeriodTarget.objects.get(period_start=date(2025, 1, 13)).target_value, Decimal('12'))
+
+    def test_patch_saves_a_batch_of_rows(self):
+        self.client.force_login(self.user)
+        response = self.patch([
+            {'period_start': '2025-01-06', 'actual': '8', 'notes': 'hujan'},
+            {'label': 'W03 2025', 'target_value': 15, 'actual': 11},
+            {'period_start': '2025-03-03', 'actual': 1},
+        ])
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(
+            (body['targets_updated'], body['evaluations_created'], body['missing']), (1, 2, ['2025-03-03'])
+        )
+        evaluation = KPIEvaluation.objects.get(period_target__period_start=date(2025, 1, 6))
+        self.assertEqual((evaluation.score, evaluation.notes), (Decimal('8'), 'hujan'))
+        self.assertEqual(evaluation.status, KPIEvaluation.Status.PENDING)
+
+        self.client.force_login(self.boss_user)
+        response = self.patch([{'period_start': '2025-01-06', 'notes_supervisor': 'ok'}])
+        self.assertEqual(response.json()['evaluations_updated'], 1)
+        evaluation.refresh_from_db()
+        self.assertEqual((evaluation.score, evaluation.status), (Decimal('8'), KPIEvaluation.Status.APPROVED))
+
+    def test_patch_rejects_invalid_rows(self):
+        self.client.force_login(self.user)
+        response = self.patch([{'period_start': 'kemarin'}, {'label': 'W02 2025', 'actual': 'banyak'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'0', '1'})
+        self.assertFalse(KPIEvaluation.objects.exists())
+
+
+class ScoreRollupTest(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Kebun Sawit')
+        self.cycle = KPICycle.objects.create(
+            company=self.company, name='2025', period=KPICycle.Period.WEEKLY,
+            start_date=date(2025, 1, 27), end_date=date(2025, 2, 9),
+        )
+        self.budi = Employee.objects.create(name='Budi', email='budi@example.com', company=self.company)
+        self.sari = Employee.objects.create(name='Sari', email='sari@example.com', company=self.company)
+        self.panen = self.make_kpi(self.budi, 'Panen TBS', 60)
+        self.perawatan = self.make_kpi(self.budi, 'Perawatan', 40)
+
+    def make_kpi(self, employee, title, weight):
+        kpi = KPI.objects.create(
+            company=self.company, employee=employee, title=title, cycle=self.cycle, weight=Decimal(weight)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            save_period_targets(kpi, [
+                (date(2025, 1, 27), 'W05 2025', Decimal('10')),
+                (date(2025, 2, 3), 'W06 2025', Decimal('10')),
+            ])
+        return kpi
+
+    def evaluate(self, kpi, actuals, is_supervisor=True):
+        rows = [{'period_start': start, 'actual': Decimal(actual)} for start, actual in actuals]
+        with self.captureOnCommitCallbacks(execute=True):
+            save_period_grid(kpi, rows, None, is_supervisor)
+
+    def test_rollups_follow_grid_saves_and_single_edits(self):
+        self.evaluate(self.panen, [(date(2025, 1, 27), 5), (date(2025, 2, 3), 8)])
+        january = KPIScoreRollup.objects.get(kpi=self.panen, month=date(2025, 1, 1))
+        self.assertEqual((january.target, january.approved_actual, january.pct), (Decimal('10'), Decimal('5'), Decimal('50')))
+        self.assertEqual(january.weighted_pct, Decimal('30'))
+
+        evaluation = KPIEvaluation.objects.get(period_target__kpi=self.panen, period_target__period_start=date(2025, 2, 3))
+        evaluation.status = KPIEvaluation.Status.REJECTED
+        with self.captureOnCommitCallbacks(execute=True):
+            evaluation.save()
+        february = KPIScoreRollup.objects.get(kpi=self.panen, month=date(2025, 2, 1))
+        self.assertEqual((february.actual, february.approved_actual, february.pct), (Decimal('8'), None, None))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            KPIPeriodTarget.objects.filter(kpi=self.panen, period_start=date(2025, 1, 27)).delete()
+        self.assertFalse(KPIScoreRollup.objects.filter(kpi=self.panen, month=date(2025, 1, 1)).exists())
+        self.assertEqual(KPIScoreRollup.objects.count(), 3)
+
+    def test_kpi_list_and_leaderboard_read_rollups(self):
+        self.evaluate(self.panen, [(date(2025, 1, 27), 10), (date(2025, 2, 3), 5)])
+        self.evaluate(self.perawatan, [(date(2025, 2, 3), 10)], is_supervisor=False)
+        sari_kpi = self.make_kpi(self.sari, 'Panen TBS', 100)
+        self.evaluate(sari_kpi, [(date(2025, 2, 3), 9)])
+
+        data = {row['kpi']: row for row in _build_kpi_data(KPI.objects.filter(employee=self.budi))}
+        self.assertEqual((data[self.panen]['target'], data[self.panen]['score']), (Decimal('20'), Decimal('15')))
+        self.assertEqual((data[self.panen]['pct'], data[self.panen]['weighted_pct']), (75.0, 45.0))
+        self.assertIsNone(data[self.perawatan]['pct'])
+
+        board = score_rollup.get_leaderboard(self.company, date(2025, 2, 14))
+        self.assertEqual([(row['employee'], row['score']) for row in board], [(self.sari, Decimal('90')), (self.budi, Decimal('50'))])
+
+        self.assertEqual(KPIScoreRollup.objects.count(), 6)
+        KPIScoreRollup.objects.all().delete()
+        self.assertEqual(score_rollup.rebuild_rollups(self.company), 6)
+
+
+class PeriodServiceTest(TestCase):
+    def test_boundaries_and_labels(self):
+        weeks = period_arrays('weekly', date(2024, 12, 31), date(2025, 1, 15))
+        self.assertEqual(weeks.starts, (date(2024, 12, 30), date(2025, 1, 6), date(2025, 1, 13)))
+        self.assertEqual(weeks.labels, ('W01 2025', 'W02 2025', 'W03 2025'))
+        self.assertEqual(weeks.ends[-1], date(2025, 1, 15))
+
+        quarters = period_arrays('quarterly', date(2025, 2, 10), date(2025, 8, 31))
+        self.assertEqual(quarters.starts, (date(2025, 1, 1), date(2025, 4, 1), date(2025, 7, 1)))
+        self.assertEqual(quarters.ends, (date(2025, 3, 31), date(2025, 6, 30), date(2025, 8, 31)))
+        self.assertEqual(quarters.labels, ('Q1 2025', 'Q2 2025', 'Q3 2025'))
+        self.assertIs(period_arrays('quarterly', date(2025, 2, 10), date(2025, 8, 31)), quarters)
+
+        periods = generate_periods('semiannual', date(2025, 3, 1), date(2026, 1, 31), period_targets={'2025-07-01': '5'})
+        self.assertEqual([(p['label'], p['target_value']) for p in periods], [
+            ('Semester 1 2025', ''), ('Semester 2 2025', '5'), ('Semester 1 2026', ''),
+        ])
+
+    def test_create_period_targets_in_one_batch(self):
+        company = Company.objects.create(name='Kebun Sawit')
+        employee = Employee.objects.create(name='Budi', email='budi@example.com', company=company)
+        cycle = KPICycle.objects.create(
+            company=company, name='2025', period=KPICycle.Period.MONTHLY,
+            start_date=date(2025, 1, 1), end_date=date(2025, 12, 31),
+        )
+        kpis = [
+            KPI.objects.create(company=company, employee=employee, title=f'KPI {n}', cycle=cycle, target=Decimal('7'))
+            for n in range(3)
+        ]
+        KPIPeriodTarget.objects.create(kpi=kpis[0], period_start=date(2025, 1, 1), label='Jan 2025', target_value=1)
 
-# Create your tests here.
+        with CaptureQueriesContext(connection) as queries:
+            create_period_targets(kpis)
+        self.assertEqual(sum('INSERT' in query['sql'] for query in queries.captured_queries), 1)
+        self.assertEqual(KPIPeriodTarget.objects.count(), 36)
+        self.assertEqual(KPIPeriodTarget.objects.get(kpi=kpis[0], period_start=date(2025, 1, 1)).target_value, 1)
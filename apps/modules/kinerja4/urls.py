@@ -13,6 +13,7 @@ urlpatterns = [
     path('kpi/<int:kpi_id>/edit/', views.KPIEditView.as_view(), name='kpi_edit'),
     path('kpi/<int:kpi_id>/approval/', views.KPIApprovalView.as_view(), name='kpi_approval'),
     path('kpi/<int:kpi_id>/period-input/', views.KPIPeriodInputView.as_view(), name='kpi_period_input'),
+    path('kpi/<int:kpi_id>/period-grid/', views.KPIPeriodGridView.as_view(), name='kpi_period_grid'),
     path('evaluation/<int:eval_id>/approval/', views.KPIEvaluationApprovalView.as_view(), name='evaluation_approval'),
 
     path('cycle/new/', views.KPICycleCreateView.as_view(), name='cycle_create'),
@@ -20,8 +20,10 @@ from .services.kpi_service import (
     get_kpi_list_data,
     create_kpi_period_targets,
 )
+from .services.period_grid_service import parse_grid_payload, save_period_grid
 from .services.period_input_service import (
     compute_roles,
+    access_error,
     check_access,
     prefill_form_initial,
     handle_table_submit,
@@ -478,6 +480,39 @@ class KPIPeriodInputView(LoginRequiredMixin, View):
         })
 
 
+class KPIPeriodGridView(LoginRequiredMixin, View):
+    """Period grid of a KPI as JSON; PATCH saves a batch of rows."""
+
+    def get_kpi(self, request, kpi_id):
+        return get_object_or_404(KPI, id=kpi_id, company=request.user.company)
+
+    def get(self, request, kpi_id: int):
+        kpi = self.get_kpi(request, kpi_id)
+        person, _, _, _ = compute_roles(request.user, kpi)
+        error = access_error(request.user, kpi, person)
+        if error:
+            return JsonResponse({'error': error}, status=403)
+        rows, total_target, total_actual = build_summary(kpi)
+        return JsonResponse({'rows': rows, 'total_target': total_target, 'total_actual': total_actual})
+
+    def patch(self, request, kpi_id: int):
+        kpi = self.get_kpi(request, kpi_id)
+        person, _, is_supervisor, _ = compute_roles(request.user, kpi)
+        error = access_error(request.user, kpi, person)
+        if error:
+            return JsonResponse({'error': error}, status=403)
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Body harus berupa JSON.'}, status=400)
+
+        rows, errors = parse_grid_payload(payload)
+        if errors:
+            return JsonResponse({'errors': errors}, status=400)
+        result = save_period_grid(kpi, rows, request.user, is_supervisor)
+        return JsonResponse({**result.as_dict(), 'rows': build_summary(kpi)[0]})
+
+
 class KPIEvaluationApprovalView(LoginRequiredMixin, View):
     def get_object(self):
         return get_object_or_404(KPIEvaluation, id=self.kwargs.get("eval_id"))
@@ -8,6 +8,7 @@ from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.urls import reverse, reverse_lazy
 from apps.core.models import Employee, Borongan
+from apps.core.services import org_hierarchy
 from apps.modules.m2recruit.models import TestResult
 from .forms import EmployeeForm, EmployeeEditForm, SOPSuggestionForm, BoronganForm
 from .models import DocumentStandar
@@ -62,46 +63,10 @@ class EmployeeListView(LoginRequiredMixin, ListView):
         if not is_owner:
             person = getattr(self.request.user, 'person', None)
             if person:
-                # Get all subordinate IDs recursively
-                allowed_ids = set()
-                
-                # Include self if person is also an employee
-                if hasattr(person, 'employee'):
-                    allowed_ids.add(person.employee.id)
-                else:
-                    # Check if person exists as employee by ID
-                    try:
-                        self_employee = Employee.objects.get(id=person.id)
-                        allowed_ids.add(self_employee.id)
-                    except Employee.DoesNotExist:
-                        pass
-                
-                # Get all subordinates recursively
-                def get_descendants(person_obj):
-                    descendants = set()
-                    for subordinate in person_obj.subordinates.all():
-                        # Check if subordinate is also an employee
-                        if hasattr(subordinate, 'employee'):
-                            descendants.add(subordinate.employee.id)
-                        # Also check by ID match
-                        try:
-                            emp = Employee.objects.get(id=subordinate.id)
-                            descendants.add(emp.id)
-                        except Employee.DoesNotExist:
-                            pass
-                        # Recursively get subordinates of this subordinate
-                        descendants.update(get_descendants(subordinate))
-                    return descendants
-                
-                subordinate_ids = get_descendants(person)
-                allowed_ids.update(subordinate_ids)
-                
-                # Filter queryset to only include allowed employees
-                if allowed_ids:
-                    queryset = queryset.filter(id__in=allowed_ids)
-                else:
-                    # If no allowed IDs, return empty queryset
-                    queryset = queryset.none()
+                # Self plus every employee below them in the org tree
+                queryset = queryset.filter(
+                    id__in=org_hierarchy.descendants(person, include_self=True).values('id')
+                )
         
         return queryset
 
@@ -210,46 +175,10 @@ class EmployeeDetailView(LoginRequiredMixin, DetailView):
         if not is_owner:
             person = getattr(self.request.user, 'person', None)
             if person:
-                # Get all subordinate IDs recursively
-                allowed_ids = set()
-                
-                # Include self if person is also an employee
-                if hasattr(person, 'employee'):
-                    allowed_ids.add(person.employee.id)
-                else:
-                    # Check if person exists as employee by ID
-                    try:
-                        self_employee = Employee.objects.get(id=person.id)
-                        allowed_ids.add(self_employee.id)
-                    except Employee.DoesNotExist:
-                        pass
-                
-                # Get all subordinates recursively
-                def get_descendants(person_obj):
-                    descendants = set()
-                    for subordinate in person_obj.subordinates.all():
-                        # Check if subordinate is also an employee
-                        if hasattr(subordinate, 'employee'):
-                            descendants.add(subordinate.employee.id)
-                        # Also check by ID match
-                        try:
-                            emp = Employee.objects.get(id=subordinate.id)
-                            descendants.add(emp.id)
-                        except Employee.DoesNotExist:
-                            pass
-                        # Recursively get subordinates of this subordinate
-                        descendants.update(get_descendants(subordinate))
-                    return descendants
-                
-                subordinate_ids = get_descendants(person)
-                allowed_ids.update(subordinate_ids)
-                
-                # Filter queryset to only include allowed employees
-                if allowed_ids:
-                    queryset = queryset.filter(id__in=allowed_ids)
-                else:
-                    # If no allowed IDs, return empty queryset
-                    queryset = queryset.none()
+                # Self plus every employee below them in the org tree
+                queryset = queryset.filter(
+                    id__in=org_hierarchy.descendants(person, include_self=True).values('id')
+                )
         
         return queryset
 
@@ -317,39 +246,10 @@ class EmployeeUpdateView(LoginRequiredMixin, UpdateView):
         if not self.request.user.is_owner:
             person = getattr(self.request.user, 'person', None)
             if person:
-                # Get all subordinate IDs recursively
-                allowed_ids = set()
-                
-                # Include self if person is also an employee
-                if hasattr(person, 'employee'):
-                    allowed_ids.add(person.employee.id)
-                
-                # Get all subordinates recursively
-                def get_descendants(person_obj):
-                    descendants = set()
-                    for subordinate in person_obj.subordinates.all():
-                        # Check if subordinate is also an employee
-                        if hasattr(subordinate, 'employee'):
-                            descendants.add(subordinate.employee.id)
-                        # Also check by ID match
-                        try:
-                            emp = Employee.objects.get(id=subordinate.id)
-                            descendants.add(emp.id)
-                        except Employee.DoesNotExist:
-                            pass
-                        # Recursively get subordinates of this subordinate
-                        descendants.update(get_descendants(subordinate))
-                    return descendants
-                
-                subordinate_ids = get_descendants(person)
-                allowed_ids.update(subordinate_ids)
-                
-                # Filter queryset to only include allowed employees
-                if allowed_ids:
-                    queryset = queryset.filter(id__in=allowed_ids)
-                else:
-                    # If no allowed IDs, return empty queryset
-                    queryset = queryset.none()
+                # Self plus every employee below them in the org tree
+                queryset = queryset.filter(
+                    id__in=org_hierarchy.descendants(person, include_self=True).values('id')
+                )
         
         return queryset
 
@@ -404,25 +304,7 @@ class EmployeeUpdateView(LoginRequiredMixin, UpdateView):
         else:
             person = getattr(request.user, 'person', None)
             if person:
-                # Check if the target employee is a subordinate
-                def is_subordinate(person_obj, target_employee):
-                    for subordinate in person_obj.subordinates.all():
-                        # Check by employee attribute
-                        if hasattr(subordinate, 'employee') and subordinate.employee.id == target_employee.id:
-                            return True
-                        # Check by ID match
-                        try:
-                            emp = Employee.objects.get(id=subordinate.id)
-                            if emp.id == target_employee.id:
-                                return True
-                        except Employee.DoesNotExist:
-                            pass
-                        # Recursively check
-                        if is_subordinate(subordinate, target_employee):
-                            return True
-                    return False
-                
-                has_permission = is_subordinate(person, self.object)
+                has_permission = org_hierarchy.is_descendant(self.object, person)
 
         if not has_permission:
             messages.error(request, self.permission_denied_message)
@@ -3,6 +3,12 @@ ASGI config for HRManagement project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server (e.g. ``uvicorn config.asgi:application``) to
+keep the consultation event streams (``api.consultation`` ``.../events/``)
+open; each open stream holds a database connection while it is connected.
+Under WSGI those endpoints fall back to polling every
+``CONSULTATION_STREAM_INTERVAL`` seconds.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 """
@@ -11,6 +17,7 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Same default as passenger_wsgi.py; config.settings itself defines nothing.
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
 
 application = get_asgi_application()
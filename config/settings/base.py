@@ -60,6 +60,7 @@ INSTALLED_APPS = [
     'api.pasar',
     'api.petunjuk',
     'api.waypoint',
+    'api.sync',
 ]
 
 # Crispy Forms Configuration
@@ -74,6 +75,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.middleware.UserRoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -140,6 +142,36 @@ LOGOUT_REDIRECT_URL = reverse_lazy('index')
 ACCOUNT_ACTIVATION_DAYS = 7
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Django REST framework
+# Pagination is opt-in per request (cursor/page_size), see api.listing.
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'api.listing.KeysetPagination',
+    'PAGE_SIZE': 50,
+}
+
+# Cache
+# Shared by every worker process (LocMem is per process). File based by
+# default; production switches to Redis when REDIS_URL is set.
+# ``master_versions`` only holds the master_cache version counters: the file
+# backend culls a random third of its files once MAX_ENTRIES is reached, and
+# losing a counter would invalidate a whole namespace.
+CACHE_DIR = os.environ.get('DJANGO_CACHE_DIR', os.path.join(BASE_DIR, '.cache'))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+        'KEY_PREFIX': 'nusasawit',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'master_versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR + '-versions',
+        'KEY_PREFIX': 'nusasawit',
+        'TIMEOUT': None,
+    },
+}
+
 # CKEditor
 CKEDITOR_CONFIGS = {
     'default': {
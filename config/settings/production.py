@@ -17,6 +17,25 @@ DATABASES = {
     }
 }
 
+# Redis (django.core.cache.backends.redis needs the ``redis`` package).
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'nusasawit',
+            'TIMEOUT': 300,
+        },
+        # Counters are stored without a TTL, so volatile-* eviction policies keep them.
+        'master_versions': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'nusasawit',
+            'TIMEOUT': None,
+        },
+    }
+
 
 STATIC_URL = '/static/'
 STATIC_ROOT = '/home/sdmporta/nusasawit.com/staticfiles'
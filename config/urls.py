@@ -46,6 +46,7 @@ urlpatterns = [
     path('api/sertifikasi/', include('api.sertifikasi.urls')),
     path('api/pasar/', include('api.pasar.urls')),
     path('api/petunjuk/', include('api.petunjuk.urls')),
+    path('api/sync/', include('api.sync.urls')),
     path('app/waypoint', include('api.waypoint.urls')),
     
 